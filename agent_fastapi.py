@@ -55,7 +55,9 @@ from open_storyline.mcp.hooks.node_interceptors import ToolInterceptor
 from open_storyline.mcp.hooks.chat_middleware import set_mcp_log_sink, reset_mcp_log_sink
 from open_storyline.pipeline.edit_template import EditTemplate, NodeConfig
 from open_storyline.pipeline.template_store import TemplateStore
-from open_storyline.pipeline.pipeline_executor import PipelineExecutor
+from open_storyline.pipeline.checkpoint import PipelineCheckpoint
+from open_storyline.pipeline.node_memo import NodeMemo
+from open_storyline.pipeline.pipeline_executor import CONFIRM_SKIP, PipelineExecutor
 
 WEB_DIR = os.path.join(ROOT_DIR, "web")
 STATIC_DIR = os.path.join(WEB_DIR, "static")
@@ -2385,19 +2387,33 @@ async def ws_chat(ws: WebSocket, session_id: str):
                     await ws_send(ws, "chat.cleared", {"ok": True})
                     continue
 
-                # ---- Pipeline: 一键剪辑 ----
-                if t == "pipeline.start":
+                # ---- Pipeline: 一键剪辑 / 从上次中断处续跑 ----
+                if t in ("pipeline.start", "pipeline.resume"):
                     if sess.pipeline_task and not sess.pipeline_task.done():
                         await ws_send(ws, "error", {"message": "Pipeline 正在运行中"})
                         continue
 
                     data = req.get("data") or {}
-                    template_id = data.get("template_id", "")
-                    template_store: TemplateStore = app.state.template_store
-                    template = template_store.get(template_id)
-                    if not template:
-                        await ws_send(ws, "error", {"message": f"模板不存在: {template_id}"})
-                        continue
+                    resume = t == "pipeline.resume"
+                    artifact_store = ArtifactStore(
+                        sess.cfg.project.outputs_dir,
+                        session_id=sess.session_id,
+                    )
+                    if resume:
+                        # 续跑使用上次执行时保存的模板
+                        saved_state = PipelineCheckpoint.for_store(artifact_store).load()
+                        if not saved_state:
+                            await ws_send(ws, "error", {"message": "没有可续跑的流水线记录"})
+                            continue
+                        template = EditTemplate(**saved_state["template"])
+                        template_id = template.template_id
+                    else:
+                        template_id = data.get("template_id", "")
+                        template_store: TemplateStore = app.state.template_store
+                        template = template_store.get(template_id)
+                        if not template:
+                            await ws_send(ws, "error", {"message": f"模板不存在: {template_id}"})
+                            continue
 
                     # 确保 agent 已初始化（我们需要 node_manager 和 store）
                     try:
@@ -2407,16 +2423,15 @@ async def ws_chat(ws: WebSocket, session_id: str):
                         continue
 
                     sess.pipeline_cancel_event.clear()
-                    artifact_store = ArtifactStore(
-                        sess.cfg.project.outputs_dir,
-                        session_id=sess.session_id,
-                    )
-
                     executor = PipelineExecutor(
                         node_manager=sess.node_manager,
                         store=artifact_store,
                         session_id=sess.session_id,
                         runtime=sess.client_context,
+                        max_parallel=sess.cfg.pipeline.max_parallel_nodes,
+                        memo=NodeMemo(sess.cfg.pipeline.memo_dir) if sess.cfg.pipeline.memo_enabled else None,
+                        speculative=sess.cfg.pipeline.speculative_confirm,
+                        prefix_preview_groups=sess.cfg.pipeline.prefix_preview_groups,
                     )
 
                     async def _safe_ws_send(event_type, payload):
@@ -2434,6 +2449,13 @@ async def ws_chat(ws: WebSocket, session_id: str):
                             "message": message,
                         })
 
+                    async def _on_partial(node_id, payload):
+                        # 节点流式发布的部分结果（如逐段配音、配音前缀的预览视频），前端可提前预览
+                        await _safe_ws_send("pipeline.partial", {
+                            "node_id": node_id,
+                            **payload,
+                        })
+
                     async def _on_confirm(node_id, params, timeout_sec):
                         await _safe_ws_send("pipeline.confirm", {
                             "node_id": node_id,
@@ -2443,19 +2465,26 @@ async def ws_chat(ws: WebSocket, session_id: str):
                         loop = asyncio.get_event_loop()
                         sess.pipeline_confirm_future = loop.create_future()
                         try:
-                            result = await sess.pipeline_confirm_future
-                            return result if isinstance(result, dict) else params
+                            # 原样返回确认参数或 CONFIRM_SKIP，由执行器判断跳过 / 修改 / 沿用
+                            return await sess.pipeline_confirm_future
                         finally:
                             sess.pipeline_confirm_future = None
 
                     async def _run_pipeline():
                         try:
-                            result = await executor.run(
-                                template,
+                            run_kwargs = dict(
                                 on_progress=_on_progress,
                                 on_confirm=_on_confirm if template.auto_mode == "semi_auto" else None,
                                 cancel_event=sess.pipeline_cancel_event,
+                                on_partial=_on_partial,
                             )
+                            # true: 全部重新执行；节点 ID 列表：仅这些节点不复用已有结果（续跑时默认沿用上次的设置）
+                            if "force" in data or not resume:
+                                run_kwargs["force"] = data.get("force") or False
+                            if resume:
+                                result = await executor.resume(**run_kwargs)
+                            else:
+                                result = await executor.run(template, **run_kwargs)
                             await _safe_ws_send("pipeline.done", result)
                         except Exception as e:
                             logger.error(f"[Pipeline] Error: {e}")
@@ -2467,6 +2496,7 @@ async def ws_chat(ws: WebSocket, session_id: str):
                     await ws_send(ws, "pipeline.started", {
                         "template_id": template_id,
                         "template_name": template.name,
+                        "resumed": resume,
                     })
                     continue
 
@@ -2481,7 +2511,7 @@ async def ws_chat(ws: WebSocket, session_id: str):
                 if t == "pipeline.confirm_response":
                     if sess.pipeline_confirm_future and not sess.pipeline_confirm_future.done():
                         data = req.get("data") or {}
-                        confirmed_params = data.get("params", {})
+                        confirmed_params = CONFIRM_SKIP if data.get("skip") else data.get("params", {})
                         try:
                             sess.pipeline_confirm_future.set_result(confirmed_params)
                         except asyncio.InvalidStateError:
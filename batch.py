@@ -0,0 +1,74 @@
+"""
+Headless batch runner: renders every job of a manifest through the pipeline, without the web UI or the agent.
+
+Manifest: JSON Lines, one job per line, e.g.
+
+    {"job_id": "trip_001", "media_dir": "/data/trip_001", "template_id": "preset_travel_vlog",
+     "overrides": {"generate_script": {"params": {"user_request": "..."}}, "generate_voiceover": {"mode": "skip"}}}
+
+Start the MCP server first (see README), then:
+
+    python batch.py --manifest jobs.jsonl --workers 4
+
+Re-running the same command after a crash skips jobs that already finished; add --resume to continue
+unfinished jobs from their last completed node instead of starting them over.
+"""
+import os
+import sys
+import json
+import asyncio
+import argparse
+
+# Add src directory to Python module search path
+ROOT_DIR = os.path.dirname(__file__)
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from open_storyline.config import load_settings, default_config_path
+from open_storyline.pipeline.batch_runner import (
+    DEFAULT_BATCH_WORKERS,
+    BatchRunner,
+    format_report,
+    load_manifest,
+)
+from open_storyline.pipeline.template_store import TemplateStore
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--manifest", type=str, required=True, help="JSON Lines file, one job per line")
+    parser.add_argument("--config", type=str, default=default_config_path())
+    parser.add_argument("--workers", type=int, default=DEFAULT_BATCH_WORKERS, help="Jobs run concurrently")
+    parser.add_argument("--state", type=str, default=None, help="Job status file (default: <manifest>.state.jsonl)")
+    parser.add_argument("--report", type=str, default=None, help="Report file (default: <manifest>.report.json)")
+    parser.add_argument("--job_timeout_sec", type=float, default=None, help="Cancel a job, running nodes included, after this long")
+    parser.add_argument("--templates_dir", type=str, default=None, help="Saved templates (default: .storyline/templates)")
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Continue unfinished jobs from their saved pipeline state (the template saved with it is used)",
+    )
+    args = parser.parse_args()
+
+    manifest_base = os.path.splitext(args.manifest)[0]
+    cfg = load_settings(args.config)
+    jobs = load_manifest(args.manifest)
+
+    runner = BatchRunner(
+        cfg,
+        args.state or f"{manifest_base}.state.jsonl",
+        workers=args.workers,
+        template_store=TemplateStore(args.templates_dir) if args.templates_dir else None,
+        job_timeout_sec=args.job_timeout_sec,
+        resume=args.resume,
+    )
+    report = await runner.run(jobs)
+
+    with open(args.report or f"{manifest_base}.report.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(format_report(report))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -3,6 +3,7 @@ import time
 import uuid
 import os,sys
 import json
+import argparse
 
 from typing import List
 
@@ -22,11 +23,42 @@ from open_storyline.config import load_settings, default_config_path
 from open_storyline.storage.agent_memory import ArtifactStore
 from open_storyline.mcp.hooks.node_interceptors import ToolInterceptor
 from open_storyline.mcp.hooks.chat_middleware import PrintStreamingTokens
+from open_storyline.pipeline.node_memo import NodeMemo
+from open_storyline.pipeline.pipeline_executor import PipelineExecutor
 
 _MEDIA_STATS_INFO_IDX = 1
 
+
+async def resume_pipeline(cfg, session_id: str, artifact_store: ArtifactStore, node_manager, context: ClientContext):
+    """Continue the session's saved pipeline run from its first incomplete node, like `batch.py --resume`."""
+    executor = PipelineExecutor(
+        node_manager=node_manager,
+        store=artifact_store,
+        session_id=session_id,
+        runtime=context,
+        max_parallel=cfg.pipeline.max_parallel_nodes,
+        memo=NodeMemo(cfg.pipeline.memo_dir) if cfg.pipeline.memo_enabled else None,
+    )
+    if executor.checkpoint.load() is None:
+        print(f"No saved pipeline run for session {session_id}")
+        return
+
+    async def on_progress(node_id, status, progress, message):
+        print(f"[{progress:4.0%}] {node_id}: {status} {message or ''}".rstrip())
+
+    result = await executor.resume(on_progress=on_progress)
+    print(f"Pipeline {result['status']}, resumed nodes: {', '.join(result.get('resumed_nodes', [])) or '-'}")
+    if result.get("failed_node"):
+        print(f"Failed node: {result['failed_node']}")
+
+
 async def main():
-    session_id = f"run_{int(time.time())}_{uuid.uuid4().hex[:8]}"
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resume", type=str, default=None, metavar="SESSION_ID",
+                        help="Continue the saved pipeline run of this session from its first incomplete node, then exit")
+    args = parser.parse_args()
+
+    session_id = args.resume or f"run_{int(time.time())}_{uuid.uuid4().hex[:8]}"
     cfg = load_settings(default_config_path())
     
     artifact_store = ArtifactStore(cfg.project.outputs_dir, session_id=session_id)
@@ -42,6 +74,10 @@ async def main():
         chat_model_key=cfg.llm.model,
     )
 
+    if args.resume:
+        await resume_pipeline(cfg, session_id, artifact_store, node_manager, context)
+        return
+
     messages: List[BaseMessage] = [
         SystemMessage(content=get_prompt("instruction.system", lang='en')),
         SystemMessage(content="【User media statistics】{}"),
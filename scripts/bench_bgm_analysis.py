@@ -0,0 +1,149 @@
+"""
+Wall time / peak memory of BGM analysis on synthetic tracks (a click track, and drums under chords), and
+accent-beat agreement between the full-track waveform HPSS analysis and the analysis select_bgm now runs: bounded
+by a `--timeline_sec` long video (SelectBGMNode.analysis_bound_sec) with the candidate percussive method.
+Agreement is the share of reference accents matched within one hop, over the timeline (the accents the planner
+snaps to) and over the whole analysed head. Run from the repo root:
+
+    python scripts/bench_bgm_analysis.py --minutes 3 60 --timeline_sec 90 --percussive_method spectral_hpss
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+import soundfile as sf
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for p in (ROOT_DIR, os.path.join(ROOT_DIR, "src")):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from open_storyline.nodes.core_nodes.select_bgm import SelectBGMNode
+
+SAMPLE_RATE = 22050
+HOP_LENGTH = 2048
+FRAME_LENGTH = 2048
+
+
+def write_click_track(path: str, minutes: float, bpm: float = 120.0, sr: int = SAMPLE_RATE) -> None:
+    """Clicks on every beat, accented on the first beat of each bar, over a quiet sustained tone."""
+    beat_sec = 60.0 / bpm
+    click_len = int(0.02 * sr)
+    click = np.hanning(click_len * 2)[click_len:] * np.sin(2 * np.pi * 3000 * np.arange(click_len) / sr)
+    with sf.SoundFile(path, "w", samplerate=sr, channels=1, subtype="PCM_16") as f:
+        block_sec = 60
+        total_sec = minutes * 60.0
+        start_sec = 0.0
+        while start_sec < total_sec:
+            n = int(min(block_sec, total_sec - start_sec) * sr)
+            t = start_sec + np.arange(n) / sr
+            y = 0.05 * np.sin(2 * np.pi * 220 * t)
+            first_beat = int(np.ceil(start_sec / beat_sec))
+            beat_idx = first_beat
+            while beat_idx * beat_sec < start_sec + n / sr:
+                pos = int(round((beat_idx * beat_sec - start_sec) * sr))
+                gain = 0.9 if beat_idx % 4 == 0 else 0.35
+                end = min(n, pos + click_len)
+                y[pos:end] += gain * click[: end - pos]
+                beat_idx += 1
+            f.write(np.clip(y, -1.0, 1.0).astype(np.float32))
+            start_sec += block_sec
+
+
+def write_drum_track(path: str, minutes: float, bpm: float = 100.0, sr: int = SAMPLE_RATE) -> None:
+    """Noise drums accented 1-3-2-3 per bar under decaying four-note chords that change every two beats."""
+    beat_sec = 60.0 / bpm
+    rng = np.random.default_rng(0)
+    total = int(minutes * 60.0 * sr)
+    chord_len = int(2 * beat_sec * sr)
+    t = np.arange(chord_len) / sr
+    hit_len = int(0.08 * sr)
+    hit_env = np.exp(-np.arange(hit_len) / (0.015 * sr))
+    with sf.SoundFile(path, "w", samplerate=sr, channels=1, subtype="PCM_16") as f:
+        block = int(60 * sr)
+        for start in range(0, total, block):
+            n = min(block, total - start)
+            y = np.zeros(n + chord_len, dtype=np.float64)
+            # Every event that starts inside this block; tails past it are cut (inaudible at block edges)
+            first, last = int(np.ceil(start / sr / beat_sec)), int((start + n) / sr / beat_sec)
+            for i in range(first, last + 1):
+                pos = int(round(i * beat_sec * sr)) - start
+                if pos < 0 or pos >= n:
+                    continue
+                gain = (0.9, 0.3, 0.6, 0.3)[i % 4] * rng.uniform(0.8, 1.2)
+                y[pos:pos + hit_len] += gain * rng.standard_normal(hit_len) * hit_env
+                if i % 2 == 0:
+                    f0 = rng.choice([196.0, 220.0, 247.0, 262.0, 294.0, 330.0])
+                    chord = sum(np.sin(2 * np.pi * f0 * m * t) / m for m in (1.0, 1.25, 1.5, 2.0))
+                    onset = pos + int(0.5 * beat_sec * sr)
+                    y[onset:onset + chord_len] += (0.15 * chord * np.exp(-t * 1.5))[: len(y) - onset]
+            f.write(np.clip(y[:n], -1.0, 1.0).astype(np.float32))
+
+
+def run(path: str, params: dict) -> tuple[dict, float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    metrics = SelectBGMNode._analyze_track(path, params)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return metrics, elapsed, peak / (1 << 20)
+
+
+def agreement(reference_ms: list, candidate_ms: list, tolerance_ms: float, until_ms: float) -> float:
+    """Share of reference beats before `until_ms` matched by a candidate beat."""
+    if not candidate_ms:
+        return 0.0
+    cand = np.asarray(candidate_ms, dtype=np.float64)
+    ref = [r for r in reference_ms if r <= min(until_ms, cand[-1] + tolerance_ms)]
+    if not ref:
+        return 1.0
+    idx = np.clip(np.searchsorted(cand, ref), 1, len(cand) - 1)
+    nearest = np.minimum(np.abs(cand[idx] - ref), np.abs(cand[idx - 1] - ref))
+    return float(np.mean(nearest <= tolerance_ms))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=float, nargs="+", default=[3, 60])
+    parser.add_argument("--timeline_sec", type=float, default=90.0, help="Expected video length; 0 = unknown (the cap)")
+    parser.add_argument("--max_analysis_sec", type=float, default=180.0)
+    parser.add_argument("--analysis_margin_sec", type=float, default=30.0)
+    parser.add_argument("--percussive_method", choices=["hpss", "spectral_hpss"], default="spectral_hpss")
+    args = parser.parse_args()
+
+    bgm_cfg = SimpleNamespace(
+        max_analysis_sec=args.max_analysis_sec,
+        analysis_margin_sec=args.analysis_margin_sec,
+        percussive_method=args.percussive_method,
+    )
+    bound_sec = SelectBGMNode.analysis_bound_sec(bgm_cfg, int(args.timeline_sec * 1000))
+    base = {"sample_rate": SAMPLE_RATE, "hop_length": HOP_LENGTH, "frame_length": FRAME_LENGTH}
+    legacy = {**base, "max_analysis_sec": 0.0, "percussive_method": "hpss"}
+    bounded = {**base, "max_analysis_sec": bound_sec, "percussive_method": args.percussive_method}
+    tolerance_ms = 1000.0 * HOP_LENGTH / SAMPLE_RATE
+
+    print(f"timeline {args.timeline_sec:g}s -> analysis bound {bound_sec:g}s")
+    with tempfile.TemporaryDirectory() as tmp:
+        for minutes in args.minutes:
+            for name, write in (("click", write_click_track), ("drums", write_drum_track)):
+                path = os.path.join(tmp, f"{name}_{minutes:g}min.wav")
+                write(path, minutes)
+                ref, ref_s, ref_mb = run(path, legacy)
+                new, new_s, new_mb = run(path, bounded)
+                print(
+                    f"{name:5s} {minutes:g} min | full+hpss {ref_s:6.2f}s {ref_mb:8.1f} MiB | "
+                    f"bounded+{args.percussive_method} {new_s:6.2f}s {new_mb:8.1f} MiB | "
+                    f"bpm {ref['bpm']:.1f} / {new['bpm']:.1f} | "
+                    f"accent agreement: timeline {agreement(ref['beats'], new['beats'], tolerance_ms, args.timeline_sec * 1000):.1%}, "
+                    f"analysed head {agreement(ref['beats'], new['beats'], tolerance_ms, new['analysed_duration']):.1%}"
+                )
+
+
+if __name__ == "__main__":
+    main()
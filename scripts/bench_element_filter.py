@@ -0,0 +1,88 @@
+"""
+Per-call latency of ElementFilter.filter over the whole library, item-by-item scan vs the inverted index,
+on synthetic tag libraries. Run from the repo root:
+
+    python scripts/bench_element_filter.py --sizes 100 10000 100000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for p in (ROOT_DIR, os.path.join(ROOT_DIR, "src")):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from open_storyline.utils.element_filter import ElementFilter
+
+_MOODS = ["happy", "calm", "epic", "sad", "romantic", "tense", "dreamy", "playful"]
+_SCENES = ["travel", "vlog", "food", "sport", "wedding", "city", "nature", "family"]
+_GENRES = ["pop", "rock", "electronic", "acoustic", "classical", "hiphop"]
+_LANGS = ["zh", "en", "ja"]
+
+
+def make_library(n: int, rng: random.Random) -> list[dict]:
+    return [
+        {
+            "id": f"elem_{i}",
+            "mood": rng.sample(_MOODS, rng.randint(1, 3)),
+            "scene": rng.sample(_SCENES, rng.randint(1, 3)),
+            "genre": rng.choice(_GENRES),
+            **({"lang": rng.choice(_LANGS)} if rng.random() < 0.5 else {}),
+        }
+        for i in range(n)
+    ]
+
+
+def make_queries(count: int, rng: random.Random) -> list[tuple[dict, dict]]:
+    queries = []
+    for _ in range(count):
+        include = {"mood": rng.sample(_MOODS, 2), "scene": rng.choice(_SCENES)}
+        exclude = {"genre": rng.choice(_GENRES)}
+        if rng.random() < 0.5:
+            include["lang"] = rng.choice(_LANGS)
+        queries.append((include, exclude))
+    return queries
+
+
+def scan(f: ElementFilter, include: dict, exclude: dict) -> list[dict]:
+    """The pre-index implementation: walk every item and normalize its tag sets."""
+    return [item for item in f.library if f._match_include(item, include) and not f._match_exclude(item, exclude)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'elements':>9} | {'scan/call':>10} | {'index/call':>10} | {'index build':>11} | speedup")
+    for n in args.sizes:
+        rng = random.Random(args.seed)
+        f = ElementFilter(library=make_library(n, rng))
+        queries = make_queries(args.queries, rng)
+
+        start = time.perf_counter()
+        f._get_index()
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = [scan(f, inc, exc) for inc, exc in queries]
+        scan_s = (time.perf_counter() - start) / len(queries)
+
+        start = time.perf_counter()
+        got = [f.filter(filter_include=inc, filter_exclude=exc, fallback_n=0) for inc, exc in queries]
+        index_s = (time.perf_counter() - start) / len(queries)
+
+        assert got == expected, "inverted index disagrees with the item-by-item scan"
+        print(
+            f"{n:>9} | {scan_s * 1e3:>8.2f}ms | {index_s * 1e3:>8.2f}ms | {build_s * 1e3:>9.1f}ms | "
+            f"{scan_s / max(index_s, 1e-9):.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Latency of filter_clips + group_clips on synthetic clip sets, single-call vs map-reduce, using a stub LLM.
+
+The stub answers instantly with well-formed JSON and sleeps `base + per_1k_tokens * prompt_tokens / 1000`
+to mimic time-to-first-token growing with prompt size. It groups clips three at a time, so a chunk whose size is
+not a multiple of three ends in a short group; its reduce reply merges that group with the first group of the
+next chunk, as a scene split by a chunk boundary. Run from the repo root:
+
+    python scripts/bench_filter_group.py --sizes 50 200 1000
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for p in (ROOT_DIR, os.path.join(ROOT_DIR, "src")):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from open_storyline.config import load_settings, default_config_path
+from open_storyline.nodes.node_state import NodeState
+from open_storyline.nodes.node_summary import NodeSummary
+from open_storyline.nodes.core_nodes.filter_clips import FilterClipsNode
+from open_storyline.nodes.core_nodes.group_clips import GroupClipsNode
+from open_storyline.utils.map_reduce import estimate_tokens
+
+_CLIP_ID_RE = re.compile(r"clip_\d{4,}")
+_GROUP_SUMMARY_RE = re.compile(r"'group_id': '(g\d+)', 'chunk': (\d+),.*?'clip_number': (\d+)")
+_WORDS = "beach city street mountain dog cat sunset night market coffee bike train river forest crowd".split()
+
+
+class StubLLM:
+    """Deterministic stand-in for SamplingLLMClient.complete."""
+
+    def __init__(self, base_sec: float, per_1k_tokens_sec: float):
+        self.base_sec = base_sec
+        self.per_1k_tokens_sec = per_1k_tokens_sec
+        self.calls = 0
+
+    async def complete(self, *, system_prompt, user_prompt, media=None, **kwargs) -> str:
+        self.calls += 1
+        tokens = estimate_tokens(system_prompt) + estimate_tokens(user_prompt)
+        await asyncio.sleep(self.base_sec + self.per_1k_tokens_sec * tokens / 1000.0)
+
+        if '"order"' in system_prompt:
+            order = []
+            previous_chunk, previous_short = None, False
+            for tmp_id, chunk, clip_number in _GROUP_SUMMARY_RE.findall(user_prompt):
+                if previous_short and chunk != previous_chunk:
+                    order[-1] = [order[-1], tmp_id]
+                else:
+                    order.append(tmp_id)
+                previous_chunk, previous_short = chunk, int(clip_number) < 3
+            return json.dumps({"order": order})
+        clip_ids = list(dict.fromkeys(_CLIP_ID_RE.findall(user_prompt)))
+        if '"groups"' in system_prompt:
+            groups = [
+                {"group_id": "", "summary": f"group of {clip_ids[i]}", "clip_ids": clip_ids[i:i + 3]}
+                for i in range(0, len(clip_ids), 3)
+            ]
+            return json.dumps({"groups": groups})
+        return json.dumps({"results": [{"clip_id": cid, "keep": True} for cid in clip_ids]})
+
+
+def make_inputs(n: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    clips, captions = [], []
+    for i in range(1, n + 1):
+        cid = f"clip_{i:04d}"
+        clips.append({"clip_id": cid, "source_ref": {"duration": rng.randint(1000, 8000)}})
+        caption = " ".join(rng.choice(_WORDS) for _ in range(40))
+        captions.append({"clip_id": cid, "caption": caption, "aes_score": round(rng.random(), 2)})
+    return {
+        "user_request": "Edit a lively travel vlog",
+        "split_shots": {"clips": clips},
+        "understand_clips": {"clip_captions": captions},
+    }
+
+
+async def run_once(cfg, n: int, llm: StubLLM) -> tuple[float, int]:
+    node_state = NodeState(
+        session_id="bench",
+        artifact_id="bench",
+        lang="en",
+        node_summary=NodeSummary(auto_console=False),
+        llm=llm,
+        mcp_ctx=None,
+    )
+    filter_node = FilterClipsNode(cfg)
+    group_node = GroupClipsNode(cfg)
+
+    start = time.perf_counter()
+    inputs = filter_node._parse_input(node_state, make_inputs(n))
+    filtered = await filter_node.process(node_state, inputs)
+    grouped = await group_node.process(node_state, {"filter_clips": filtered, "user_request": inputs["user_request"]})
+    elapsed = time.perf_counter() - start
+    grouped_ids = [cid for g in grouped["groups"] for cid in g["clip_ids"]]
+    assert sorted(grouped_ids) == sorted(filtered["selected"]), "groups must carry every selected clip exactly once"
+    return elapsed, len(grouped["groups"])
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", type=str, default=default_config_path())
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--base_sec", type=float, default=0.3, help="Stub per-request overhead")
+    parser.add_argument("--per_1k_tokens_sec", type=float, default=0.4, help="Stub latency per 1k prompt tokens")
+    args = parser.parse_args()
+
+    cfg = load_settings(args.config)
+    single_cfg = cfg.model_copy(
+        update={"clip_map_reduce": cfg.clip_map_reduce.model_copy(update={"single_call_max_tokens": 10**9})}
+    )
+
+    print(f"{'clips':>6} | {'single-call':>12} | {'map-reduce':>12} | calls (single / map-reduce) | groups (single / map-reduce)")
+    for n in args.sizes:
+        single_llm = StubLLM(args.base_sec, args.per_1k_tokens_sec)
+        chunked_llm = StubLLM(args.base_sec, args.per_1k_tokens_sec)
+        single_s, single_groups = await run_once(single_cfg, n, single_llm)
+        chunked_s, chunked_groups = await run_once(cfg, n, chunked_llm)
+        print(
+            f"{n:>6} | {single_s:>11.2f}s | {chunked_s:>11.2f}s | {single_llm.calls:>5} / {chunked_llm.calls:<17} | "
+            f"{single_groups} / {chunked_groups}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""
+Image blocks and modelled VLM latency of understand_clips frame allocation: the fixed per-clip policy of the
+sampling client vs the motion-adaptive allocation, on a synthetic set of clips with mixed motion.
+
+Each clip is one VLM request whose latency is modelled as `base_ms + per_image_ms * frames` (image encoding
+and prefill dominate for short captions); requests run `concurrency` at a time. The allocation itself is timed
+for real. Run from the repo root:
+
+    python scripts/bench_frame_budget.py --clips 30 --clip_sec 4
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for p in (ROOT_DIR, os.path.join(ROOT_DIR, "src")):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from open_storyline.config import load_settings, default_config_path
+from open_storyline.mcp.sampling_handler import GLOBAL_MAX_IMAGE_BLOCKS
+from open_storyline.nodes.core_nodes.understand_clips import _fixed_policy_frames
+from open_storyline.utils.frame_budget import allocate_frame_budget
+
+
+def modelled_latency_ms(frames: list, base_ms: float, per_image_ms: float, concurrency: int) -> float:
+    per_request = sorted((base_ms + per_image_ms * n for n in frames), reverse=True)
+    lanes = [0.0] * max(1, concurrency)
+    for cost in per_request:
+        i = lanes.index(min(lanes))
+        lanes[i] += cost
+    return max(lanes)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clips", type=int, default=30)
+    parser.add_argument("--clip_sec", type=float, default=4.0)
+    parser.add_argument("--jitter_sec", type=float, default=1.5, help="Clip durations vary by up to this much")
+    parser.add_argument("--base_ms", type=float, default=900.0)
+    parser.add_argument("--per_image_ms", type=float, default=120.0)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cfg = load_settings(default_config_path()).understand_clips
+    rng = random.Random(args.seed)
+    durations = [max(0.5, args.clip_sec + rng.uniform(-args.jitter_sec, args.jitter_sec)) for _ in range(args.clips)]
+    # Mostly calm footage with some action: mean abs gray difference per frame, 0..1
+    motions = [rng.choice([0.0, 0.005, 0.01, 0.02, 0.04, 0.08, 0.15]) for _ in range(args.clips)]
+
+    fixed = [_fixed_policy_frames(d) for d in durations]
+    policies = {
+        "fixed policy": (fixed, 0.0),
+        # Defaults of the first adaptive version: 64 frames per clip (clamped to 48), absolute budget of 400
+        "adaptive, old defaults": (None, dict(max_frames=min(64, GLOBAL_MAX_IMAGE_BLOCKS), run_budget=400)),
+        "adaptive, new defaults": (None, dict(
+            max_frames=min(cfg.max_frames, cfg.adaptive_max_frames, GLOBAL_MAX_IMAGE_BLOCKS),
+            run_budget=max(args.clips * cfg.min_frames, int(sum(fixed) * cfg.run_budget_ratio)) if cfg.run_budget_ratio > 0 else 0,
+        )),
+    }
+    print(f"{args.clips} clips of ~{args.clip_sec}s, sample_fps {cfg.sample_fps}, min_frames {cfg.min_frames}")
+    for name, (frames, kwargs) in policies.items():
+        alloc_ms = 0.0
+        if frames is None:
+            start = time.perf_counter()
+            frames = allocate_frame_budget(durations, motions, sample_fps=cfg.sample_fps, min_frames=cfg.min_frames, **kwargs)
+            alloc_ms = (time.perf_counter() - start) * 1000
+        latency = modelled_latency_ms(frames, args.base_ms, args.per_image_ms, args.concurrency)
+        print(
+            f"{name:24s} blocks {sum(frames):4d} (per clip {min(frames)}-{max(frames)}) | "
+            f"modelled VLM time {latency / 1000:6.1f}s | allocation {alloc_ms:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Event-loop lag of the MCP server under concurrent sessions, with node work run inline vs through NODE_RUNTIME.
+
+Each "heavy" session repeats a split_shots-like step: native work that releases the GIL (sha256 over a large
+buffer, standing in for ffmpeg decode / TransNetV2 / librosa) plus a blocking wait (standing in for the ffmpeg
+subprocess). Each "light" session issues small tool calls (a short await plus a little JSON work) and records
+how long they take end to end, which is what other users of the server see. Loop lag is sampled with the same
+LoopLagMonitor the server runs. Run from the repo root:
+
+    python scripts/bench_node_loop_lag.py --heavy_sessions 4 --light_sessions 16 --duration 5
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+import statistics
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for p in (ROOT_DIR, os.path.join(ROOT_DIR, "src")):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from open_storyline.nodes.node_runtime import LoopLagMonitor, NodeRuntime
+
+
+def heavy_step(buffer: bytes, rounds: int, wait_sec: float) -> str:
+    digest = b""
+    for _ in range(rounds):
+        digest = hashlib.sha256(buffer + digest).digest()
+    time.sleep(wait_sec)
+    return digest.hex()
+
+
+async def heavy_session(runtime, args, buffer: bytes, deadline: float, steps: list) -> None:
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        if runtime is None:
+            heavy_step(buffer, args.rounds, args.wait_sec)
+        else:
+            await runtime.run("heavy", heavy_step, buffer, args.rounds, args.wait_sec)
+        steps.append(time.perf_counter() - start)
+        await asyncio.sleep(0)
+
+
+async def light_session(deadline: float, latencies: list) -> None:
+    payload = {"clips": [{"clip_id": f"clip_{i:04d}", "duration": i * 10} for i in range(50)]}
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await asyncio.sleep(0.005)
+        json.loads(json.dumps(payload))
+        latencies.append(time.perf_counter() - start)
+
+
+def pct(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+async def run_mode(mode: str, args) -> dict:
+    runtime = None if mode == "inline" else NodeRuntime({"heavy": args.heavy_workers})
+    buffer = os.urandom(args.buffer_mb << 20)
+    monitor = LoopLagMonitor(interval_sec=0.01, window=100_000, report_every_sec=float("inf")).start()
+    steps, latencies = [], []
+    deadline = time.perf_counter() + args.duration
+    await asyncio.gather(
+        *[heavy_session(runtime, args, buffer, deadline, steps) for _ in range(args.heavy_sessions)],
+        *[light_session(deadline, latencies) for _ in range(args.light_sessions)],
+    )
+    await monitor.stop()
+    if runtime is not None:
+        runtime.shutdown()
+    return {
+        "mode": mode,
+        "loop_lag": monitor.summary(),
+        "light_calls": len(latencies),
+        "light_p50_ms": round(pct(latencies, 0.5) * 1000, 1),
+        "light_p99_ms": round(pct(latencies, 0.99) * 1000, 1),
+        "heavy_steps": len(steps),
+        "heavy_step_mean_ms": round(statistics.mean(steps) * 1000, 1) if steps else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--heavy_sessions", type=int, default=4)
+    parser.add_argument("--light_sessions", type=int, default=16)
+    parser.add_argument("--heavy_workers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--buffer_mb", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=4, help="sha256 passes over the buffer per step")
+    parser.add_argument("--wait_sec", type=float, default=0.05, help="Blocking wait per step")
+    args = parser.parse_args()
+
+    for mode in ("inline", "runtime"):
+        result = asyncio.run(run_mode(mode, args))
+        lag = result["loop_lag"]
+        print(
+            f"{mode:8s} loop lag p50 {lag['p50_ms']}ms p99 {lag['p99_ms']}ms max {lag['max_ms']}ms | "
+            f"light calls {result['light_calls']} p50 {result['light_p50_ms']}ms p99 {result['light_p99_ms']}ms | "
+            f"heavy steps {result['heavy_steps']} mean {result['heavy_step_mean_ms']}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Microbenchmark of the plan_timeline_pro planner (TimeLine) on synthetic timelines of 10 / 100 / 1k / 10k clips
+against a dense beat grid, in beat-snapped and TTS-driven modes. Run from the repo root:
+
+    python scripts/bench_plan_timeline_pro.py --sizes 10 100 1000 10000 --beat_ms 400
+"""
+import io
+import os
+import sys
+import time
+import random
+import argparse
+import contextlib
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for p in (ROOT_DIR, os.path.join(ROOT_DIR, "src")):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from open_storyline.config import load_settings, default_config_path
+from open_storyline.nodes.node_state import NodeState
+from open_storyline.nodes.node_summary import NodeSummary
+from open_storyline.nodes.core_nodes.plan_timeline_pro import TimeLine
+
+
+def make_case(num_clips: int, beat_ms: int, music_sec: float, seed: int) -> dict:
+    rng = random.Random(seed)
+    groups, left = [], num_clips
+    while left > 0:
+        groups.append(min(left, rng.randint(1, 5)))
+        left -= groups[-1]
+    beats = list(range(beat_ms, int(music_sec * 1000), beat_ms))
+    beats = [b + rng.randint(-beat_ms // 10, beat_ms // 10) for b in beats]
+    return {
+        "music": {"beats": beats, "duration": int(music_sec * 1000)},
+        "meterial_durations": [rng.randint(800, 8000) for _ in range(num_clips)],
+        "types": [rng.choice(["video", "video", "video", "img"]) for _ in range(num_clips)],
+        "texts": [["x" * rng.randint(4, 20) for _ in range(rng.randint(1, 4))] for _ in groups],
+        "tts_res": [{"duration": rng.randint(1500, 9000)} for _ in groups],
+        "tts_indices_map": dict(enumerate(groups)),
+    }
+
+
+def plan(timeline: TimeLine, cfg, case: dict, on_beats: bool) -> float:
+    node_state = NodeState(
+        session_id="bench",
+        artifact_id="plan",
+        lang="en",
+        node_summary=NodeSummary(auto_console=False),
+        llm=None,
+        mcp_ctx=None,
+    )
+    random.seed(0)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, durations, _, _ = timeline.edit_meterial_timeline(
+            cfg,
+            node_state,
+            case["music"],
+            case["meterial_durations"],
+            case["tts_res"],
+            texts=case["texts"],
+            types=case["types"],
+            tts_indices_map=case["tts_indices_map"],
+            group_indices_map=case["tts_indices_map"],
+            title_clip_duration=0,
+            is_on_beats=on_beats,
+        )
+        tts_res = timeline.edit_tts_timeline(cfg, node_state, durations, [dict(t) for t in case["tts_res"]], case["tts_indices_map"])
+        timeline.edit_text_timeline(
+            cfg, node_state, durations, texts=case["texts"], tts_res=tts_res,
+            tts_indices_map=case["tts_indices_map"], music=case["music"],
+        )
+        # the no-TTS path snaps subtitle starts to beats when is_text_beats is on
+        timeline.edit_text_timeline(
+            cfg, node_state, durations, texts=case["texts"], tts_res=None,
+            tts_indices_map=case["tts_indices_map"], music=case["music"],
+        )
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", type=str, default=default_config_path())
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--beat_ms", type=int, default=400, help="Beat spacing of the synthetic BGM")
+    parser.add_argument("--music_sec", type=float, default=180.0)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    cfg = load_settings(args.config).plan_timeline_pro.model_copy(update={"is_text_beats": True})
+    timeline = TimeLine()
+    print(f"{'clips':>6} {'beats mode':>12} {'tts mode':>12}")
+    for n in args.sizes:
+        case = make_case(n, args.beat_ms, args.music_sec, seed=n)
+        beats_s = min(plan(timeline, cfg, case, on_beats=True) for _ in range(args.repeats))
+        tts_s = min(plan(timeline, cfg, case, on_beats=False) for _ in range(args.repeats))
+        print(f"{n:>6} {beats_s * 1000:>10.1f}ms {tts_s * 1000:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Search-media cost against a fake Pexels API: search latency for a repeated query (cold vs served from the TTL
+cache) and bytes downloaded with canvas-sized renditions vs the largest rendition of every asset. The stand-in
+serves multi-rendition results whose file sizes scale with pixel area. Run from the repo root:
+
+    python scripts/bench_search_media.py --videos 8 --photos 8 --api_latency 0.3
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+import json
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for p in (ROOT_DIR, os.path.join(ROOT_DIR, "src")):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from open_storyline.utils.media_download import MediaDownloadCache
+from open_storyline.nodes.core_nodes.search_media import (
+    SearchResponseCache,
+    get_photo_media_from_pexels,
+    get_video_media_from_pexels,
+)
+
+VIDEO_RENDITIONS = [("sd", 640, 360), ("sd", 960, 540), ("hd", 1280, 720), ("hd", 1920, 1080), ("uhd", 3840, 2160)]
+PHOTO_ORIGINAL = (6000, 4000)
+BYTES_PER_PIXEL = 0.05
+
+
+class FakePexelsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    api_latency = 0.3
+    base = ""
+    lock = threading.Lock()
+    search_calls = 0
+    bytes_sent = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        qs = parse_qs(url.query)
+        if url.path in ("/videos/search", "/v1/search"):
+            with self.lock:
+                FakePexelsHandler.search_calls += 1
+            time.sleep(self.api_latency)
+            page = int(qs.get("page", ["1"])[0])
+            per_page = int(qs.get("per_page", ["15"])[0])
+            ids = range((page - 1) * per_page, page * per_page)
+            payload = self._videos(ids) if url.path == "/videos/search" else self._photos(ids)
+            self._send(json.dumps(payload).encode("utf-8"), "application/json")
+            return
+
+        # /files/<id>_<w>x<h>.<ext>, or an original photo resized with ?w=
+        w, h = map(int, url.path.rsplit("_", 1)[1].split(".")[0].split("x"))
+        if "w" in qs:
+            scale = int(qs["w"][0]) / w
+            w, h = int(qs["w"][0]), int(h * scale)
+        body = b"\0" * int(w * h * BYTES_PER_PIXEL)
+        with self.lock:
+            FakePexelsHandler.bytes_sent += len(body)
+        self._send(body, "application/octet-stream")
+
+    def _videos(self, ids) -> dict:
+        return {"videos": [
+            {
+                "id": i,
+                "width": 3840,
+                "height": 2160,
+                "duration": 10,
+                "video_files": [
+                    {
+                        "id": i * 10 + k,
+                        "quality": q,
+                        "file_type": "video/mp4",
+                        "width": w,
+                        "height": h,
+                        "link": f"{self.base}/files/v{i}_{w}x{h}.mp4",
+                    }
+                    for k, (q, w, h) in enumerate(VIDEO_RENDITIONS)
+                ],
+            }
+            for i in ids
+        ]}
+
+    def _photos(self, ids) -> dict:
+        w, h = PHOTO_ORIGINAL
+        return {"photos": [
+            {"id": i, "width": w, "height": h, "src": {"original": f"{self.base}/files/p{i}_{w}x{h}.jpg"}}
+            for i in ids
+        ]}
+
+
+def largest_bytes(videos: int, photos: int) -> int:
+    _, w, h = max(VIDEO_RENDITIONS, key=lambda r: r[1] * r[2])
+    return int(videos * w * h * BYTES_PER_PIXEL + photos * PHOTO_ORIGINAL[0] * PHOTO_ORIGINAL[1] * BYTES_PER_PIXEL)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--videos", type=int, default=8)
+    parser.add_argument("--photos", type=int, default=8)
+    parser.add_argument("--api_latency", type=float, default=0.3, help="Seconds per fake search request")
+    parser.add_argument("--repeats", type=int, default=3, help="Searches of the same query after the first")
+    args = parser.parse_args()
+
+    FakePexelsHandler.api_latency = args.api_latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakePexelsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    FakePexelsHandler.base = base
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            cache = SearchResponseCache(ttl_sec=3600)
+
+            def run(n: int):
+                # A fresh download cache each time so every run measures real transfers
+                downloader = MediaDownloadCache(tmp / f"cache_{n}")
+                common = dict(
+                    pexels_api_key="fake",
+                    media_dir=tmp / f"session_{n}",
+                    orientation="",
+                    downloader=downloader,
+                    api_base=base,
+                    cache=cache,
+                )
+                start = time.perf_counter()
+                get_video_media_from_pexels(
+                    query="City Night", video_number=args.videos, min_video_duration=1, max_video_duration=30, **common
+                )
+                get_photo_media_from_pexels(query="  city night ", photo_number=args.photos, **common)
+                return time.perf_counter() - start
+
+            sent_before = FakePexelsHandler.bytes_sent
+            cold_s = run(0)
+            sent = FakePexelsHandler.bytes_sent - sent_before
+            calls_cold = FakePexelsHandler.search_calls
+            warm_s = [run(i + 1) for i in range(args.repeats)]
+            calls_warm = FakePexelsHandler.search_calls - calls_cold
+
+        full = largest_bytes(args.videos, args.photos)
+        print(f"{args.videos} videos + {args.photos} photos for a 1080p canvas")
+        print(f"  cold run   {cold_s:6.2f}s  ({calls_cold} search requests)")
+        print(f"  warm runs  {sum(warm_s) / len(warm_s):6.2f}s avg ({calls_warm} search requests, "
+              f"{cache.hits} cache hits)")
+        print(f"  bytes      {sent / (1 << 20):6.1f} MB vs {full / (1 << 20):.1f} MB at largest renditions "
+              f"({1 - sent / full:.0%} fewer)")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
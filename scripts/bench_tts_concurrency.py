@@ -0,0 +1,155 @@
+"""
+Wall time of GenerateVoiceoverNode against a local stub IndexTTS server, sequential vs concurrent synthesis.
+
+The stub answers POST /api/v1/tts with a sine WAV whose pitch and length depend on the text and sleeps
+`--latency` seconds per request. Outputs of both runs are compared byte for byte. Run from the repo root:
+
+    python scripts/bench_tts_concurrency.py --groups 20 --concurrency 1 4 8
+"""
+import io
+import os
+import sys
+import json
+import math
+import time
+import wave
+import base64
+import struct
+import asyncio
+import hashlib
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+from urllib.parse import parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for p in (ROOT_DIR, os.path.join(ROOT_DIR, "src")):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from open_storyline.config import load_settings, default_config_path
+from open_storyline.nodes.node_state import NodeState
+from open_storyline.nodes.node_summary import NodeSummary
+from open_storyline.nodes.core_nodes.generate_voiceover import GenerateVoiceoverNode
+
+SAMPLE_RATE = 24000
+_SENTENCE = "这是一段用于测试并发配音合成的旁白文本。"
+
+
+def sine_wav(text: str, sr: int = SAMPLE_RATE) -> bytes:
+    """Deterministic per text: 0.1 s of tone per character, pitch from the text digest."""
+    freq = 200 + int(hashlib.md5(text.encode("utf-8")).hexdigest()[:4], 16) % 600
+    n = int(0.1 * sr * len(text))
+    frames = b"".join(struct.pack("<h", int(8000 * math.sin(2 * math.pi * freq * i / sr))) for i in range(n))
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes(frames)
+    return buf.getvalue()
+
+
+class StubTTSHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooled connections are reused
+    latency = 0.5
+    connections = set()
+    requests = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._reply({"status": "ok"})
+
+    def do_POST(self):
+        with self.lock:
+            StubTTSHandler.requests += 1
+            StubTTSHandler.connections.add(self.client_address)
+        form = parse_qs(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8"))
+        text = form.get("input_text", [""])[0]
+        time.sleep(self.latency)
+        audio = base64.b64encode(sine_wav(text)).decode("ascii")
+        self._reply({"success": True, "audio_base64": audio, "sample_rate": SAMPLE_RATE})
+
+
+def make_scripts(groups: int, sentences_per_group: int) -> list[dict]:
+    return [
+        {"group_id": f"group_{i:04d}", "raw_text": f"第{i}段。" + _SENTENCE * sentences_per_group}
+        for i in range(1, groups + 1)
+    ]
+
+
+async def run_once(cfg, base_url: str, scripts: list[dict], concurrency: int, workdir: Path):
+    providers = {"indextts": {"base_url": base_url, "max_concurrency": concurrency}}
+    run_cfg = cfg.model_copy(
+        update={
+            # Chunk cache off, otherwise later runs would just replay the first one
+            "generate_voiceover": cfg.generate_voiceover.model_copy(
+                update={"providers": providers, "cache_enabled": False}
+            ),
+            "local_mcp_server": cfg.local_mcp_server.model_copy(update={"server_cache_dir": str(workdir)}),
+        }
+    )
+    node = GenerateVoiceoverNode(run_cfg)
+    node_state = NodeState(
+        session_id="bench",
+        artifact_id=f"c{concurrency}",
+        lang="zh",
+        node_summary=NodeSummary(auto_console=False),
+        llm=None,
+        mcp_ctx=None,
+    )
+    start = time.perf_counter()
+    out = await node.process(node_state, {"generate_script": {"group_scripts": scripts}})
+    return out["voiceover"], time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", type=str, default=default_config_path())
+    parser.add_argument("--groups", type=int, default=20)
+    parser.add_argument("--sentences_per_group", type=int, default=30, help="30 sentences ≈ 2 chunks of 500 chars")
+    parser.add_argument("--latency", type=float, default=0.5, help="Stub seconds per TTS request")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    StubTTSHandler.latency = args.latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubTTSHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    cfg = load_settings(args.config)
+    scripts = make_scripts(args.groups, args.sentences_per_group)
+    reference = None
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            print(f"{'concurrency':>11} | {'wall':>8} | requests | connections | identical")
+            for c in args.concurrency:
+                StubTTSHandler.requests = 0
+                StubTTSHandler.connections = set()
+                voiceover, wall = await run_once(cfg, base_url, scripts, c, Path(tmp))
+                audio = [(v["group_id"], v["duration"], Path(v["path"]).read_bytes()) for v in voiceover]
+                if reference is None:
+                    reference = audio
+                print(
+                    f"{c:>11} | {wall:>7.2f}s | {StubTTSHandler.requests:>8} | "
+                    f"{len(StubTTSHandler.connections):>11} | {audio == reference}"
+                )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,173 @@
+"""
+Time to the first rendered video (TTFF) of a long narrated script, with and without the pipeline's prefix preview,
+against the local stub TTS server of bench_tts_concurrency.py.
+
+PipelineExecutor runs load_media -> generate_voiceover -> plan_timeline -> render_video. generate_voiceover is the
+real node talking to the stub server, and its groups reach the executor through the MCP progress channel as in a
+real run. The other nodes are stand-ins that read substituted inputs and save their artifacts the way
+ToolInterceptor does: planning takes `--plan_sec`, rendering `--render_rtf` seconds per second of timeline. The
+stand-in renders only sleep, so they do not compete for CPU as two real renders would. Run from the repo root:
+
+    python scripts/bench_voiceover_streaming.py --groups 60 --latency 1.0 --preview_groups 2
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for p in (ROOT_DIR, os.path.join(ROOT_DIR, "src")):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from open_storyline.config import load_settings, default_config_path
+from open_storyline.mcp.hooks.chat_middleware import get_mcp_log_sink
+from open_storyline.mcp.hooks.node_interceptors import get_input_overrides, preview_session_id
+from open_storyline.nodes.node_state import NodeState
+from open_storyline.nodes.node_summary import NodeSummary
+from open_storyline.nodes.core_nodes.generate_voiceover import GenerateVoiceoverNode
+from open_storyline.pipeline.edit_template import EditTemplate, NodeConfig
+from open_storyline.pipeline.pipeline_executor import PipelineExecutor
+from open_storyline.storage.agent_memory import ArtifactStore
+from scripts.bench_tts_concurrency import StubTTSHandler, make_scripts
+from scripts.check_pipeline_executor import make_node_manager
+
+
+class ProgressContext:
+    """Stands in for the MCP Context: progress goes to the MCP log sink, as the client's progress callback does."""
+
+    async def report_progress(self, progress, total=None, message=None):
+        sink = get_mcp_log_sink()
+        if sink:
+            sink({"type": "tool_progress", "message": message})
+
+
+class StandInTools:
+    """Replaces PipelineExecutor._call_tool: the real voiceover node, modelled planning and rendering."""
+
+    def __init__(self, executor: PipelineExecutor, voiceover_node: GenerateVoiceoverNode, group_scripts, args):
+        self.executor = executor
+        self.voiceover_node = voiceover_node
+        self.group_scripts = group_scripts
+        self.args = args
+
+    def _latest(self, node_id: str):
+        store = self.executor.store
+        meta = store.get_latest_meta(node_id=node_id, session_id=self.executor.session_id)
+        return store.load_result(meta.artifact_id)[1]["payload"]
+
+    async def __call__(self, node_id, mode, params, artifact_id=None):
+        overrides = get_input_overrides() or {}
+        inputs = lambda kind, node_id: overrides[kind] if kind in overrides else self._latest(node_id)
+        if node_id == "generate_voiceover":
+            node_state = NodeState(
+                session_id="bench",
+                artifact_id=artifact_id,
+                lang="zh",
+                node_summary=NodeSummary(auto_console=False),
+                llm=None,
+                mcp_ctx=ProgressContext(),
+            )
+            payload = await self.voiceover_node.process(node_state, {"generate_script": {"group_scripts": self.group_scripts}})
+        elif node_id == "plan_timeline":
+            await asyncio.sleep(self.args.plan_sec)
+            voiceover = inputs("tts", "generate_voiceover")["voiceover"]
+            group_ids = {g["group_id"] for g in inputs("group_clips", "group_clips")["groups"]}
+            duration_ms = sum(v["duration"] + 1000 for v in voiceover if v["group_id"] in group_ids)
+            payload = {"tracks": {"voiceover": voiceover}, "duration_ms": duration_ms}
+        elif node_id == "render_video":
+            duration_s = inputs("plan_timeline", "plan_timeline")["duration_ms"] / 1000.0
+            await asyncio.sleep(duration_s * self.args.render_rtf)
+            payload = {"output_path": f"{artifact_id}.mp4", "duration_s": duration_s}
+        else:
+            payload = {}
+        session_id = preview_session_id(self.executor.session_id) if overrides else self.executor.session_id
+        self.executor.store.save_result(
+            session_id, node_id, {"artifact_id": artifact_id, "summary": "ok", "tool_excute_result": payload}
+        )
+        return {"summary": "ok", "isError": False}
+
+
+async def run_once(cfg, node_manager, base_url: str, group_scripts, args, preview_groups: int, workdir: str):
+    providers = {"indextts": {"base_url": base_url, "max_concurrency": args.concurrency}}
+    run_cfg = cfg.model_copy(
+        update={
+            "generate_voiceover": cfg.generate_voiceover.model_copy(update={"providers": providers, "cache_enabled": False}),
+            "local_mcp_server": cfg.local_mcp_server.model_copy(update={"server_cache_dir": workdir}),
+        }
+    )
+    store = ArtifactStore(os.path.join(workdir, "artifacts"), "bench")
+    groups = [{"group_id": s["group_id"], "clip_ids": []} for s in group_scripts]
+    store.save_result("bench", "group_clips", {"artifact_id": "group_clips_seed", "summary": "", "tool_excute_result": {"groups": groups}})
+
+    executor = PipelineExecutor(node_manager, store, "bench", runtime=None, prefix_preview_groups=preview_groups)
+    executor._call_tool = StandInTools(executor, GenerateVoiceoverNode(run_cfg), group_scripts, args)
+
+    start = time.perf_counter()
+    marks = {}
+
+    async def on_progress(node_id, status, progress, message):
+        if status == "done":
+            marks[node_id] = time.perf_counter() - start
+
+    async def on_partial(node_id, payload):
+        if payload.get("event") == "voiceover.segment" and payload["prefix"] >= 1:
+            marks.setdefault("first_group", time.perf_counter() - start)
+        elif payload.get("event") == "render.preview":
+            marks["preview"] = time.perf_counter() - start
+            marks["preview_groups"] = payload["prefix"]
+
+    template = EditTemplate(template_id="bench", name="bench", nodes=[NodeConfig(node_id="generate_voiceover")])
+    result = await executor.run(template, on_progress=on_progress, on_partial=on_partial)
+    assert result["status"] == "done", json.dumps(result, ensure_ascii=False)
+    leftovers = [m for m in store._load_meta_list() if m.session_id != "bench"]
+    assert not leftovers, f"preview artifacts left behind: {leftovers}"
+    return marks
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", type=str, default=default_config_path())
+    parser.add_argument("--groups", type=int, default=60)
+    parser.add_argument("--sentences_per_group", type=int, default=1, help="1 sentence ≈ 2.5 s of narration")
+    parser.add_argument("--latency", type=float, default=1.0, help="Stub seconds per TTS request")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--preview_groups", type=int, default=2, help="[pipeline] prefix_preview_groups of the preview run")
+    parser.add_argument("--plan_sec", type=float, default=0.2, help="Modelled plan_timeline time")
+    parser.add_argument("--render_rtf", type=float, default=0.25, help="Modelled render seconds per second of timeline")
+    args = parser.parse_args()
+
+    StubTTSHandler.latency = args.latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubTTSHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    cfg = load_settings(args.config)
+    node_manager = make_node_manager()
+    group_scripts = make_scripts(args.groups, args.sentences_per_group)
+    try:
+        print(
+            f"{args.groups} groups, {args.concurrency} concurrent TTS requests of {args.latency}s, "
+            f"render {args.render_rtf}s per timeline second"
+        )
+        for label, preview_groups in (("without preview", 0), (f"preview after {args.preview_groups} groups", args.preview_groups)):
+            with tempfile.TemporaryDirectory() as tmp:
+                marks = await run_once(cfg, node_manager, base_url, group_scripts, args, preview_groups, tmp)
+            ttff = marks.get("preview", marks["render_video"])
+            if "preview" in marks:
+                label = f"{label} ({marks['preview_groups']} done)"
+            print(
+                f"  {label:35s} first group {marks['first_group']:6.2f}s | voiceover done {marks['generate_voiceover']:6.2f}s | "
+                f"first rendered video {ttff:6.2f}s | full render {marks['render_video']:6.2f}s"
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
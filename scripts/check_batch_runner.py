@@ -0,0 +1,164 @@
+"""
+Checks for BatchRunner, with build_agent and the MCP tool calls replaced by stand-ins (no MCP server needed):
+
+- every job builds its MCP client with its own session id, which the server reads from X-Storyline-Session-Id;
+- --job_timeout_sec cancels a job together with its running node: the job is recorded as "timeout" right after
+  the deadline instead of when the node finishes, and the other job is unaffected;
+- a --resume run continues the timed-out job from the nodes it had completed and skips the finished job;
+- the stub model server of stub_model_server.py answers the real node prompts with replies the nodes' own
+  parsers accept.
+
+Run from the repo root:
+
+    python scripts/check_batch_runner.py
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import tempfile
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for p in (ROOT_DIR, os.path.join(ROOT_DIR, "src")):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from open_storyline.config import load_settings, default_config_path
+from open_storyline.nodes.core_nodes.filter_clips import _extract_selected_ids
+from open_storyline.nodes.core_nodes.group_clips import _extract_groups_obj, _normalize_groups_from_llm
+from open_storyline.pipeline import batch_runner
+from open_storyline.pipeline.batch_runner import BatchJob, BatchRunner
+from open_storyline.pipeline.edit_template import EditTemplate, NodeConfig
+from open_storyline.pipeline.pipeline_executor import PipelineExecutor
+from open_storyline.utils.parse_json import parse_json_dict
+from open_storyline.utils.prompts import get_prompt
+from scripts.check_pipeline_executor import make_node_manager
+from scripts.stub_model_server import StubModelHandler
+
+TEMPLATE = EditTemplate(
+    template_id="check",
+    name="check",
+    nodes=[NodeConfig(node_id="load_media"), NodeConfig(node_id="split_shots"), NodeConfig(node_id="understand_clips")],
+)
+
+
+class StandIns:
+    """Records what the runner asked of build_agent and of the tools; `slow` maps (session, node) to seconds."""
+
+    def __init__(self):
+        self.node_manager = make_node_manager()
+        self.sessions = []
+        self.cancelled = []
+        self.slow = {}
+
+    async def build_agent(self, cfg, session_id, store, tool_interceptors=None, **kwargs):
+        self.sessions.append(session_id)
+        return None, self.node_manager
+
+    def call_tool(self):
+        stand_ins = self
+
+        async def call_tool(executor, node_id, mode, params, artifact_id=None):
+            try:
+                await asyncio.sleep(stand_ins.slow.get((executor.session_id, node_id), 0.01))
+            except asyncio.CancelledError:
+                stand_ins.cancelled.append((executor.session_id, node_id))
+                raise
+            executor.store.save_result(
+                executor.session_id, node_id, {"artifact_id": artifact_id, "summary": "ok", "tool_excute_result": {}}
+            )
+            return {"summary": "ok", "isError": False}
+
+        return call_tool
+
+
+def check_timeout_and_resume(tmp: str) -> None:
+    cfg = load_settings(default_config_path())
+    cfg = cfg.model_copy(update={
+        "project": cfg.project.model_copy(update={"outputs_dir": os.path.join(tmp, "outputs")}),
+        "pipeline": cfg.pipeline.model_copy(update={"memo_enabled": False}),
+    })
+    stand_ins = StandIns()
+    batch_runner.build_agent = stand_ins.build_agent
+    PipelineExecutor._call_tool = stand_ins.call_tool()
+    jobs = [BatchJob(job_id=job_id, media_dir=tmp, template=TEMPLATE) for job_id in ("fast", "slow")]
+    state_path = os.path.join(tmp, "jobs.state.jsonl")
+
+    stand_ins.slow[("batch_slow", "understand_clips")] = 30.0
+    runner = BatchRunner(cfg, state_path, workers=2, job_timeout_sec=0.5)
+    start = time.perf_counter()
+    report = asyncio.run(runner.run(jobs))
+    elapsed = time.perf_counter() - start
+    records = runner.state.records
+    assert sorted(stand_ins.sessions) == ["batch_fast", "batch_slow"], stand_ins.sessions
+    print("  one MCP session per job: batch_fast, batch_slow")
+    assert records["fast"]["status"] == "done" and records["slow"]["status"] == "timeout", report
+    assert elapsed < 2.0 and stand_ins.cancelled == [("batch_slow", "understand_clips")], (elapsed, stand_ins.cancelled)
+    assert records["slow"]["completed_nodes"] == ["load_media", "split_shots"], records["slow"]
+    print(f"  timeout 0.5s: slow job cancelled with its 30s node after {records['slow']['elapsed_sec']:.2f}s, fast job done")
+
+    stand_ins.slow.clear()
+    runner = BatchRunner(cfg, state_path, workers=2, resume=True)
+    report = asyncio.run(runner.run(jobs))
+    slow = runner.state.records["slow"]
+    assert report["skipped_done"] == 1 and slow["status"] == "done", report
+    assert slow["resumed_nodes"] == ["load_media", "split_shots"], slow
+    print("  --resume: finished job skipped, timed-out job continued from understand_clips")
+
+
+def check_stub_model_server() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubModelHandler)
+    StubModelHandler.latency = 0.0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+
+    def complete(system_prompt: str, user_prompt: str, stream: bool = False) -> str:
+        body = {"model": "stub", "stream": stream, "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]}
+        request = urllib.request.Request(url, json.dumps(body).encode("utf-8"), {"Content-Type": "application/json"})
+        raw = urllib.request.urlopen(request, timeout=10).read().decode("utf-8")
+        if not stream:
+            return json.loads(raw)["choices"][0]["message"]["content"]
+        chunks = [json.loads(line[6:]) for line in raw.splitlines() if line.startswith("data: {")]
+        return "".join(c["choices"][0]["delta"].get("content") or "" for c in chunks)
+
+    try:
+        clip_ids = ["clip_0001", "clip_0002", "clip_0003", "clip_0004"]
+        clips = [{"clip_id": cid, "duration": 2.0, "caption": "a street"} for cid in clip_ids]
+        for lang in ("zh", "en"):
+            captions = parse_json_dict(complete(
+                get_prompt("understand_clips.system_batch", lang=lang),
+                f"{clip_ids}",
+            ))
+            assert set(captions) == set(clip_ids), captions
+            reply = complete("", get_prompt("filter_clips.user", lang=lang, user_request="", clip_captions=clips))
+            assert _extract_selected_ids(parse_json_dict(reply), clip_ids) == clip_ids, reply
+            reply = complete(
+                get_prompt("group_clips.system", lang=lang),
+                get_prompt("group_clips.user", lang=lang, user_request="", selected_clips=clip_ids, clip_captions=clips, clip_number=4),
+                stream=True,
+            )
+            groups = _normalize_groups_from_llm(_extract_groups_obj(parse_json_dict(reply)), set(clip_ids))
+            assert [cid for g in groups for cid in g["clip_ids"]] == clip_ids, groups
+            reply = complete(get_prompt("generate_script.system", lang=lang), "group_0001 group_0002")
+            assert [s["group_id"] for s in parse_json_dict(reply)["group_scripts"]] == ["group_0001", "group_0002"], reply
+        print("  stub model server: captions, filter, groups (streamed) and scripts parse in zh and en")
+    finally:
+        server.shutdown()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        check_timeout_and_resume(tmp)
+    check_stub_model_server()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
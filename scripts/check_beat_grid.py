@@ -0,0 +1,186 @@
+"""
+Randomized property checks for BeatGrid and the beat snapping in plan_timeline:
+
+- BeatGrid floor / ceil / nearest / between agree with brute force, looping and non-looping;
+- TimelinePlanner._snap_to_nearest_beat / _snap_to_beat_ceil return exactly what the previous beat-by-beat
+  walks (kept below as reference implementations) returned, including the safety-limit errors;
+
+then times snapping on a long track. Snapping walks the first SNAP_WALK_MAX_STEPS beats and bisects past them,
+so at typical beat spacing it costs about the same as the walk and it is faster on dense grids or long clips.
+Run from the repo root:
+
+    python scripts/check_beat_grid.py --cases 2000 --long_beats 40000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for p in (ROOT_DIR, os.path.join(ROOT_DIR, "src")):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from open_storyline.utils.beat_grid import BeatGrid
+from open_storyline.nodes.core_nodes.plan_timeline import SNAP_SAFETY_MAX_STEPS, TimelinePlanner
+
+
+# -----------------------------
+# Reference: beat-by-beat walks as they were before BeatGrid
+# -----------------------------
+def reference_snap_to_nearest_beat(beat_durations_ms, desired_ms, beat_index, phase_ms, min_clip_ms):
+    beat_count = len(beat_durations_ms)
+    elapsed_ms = int(phase_ms)
+    idx = int(beat_index)
+
+    safety_steps = 0
+    while elapsed_ms < int(min_clip_ms):
+        elapsed_ms += int(beat_durations_ms[idx])
+        idx = (idx + 1) % beat_count
+        safety_steps += 1
+        if safety_steps > SNAP_SAFETY_MAX_STEPS:
+            raise RuntimeError("snap_to_nearest_beat safety exceeded")
+
+    if elapsed_ms >= int(desired_ms):
+        return int(elapsed_ms), int(idx)
+
+    previous_elapsed_ms = elapsed_ms
+    previous_idx = idx
+
+    safety_steps = 0
+    while elapsed_ms < int(desired_ms):
+        previous_elapsed_ms = elapsed_ms
+        previous_idx = idx
+        elapsed_ms += int(beat_durations_ms[idx])
+        idx = (idx + 1) % beat_count
+        safety_steps += 1
+        if safety_steps > SNAP_SAFETY_MAX_STEPS:
+            raise RuntimeError("snap_to_nearest_beat safety exceeded")
+
+    if int(desired_ms) - previous_elapsed_ms < elapsed_ms - int(desired_ms):
+        return int(previous_elapsed_ms), int(previous_idx)
+    return int(elapsed_ms), int(idx)
+
+
+def reference_snap_to_beat_ceil(beat_durations_ms, desired_ms, beat_index, phase_ms, min_clip_ms):
+    beat_count = len(beat_durations_ms)
+    elapsed_ms = int(phase_ms)
+    idx = int(beat_index)
+
+    desired_ms = max(int(min_clip_ms), int(desired_ms))
+    safety_steps = 0
+    while elapsed_ms < desired_ms:
+        elapsed_ms += int(beat_durations_ms[idx])
+        idx = (idx + 1) % beat_count
+        safety_steps += 1
+        if safety_steps > SNAP_SAFETY_MAX_STEPS:
+            raise RuntimeError("snap_to_beat_ceil safety exceeded")
+    return int(elapsed_ms), int(idx)
+
+
+def outcome(fn, *args):
+    try:
+        return fn(*args)
+    except RuntimeError as e:
+        return f"RuntimeError: {e}"
+
+
+def random_durations(rng: random.Random, count: int):
+    return [rng.randint(1, 1200) for _ in range(count)]
+
+
+def check_grid_queries(rng: random.Random, cases: int) -> None:
+    for _ in range(cases):
+        durations = random_durations(rng, rng.randint(1, 30))
+        looped = BeatGrid.from_durations(durations)
+        flat = BeatGrid(sorted(rng.sample(range(0, 20000), rng.randint(1, 30))))
+        for grid in (looped, flat):
+            # enough unrolled loops to cover every query below
+            cycles = 4 + 3000 // grid.cycle_ms if grid.loops else 1
+            unrolled = [grid.positions[i % len(grid)] + (i // len(grid)) * grid.cycle_ms for i in range(len(grid) * cycles)]
+            for _ in range(20):
+                t = rng.randint(0, 2 * grid.cycle_ms) if grid.loops else rng.randint(-100, unrolled[-1] + 100)
+                below = [p for p in unrolled if p <= t]
+                above = [p for p in unrolled if p >= t]
+                assert grid.floor(t) == (below[-1] if below else None), (grid.positions, t)
+                assert grid.ceil(t) == (above[0] if above else None), (grid.positions, t)
+                expected = min(below[-1:] + above[:1], key=lambda p: abs(p - t))
+                assert grid.nearest(t) == expected, (grid.positions, t)
+                end = t + rng.randint(0, 3000)
+                assert grid.between(t, end) == [p for p in unrolled if t <= p < end], (grid.positions, t, end)
+        downbeats = looped.downbeats(4, phase=1)
+        assert downbeats.positions == looped.positions[1::4]
+
+
+def check_snapping(rng: random.Random, cases: int) -> None:
+    for _ in range(cases):
+        durations = random_durations(rng, rng.randint(1, 40))
+        grid = BeatGrid.from_durations(durations)
+        min_clip_ms = rng.choice([0, 500, 1000, 1500])
+        for _ in range(20):
+            beat_index = rng.randrange(len(durations))
+            phase_ms = rng.choice([0, rng.randint(0, 3000)])
+            desired_ms = rng.randint(0, 20000)
+            args = (desired_ms, beat_index, phase_ms, min_clip_ms)
+            assert outcome(TimelinePlanner._snap_to_nearest_beat, grid, *args) == outcome(
+                reference_snap_to_nearest_beat, durations, *args
+            ), (durations, args)
+            assert outcome(TimelinePlanner._snap_to_beat_ceil, grid, *args) == outcome(
+                reference_snap_to_beat_ceil, durations, *args
+            ), (durations, args)
+
+    # walks past the safety limit fail the same way
+    durations = [1] * 50
+    args = (SNAP_SAFETY_MAX_STEPS + 10, 0, 0, 0)
+    assert outcome(TimelinePlanner._snap_to_beat_ceil, BeatGrid.from_durations(durations), *args) == outcome(
+        reference_snap_to_beat_ceil, durations, *args
+    )
+
+    # all-zero beats give a grid that does not loop: index_ceil runs off its end, which must fail like the walk did
+    durations = [0] * 5
+    args = (100, 0, 0, 0)
+    for snap, reference in (
+        (TimelinePlanner._snap_to_nearest_beat, reference_snap_to_nearest_beat),
+        (TimelinePlanner._snap_to_beat_ceil, reference_snap_to_beat_ceil),
+    ):
+        assert outcome(snap, BeatGrid.from_durations(durations), *args) == outcome(reference, durations, *args)
+
+
+def time_long_track(rng: random.Random, beats: int, snaps: int, beat_ms: int) -> None:
+    durations = [rng.randint(beat_ms // 2, beat_ms * 3 // 2) for _ in range(beats)]
+    start = time.perf_counter()
+    grid = BeatGrid.from_durations(durations)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    queries = [(rng.randint(1000, 8000), rng.randrange(beats), 0, 1000) for _ in range(snaps)]
+    start = time.perf_counter()
+    for q in queries:
+        TimelinePlanner._snap_to_nearest_beat(grid, *q)
+    grid_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    for q in queries:
+        reference_snap_to_nearest_beat(durations, *q)
+    walk_ms = (time.perf_counter() - start) * 1000
+    print(f"{beats} beats of ~{beat_ms}ms: grid built in {build_ms:.1f}ms; {snaps} snaps {grid_ms:.1f}ms (beat-by-beat walk {walk_ms:.1f}ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--long_beats", type=int, default=40000)
+    parser.add_argument("--snaps", type=int, default=2000)
+    parser.add_argument("--beat_ms", type=int, nargs="+", default=[450, 50], help="Average beat spacing(s) to time")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    check_grid_queries(rng, args.cases)
+    check_snapping(rng, args.cases)
+    for beat_ms in args.beat_ms:
+        time_long_track(rng, args.long_beats, args.snaps, beat_ms)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Checks for BoundedDiskCache, the size bound behind TTSChunkCache and JpegFrameCache:
+
+- concurrent puts of the same key (two TTS misses of one chunk) count the entry once, and replacing an entry
+  counts only the size difference;
+- past `max_bytes` the least recently read entries are evicted down to 90%, together with their sidecars;
+- a fresh instance over an existing directory picks up its size.
+
+Run from the repo root:
+
+    python scripts/check_disk_cache.py
+"""
+import os
+import sys
+import time
+import tempfile
+import threading
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for p in (ROOT_DIR, os.path.join(ROOT_DIR, "src")):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from open_storyline.utils.disk_cache import BoundedDiskCache
+from open_storyline.utils.tts_cache import TTSChunkCache
+
+
+def disk_bytes(root: str, suffix: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(root) for f in files if f.endswith(suffix)
+    )
+
+
+def check_same_key(tmp: str) -> None:
+    cache = TTSChunkCache(os.path.join(tmp, "tts"), max_bytes=1 << 20)
+    data = b"x" * 1000
+    barrier = threading.Barrier(8)
+
+    def put():
+        barrier.wait()
+        cache.put("ab" * 20, data, {"frames": 1, "sample_rate": 1})
+
+    threads = [threading.Thread(target=put) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert cache.total_bytes() == 1000 == disk_bytes(cache.root, ".wav"), cache.total_bytes()
+
+    cache.put("ab" * 20, b"y" * 400, {"frames": 1, "sample_rate": 1})
+    assert cache.total_bytes() == 400, cache.total_bytes()
+    assert cache.get("ab" * 20)[0] == b"y" * 400
+    print("  same key written 8x concurrently, then replaced: counted once, then by its new size")
+
+
+def check_eviction(tmp: str) -> None:
+    root = os.path.join(tmp, "lru")
+    cache = BoundedDiskCache(root, max_bytes=10_000, suffix=".wav", companion_suffixes=(".json",))
+    keys = [f"{i:02d}" + "0" * 38 for i in range(10)]
+    for i, key in enumerate(keys):
+        cache.put(key, [(".wav", b"a" * 1000), (".json", b"{}")])
+        os.utime(cache.path_for(key), (i, i))
+    cache.touch(cache.path_for(keys[0]))  # read recently: survives
+    time.sleep(0.01)
+    cache.put("zz" + "0" * 38, [(".wav", b"a" * 1000), (".json", b"{}")])
+
+    assert cache.total_bytes() <= 9_000 == disk_bytes(root, ".wav"), (cache.total_bytes(), disk_bytes(root, ".wav"))
+    assert cache.path_for(keys[0]).exists() and not cache.path_for(keys[1]).exists()
+    assert not cache.path_for(keys[1], ".json").exists(), "sidecar of an evicted entry left behind"
+    assert disk_bytes(root, ".json") == 2 * 9, disk_bytes(root, ".json")
+    print("  over the bound: least recently read entries and their sidecars evicted down to 90%")
+
+    assert BoundedDiskCache(root, max_bytes=10_000, suffix=".wav").total_bytes() == 9_000
+    print("  new instance: size scanned from the directory")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        check_same_key(tmp)
+        check_eviction(tmp)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
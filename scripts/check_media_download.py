@@ -0,0 +1,194 @@
+"""
+Exercise MediaDownloadCache against a local HTTP stand-in that serves synthetic files, honours Range requests
+and injects faults (connections dropped mid-body on the first request of each file). Checks that every file
+arrives intact, that interrupted downloads resume instead of restarting, and that a second session is served
+from the cache via hard links. Edge cases, one file each: a 503 with Retry-After is retried; a resume answered
+from the wrong offset is not appended; a partial file that is already whole (416) is renamed into place without
+downloading again. Run from the repo root:
+
+    python scripts/check_media_download.py --files 12 --size_mb 8 --concurrency 4
+"""
+import os
+import re
+import sys
+import time
+import hashlib
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for p in (ROOT_DIR, os.path.join(ROOT_DIR, "src")):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from open_storyline.utils.media_download import DownloadJob, MediaDownloadCache
+
+_RANGE_RE = re.compile(r"bytes=(\d+)-(\d*)")
+
+
+def synthetic_bytes(name: str, size: int) -> bytes:
+    seed = hashlib.sha256(name.encode("utf-8")).digest()
+    reps = size // len(seed) + 1
+    return (seed * reps)[:size]
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    size = 8 << 20
+    fail_first = True        # drop the first response of every file halfway through
+    latency = 0.05
+    lock = threading.Lock()
+    requests_seen: dict = {}
+    bytes_sent = 0
+    # file name -> "unavailable": 503 on the first request; "shifted": the resume is answered 1000 bytes early
+    faults: dict = {}
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        name = self.path.strip("/")
+        body = synthetic_bytes(name, self.size)
+        with self.lock:
+            n = StandInHandler.requests_seen.get(name, 0)
+            StandInHandler.requests_seen[name] = n + 1
+        time.sleep(self.latency)
+        fault = self.faults.get(name)
+        if fault == "unavailable" and n == 0:
+            self.send_response(503)
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        start, end = 0, len(body) - 1
+        m = _RANGE_RE.match(self.headers.get("Range", ""))
+        if m:
+            start = int(m.group(1))
+            end = int(m.group(2)) if m.group(2) else end
+            if fault == "shifted" and n == 1:
+                start = max(0, start - 1000)
+            if start >= len(body):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(body)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(body)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+
+        payload = body[start:end + 1]
+        if self.fail_first and n == 0 and fault != "unavailable":
+            payload = payload[: len(payload) // 2]
+            self.close_connection = True
+        self.wfile.write(payload)
+        with self.lock:
+            StandInHandler.bytes_sent += len(payload)
+
+
+class StandInServer(ThreadingHTTPServer):
+
+    def handle_error(self, request, client_address):
+        # The client hangs up on responses it rejects (e.g. a resume from the wrong offset)
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def check_edge_cases(base: str, tmp: Path) -> None:
+    cache = MediaDownloadCache(tmp / "edge_cache", max_workers=3)
+    StandInHandler.faults = {"unavailable.mp4": "unavailable", "shifted.mp4": "shifted"}
+
+    def job(name: str) -> DownloadJob:
+        return DownloadJob(
+            url=f"{base}/{name}", provider="standin", asset_id=name, rendition="hd", ext=".mp4",
+            target=tmp / "edge_session" / name,
+        )
+
+    whole = cache.path_for("standin", "whole.mp4", "hd", ".mp4")
+    whole.parent.mkdir(parents=True, exist_ok=True)
+    Path(str(whole) + ".part").write_bytes(synthetic_bytes("whole.mp4", StandInHandler.size))
+
+    results = cache.fetch_all([job("unavailable.mp4"), job("shifted.mp4"), job("whole.mp4")])
+    errors = [r for r in results if isinstance(r, Exception)]
+    assert not errors, errors
+    for r in results:
+        assert r.path.read_bytes() == synthetic_bytes(r.job.asset_id, StandInHandler.size), f"corrupt file {r.path}"
+    seen = StandInHandler.requests_seen
+    assert seen["unavailable.mp4"] == 2, seen
+    assert seen["shifted.mp4"] == 3, seen       # dropped, resumed from the wrong offset, restarted
+    assert seen["whole.mp4"] == 1 and results[2].resumed, seen
+    print("edge cases: 503 retried after Retry-After, wrong resume offset restarted, whole .part renamed on 416")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=12)
+    parser.add_argument("--size_mb", type=float, default=8)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    StandInHandler.size = int(args.size_mb * (1 << 20))
+    server = StandInServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            cache = MediaDownloadCache(tmp / "cache", max_workers=args.concurrency)
+
+            def jobs_for(session: str):
+                return [
+                    DownloadJob(
+                        url=f"{base}/asset_{i}.mp4",
+                        provider="standin",
+                        asset_id=str(i),
+                        rendition="hd",
+                        ext=".mp4",
+                        target=tmp / session / "media" / f"video_{i}.mp4",
+                    )
+                    for i in range(args.files)
+                ]
+
+            start = time.perf_counter()
+            first = cache.fetch_all(jobs_for("session_a"))
+            first_s = time.perf_counter() - start
+            sent_first = StandInHandler.bytes_sent
+
+            start = time.perf_counter()
+            second = cache.fetch_all(jobs_for("session_b"))
+            second_s = time.perf_counter() - start
+
+            errors = [r for r in first + second if isinstance(r, Exception)]
+            assert not errors, errors
+            for r in first + second:
+                expected = synthetic_bytes(Path(r.job.url).name, StandInHandler.size)
+                assert r.path.read_bytes() == expected, f"corrupt file {r.path}"
+            assert all(r.resumed for r in first), "interrupted downloads should resume with Range"
+            assert all(r.cached for r in second), "second session should be served from the cache"
+            assert StandInHandler.bytes_sent == sent_first, "cache hits must not download"
+            linked = sum(os.stat(r.path).st_ino == os.stat(f.path).st_ino for r, f in zip(second, first))
+            assert not list((tmp / "cache").rglob("*.part")), "partial files left behind"
+
+            total_mb = args.files * StandInHandler.size / (1 << 20)
+            print(f"session A: {args.files} files, {total_mb:.0f} MB in {first_s:.2f}s, "
+                  f"{sum(r.resumed for r in first)} resumed after injected faults, "
+                  f"{sent_first / (1 << 20):.0f} MB sent (a restart-from-zero client needs {1.5 * total_mb:.0f} MB)")
+            print(f"session B: {args.files} files from cache in {second_s:.3f}s, {linked} hard-linked")
+            check_edge_cases(base, tmp)
+            print("OK")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Checks for PipelineExecutor scheduling, against the node metadata of the configured nodes (no real node runs):
+
+- the dependency graph of every preset template, with search_media switched on and off: load_media waits for
+  search_media whenever it runs (it lists the media directory that search_media downloads into), and every node
+  depends only on nodes planned before it;
+- semi-auto confirmation with speculation, with a stand-in tool call that saves an artifact the way
+  ToolInterceptor does: skipping (CONFIRM_SKIP, as sent by the web UI's skip button) before or after the
+  speculative run finished discards it and does not run the node; unchanged params adopt the speculative result;
+  changed params discard it and run again; cancelling the step while it waits for confirmation, or while a
+  slow-to-stop speculative run is being discarded, raises CancelledError instead of being swallowed;
+- the voiceover prefix preview, with stand-in tools: plan_timeline and render_video run on the streamed prefix
+  while generate_voiceover is still running, the preview is published as render.preview and its artifacts are
+  removed, and a failing preview leaves the pipeline result unchanged.
+
+Run from the repo root:
+
+    python scripts/check_pipeline_executor.py
+"""
+import os
+import sys
+import json
+import asyncio
+import tempfile
+from dataclasses import asdict
+from types import SimpleNamespace
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for p in (ROOT_DIR, os.path.join(ROOT_DIR, "src")):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from open_storyline.config import load_settings, default_config_path
+from open_storyline.mcp.hooks.chat_middleware import get_mcp_log_sink
+from open_storyline.mcp.hooks.node_interceptors import get_input_overrides, preview_session_id
+from open_storyline.nodes.node_manager import NodeManager
+from open_storyline.pipeline.edit_template import PRESET_TEMPLATES, EditTemplate, NodeConfig
+from open_storyline.pipeline.pipeline_executor import CONFIRM_SKIP, PipelineExecutor
+from open_storyline.storage.agent_memory import ArtifactStore
+from open_storyline.utils.register import NODE_REGISTRY
+
+
+def make_node_manager() -> NodeManager:
+    """NodeManager over stand-in tools that carry the same `_meta` as the registered MCP tools."""
+    cfg = load_settings(default_config_path())
+    for pkg in cfg.local_mcp_server.available_node_pkgs:
+        NODE_REGISTRY.scan_package(pkg)
+    tools = [
+        SimpleNamespace(metadata={"_meta": asdict(NODE_REGISTRY.get(name=name).meta)})
+        for name in cfg.local_mcp_server.available_nodes
+    ]
+    return NodeManager(tools)
+
+
+def check_dependency_graph(executor: PipelineExecutor) -> None:
+    for preset in PRESET_TEMPLATES:
+        for search_mode in ("auto", "skip"):
+            template = preset.model_copy(deep=True)
+            for node_cfg in template.nodes:
+                if node_cfg.node_id == "search_media":
+                    node_cfg.mode = search_mode
+            plan = executor._build_execution_plan(template)
+            deps = executor._build_dependency_graph(plan)
+
+            order = [node_cfg.node_id for node_cfg in plan]
+            for i, node_id in enumerate(order):
+                assert deps[node_id] <= set(order[:i]), (preset.name, node_id, deps[node_id])
+            modes = {node_cfg.node_id: node_cfg.mode for node_cfg in plan}
+            if modes.get("load_media", "skip") != "skip":
+                waits = "search_media" in deps["load_media"]
+                assert waits == (modes.get("search_media", "skip") != "skip"), (preset.name, search_mode, deps["load_media"])
+        print(f"  {preset.name}: load_media deps ok")
+
+
+async def run_confirmed_step(
+    executor: PipelineExecutor,
+    answer,
+    answer_after_sec: float,
+    tool_sec: float,
+    teardown_sec: float = 0.0,
+    cancel_after_sec: float = 0.0,
+):
+    """
+    One semi-auto filter_clips step; returns (result, exception, artifact ids the tool saved, tool calls).
+    `teardown_sec` delays the tool's reaction to cancellation; `cancel_after_sec` > 0 cancels the step itself,
+    and the exception is then whatever the cancelled step raised.
+    """
+    saved, calls = [], []
+
+    async def call_tool(node_id, mode, params, artifact_id=None):
+        calls.append(dict(params))
+        try:
+            await asyncio.sleep(tool_sec)
+        except asyncio.CancelledError:
+            await asyncio.sleep(teardown_sec)
+            raise
+        executor.store.save_result(
+            executor.session_id, node_id, {"artifact_id": artifact_id, "summary": "ok", "tool_excute_result": {}}
+        )
+        saved.append(artifact_id)
+        return {"summary": "ok", "isError": False}
+
+    async def on_confirm(node_id, params, timeout_sec):
+        await asyncio.sleep(answer_after_sec)
+        return answer(params)
+
+    executor._call_tool = call_tool
+    template = EditTemplate(
+        template_id="check",
+        name="check",
+        auto_mode="semi_auto",
+        semi_auto_timeout_sec=10,
+        nodes=[NodeConfig(node_id="filter_clips", mode="auto", params={"k": 1}, confirm_required=True)],
+    )
+    step = asyncio.create_task(executor._run_step(template, template.nodes[0], None, on_confirm, None, lambda: 0.0))
+    if cancel_after_sec > 0:
+        await asyncio.sleep(cancel_after_sec)
+        step.cancel()
+        try:
+            await step
+        except BaseException as e:
+            return None, e, saved, calls
+        return None, None, saved, calls
+    result, exc, _ = await step
+    return result, exc, saved, calls
+
+
+def check_confirmation(executor: PipelineExecutor) -> None:
+    def exists(artifact_id: str) -> bool:
+        return executor.store.load_result(artifact_id)[0] is not None
+
+    for label, answer_after_sec, tool_sec in (("after the speculative run", 0.2, 0.05), ("during it", 0.05, 0.2)):
+        result, exc, saved, calls = asyncio.run(run_confirmed_step(executor, lambda p: CONFIRM_SKIP, answer_after_sec, tool_sec))
+        assert exc is None and result == {"skipped": True}, (label, result, exc)
+        assert len(calls) == 1 and not any(exists(a) for a in saved), (label, calls, saved)
+        print(f"  skip {label}: node skipped, speculative artifact discarded")
+
+    result, exc, saved, calls = asyncio.run(run_confirmed_step(executor, dict, 0.2, 0.05))
+    assert exc is None and len(calls) == 1 and result["artifact_id"] == saved[0] and exists(saved[0]), (result, saved)
+    assert result["speculative_saved_sec"] > 0, result
+    print("  unchanged params: speculative result adopted")
+
+    result, exc, saved, calls = asyncio.run(run_confirmed_step(executor, lambda p: {"k": 2}, 0.2, 0.05))
+    assert exc is None and calls == [{"k": 1}, {"k": 2}], calls
+    assert not exists(saved[0]) and exists(saved[1]) and result["artifact_id"] == saved[1], (result, saved)
+    print("  changed params: speculative result discarded, node run again")
+
+    _, exc, saved, calls = asyncio.run(run_confirmed_step(executor, dict, 1.0, 0.5, cancel_after_sec=0.1))
+    assert isinstance(exc, asyncio.CancelledError) and len(calls) == 1 and not saved, (exc, calls, saved)
+    print("  cancelled while waiting for confirmation: CancelledError raised, speculative run cancelled")
+
+    # params change at 0.05s; the speculative run takes 0.3s to stop, and the step is cancelled at 0.15s
+    _, exc, saved, calls = asyncio.run(
+        run_confirmed_step(executor, lambda p: {"k": 2}, 0.05, 1.0, teardown_sec=0.3, cancel_after_sec=0.15)
+    )
+    assert isinstance(exc, asyncio.CancelledError) and calls == [{"k": 1}] and not saved, (exc, calls, saved)
+    print("  cancelled while discarding the speculative run: CancelledError raised")
+
+
+async def run_with_preview(executor: PipelineExecutor, groups: int, fail_render_preview: bool = False):
+    """generate_voiceover streams one group every 50 ms; returns (result, partial events, {tool: [overrides]})."""
+    events, calls = [], {}
+
+    async def call_tool(node_id, mode, params, artifact_id=None):
+        overrides = get_input_overrides()
+        calls.setdefault(node_id, []).append(overrides)
+        if node_id == "generate_voiceover":
+            for i in range(groups):
+                await asyncio.sleep(0.05)
+                segment = {"voiceover_id": f"v{i}", "group_id": f"g{i}", "path": "", "duration": 1000}
+                message = {"event": "voiceover.segment", "index": i, "segment": segment, "prefix": i + 1, "total": groups}
+                get_mcp_log_sink()({"type": "tool_progress", "message": json.dumps(message)})
+        if overrides and node_id == "render_video" and fail_render_preview:
+            return {"summary": "failed", "isError": True}
+        session_id = preview_session_id(executor.session_id) if overrides else executor.session_id
+        executor.store.save_result(session_id, node_id, {"artifact_id": artifact_id, "summary": "ok", "tool_excute_result": {}})
+        return {"summary": "ok", "isError": False}
+
+    async def on_partial(node_id, payload):
+        events.append((node_id, payload["event"], payload.get("prefix")))
+
+    executor._call_tool = call_tool
+    executor.store.save_result(executor.session_id, "group_clips", {
+        "artifact_id": executor.store.generate_artifact_id("group_clips"),
+        "summary": "",
+        "tool_excute_result": {"groups": [{"group_id": f"g{i}"} for i in range(groups)]},
+    })
+    template = EditTemplate(template_id="check", name="check", nodes=[NodeConfig(node_id="generate_voiceover")])
+    result = await executor.run(template, on_partial=on_partial)
+    return result, events, calls
+
+
+def check_prefix_preview(executor: PipelineExecutor) -> None:
+    executor.prefix_preview_groups = 2
+    result, events, calls = asyncio.run(run_with_preview(executor, groups=6))
+    previews = [e for e in events if e[1] == "render.preview"]
+    assert result["status"] == "done" and previews == [("render_video", "render.preview", 2)], (result["status"], events)
+    assert events.index(previews[0]) < events.index(("generate_voiceover", "voiceover.segment", 6)), events
+    plan_overrides = [o for o in calls["plan_timeline"] if o]
+    assert [v["group_id"] for v in plan_overrides[0]["tts"]["voiceover"]] == ["g0", "g1"], plan_overrides
+    assert [g["group_id"] for g in plan_overrides[0]["group_clips"]["groups"]] == ["g0", "g1"], plan_overrides
+    assert len(calls["plan_timeline"]) == len(calls["render_video"]) == 2, calls
+    assert result["timing"]["prefix_preview_sec"] > 0, result["timing"]
+    assert all(m.session_id == executor.session_id for m in executor.store._load_meta_list())
+    print("  prefix preview: rendered on the first 2 groups before the voiceover finished, artifacts removed")
+
+    result, events, _ = asyncio.run(run_with_preview(executor, groups=6, fail_render_preview=True))
+    assert result["status"] == "done" and not any(e[1] == "render.preview" for e in events), (result, events)
+    assert all(m.session_id == executor.session_id for m in executor.store._load_meta_list())
+    print("  failing preview: pipeline unaffected")
+
+    executor.prefix_preview_groups = 0
+    _, events, calls = asyncio.run(run_with_preview(executor, groups=6))
+    assert len(calls["plan_timeline"]) == 1 and not any(e[1] == "render.preview" for e in events), calls
+    print("  prefix_preview_groups = 0: no preview")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        executor = PipelineExecutor(make_node_manager(), ArtifactStore(tmp, "check"), "check", runtime=None)
+        check_dependency_graph(executor)
+        check_confirmation(executor)
+        check_prefix_preview(executor)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
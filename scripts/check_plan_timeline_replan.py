@@ -0,0 +1,203 @@
+"""
+Randomized checks for incremental re-planning in plan_timeline (TimelinePlanner.plan with previous_plan and
+changed_group_ids):
+
+- groups before the first changed group come out byte-identical;
+- every reused group keeps its clip durations and source windows and is only shifted on the timeline;
+- without beats exactly the changed groups are re-planned, even when the other groups' voiceovers were
+  regenerated with slightly different durations;
+- re-planning with nothing changed reproduces the previous plan, and re-planning every group equals a fresh plan;
+- the diff's shifted / changed video items match what actually moved.
+
+then times a full plan against a one-group re-plan. Run from the repo root:
+
+    python scripts/check_plan_timeline_replan.py --cases 300 --long_groups 2000
+"""
+import os
+import sys
+import copy
+import json
+import time
+import random
+import argparse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for p in (ROOT_DIR, os.path.join(ROOT_DIR, "src")):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from open_storyline.config import load_settings, default_config_path
+from open_storyline.nodes.core_nodes.plan_timeline import TimelinePlanner
+
+
+def make_case(rng: random.Random, num_groups: int) -> dict:
+    clips, groups, scripts, voiceovers = [], [], [], []
+    for g in range(num_groups):
+        clip_ids = []
+        for _ in range(rng.randint(1, 4)):
+            clip_id = f"clip_{len(clips):04d}"
+            duration = rng.randint(300, 12000)
+            start = rng.randint(0, 5000)
+            clips.append(
+                {
+                    "clip_id": clip_id,
+                    "kind": rng.choice(["video", "video", "image"]),
+                    "path": f"{clip_id}.mp4",
+                    "source_ref": {"media_id": "media_0000", "start": start, "end": start + duration, "duration": duration},
+                }
+            )
+            clip_ids.append(clip_id)
+        group_id = f"group_{g:04d}"
+        groups.append({"group_id": group_id, "clip_ids": clip_ids})
+        if rng.random() < 0.8:
+            scripts.append(
+                {
+                    "group_id": group_id,
+                    "raw_text": "x" * rng.randint(0, 80),
+                    "subtitle_units": [{"unit_id": f"{group_id}_u{i}", "text": "hello" * (i + 1)} for i in range(rng.randint(1, 3))],
+                }
+            )
+        if rng.random() < 0.6:
+            voiceovers.append(
+                {"group_id": group_id, "voiceover_id": f"vo_{g}", "duration": rng.randint(500, 9000), "path": f"vo_{g}.wav"}
+            )
+
+    beats = sorted({rng.randint(1, 120000) for _ in range(rng.randint(2, 200))})
+    music = {"bgm_id": "bgm_0", "beats": beats, "duration": beats[-1] + rng.randint(0, 4000), "path": "bgm.mp3"}
+    return {
+        "media": [{"media_id": "media_0000", "path": "media_0000.mp4"}],
+        "clips": clips,
+        "groups": groups,
+        "group_scripts": scripts,
+        "voiceovers": voiceovers,
+        "background_music": music if rng.random() < 0.8 else None,
+        "use_beats": rng.random() < 0.6,
+    }
+
+
+def as_stored(plan: dict) -> dict:
+    """JSON round trip without files, as the interceptor hands a stored plan back to the node."""
+    plan = json.loads(json.dumps(plan))
+    tracks = {
+        name: [{k: v for k, v in item.items() if k not in ("path", "base64", "md5")} for item in items]
+        for name, items in plan["tracks"].items()
+    }
+    return {"tracks": tracks, "plan_state": plan["plan_state"]}
+
+
+def edit_group(rng: random.Random, case: dict, group_id: str, jitter_others: bool) -> dict:
+    case = copy.deepcopy(case)
+    voiceover = next((v for v in case["voiceovers"] if v["group_id"] == group_id), None)
+    if voiceover is not None:
+        voiceover["duration"] = rng.randint(500, 9000)
+    else:
+        case["voiceovers"].append({"group_id": group_id, "voiceover_id": "vo_new", "duration": rng.randint(500, 9000)})
+    if jitter_others:
+        # regenerating TTS for the whole script changes every duration a little
+        for v in case["voiceovers"]:
+            if v["group_id"] != group_id:
+                v["duration"] = max(1, v["duration"] + rng.randint(-40, 40))
+    return case
+
+
+def segments_by_group(plan: dict) -> dict:
+    out = {}
+    for seg in plan["tracks"]["video"]:
+        out.setdefault(seg["group_id"], []).append(seg)
+    return out
+
+
+def check_case(planner: TimelinePlanner, rng: random.Random, case: dict) -> None:
+    previous = planner.plan(**case)
+
+    # nothing changed -> same plan, empty diff
+    same = planner.plan(**case, previous_plan=as_stored(previous), changed_group_ids=[])
+    assert same["tracks"] == previous["tracks"]
+    for track_diff in same["diff"]["tracks"].values():
+        assert not (track_diff["added"] or track_diff["removed"] or track_diff["changed"] or track_diff["shifted"]), track_diff
+
+    group_ids = [g["group_id"] for g in case["groups"]]
+    changed_id = rng.choice(group_ids)
+    jitter = rng.random() < 0.5
+    edited = edit_group(rng, case, changed_id, jitter_others=jitter)
+
+    # everything changed -> a fresh plan
+    everything = planner.plan(**edited, previous_plan=as_stored(previous), changed_group_ids=group_ids)
+    assert everything["tracks"] == planner.plan(**edited)["tracks"]
+
+    replanned = planner.plan(**edited, previous_plan=as_stored(previous), changed_group_ids=[changed_id])
+    diff = replanned["diff"]
+    assert changed_id in diff["replanned_groups"]
+    beats_on = bool(edited["use_beats"] and edited["background_music"])
+    if not beats_on:
+        assert diff["replanned_groups"] == [changed_id], diff["replanned_groups"]
+
+    before, after = segments_by_group(previous), segments_by_group(replanned)
+    for group_id in group_ids[: group_ids.index(changed_id)]:
+        assert after.get(group_id) == before.get(group_id), group_id
+
+    shifted_groups = set()
+    for group_id in diff["reused_groups"]:
+        old, new = before[group_id], after[group_id]
+        delta = new[0]["timeline_window"]["start"] - old[0]["timeline_window"]["start"]
+        for a, b in zip(old, new):
+            assert a["source_window"] == b["source_window"], group_id
+            assert a["playback_rate"] == b["playback_rate"], group_id
+            assert b["timeline_window"]["start"] - a["timeline_window"]["start"] == delta, group_id
+            assert b["timeline_window"]["end"] - a["timeline_window"]["end"] == delta, group_id
+        if delta:
+            shifted_groups.add(group_id)
+
+    video_diff = diff["tracks"]["video"]
+    # clips of a re-planned group that kept their duration (and so their seeded window) are only shifted too
+    shifted_in_diff = {item["group_id"] for item in video_diff["shifted"]}
+    assert shifted_groups <= shifted_in_diff <= shifted_groups | set(diff["replanned_groups"])
+    assert {item["group_id"] for item in video_diff["changed"]} <= set(diff["replanned_groups"])
+    assert diff["duration_delta_ms"] == (
+        replanned["tracks"]["video"][-1]["timeline_window"]["end"] - previous["tracks"]["video"][-1]["timeline_window"]["end"]
+    )
+
+
+def time_long_case(planner: TimelinePlanner, rng: random.Random, num_groups: int) -> None:
+    case = make_case(rng, num_groups)
+    case["use_beats"] = False
+    start = time.perf_counter()
+    previous = planner.plan(**case)
+    full_ms = (time.perf_counter() - start) * 1000
+
+    changed_id = case["groups"][num_groups // 2]["group_id"]
+    edited = edit_group(rng, case, changed_id, jitter_others=False)
+    for v in edited["voiceovers"]:
+        if v["group_id"] == changed_id:
+            v["duration"] = 20000  # long enough to move everything after it
+    stored = as_stored(previous)
+    start = time.perf_counter()
+    replanned = planner.plan(**edited, previous_plan=stored, changed_group_ids=[changed_id])
+    replan_ms = (time.perf_counter() - start) * 1000
+    print(
+        f"{num_groups} groups: full plan {full_ms:.1f}ms, re-plan of one group {replan_ms:.1f}ms "
+        f"({len(replanned['diff']['replanned_groups'])} groups re-planned, "
+        f"{len(replanned['diff']['tracks']['video']['changed'])} clips changed, "
+        f"{len(replanned['diff']['tracks']['video']['shifted'])} shifted, "
+        f"timeline {replanned['diff']['duration_delta_ms']:+d}ms)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", type=str, default=default_config_path())
+    parser.add_argument("--cases", type=int, default=300)
+    parser.add_argument("--long_groups", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    planner = TimelinePlanner(load_settings(args.config).plan_timeline)
+    rng = random.Random(args.seed)
+    for _ in range(args.cases):
+        check_case(planner, rng, make_case(rng, rng.randint(1, 10)))
+    time_long_case(planner, rng, args.long_groups)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import os
+import sys
+import argparse
+from pathlib import Path
+
+from tqdm import tqdm  # progress bar
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for p in (ROOT_DIR, os.path.join(ROOT_DIR, "src")):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from open_storyline.config import load_settings, default_config_path
+from open_storyline.nodes.core_nodes.select_bgm import SelectBGMNode
+from open_storyline.utils.music_index import MusicAnalysisIndex
+
+
+# -------------------------------
+# Main
+# -------------------------------
+def main():
+    parser = argparse.ArgumentParser(
+        description="Precompute beats / tempo / loudness for every track in bgm_dir into its .analysis_index.json"
+    )
+    parser.add_argument("--config", type=str, default=default_config_path(), help="config.toml path")
+    parser.add_argument("--bgm_dir", type=str, default=None, help="Override [project] bgm_dir")
+    args = parser.parse_args()
+
+    cfg = load_settings(args.config)
+    bgm_dir = Path(args.bgm_dir) if args.bgm_dir else cfg.project.bgm_dir
+    params = SelectBGMNode.analysis_params(
+        cfg.select_bgm.sample_rate, cfg.select_bgm.hop_length, cfg.select_bgm.frame_length, cfg.select_bgm
+    )
+
+    index = MusicAnalysisIndex(bgm_dir, analyze=SelectBGMNode._analyze_track)
+    todo = index.missing(params)
+    print(f"{len(index.iter_tracks())} tracks in {bgm_dir}, {len(todo)} to analyse")
+
+    failed = []
+    with tqdm(total=len(todo), desc="Analysing BGMs", unit="file") as bar:
+        def on_progress(path: Path, err):
+            if err is not None:
+                failed.append(path)
+                tqdm.write(f"⚠️ Error analysing {path.name}: {err}")
+            bar.update(1)
+
+        done = index.build(params, paths=todo, on_progress=on_progress)
+
+    print(f"✅ Done! {done} tracks indexed, {len(failed)} failed. Index saved to {index.index_path}")
+
+
+if __name__ == "__main__":
+    main()
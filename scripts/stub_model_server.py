@@ -0,0 +1,131 @@
+"""
+Offline stand-ins for the model services, so batch.py (or the web UI) can run end to end without network access:
+
+- POST /v1/chat/completions: OpenAI-compatible LLM / VLM. Replies are well-formed JSON in the shape each node's
+  prompt asks for (captions, filter results, groups, reduce order, scripts), built from the ids in the prompt;
+  other prompts get "{}" and the node falls back to its default. `"stream": true` is answered as SSE.
+- POST /api/v1/tts: IndexTTS, the sine WAV stub of bench_tts_concurrency.py.
+
+Every request sleeps `--latency` seconds. Start the MCP server (see README) and this server, then point a
+manifest's jobs at it:
+
+    python scripts/stub_model_server.py --port 8765
+    {"job_id": "smoke_001", "media_dir": "/data/smoke_001", "template_id": "preset_travel_vlog",
+     "llm": {"base_url": "http://127.0.0.1:8765/v1", "api_key": "stub"},
+     "vlm": {"base_url": "http://127.0.0.1:8765/v1", "api_key": "stub"},
+     "tts_config": {"provider": "indextts", "indextts": {"base_url": "http://127.0.0.1:8765"}}}
+    python batch.py --manifest smoke.jsonl --workers 2 --job_timeout_sec 600
+
+Run from the repo root.
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from http.server import ThreadingHTTPServer
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for p in (ROOT_DIR, os.path.join(ROOT_DIR, "src")):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from scripts.bench_tts_concurrency import StubTTSHandler
+
+_CLIP_ID_RE = re.compile(r"clip_\d{4,}")
+_GROUP_ID_RE = re.compile(r"group_\d{4,}")
+_GROUP_TMP_ID_RE = re.compile(r"'group_id': '(g\d+)'")
+
+
+def _text_of(content) -> str:
+    """Message content is a string, or a list of parts of which only the text parts matter here."""
+    if isinstance(content, str):
+        return content
+    return "\n".join(part.get("text", "") for part in content or [] if isinstance(part, dict))
+
+
+def stub_reply(system_prompt: str, user_prompt: str) -> str:
+    """JSON reply in the shape the node's prompt asks for."""
+    clip_ids = list(dict.fromkeys(_CLIP_ID_RE.findall(user_prompt)))
+    if '"aes_score"' in system_prompt:
+        caption = {"caption": "A steady shot of the scene.", "aes_score": 5.0}
+        if '"<clip_id>"' in system_prompt:  # batch prompt: one caption per clip
+            return json.dumps({cid: caption for cid in clip_ids})
+        return json.dumps(caption)
+    if '"group_scripts"' in system_prompt:
+        group_ids = list(dict.fromkeys(_GROUP_ID_RE.findall(user_prompt))) or ["group_0001"]
+        scripts = [{"group_id": gid, "raw_text": "这是一段离线测试旁白。"} for gid in group_ids]
+        return json.dumps({"group_scripts": scripts, "title": "Offline smoke run"}, ensure_ascii=False)
+    if '"order"' in system_prompt:
+        return json.dumps({"order": list(dict.fromkeys(_GROUP_TMP_ID_RE.findall(user_prompt)))})
+    if '"groups"' in system_prompt:
+        groups = [
+            {"group_id": "", "summary": f"group of {clip_ids[i]}", "clip_ids": clip_ids[i:i + 3]}
+            for i in range(0, len(clip_ids), 3)
+        ]
+        return json.dumps({"groups": groups})
+    if '"results"' in user_prompt:
+        return json.dumps({"results": [{"clip_id": cid, "keep": True} for cid in clip_ids]})
+    return "{}"
+
+
+class StubModelHandler(StubTTSHandler):
+
+    def _send_sse(self, chunks: list):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for chunk in chunks:
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return super().do_POST()
+
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        messages = body.get("messages") or []
+        system_prompt = "\n".join(_text_of(m.get("content")) for m in messages if m.get("role") == "system")
+        user_prompt = "\n".join(_text_of(m.get("content")) for m in messages if m.get("role") != "system")
+        time.sleep(self.latency)
+        content = stub_reply(system_prompt, user_prompt)
+
+        base = {"id": "stub", "created": int(time.time()), "model": body.get("model", "stub")}
+        if body.get("stream"):
+            delta = {"index": 0, "delta": {"role": "assistant", "content": content}, "finish_reason": None}
+            stop = {"index": 0, "delta": {}, "finish_reason": "stop"}
+            return self._send_sse([
+                {**base, "object": "chat.completion.chunk", "choices": [delta]},
+                {**base, "object": "chat.completion.chunk", "choices": [stop]},
+            ])
+        self._reply({
+            **base,
+            "object": "chat.completion",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per request")
+    args = parser.parse_args()
+
+    StubModelHandler.latency = args.latency
+    server = ThreadingHTTPServer((args.host, args.port), StubModelHandler)
+    print(f"stub LLM/VLM at http://{args.host}:{args.port}/v1, stub IndexTTS at http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
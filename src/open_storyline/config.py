@@ -126,6 +126,15 @@ class MCPConfig(ConfigBaseModel):
 
     available_node_pkgs: List[str] = []
     available_nodes: List[str] = []
+    warmup_nodes: bool = True  # Load nodes (models, indexes) in the background after startup instead of on first call
+    strict_ready: bool = False  # Keep /ready at 503 while any node failed to load during warm-up
+
+    # Thread pools for node work that would otherwise block the server event loop (see nodes/node_runtime.py)
+    io_workers: int = Field(default=16, ge=1, description="File, network and subprocess waits")
+    cpu_workers: int = Field(default=4, ge=1, description="Numeric work such as music analysis and frame hashing")
+    heavy_workers: int = Field(default=2, ge=1, description="Shot detection and video rendering")
+    loop_lag_warn_ms: float = Field(default=200.0, ge=0, description="Log event loop lag when the worst sample in a minute exceeds this")
+
     @property
     def url(self) -> str:
         return f"{self.url_scheme}://{self.connect_host}:{self.port}{self.path}"
@@ -133,8 +142,17 @@ class MCPConfig(ConfigBaseModel):
 class SkillsConfig(ConfigBaseModel):
     skill_dir: Path = Field(..., description="Skill directory.")
 
+class LoadMediaConfig(ConfigBaseModel):
+    probe_workers: int = Field(default=8, ge=1, description="Files probed in parallel")
+    metadata_cache_enabled: bool = True
+    metadata_cache_dir: str = "./.storyline/cache/media_meta"
+
 class PexelsConfig(ConfigBaseModel):
     pexels_api_key: str = ""
+    download_concurrency: int = Field(default=4, ge=1, description="Media files downloaded in parallel")
+    media_cache_dir: str = "./.storyline/cache/media"
+    search_cache_ttl_sec: int = Field(default=3600, ge=0, description="TTL of cached search API responses, 0 disables")
+    api_base_url: str = "https://api.pexels.com"
 
 class SplitShotsConfig(ConfigBaseModel):
     transnet_weights: Path = Field(..., description="Path to transnet_v2 weights")
@@ -143,6 +161,21 @@ class SplitShotsConfig(ConfigBaseModel):
 class UnderstandClipsConfig(ConfigBaseModel):
     sample_fps: float = 2.0
     max_frames: int = 64
+    dedup_enabled: bool = True
+    dedup_max_hamming: int = Field(default=6, ge=0, le=64, description="Max per-frame dHash Hamming distance for near-duplicate clips")
+    dedup_frames_per_clip: int = Field(default=3, ge=1)
+    adaptive_frames: bool = True
+    min_frames: int = Field(default=1, ge=1)
+    adaptive_max_frames: int = Field(default=12, ge=1, description="Per-clip frame ceiling of the adaptive allocation")
+    run_budget_ratio: float = Field(default=1.0, ge=0.0, description="Run image budget as a multiple of the fixed per-clip policy's total, 0 = unlimited")
+    batch_mode: bool = False
+    batch_max_clips: int = Field(default=6, ge=1)
+    batch_max_clip_sec: float = Field(default=5.0, ge=0.0, description="Only clips up to this length are packed into a batch")
+
+class ClipMapReduceConfig(ConfigBaseModel):
+    single_call_max_tokens: int = Field(default=6000, ge=1, description="Clip blocks up to this estimated size use one LLM call")
+    chunk_max_tokens: int = Field(default=3000, ge=1, description="Estimated clip-block size of one map chunk")
+    max_concurrency: int = Field(default=4, ge=1)
 
 class RecommendScriptTemplateConfig(ConfigBaseModel):
     script_template_dir: Path = Field(..., description="Script template directory.")
@@ -151,16 +184,30 @@ class RecommendScriptTemplateConfig(ConfigBaseModel):
 class GenerateVoiceoverConfig(ConfigBaseModel):
     tts_provider_params_path: Path = Field(..., description="TTS provider config file path")
     providers: dict[str, dict[str, Any]] = Field(default_factory=dict)
+    cache_enabled: bool = True
+    cache_dir: str = "./.storyline/cache/tts"
+    cache_max_mb: int = Field(default=1024, ge=0, description="Size limit of the synthesized chunk cache (MB)")
 
 class SelectBGMConfig(ConfigBaseModel):
     sample_rate: int = 22050
     hop_length: int = 2048
     frame_length: int = 2048
+    index_in_background: bool = True
+    max_analysis_sec: float = Field(default=180.0, ge=0.0, description="Analyse at most this much of a track (also the bound when the timeline length is unknown), 0 = no cap")
+    analysis_margin_sec: float = Field(default=30.0, ge=0.0, description="Music analysed past the expected timeline length")
+    percussive_method: Literal["hpss", "spectral_hpss"] = "spectral_hpss"  # "hpss" separates the waveform (slow); see scripts/bench_bgm_analysis.py
 
 class RecommendTextConfig(ConfigBaseModel):
     font_info_path: Path = Field(..., description="Font info path.")
 
 
+class PipelineConfig(ConfigBaseModel):
+    max_parallel_nodes: int = Field(default=3, ge=1, description="Pipeline nodes run concurrently once their inputs are ready")
+    memo_enabled: bool = True  # Reuse a prior artifact when a node runs with the same inputs, params, config and prompts
+    memo_dir: str = "./.storyline/cache/node_memo"
+    speculative_confirm: bool = True  # In semi_auto, pre-run a node with its current params while waiting for confirmation
+    prefix_preview_groups: int = Field(default=2, ge=0, description="Render a preview once this many leading voiceover groups are done; 0 = off")
+
 class PlanTimelineConfig(ConfigBaseModel):
     beat_type_max: int = 1  # Maximum beat strength to use (e.g., in 4/4: 1,2,1,3 where 1=strongest, 3=weakest)
     title_duration: int = 5000  # Title/intro duration in milliseconds
@@ -240,15 +287,18 @@ class Settings(ConfigBaseModel):
     local_mcp_server: MCPConfig
 
     skills: SkillsConfig
+    load_media: LoadMediaConfig = Field(default_factory=LoadMediaConfig)
     search_media: PexelsConfig
     split_shots: SplitShotsConfig
     understand_clips: UnderstandClipsConfig
+    clip_map_reduce: ClipMapReduceConfig = Field(default_factory=ClipMapReduceConfig)
     script_template: RecommendScriptTemplateConfig
     generate_voiceover: GenerateVoiceoverConfig
     select_bgm: SelectBGMConfig
     recommend_text: RecommendTextConfig
     plan_timeline: PlanTimelineConfig
     plan_timeline_pro: PlanTimelineProConfig
+    pipeline: PipelineConfig = Field(default_factory=PipelineConfig)
 
 
 def load_settings(config_path: str | Path) -> Settings:
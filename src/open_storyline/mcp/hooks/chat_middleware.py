@@ -37,6 +37,9 @@ def set_mcp_log_sink(sink: Optional[Callable[[dict], None]]):
 def reset_mcp_log_sink(token):
     _MCP_LOG_SINK.reset(token)
 
+def get_mcp_log_sink() -> Optional[Callable[[dict], None]]:
+    return _MCP_LOG_SINK.get()
+
 
 def _norm_url(u: str) -> str:
     u = (u or "").strip()
@@ -1,6 +1,8 @@
 from collections import defaultdict
-from typing import List, Any, Dict
+from typing import List, Any, Dict, Optional
 import os
+import copy
+import contextvars
 from pathlib import Path
 import json
 import traceback
@@ -19,6 +21,23 @@ from open_storyline.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# kind -> payload that replaces the session's latest artifact of that kind as node input (e.g. the pipeline's
+# prefix preview plans on the voiceover groups finished so far). While set, results are saved under
+# preview_session_id(), so the session's own artifact lookups never pick them up.
+_INPUT_OVERRIDES = contextvars.ContextVar("tool_input_overrides", default=None)
+
+def set_input_overrides(overrides: Optional[Dict[str, Any]]):
+    return _INPUT_OVERRIDES.set(overrides)
+
+def reset_input_overrides(token):
+    _INPUT_OVERRIDES.reset(token)
+
+def get_input_overrides() -> Optional[Dict[str, Any]]:
+    return _INPUT_OVERRIDES.get()
+
+def preview_session_id(session_id: str) -> str:
+    return f"{session_id}__preview"
+
 def compress_payload_to_base64(payload: Dict[str,List[Any]]):
     if not isinstance(payload, dict):
         return payload
@@ -37,6 +56,36 @@ def compress_payload_to_base64(payload: Dict[str,List[Any]]):
         elif isinstance(value, dict):
             compress_payload_to_base64(value)
 
+def slim_previous_plan(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Keep only what a re-plan compares against: track items without their files (the re-plan takes files
+    from the current inputs, so nothing needs uploading) and the per-group plan_state.
+    """
+    file_keys = {"path", "base64", "md5"}
+    tracks = {
+        name: [{k: v for k, v in item.items() if k not in file_keys} for item in items]
+        for name, items in (payload.get("tracks") or {}).items()
+    }
+    return {"tracks": tracks, "plan_state": payload.get("plan_state") or {}}
+
+def collect_timeline_hint(store, session_id: str) -> Dict[str, List[int]]:
+    """
+    Durations (ms) select_bgm estimates the timeline length from, to bound its music analysis: the latest
+    voiceover segments and the latest clips (0 for images). Either list is empty when that node has not run yet.
+    """
+    hint: Dict[str, List[int]] = {"voiceover_ms": [], "clips_ms": []}
+    for node_id, list_key, hint_key in (("generate_voiceover", "voiceover", "voiceover_ms"), ("split_shots", "clips", "clips_ms")):
+        meta = store.get_latest_meta(node_id=node_id, session_id=session_id)
+        if meta is None:
+            continue
+        _, output = store.load_result(meta.artifact_id)
+        for item in ((output or {}).get('payload') or {}).get(list_key) or []:
+            if hint_key == "voiceover_ms":
+                hint[hint_key].append(int(item.get("duration") or 0))
+            else:
+                hint[hint_key].append(int((item.get("source_ref") or {}).get("duration") or 0))
+    return hint
+
 class ToolInterceptor:
     
     @staticmethod
@@ -59,6 +108,7 @@ class ToolInterceptor:
             artifact_id = store.generate_artifact_id(node_id)
             meta_collector: NodeManager = context.node_manager
             input_data = defaultdict(list)
+            input_overrides = get_input_overrides() or {}
 
             def load_collected_data(collected_node, input_data, store):
                 """Load collected node data"""
@@ -90,6 +140,7 @@ class ToolInterceptor:
                     if is_skip_mode 
                     else meta_collector.id_to_require_prior_kind[node_id]
                 )
+                require_kind = [kind for kind in require_kind if kind not in input_overrides]
                 
                 # 2. Check if node is executable
                 collect_result = meta_collector.check_excutable(session_id, store, require_kind)
@@ -235,6 +286,23 @@ class ToolInterceptor:
                     # Collect dependencies again
                     collect_result = meta_collector.check_excutable(session_id, store, require_kind)
                     load_collected_data(collect_result['collected_node'], input_data, store)
+
+                # 5. Incremental re-plan: hand plan_timeline its own latest plan
+                if node_id == 'plan_timeline' and request.args.get('changed_group_ids') is not None:
+                    previous_meta = store.get_latest_meta(node_id=node_id, session_id=session_id)
+                    if previous_meta is not None:
+                        _, previous_output = store.load_result(previous_meta.artifact_id)
+                        input_data['previous_plan'] = slim_previous_plan(previous_output['payload'])
+
+                # 6. select_bgm analyses only as much of the music as the timeline is likely to need
+                if node_id == 'select_bgm':
+                    input_data['timeline_hint'] = collect_timeline_hint(store, session_id)
+
+                # 7. Substituted inputs
+                for kind, payload in input_overrides.items():
+                    payload = copy.deepcopy(payload)
+                    compress_payload_to_base64(payload)
+                    input_data[kind] = payload
             else:
                 input_data['artifacts_dir'] = store.artifacts_dir
 
@@ -271,6 +339,8 @@ class ToolInterceptor:
             
             artifact_id = tool_result['artifact_id']
             session_id = client_ctx.session_id
+            if get_input_overrides():
+                session_id = preview_session_id(session_id)
 
             store = request.runtime.store
 
@@ -1,8 +1,10 @@
 from __future__ import annotations
 from dataclasses import asdict
-from typing import Annotated
+from typing import Annotated, Any, Dict, List, Optional
 from pydantic import BaseModel, Field
+import asyncio
 import inspect
+import threading
 import time
 import traceback
 
@@ -14,17 +16,136 @@ from open_storyline.mcp.sampling_requester import make_llm
 from open_storyline.nodes.core_nodes.base_node import BaseNode
 from open_storyline.nodes.node_summary import NodeSummary
 from open_storyline.nodes.node_state import NodeState
+from open_storyline.nodes.node_runtime import NODE_RUNTIME
+from open_storyline.pipeline.edit_template import DEFAULT_PIPELINE_ORDER, PIPELINE_NODE_ALIASES
+from open_storyline.utils.logging import get_logger
 from src.open_storyline.storage.agent_memory import ArtifactStore
 
 from mcp.server.fastmcp import Context, FastMCP
 from mcp.server.session import ServerSession
 
-def create_tool_wrapper(node: BaseNode, input_schema: type[BaseModel]):
+logger = get_logger(__name__)
+
+
+class LazyNode:
+    """
+    A registered node whose instance is created on first use. Constructing a node can load models, build
+    vector stores or read resource metadata, so it happens at most once, outside the event loop.
+    """
+
+    def __init__(self, node_cls: type[BaseNode], cfg: Settings) -> None:
+        self.node_cls = node_cls
+        self.cfg = cfg
+        self.meta = node_cls.meta
+        self.state = "pending"  # pending / loading / ready / failed
+        self.load_sec: Optional[float] = None
+        self.error: Optional[str] = None
+        self._instance: Optional[BaseNode] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> BaseNode:
+        if self._instance is not None:
+            return self._instance
+        with self._lock:
+            if self._instance is None:
+                self.state = "loading"
+                start = time.perf_counter()
+                try:
+                    self._instance = self.node_cls(self.cfg)
+                except Exception as e:
+                    # Not cached: the next call (or a restart after fixing config / resources) tries again
+                    self.state, self.error = "failed", f"{type(e).__name__}: {e}"
+                    raise
+                finally:
+                    self.load_sec = round(time.perf_counter() - start, 3)
+                self.state, self.error = "ready", None
+        return self._instance
+
+    async def aget(self) -> BaseNode:
+        if self._instance is not None:
+            return self._instance
+        return await asyncio.to_thread(self.get)
+
+
+class NodeLoader:
+    """
+    Registered nodes plus startup bookkeeping: optional background warm-up in pipeline order, and the
+    state behind the server's /ready endpoint.
+    """
+
+    def __init__(self) -> None:
+        self.nodes: Dict[str, LazyNode] = {}
+        self.timings: Dict[str, float] = {}
+        self.warmup_enabled = False
+        self.strict_ready = False
+        self._warmup_done = threading.Event()
+
+    def add(self, node: LazyNode) -> None:
+        self.nodes[node.meta.node_id] = node
+
+    def warmup_order(self) -> List[LazyNode]:
+        """Nodes in DEFAULT_PIPELINE_ORDER (so the first pipeline steps are usable first), then the rest."""
+        ordered_ids = [
+            tool_id for node_id in DEFAULT_PIPELINE_ORDER for tool_id in PIPELINE_NODE_ALIASES.get(node_id, [node_id])
+        ]
+        rank = {node_id: i for i, node_id in enumerate(ordered_ids)}
+        return sorted(self.nodes.values(), key=lambda n: rank.get(n.meta.node_id, len(rank)))
+
+    def start_warmup(self) -> None:
+        self.warmup_enabled = True
+        threading.Thread(target=self._warmup, name="node-warmup", daemon=True).start()
+
+    def _warmup(self) -> None:
+        start = time.perf_counter()
+        for node in self.warmup_order():
+            try:
+                node.get()
+            except Exception:
+                logger.error(f"[Startup] failed to load node {node.meta.node_id}", exc_info=True)
+        self.timings["warmup_sec"] = round(time.perf_counter() - start, 3)
+        self._warmup_done.set()
+        breakdown = ", ".join(
+            f"{n.meta.node_id} {n.load_sec:.2f}s" + ("" if n.state == "ready" else f" ({n.state})")
+            for n in sorted(self.nodes.values(), key=lambda n: -(n.load_sec or 0.0))
+        )
+        logger.info(f"[Startup] nodes warmed up in {self.timings['warmup_sec']:.2f}s: {breakdown}")
+
+    @property
+    def failed(self) -> List[str]:
+        return [node_id for node_id, n in self.nodes.items() if n.state == "failed"]
+
+    @property
+    def ready(self) -> bool:
+        """
+        Without warm-up the server is ready once tools are registered; nodes then load on first call. With warm-up
+        it is ready once warm-up has finished: nodes that failed to load are listed in status() and retried on
+        their next call, and only keep the server unready when `strict_ready` is set.
+        """
+        if not self.warmup_enabled:
+            return True
+        if not self._warmup_done.is_set():
+            return False
+        return not (self.strict_ready and self.failed)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "warmup": "off" if not self.warmup_enabled else ("done" if self._warmup_done.is_set() else "running"),
+            "failed": self.failed,
+            "timings": dict(self.timings),
+            "nodes": {
+                node_id: {"state": n.state, "load_sec": n.load_sec, **({"error": n.error} if n.error else {})}
+                for node_id, n in self.nodes.items()
+            },
+        }
+
+
+def create_tool_wrapper(node: LazyNode, input_schema: type[BaseModel]):
     """
     Factory function: Convert custom Node to MCP Tool function
     """
     # Get metadata for @server.tool parameters
-    meta = node.meta if hasattr(node, 'meta') else None
+    meta = node.meta
 
     async def wrapper(mcp_ctx: Context, **kwargs) -> dict:
         # 1. Unified handling of context and Session
@@ -51,7 +172,17 @@ def create_tool_wrapper(node: BaseNode, input_schema: type[BaseModel]):
             llm=make_llm(mcp_ctx),
             mcp_ctx=mcp_ctx,
         )
-        result = await node(node_state, **params)
+        try:
+            instance = await node.aget()
+        except Exception:
+            logger.error(f"[Node {meta.node_id}] failed to load", exc_info=True)
+            return {
+                'artifact_id': node_state.artifact_id,
+                'summary': {"error_info": f"[Node {meta.node_id}] failed to load: {node.error}"},
+                'tool_excute_result': {},
+                'isError': True,
+            }
+        result = await instance(node_state, **params)
         return result
 
 
@@ -90,18 +221,30 @@ def create_tool_wrapper(node: BaseNode, input_schema: type[BaseModel]):
     return wrapper, meta
 
 
-def register(server: FastMCP, cfg: Settings) -> None:
+def register(server: FastMCP, cfg: Settings) -> NodeLoader:
+    """
+    Register every available node as a tool from its class metadata alone; instances are created on first
+    call, or ahead of time by the background warm-up when local_mcp_server.warmup_nodes is on.
+    """
+
+    mcp_cfg = cfg.local_mcp_server
+    NODE_RUNTIME.configure({"io": mcp_cfg.io_workers, "cpu": mcp_cfg.cpu_workers, "heavy": mcp_cfg.heavy_workers})
+    loader = NodeLoader()
 
     # scan node packages
+    start = time.perf_counter()
     for pkg in cfg.local_mcp_server.available_node_pkgs:
         NODE_REGISTRY.scan_package(pkg)
     all_node_classes = [NODE_REGISTRY.get(name=node_name) for node_name in cfg.local_mcp_server.available_nodes]
+    loader.timings["scan_sec"] = round(time.perf_counter() - start, 3)
 
+    start = time.perf_counter()
     for NodeClass in all_node_classes:
-        node_instance = NodeClass(cfg)
-        input_schema = node_instance.input_schema
+        node = LazyNode(NodeClass, cfg)
+        loader.add(node)
+        input_schema = NodeClass.input_schema
 
-        tool_func, meta = create_tool_wrapper(node_instance, input_schema)
+        tool_func, meta = create_tool_wrapper(node, input_schema)
         
         tool_name = NodeClass.meta.name
         tool_desc = NodeClass.meta.description
@@ -191,4 +334,13 @@ def register(server: FastMCP, cfg: Settings) -> None:
             'summary': "",
             'isError': False,
         }
-        
+
+    loader.timings["register_sec"] = round(time.perf_counter() - start, 3)
+    logger.info(
+        f"[Startup] registered {len(loader.nodes)} node tools in {loader.timings['register_sec']:.2f}s "
+        f"(package scan {loader.timings['scan_sec']:.2f}s)"
+    )
+    loader.strict_ready = mcp_cfg.strict_ready
+    if mcp_cfg.warmup_nodes:
+        loader.start_warmup()
+    return loader
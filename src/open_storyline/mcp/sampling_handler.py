@@ -3,15 +3,16 @@ import os
 import math
 import base64
 from io import BytesIO
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
 from PIL import Image
-from moviepy.video.io.VideoFileClip import VideoFileClip
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 
 from mcp.types import CreateMessageRequestParams, CreateMessageResult, TextContent
 
+from open_storyline.utils.video_frames import get_frame_extractor
+
 
 # -----------------------------
 # Configurable parameters: Control multimodal input size
@@ -87,6 +88,45 @@ def _choose_num_frames(duration_sec: float, min_frames: int, max_frames: int, fr
     return n
 
 
+def _segment_sample_times(
+    vdur: float,
+    in_sec: float,
+    out_sec: float,
+    min_frames: int,
+    max_frames: int,
+    frames_per_sec: float,
+    num_frames: Optional[int] = None,
+) -> Tuple[float, List[float]]:
+    """
+    Returns (clamped in_sec, relative sample times) for one segment.
+    `num_frames` is a per-segment frame count chosen by the requester (e.g. from a motion estimate);
+    when given it replaces the duration-based default, capped at GLOBAL_MAX_IMAGE_BLOCKS.
+    """
+    in_sec = float(in_sec)
+    out_sec = float(out_sec)
+
+    # If duration is unavailable, conservatively sample one frame to avoid out_sec exceeding bounds
+    if vdur <= 0:
+        return max(0.0, in_sec), [0.0]
+
+    # Clamp to valid range
+    in_sec = max(0.0, min(in_sec, vdur))
+    out_sec = max(0.0, min(out_sec, vdur))
+
+    # If still invalid, fallback to one frame at in_sec
+    if out_sec <= in_sec:
+        return in_sec, [0.0]
+
+    seg_dur = out_sec - in_sec
+    if num_frames is not None and int(num_frames) > 0:
+        n = min(int(num_frames), GLOBAL_MAX_IMAGE_BLOCKS)
+    else:
+        n = _choose_num_frames(seg_dur, min_frames, max_frames, frames_per_sec)
+
+    # Sample at bucket centers to avoid boundary frames
+    return in_sec, [((i + 0.5) / n) * seg_dur for i in range(n)]
+
+
 def _sample_video_segment_to_data_urls(
     video_path: str,
     in_sec: float,
@@ -96,50 +136,63 @@ def _sample_video_segment_to_data_urls(
     min_frames: int,
     max_frames: int,
     frames_per_sec: float,
+    num_frames: Optional[int] = None,
 ) -> List[Tuple[float, str]]:
     """
     Sample frames only from the [in_sec, out_sec] segment. Returns (rel_t_from_in, data_url)
     """
+    extractor = get_frame_extractor()
+    vdur = extractor.duration(video_path)
+    in_sec, times = _segment_sample_times(vdur, in_sec, out_sec, min_frames, max_frames, frames_per_sec, num_frames)
+
+    jpegs = extractor.extract(video_path, [in_sec + rel_t for rel_t in times], resize_edge, jpeg_quality)
+    out: List[Tuple[float, str]] = []
+    for rel_t, data in zip(times, jpegs):
+        if data is None:
+            continue
+        b64 = base64.b64encode(data).decode("utf-8")
+        out.append((rel_t, f"data:image/jpeg;base64,{b64}"))
+    return out
 
-    in_sec = float(in_sec)
-    out_sec = float(out_sec)
-
-    clip = VideoFileClip(video_path, audio=False)
-    try:
-        vdur = float(clip.duration or 0.0)
-
-        # If duration is unavailable, conservatively sample one frame to avoid out_sec exceeding bounds
-        if vdur <= 0:
-            t = max(0.0, in_sec)
-            frame = clip.get_frame(t)
-            img = Image.fromarray(frame)
-            return [(0.0, _pil_to_data_url(img, resize_edge, jpeg_quality))]
-
-        # Clamp to valid range
-        in_sec = max(0.0, min(in_sec, vdur))
-        out_sec = max(0.0, min(out_sec, vdur))
-
-        # If still invalid, fallback to one frame at in_sec
-        if out_sec <= in_sec:
-            frame = clip.get_frame(in_sec)
-            img = Image.fromarray(frame)
-            return [(0.0, _pil_to_data_url(img, resize_edge, jpeg_quality))]
-
-        seg_dur = out_sec - in_sec
-        n = _choose_num_frames(seg_dur, min_frames, max_frames, frames_per_sec)
 
-        # Sample at bucket centers to avoid boundary frames
-        times = [((i + 0.5) / n) * seg_dur for i in range(n)]
+def _prefetch_video_frames(
+    items: List[Dict[str, Any]],
+    resize_edge: int,
+    jpeg_quality: int,
+    min_frames: int,
+    max_frames: int,
+    frames_per_sec: float,
+) -> None:
+    """
+    Decode every local video once for all of its segments in this request.
+    Frames land in the extractor's disk cache, so the per-segment sampling below only reads them back.
+    """
+    extractor = get_frame_extractor()
+    by_path: Dict[str, List[float]] = {}
+    for mi in items:
+        path = _strip_file_scheme(str(mi.get("url")))
+        if _is_data_url(path) or _is_http_url(path) or _guess_ext(path) not in VIDEO_EXTS:
+            continue
+        if not os.path.exists(path):
+            continue
+        in_sec, out_sec = mi.get("in_sec"), mi.get("out_sec")
+        if in_sec is None or out_sec is None:
+            in_sec, out_sec = 0.0, 1e12
+        try:
+            vdur = extractor.duration(path)
+        except Exception:
+            continue
+        in_s, times = _segment_sample_times(
+            vdur, in_sec, out_sec, min_frames, max_frames, frames_per_sec, mi.get("num_frames")
+        )
+        by_path.setdefault(path, []).extend(in_s + rel_t for rel_t in times)
 
-        out: List[Tuple[float, str]] = []
-        for rel_t in times:
-            abs_t = in_sec + rel_t
-            frame = clip.get_frame(abs_t)
-            img = Image.fromarray(frame)
-            out.append((rel_t, _pil_to_data_url(img, resize_edge, jpeg_quality)))
-        return out
-    finally:
-        clip.close()
+    for path, abs_times in by_path.items():
+        try:
+            extractor.extract(path, sorted(abs_times), resize_edge, jpeg_quality)
+        except Exception:
+            # Per-segment sampling retries and surfaces the error for this source
+            continue
 
 
 def _extract_text_from_mcp_content(content: Any) -> str:
@@ -172,7 +225,7 @@ def _normalize_media_items(media_inputs: List[Any]) -> List[Dict[str, Any]]:
       1) "path/to/video.mp4"
       2) {"url"/"path": "...", "in_sec": 1.2, "out_sec": 3.4}
       3) ("path/to/video.mp4", 1.2, 3.4)  # optional
-    Output normalized to: {"url": "...", "in_sec": optional, "out_sec": optional}
+    Output normalized to: {"url": "...", "in_sec": optional, "out_sec": optional, "num_frames": optional}
     """
     out = []
     for item in media_inputs or []:
@@ -198,6 +251,8 @@ def _normalize_media_items(media_inputs: List[Any]) -> List[Dict[str, Any]]:
                 d["in_sec"] = item.get("in_sec")
             if "out_sec" in item:
                 d["out_sec"] = item.get("out_sec")
+            if item.get("num_frames") is not None:
+                d["num_frames"] = item.get("num_frames")
             out.append(d)
             continue
 
@@ -222,6 +277,7 @@ def _build_media_blocks(
     img_count = 0
 
     items = _normalize_media_items(media_inputs)
+    _prefetch_video_frames(items, resize_edge, jpeg_quality, min_frames, max_frames, frames_per_sec)
 
     for idx, mi in enumerate(items):
         if img_count >= global_max_images:
@@ -285,6 +341,7 @@ def _build_media_blocks(
                 min_frames=min_frames,
                 max_frames=max_frames,
                 frames_per_sec=frames_per_sec,
+                num_frames=mi.get("num_frames"),
             )
 
             if has_segment:
@@ -1,11 +1,15 @@
+import time
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
 from mcp.server.fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse
 
 from open_storyline.mcp import register_tools
 from open_storyline.config import load_settings, default_config_path
 from open_storyline.config import Settings
+from open_storyline.nodes.node_runtime import NODE_RUNTIME, LoopLagMonitor
 from open_storyline.storage.session_manager import SessionLifecycleManager
 from open_storyline.utils.logging import get_logger
 
@@ -18,12 +22,15 @@ def create_server(cfg: Settings) -> FastMCP:
     """
 
     runtime_ctx = cfg
+    # One monitor per server process; the lifespan below is entered once per MCP session
+    loop_lag = LoopLagMonitor(warn_ms=cfg.local_mcp_server.loop_lag_warn_ms)
 
     @asynccontextmanager
     async def session_lifespan(server: FastMCP) -> AsyncIterator[SessionLifecycleManager]:
         """Manage session lifecycle with type-safe context."""
         # Initialize on startup
         logger.info("Enable session lifespan manager")
+        loop_lag.start()
         session_manager = SessionLifecycleManager(
             artifacts_root=cfg.project.outputs_dir,
             cache_root=cfg.local_mcp_server.server_cache_dir,
@@ -43,7 +50,20 @@ def create_server(cfg: Settings) -> FastMCP:
     )
 
     # Pass runtime_ctx to register_tools so each tool can access cfg
-    register_tools.register(server, runtime_ctx)
+    started_at = time.time()
+    node_loader = register_tools.register(server, runtime_ctx)
+
+    @server.custom_route("/live", methods=["GET"])
+    async def live(request: Request) -> JSONResponse:
+        """The process is up and its event loop answers"""
+        return JSONResponse({"status": "alive", "uptime_sec": round(time.time() - started_at, 1), "loop_lag": loop_lag.summary()})
+
+    @server.custom_route("/ready", methods=["GET"])
+    async def ready(request: Request) -> JSONResponse:
+        """503 until node warm-up has loaded every node (or a node failed to load), with per-node state and timings"""
+        status = node_loader.status()
+        status["pools"] = NODE_RUNTIME.stats()
+        return JSONResponse(status, status_code=200 if status["ready"] else 503)
 
     return server
 
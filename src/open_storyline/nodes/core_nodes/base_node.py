@@ -3,12 +3,13 @@ import os
 from pathlib import Path
 from dataclasses import dataclass, field
 from pydantic import BaseModel, ValidationError
-from typing import Any, Dict, List, Optional, Union, ClassVar
+from typing import Any, Callable, Dict, List, Optional, Union, ClassVar, TypeVar
 import json
 import traceback
 
 from open_storyline.config import Settings
 from open_storyline.nodes.node_state import NodeState
+from open_storyline.nodes.node_runtime import NODE_RUNTIME
 
 from open_storyline.storage.file import FileCompressor
 from open_storyline.utils.logging import get_logger
@@ -16,6 +17,8 @@ from open_storyline.mcp.sampling_requester import LLMClient
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
 @dataclass
 class NodeMeta:
     """
@@ -38,6 +41,8 @@ class NodeMeta:
                             after execution completes
                             Used to define possible branch paths in the workflow
         priority: Execution priority among nodes with the same functionality
+        work_class: Thread pool that runs the node's blocking work ("io", "cpu" or "heavy"),
+                    see open_storyline.nodes.node_runtime
     """
 
     name: str
@@ -48,6 +53,7 @@ class NodeMeta:
     default_require_prior_kind: List[str] = field(default_factory=list)
     next_available_node: List[str] = field(default_factory=list)
     priority: int = 5
+    work_class: str = "io"
 
 
 
@@ -170,6 +176,12 @@ class BaseNode(ABC):
         """
         ...
 
+    async def run_blocking(self, fn: Callable[..., T], *args: Any, work_class: Optional[str] = None, **kwargs: Any) -> T:
+        """
+        Run synchronous work off the server event loop, in the pool of `work_class` (defaults to the node's class).
+        """
+        return await NODE_RUNTIME.run(work_class or self.meta.work_class, fn, *args, **kwargs)
+
     def _parse_input(self, node_state: NodeState, inputs: Dict[str, Any]):
         return inputs
 
@@ -207,7 +219,8 @@ class BaseNode(ABC):
         try:
             mode = params.get("mode", "auto")
 
-            inputs = self.load_inputs_from_client(node_state, params.copy())
+            # Decoding base64 media and writing it to the server cache is file work, keep it off the event loop
+            inputs = await self.run_blocking(self.load_inputs_from_client, node_state, params.copy(), work_class="io")
 
             parsed_inputs = self._parse_input(node_state, inputs)
 
@@ -218,7 +231,7 @@ class BaseNode(ABC):
 
             processed_outputs = self._combine_tool_outputs(node_state, outputs)
 
-            packed_output = self.pack_outputs_to_client(node_state, processed_outputs)
+            packed_output = await self.run_blocking(self.pack_outputs_to_client, node_state, processed_outputs, work_class="io")
             
             # self._validate_schema(packed_output, 'output_schema')
 
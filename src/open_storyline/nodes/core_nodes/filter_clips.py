@@ -7,6 +7,7 @@ from open_storyline.mcp.sampling_requester import LLMClient
 from src.open_storyline.utils.prompts import get_prompt
 from open_storyline.utils.parse_json import parse_json_dict
 from open_storyline.utils.register import NODE_REGISTRY
+from open_storyline.utils.map_reduce import chunk_by_tokens, estimate_tokens, gather_bounded
 
 @NODE_REGISTRY.register()
 class FilterClipsNode(BaseNode):
@@ -66,6 +67,10 @@ class FilterClipsNode(BaseNode):
         
         else:
             clip_block = _build_clips_block(clip_captions)
+            cfg = self.server_cfg.clip_map_reduce
+            if estimate_tokens(clip_block) > cfg.single_call_max_tokens:
+                return await self._process_chunked(node_state, clip_captions, user_request)
+
             system_prompt = get_prompt("filter_clips.system", lang=node_state.lang)
             user_prompt = get_prompt("filter_clips.user", lang=node_state.lang, user_request=user_request, clip_captions=clip_block)
 
@@ -93,6 +98,62 @@ class FilterClipsNode(BaseNode):
             "selected": select_ids,
         }
 
+    async def _process_chunked(
+        self,
+        node_state: NodeState,
+        clip_captions: list[dict[str, Any]],
+        user_request: str,
+    ) -> Any:
+        """
+        Map step only: every chunk is filtered independently (the keep-ratio rule is per chunk, so it still holds
+        overall) and the kept ids are concatenated in input order. A chunk that fails keeps all of its clips.
+        """
+        cfg = self.server_cfg.clip_map_reduce
+        chunks = chunk_by_tokens(clip_captions, lambda c: _build_clips_block([c]), cfg.chunk_max_tokens)
+        system_prompt = get_prompt("filter_clips.system", lang=node_state.lang)
+
+        async def filter_chunk(chunk: list[dict[str, Any]]) -> list[str]:
+            user_prompt = get_prompt(
+                "filter_clips.user",
+                lang=node_state.lang,
+                user_request=user_request,
+                clip_captions=_build_clips_block(chunk),
+            )
+            raw = await node_state.llm.complete(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                media=None,
+                temperature=0.1,
+                top_p=0.9,
+                max_tokens=2048,
+                model_preferences=None,
+            )
+            return _extract_selected_ids(parse_json_dict(raw), [c.get("clip_id") for c in chunk])
+
+        results = await gather_bounded(
+            [lambda chunk=chunk: filter_chunk(chunk) for chunk in chunks],
+            cfg.max_concurrency,
+        )
+
+        select_ids: list[str] = []
+        failed = 0
+        for chunk, res in zip(chunks, results):
+            if isinstance(res, Exception):
+                failed += 1
+                node_state.node_summary.debug_for_dev(f"Filter chunk failed, keeping its {len(chunk)} clips: {res}")
+                select_ids.extend(c.get("clip_id") for c in chunk)
+            else:
+                select_ids.extend(res)
+
+        msg = f"Successfully filtered {len(select_ids)} clips in {len(chunks)} chunks"
+        if failed:
+            msg += f" ({failed} chunks could not be parsed and kept all their clips)"
+        node_state.node_summary.info_for_user(msg)
+        return {
+            "clip_captions": clip_captions,
+            "selected": select_ids,
+        }
+
 
 
 def _add_input_duration(clip_captions:list[dict[str, Any]],clip_durations: dict[str, float]) -> Any:
@@ -1,20 +1,24 @@
 import asyncio
 import base64
 import io
+import json
 import time
 import random
 import re
+import threading
 import wave
-import librosa
 from pathlib import Path
-from typing import Any, Dict, Callable, Union
+from typing import Any, Dict, Callable, Optional, Union
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from open_storyline.config import Settings
 from open_storyline.nodes.core_nodes.base_node import BaseNode, NodeMeta
 from open_storyline.nodes.node_schema import GenerateVoiceoverInput
 from open_storyline.nodes.node_state import NodeState
 from open_storyline.utils.register import NODE_REGISTRY
+from open_storyline.utils.tts_cache import TTSChunkCache
 
 
 # IndexTTS default voice index
@@ -26,6 +30,7 @@ _MAX_RETRIES = 3
 _CONNECT_TIMEOUT = 5        # seconds
 _READ_TIMEOUT = 300          # seconds (TTS generation can be slow)
 _MAX_TEXT_LEN = 500          # max characters per TTS API call
+_DEFAULT_MAX_CONCURRENCY = 4 # TTS requests in flight per run, override with providers.<name>.max_concurrency
 
 
 @NODE_REGISTRY.register()
@@ -41,15 +46,34 @@ class GenerateVoiceoverNode(BaseNode):
 
     input_schema = GenerateVoiceoverInput
 
-    # provider -> handler method name
+    # provider -> handler method name (one text chunk -> WAV bytes, single attempt)
     _PROVIDER_HANDLERS: Dict[str, str] = {
-        "indextts": "_tts_indextts_sync",
+        "indextts": "_call_indextts_api",
     }
 
+    # provider -> fixed synthesis params sent with every request (part of the chunk cache key)
+    _PROVIDER_PARAMS: Dict[str, Dict[str, Any]] = {
+        "indextts": {"beam_size": 1, "sample_rate": 24000},
+    }
+
+    # Transient errors worth retrying with backoff
+    _RETRYABLE_ERRORS = (requests.ConnectionError, requests.Timeout, requests.HTTPError)
+
     _DEFAULT_PROVIDER = "indextts"
 
     MILLISECONDS_PER_SECOND = 1000.0
 
+    def __init__(self, server_cfg: Settings) -> None:
+        super().__init__(server_cfg)
+        self._session: Optional[requests.Session] = None
+        self._session_pool_size = 0
+        self._session_lock = threading.Lock()
+
+        cfg = server_cfg.generate_voiceover
+        self.tts_cache: Optional[TTSChunkCache] = (
+            TTSChunkCache(cfg.cache_dir, cfg.cache_max_mb * 1024 * 1024) if cfg.cache_enabled else None
+        )
+
     async def default_process(self, node_state: NodeState, inputs: Dict[str, Any]) -> Any:
         node_state.node_summary.info_for_user("Voiceover not generated")
         return {"voiceover": []}
@@ -71,15 +95,17 @@ class GenerateVoiceoverNode(BaseNode):
             voice_index = _DEFAULT_VOICE_INDEX
 
         # 4) Resolve base_url
+        provider_cfg = self._get_provider_cfg(provider_name)
         base_url = (inputs.get("base_url") or "").strip()
         if not base_url:
-            provider_cfg = self._get_provider_cfg(provider_name)
             base_url = (provider_cfg.get("base_url") or "").strip() or _DEFAULT_INDEXTTS_BASE_URL
+        max_concurrency = max(1, int(provider_cfg.get("max_concurrency") or _DEFAULT_MAX_CONCURRENCY))
 
         node_state.node_summary.info_for_user(f"TTS: IndexTTS, voice: {voice_index}")
 
         # 5) Health check before batch generation
-        healthy = await asyncio.to_thread(self._check_health, base_url)
+        session = self._get_session(max_concurrency)
+        healthy = await self.run_blocking(self._check_health, base_url, session)
         if not healthy:
             raise RuntimeError(
                 f"IndexTTS service at {base_url} is not reachable. "
@@ -95,10 +121,11 @@ class GenerateVoiceoverNode(BaseNode):
         output_dir = self.server_cache_dir / str(session_id) / str(artifact_id)
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        # 7) Generate segment by segment
+        # 7) Validate all groups up front, then synthesize groups and their chunks concurrently;
+        #    at most `max_concurrency` TTS requests are in flight across the whole run
         ts_ms = int(time.time() * 1000)
         total = len(group_scripts)
-        voiceover: list[dict[str, Any]] = []
+        jobs: list[tuple[str, str, str, Path]] = []
 
         for i, group in enumerate(group_scripts, start=1):
             group_id = (group or {}).get("group_id", "")
@@ -110,39 +137,73 @@ class GenerateVoiceoverNode(BaseNode):
                 raise ValueError(f"raw_text is empty for group_id={group_id}, cannot generate speech.")
 
             voiceover_id = f"voiceover_{i:04d}"
-            wav_path = output_dir / f"{voiceover_id}_{ts_ms}.wav"
+            jobs.append((voiceover_id, group_id, raw_text, output_dir / f"{voiceover_id}_{ts_ms}.wav"))
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+        finished = 0
+        completed: list[Optional[dict[str, Any]]] = [None] * total
+        prefix = 0
+        cache_stats = {"hits": 0, "misses": 0}
+        cache_scope = {
+            "provider": provider_name,
+            "voice": voice_index,
+            "params": self._PROVIDER_PARAMS.get(provider_name, {}),
+            "model_version": str(provider_cfg.get("model_version") or ""),
+            "endpoint": base_url,
+        }
 
-            await asyncio.to_thread(
+        async def _run_group(index: int, voiceover_id: str, group_id: str, raw_text: str, wav_path: Path) -> dict[str, Any]:
+            nonlocal finished, prefix
+            duration = await self._synthesize_group(
                 handler,
+                semaphore,
                 text=raw_text,
                 wav_path=wav_path,
+                cache_scope=cache_scope,
+                cache_stats=cache_stats,
                 base_url=base_url,
                 voice_index=voice_index,
+                session=session,
             )
-
-            duration = self._wav_duration_ms(wav_path)
-            voiceover.append(
-                {
-                    "voiceover_id": voiceover_id,
-                    "group_id": group_id,
-                    "path": str(wav_path),
-                    "duration": duration,
-                }
-            )
+            item = {
+                "voiceover_id": voiceover_id,
+                "group_id": group_id,
+                "path": str(wav_path),
+                "duration": duration,
+            }
+            finished += 1
+            completed[index] = item
+            while prefix < total and completed[prefix] is not None:
+                prefix += 1
 
             node_state.node_summary.info_for_user(
-                f"Generated {voiceover_id} ({i}/{total})",
+                f"Generated {voiceover_id} ({finished}/{total})",
                 preview_urls=[str(wav_path)],
             )
+            await self._publish_segment(node_state, index=index, item=item, finished=finished, total=total, prefix=prefix)
+            return item
+
+        start = time.perf_counter()
+        voiceover: list[dict[str, Any]] = list(
+            await asyncio.gather(*(_run_group(i, *job) for i, job in enumerate(jobs)))
+        )
 
-        node_state.node_summary.info_for_user(f"Generated {len(voiceover)} voiceover segments in total")
+        node_state.node_summary.info_for_user(
+            f"Generated {len(voiceover)} voiceover segments in total "
+            f"({time.perf_counter() - start:.1f}s, up to {max_concurrency} concurrent TTS requests)"
+        )
+        if self.tts_cache is not None:
+            node_state.node_summary.info_for_user(
+                f"TTS cache: {cache_stats['hits']} chunks reused, {cache_stats['misses']} synthesized; "
+                f"cache size {self.tts_cache.total_bytes() / (1 << 20):.1f}/{self.tts_cache.max_bytes / (1 << 20):.0f} MB"
+            )
         return {"voiceover": voiceover}
 
     # ---------------------------------------------------------------------
     # Provider dispatch / config helpers
     # ---------------------------------------------------------------------
 
-    def _get_provider_handler(self, provider_name: str) -> Callable[..., None]:
+    def _get_provider_handler(self, provider_name: str) -> Callable[..., bytes]:
         if provider_name is None or provider_name == "":
             provider_name = self._DEFAULT_PROVIDER
         method_name = self._PROVIDER_HANDLERS.get(provider_name)
@@ -160,10 +221,27 @@ class GenerateVoiceoverNode(BaseNode):
             return {"base_url": _DEFAULT_INDEXTTS_BASE_URL}
         return cfg
 
-    def _check_health(self, base_url: str) -> bool:
+    def _get_session(self, pool_size: int) -> requests.Session:
+        """
+        Keep-alive session shared by every TTS request of this node; the connection pool is sized to the
+        concurrency limit so parallel requests don't open throwaway connections.
+        """
+        with self._session_lock:
+            if self._session is None or self._session_pool_size < pool_size:
+                if self._session is not None:
+                    self._session.close()
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+                self._session_pool_size = pool_size
+            return self._session
+
+    def _check_health(self, base_url: str, session: Optional[requests.Session] = None) -> bool:
         """Check if IndexTTS service is reachable before batch generation."""
         try:
-            r = requests.get(
+            r = (session or requests).get(
                 f"{base_url.rstrip('/')}/api/v1/health",
                 timeout=(_CONNECT_TIMEOUT, 10),
             )
@@ -172,10 +250,38 @@ class GenerateVoiceoverNode(BaseNode):
             return False
 
     def _wav_duration_ms(self, wav_path: Union[str, Path]) -> int:
-        p = str(wav_path)
-        duration_s = librosa.get_duration(path=p)
+        """Duration from the WAV header (frame count / sample rate), without decoding the audio."""
+        with wave.open(str(wav_path), 'rb') as w:
+            duration_s = w.getnframes() / float(w.getframerate())
         return int(round(duration_s * self.MILLISECONDS_PER_SECOND))
 
+    async def _publish_segment(
+        self,
+        node_state: NodeState,
+        *,
+        index: int,
+        item: Dict[str, Any],
+        finished: int,
+        total: int,
+        prefix: int,
+    ) -> None:
+        """
+        Stream a finished group to the client through MCP progress notifications, so the pipeline can act on
+        the completed prefix (`prefix` = number of leading groups that are ready) before the whole node returns.
+        """
+        mcp_ctx = node_state.mcp_ctx
+        if mcp_ctx is None:
+            return
+        message = json.dumps(
+            {"event": "voiceover.segment", "index": index, "segment": item, "prefix": prefix, "total": total},
+            ensure_ascii=False,
+        )
+        try:
+            await mcp_ctx.report_progress(finished, total, message)
+        except Exception:
+            # Progress is best effort; the full result is still returned by the node
+            pass
+
     # ---------------------------------------------------------------------
     # Text splitting for long segments
     # ---------------------------------------------------------------------
@@ -211,100 +317,145 @@ class GenerateVoiceoverNode(BaseNode):
         return chunks if chunks else [text]
 
     # ---------------------------------------------------------------------
-    # IndexTTS provider implementation
+    # Concurrent synthesis
     # ---------------------------------------------------------------------
 
-    def _tts_indextts_sync(
+    async def _synthesize_group(
         self,
+        handler: Callable[..., bytes],
+        semaphore: asyncio.Semaphore,
         *,
         text: str,
         wav_path: Path,
-        base_url: str,
-        voice_index: str,
-    ) -> None:
+        cache_scope: Dict[str, Any],
+        cache_stats: Dict[str, int],
+        **kwargs: Any,
+    ) -> int:
         """
-        Call IndexTTS API to generate voiceover.
-        - Splits long text into chunks and concatenates audio.
-        - Retries transient failures with exponential backoff + jitter.
-        
-        API: POST /api/v1/tts  (form-data)
-        Response: {"success": true, "audio_base64": "...", "sample_rate": 24000}
+        Synthesize one group and return its duration (ms): long text is split into chunks, cached chunks are
+        reused, the rest are requested concurrently, and everything is concatenated in text order into `wav_path`.
         """
         chunks = self._split_long_text(text)
-        audio_parts: list[bytes] = []
-
-        for chunk in chunks:
-            audio_bytes = self._call_indextts_api(
-                text=chunk,
-                base_url=base_url,
-                voice_index=voice_index,
-            )
-            audio_parts.append(audio_bytes)
+        audio_parts: list[Optional[bytes]] = [None] * len(chunks)
+        frames: list[tuple[int, int]] = [(0, 0)] * len(chunks)
+        keys: list[Optional[str]] = [None] * len(chunks)
+
+        if self.tts_cache is not None:
+            for i, chunk in enumerate(chunks):
+                keys[i] = self.tts_cache.make_key(text=chunk, **cache_scope)
+                hit = self.tts_cache.get(keys[i])
+                if hit is not None:
+                    audio_parts[i] = hit[0]
+                    frames[i] = (int(hit[1]["nframes"]), int(hit[1]["framerate"]))
+
+        missing = [i for i, part in enumerate(audio_parts) if part is None]
+        cache_stats["hits"] += len(chunks) - len(missing)
+        cache_stats["misses"] += len(missing)
+
+        synthesized = await asyncio.gather(
+            *(self._synthesize_chunk(handler, semaphore, text=chunks[i], **kwargs) for i in missing)
+        )
+        for i, data in zip(missing, synthesized):
+            audio_parts[i] = data
+            frames[i] = self._wav_frames(data)
+            if keys[i] is not None:
+                self.tts_cache.put(keys[i], data, {"nframes": frames[i][0], "framerate": frames[i][1]})
 
         # Concatenate WAV parts using wave stdlib (handles variable header sizes)
         if len(audio_parts) == 1:
             wav_path.write_bytes(audio_parts[0])
         else:
-            combined = self._concat_wav_parts(audio_parts)
+            combined = self._concat_wav_parts(list(audio_parts))
             wav_path.write_bytes(combined)
 
+        # Concatenation keeps the first part's params, so the duration is all frames at its rate
+        total_frames = sum(n for n, _ in frames)
+        return int(round(total_frames / frames[0][1] * self.MILLISECONDS_PER_SECOND))
+
+    async def _synthesize_chunk(
+        self,
+        handler: Callable[..., bytes],
+        semaphore: asyncio.Semaphore,
+        **kwargs: Any,
+    ) -> bytes:
+        """
+        Single chunk with retry + exponential backoff + jitter. The concurrency slot is only held
+        while a request is in flight, not while backing off.
+        """
+        last_error = None
+        for attempt in range(_MAX_RETRIES):
+            try:
+                async with semaphore:
+                    return await self.run_blocking(handler, **kwargs)
+            except self._RETRYABLE_ERRORS as e:
+                last_error = e
+                if attempt < _MAX_RETRIES - 1:
+                    wait = (2 ** attempt) + random.uniform(0, 1)
+                    await asyncio.sleep(wait)
+                continue
+
+        raise RuntimeError(
+            f"TTS API failed after {_MAX_RETRIES} retries: {last_error}"
+        )
+
+    # ---------------------------------------------------------------------
+    # IndexTTS provider implementation
+    # ---------------------------------------------------------------------
+
     def _call_indextts_api(
         self,
         *,
         text: str,
         base_url: str,
         voice_index: str,
+        session: Optional[requests.Session] = None,
     ) -> bytes:
-        """Single API call with retry + exponential backoff."""
+        """
+        Single IndexTTS API call; retries are handled by `_synthesize_chunk`.
+
+        API: POST /api/v1/tts  (form-data)
+        Response: {"success": true, "audio_base64": "...", "sample_rate": 24000}
+        """
         api_url = base_url.rstrip("/") + "/api/v1/tts"
 
         data = {
             "input_text": text,
             "index": voice_index,
-            "beam_size": 1,
-            "sample_rate": 24000,
+            **self._PROVIDER_PARAMS["indextts"],
         }
 
-        last_error = None
-        for attempt in range(_MAX_RETRIES):
-            try:
-                resp = requests.post(
-                    api_url,
-                    data=data,
-                    timeout=(_CONNECT_TIMEOUT, _READ_TIMEOUT),
-                )
-                resp.raise_for_status()
-
-                resp_json = resp.json()
-                if not isinstance(resp_json, dict):
-                    raise RuntimeError(f"IndexTTS: invalid response: {resp.text[:200]}")
-
-                if not resp_json.get("success"):
-                    error_msg = resp_json.get("error") or resp_json.get("message") or "Unknown error"
-                    raise RuntimeError(f"IndexTTS TTS failed: {error_msg}")
-
-                audio_b64 = resp_json.get("audio_base64")
-                if not audio_b64:
-                    raise RuntimeError("IndexTTS: no audio_base64 in response")
-
-                try:
-                    return base64.b64decode(audio_b64)
-                except Exception as e:
-                    raise RuntimeError(
-                        f"IndexTTS: base64 decode failed: {e}, "
-                        f"data[:64]={str(audio_b64)[:64]}"
-                    )
-
-            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
-                last_error = e
-                if attempt < _MAX_RETRIES - 1:
-                    wait = (2 ** attempt) + random.uniform(0, 1)
-                    time.sleep(wait)
-                continue
-
-        raise RuntimeError(
-            f"IndexTTS API failed after {_MAX_RETRIES} retries: {last_error}"
+        resp = (session or requests).post(
+            api_url,
+            data=data,
+            timeout=(_CONNECT_TIMEOUT, _READ_TIMEOUT),
         )
+        resp.raise_for_status()
+
+        resp_json = resp.json()
+        if not isinstance(resp_json, dict):
+            raise RuntimeError(f"IndexTTS: invalid response: {resp.text[:200]}")
+
+        if not resp_json.get("success"):
+            error_msg = resp_json.get("error") or resp_json.get("message") or "Unknown error"
+            raise RuntimeError(f"IndexTTS TTS failed: {error_msg}")
+
+        audio_b64 = resp_json.get("audio_base64")
+        if not audio_b64:
+            raise RuntimeError("IndexTTS: no audio_base64 in response")
+
+        try:
+            return base64.b64decode(audio_b64)
+        except Exception as e:
+            raise RuntimeError(
+                f"IndexTTS: base64 decode failed: {e}, "
+                f"data[:64]={str(audio_b64)[:64]}"
+            )
+
+    @staticmethod
+    def _wav_frames(data: bytes) -> tuple[int, int]:
+        """(frame count, sample rate) from the WAV header, without decoding samples."""
+        with wave.open(io.BytesIO(data), 'rb') as w:
+            return w.getnframes(), w.getframerate()
 
     @staticmethod
     def _concat_wav_parts(audio_parts: list[bytes]) -> bytes:
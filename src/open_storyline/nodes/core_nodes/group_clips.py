@@ -7,6 +7,7 @@ from open_storyline.nodes.node_schema import GroupClipsInput
 from src.open_storyline.utils.prompts import get_prompt
 from open_storyline.utils.parse_json import parse_json_dict
 from open_storyline.utils.register import NODE_REGISTRY
+from open_storyline.utils.map_reduce import chunk_by_tokens, estimate_tokens, gather_bounded
 
 @NODE_REGISTRY.register()
 class GroupClipsNode(BaseNode):
@@ -50,6 +51,10 @@ class GroupClipsNode(BaseNode):
         if user_request == "":
             user_request = "No additional requirements"
 
+        cfg = self.server_cfg.clip_map_reduce
+        if estimate_tokens(clip_block) > cfg.single_call_max_tokens:
+            return await self._process_chunked(node_state, selected_clips_captions, user_request)
+
         user_prompt = get_prompt(
             "group_clips.user",
             lang=node_state.lang,
@@ -90,6 +95,132 @@ class GroupClipsNode(BaseNode):
                 "groups": result,
             }
 
+    async def _process_chunked(
+        self,
+        node_state: NodeState,
+        selected_clips_captions: list[dict[str, Any]],
+        user_request: str,
+    ) -> Any:
+        """
+        Map: consecutive chunks of the selected clips are grouped independently, in parallel.
+        Reduce: one LLM call orders the resulting groups from their summaries alone, and merges groups that one
+        scene was split into (typically across a chunk boundary).
+        """
+        cfg = self.server_cfg.clip_map_reduce
+        chunks = chunk_by_tokens(selected_clips_captions, lambda c: _build_clips_block([c]), cfg.chunk_max_tokens)
+        system_prompt = get_prompt("group_clips.system", lang=node_state.lang)
+
+        async def group_chunk(chunk: list[dict[str, Any]]) -> list[dict[str, Any]]:
+            chunk_ids = [c.get("clip_id") for c in chunk]
+            chunk_block = _build_clips_block(chunk)
+            user_prompt = get_prompt(
+                "group_clips.user",
+                lang=node_state.lang,
+                user_request=user_request,
+                selected_clips=chunk_ids,
+                clip_captions=chunk_block,
+                clip_number=len(chunk_block),
+            )
+            raw = await node_state.llm.complete(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                media=None,
+                temperature=0.1,
+                top_p=0.9,
+                max_tokens=4096,
+                model_preferences=None,
+            )
+            return _normalize_groups_from_llm(
+                groups_raw=_extract_groups_obj(parse_json_dict(raw)),
+                selected_ids_set=set(chunk_ids),
+            )
+
+        results = await gather_bounded(
+            [lambda chunk=chunk: group_chunk(chunk) for chunk in chunks],
+            cfg.max_concurrency,
+        )
+
+        groups: list[dict[str, Any]] = []
+        chunk_indices: list[int] = []
+        failed = 0
+        for chunk_index, (chunk, res) in enumerate(zip(chunks, results)):
+            if isinstance(res, Exception):
+                failed += 1
+                node_state.node_summary.debug_for_dev(f"Group chunk failed, using one group for it: {res}")
+                res = _make_single_group_fallback([c.get("clip_id") for c in chunk])
+            groups.extend(res)
+            chunk_indices.extend([chunk_index] * len(res))
+
+        groups = await self._reduce_groups(node_state, groups, chunk_indices, selected_clips_captions, user_request)
+        for i, g in enumerate(groups, start=1):
+            g["group_id"] = f"group_{i:04d}"
+
+        msg = f"Grouping successful: {len(groups)} groups in total ({len(chunks)} chunks)"
+        if failed:
+            msg += f"; {failed} chunks fell back to a single group"
+        node_state.node_summary.info_for_user(msg)
+        return {
+            "groups": groups,
+        }
+
+    async def _reduce_groups(
+        self,
+        node_state: NodeState,
+        groups: list[dict[str, Any]],
+        chunk_indices: list[int],
+        clip_captions: list[dict[str, Any]],
+        user_request: str,
+    ) -> list[dict[str, Any]]:
+        """
+        Order chunk-level groups into one narrative. An entry of the reply's "order" is a group id, or a list of
+        group ids to merge into one group (clips in the listed order). Groups the model leaves out keep their map
+        order at the end; if the reply cannot be used, the map order is kept as is.
+        """
+        if len(groups) < 2:
+            return groups
+
+        clip_lookup = _build_clip_lookup(clip_captions)
+        summaries = []
+        for i, g in enumerate(groups):
+            duration = sum(float(clip_lookup.get(cid, {}).get("duration", 0.0) or 0.0) for cid in g["clip_ids"])
+            summaries.append({
+                "group_id": f"g{i}",
+                "chunk": chunk_indices[i],
+                "summary": g.get("summary", ""),
+                "clip_number": len(g["clip_ids"]),
+                "duration": f"{duration:.1f}s",
+            })
+
+        try:
+            raw = await node_state.llm.complete(
+                system_prompt=get_prompt("group_clips.system_reduce", lang=node_state.lang),
+                user_prompt=get_prompt("group_clips.user_reduce", lang=node_state.lang, user_request=user_request, groups=summaries),
+                media=None,
+                temperature=0.1,
+                top_p=0.9,
+                max_tokens=2048,
+                model_preferences=None,
+            )
+            order = parse_json_dict(raw).get("order")
+            if not isinstance(order, list):
+                raise ValueError('"order" must be a list')
+        except Exception as e:
+            node_state.node_summary.debug_for_dev(f"Group reduce step failed, keeping chunk order: {e}")
+            return groups
+
+        by_tmp_id = {s["group_id"]: g for s, g in zip(summaries, groups)}
+        reduced: list[dict[str, Any]] = []
+        for entry in order:
+            tmp_ids = entry if isinstance(entry, list) else [entry]
+            members = [by_tmp_id.pop(str(tmp_id)) for tmp_id in tmp_ids if str(tmp_id) in by_tmp_id]
+            if len(members) == 1:
+                reduced.append(members[0])
+            elif members:
+                reduced.append(_merge_groups(members))
+        reduced.extend(g for s, g in zip(summaries, groups) if s["group_id"] in by_tmp_id)
+        return reduced
+
+
 def _extract_groups_obj(obj: Any) -> list[dict[str, Any]]:
     if isinstance(obj, dict) and isinstance(obj.get("groups"), list):
         return obj["groups"]
@@ -161,6 +292,17 @@ def _normalize_groups_from_llm(
     return normalized_groups
 
 
+def _merge_groups(groups: list[dict[str, Any]]) -> dict[str, Any]:
+    """One group carrying the clips of `groups` in order; group_id is rewritten by the caller."""
+    durations = [g.get("duration") for g in groups]
+    return {
+        "group_id": "",
+        "summary": " ".join(g.get("summary", "") for g in groups).strip(),
+        "clip_ids": [cid for g in groups for cid in g["clip_ids"]],
+        "duration": sum(durations) if all(isinstance(d, (int, float)) for d in durations) else None,
+    }
+
+
 def _build_clip_lookup(clip_captions: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
     lookup: dict[str, dict[str, Any]] = {}
     for clip in clip_captions:
@@ -1,15 +1,20 @@
-from typing import Any, Dict, Optional, ClassVar, Type
+from typing import Any, Dict, Optional, ClassVar, Type, Tuple
 from pydantic import BaseModel
+import time
+import struct
+import asyncio
+import math
 import traceback
 from collections import Counter
 from pathlib import Path
 
 import av
 
+from open_storyline.config import Settings
 from open_storyline.nodes.core_nodes.base_node import NodeMeta, BaseNode
 from open_storyline.nodes.node_schema import LoadMediaInput, LoadMediaOutput
 from open_storyline.nodes.node_state import NodeState
-from open_storyline.utils.util import get_video_rotation
+from open_storyline.utils.media_meta_cache import MediaMetadataCache
 from open_storyline.utils.register import NODE_REGISTRY
 
 
@@ -19,23 +24,69 @@ VIDEO_EXTS = {
 IMAGE_EXTS = {
     ".jpg", ".jpeg", ".png", ".webp", ".bmp"
 }
+EXIF_ORIENTATION_TAG = 0x0112
+# EXIF orientations that include a 90/270 degree turn
+EXIF_TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
 
 def _image_metadata_from_path(path: Path) -> dict[str, Any]:
-    from PIL import Image, ImageOps
+    from PIL import Image
 
+    # Only the header and EXIF are read: the displayed size is known without decoding / transposing pixels
     with Image.open(path) as img:
+        w, h = img.size
         try:
-            img2 = ImageOps.exif_transpose(img)
-            w, h = img2.size
+            orientation = int(img.getexif().get(EXIF_ORIENTATION_TAG, 1))
         except Exception:
-            w, h = img.size
-        
+            orientation = 1
+        if orientation in EXIF_TRANSPOSED_ORIENTATIONS:
+            w, h = h, w
+
     return {
         "width": int(w),
         "height": int(h),
     }
 
 
+def _display_matrix_rotation(matrix: Any) -> float:
+    """Rotation in degrees (ffprobe convention) of a raw 3x3 16.16 fixed-point display matrix."""
+    m = struct.unpack("<9i", bytes(matrix)[:36])
+    scale_0 = math.hypot(m[0], m[3])
+    scale_1 = math.hypot(m[1], m[4])
+    if scale_0 == 0 or scale_1 == 0:
+        return 0.0
+    return -math.degrees(math.atan2(m[1] / scale_1, m[0] / scale_0))
+
+
+def _video_rotation(container: Any, video_stream: Any) -> int:
+    """
+    Rotation of the first video stream from the already open container, instead of a separate ffprobe run.
+    Tries the legacy `rotate` tag, then stream side data (PyAV < 14), then the first decoded frame (PyAV >= 14).
+    """
+    rotate_tag = (video_stream.metadata or {}).get("rotate")
+    if rotate_tag:
+        try:
+            return -int(float(rotate_tag))
+        except ValueError:
+            pass
+
+    side_data = getattr(video_stream, "side_data", None) or {}
+    matrix = side_data.get("DISPLAYMATRIX") if hasattr(side_data, "get") else None
+    if matrix is not None:
+        try:
+            if isinstance(matrix, (int, float)):
+                return int(round(matrix))
+            return int(round(_display_matrix_rotation(matrix)))
+        except (TypeError, ValueError, struct.error):
+            pass
+
+    try:
+        for frame in container.decode(video_stream):
+            return int(getattr(frame, "rotation", 0) or 0)
+    except av.error.FFmpegError:
+        pass
+    return 0
+
+
 def _video_metadata_from_path(
     path: Path,
     *,
@@ -68,7 +119,7 @@ def _video_metadata_from_path(
         w = int(video_stream.codec_context.width or 0)
         h = int(video_stream.codec_context.height or 0)
 
-        rotation = get_video_rotation(path)
+        rotation = _video_rotation(container, video_stream)
 
         if abs(rotation) in (90, 270):
             w, h = h, w
@@ -113,28 +164,64 @@ class LoadMediaNode(BaseNode):
     input_schema: ClassVar[Type[BaseModel]] = LoadMediaInput
     # output_schema:  ClassVar[Type[BaseModel]] = LoadMediaOutput
 
+    def __init__(self, server_cfg: Settings) -> None:
+        super().__init__(server_cfg)
+        cfg = server_cfg.load_media
+        self.probe_workers = cfg.probe_workers
+        self.meta_cache = MediaMetadataCache(cfg.metadata_cache_dir) if cfg.metadata_cache_enabled else None
+
     async def default_process(self, node_state: NodeState, inputs: Dict[str, Any]) -> Dict[str, Any]:
         return await self.process(node_state, inputs)
 
+    def _probe(self, path: Path, media_type: str) -> Tuple[dict[str, Any], float, bool]:
+        """Returns (metadata, elapsed_ms, from_cache)."""
+        start = time.perf_counter()
+        key = self.meta_cache.make_key(path) if self.meta_cache is not None else None
+        if key is not None:
+            cached = self.meta_cache.get(key)
+            if cached is not None:
+                return cached, (time.perf_counter() - start) * 1000, True
+
+        if media_type == "video":
+            metadata = _video_metadata_from_path(path)
+        else:
+            metadata = _image_metadata_from_path(path)
+        if key is not None:
+            self.meta_cache.put(key, metadata)
+        return metadata, (time.perf_counter() - start) * 1000, False
+
     async def process(self, node_state: NodeState, inputs: Dict[str, Any]) -> Dict[str, Any]:
         input_media = inputs.get('inputs', [])
-        
-        media_idx = 1
-        media = []
+
+        entries = []
         for enc_media in input_media:
             path = Path(enc_media['path'])
             suffix = path.suffix.lower()
 
             if suffix in VIDEO_EXTS:
-                metadata = _video_metadata_from_path(path)
                 media_type = "video"
             elif suffix in IMAGE_EXTS:
-                metadata = _image_metadata_from_path(path)
                 media_type = "image"
             else:
                 node_state.node_summary.info_for_user(f"[Node {self.meta.node_id}] Skipping unsupported file type `{enc_media['orig_path']}` ")
                 continue
+            entries.append((enc_media, path, media_type))
 
+        # Probing is I/O + native decoder work, so threads overlap it well; the io pool is shared by all
+        # sessions, probe_workers caps how much of it one call takes
+        start = time.perf_counter()
+        workers = max(1, min(self.probe_workers, len(entries)))
+        slots = asyncio.Semaphore(workers)
+
+        async def probe(path: Path, media_type: str) -> Tuple[dict[str, Any], float, bool]:
+            async with slots:
+                return await self.run_blocking(self._probe, path, media_type)
+
+        probed = await asyncio.gather(*[probe(path, media_type) for _, path, media_type in entries])
+        elapsed = time.perf_counter() - start
+
+        media = []
+        for media_idx, ((enc_media, path, media_type), (metadata, probe_ms, from_cache)) in enumerate(zip(entries, probed), start=1):
             media.append(
                 {
                     "media_id": f"media_{media_idx:04d}",
@@ -145,8 +232,8 @@ class LoadMediaNode(BaseNode):
                     "orig_md5": enc_media['orig_md5'],
                 }
             )
-            node_state.node_summary.info_for_user(f"Added media_{media_idx:04d}: ({media_type})")
-            media_idx += 1
+            source = "metadata cache" if from_cache else "probed"
+            node_state.node_summary.info_for_user(f"Added media_{media_idx:04d}: ({media_type}) {source} in {probe_ms:.0f} ms")
 
         c = Counter(
             (a.get("media_type") or "").strip().lower()
@@ -154,6 +241,13 @@ class LoadMediaNode(BaseNode):
             if isinstance(a, dict)
         )   
 
+        if entries:
+            cache_hits = sum(from_cache for _, _, from_cache in probed)
+            slowest = max(range(len(entries)), key=lambda i: probed[i][1])
+            node_state.node_summary.info_for_user(
+                f"[Node {self.meta.node_id}] Probed {len(entries)} file(s) in {elapsed:.2f}s with {workers} worker(s), "
+                f"{cache_hits} from metadata cache; slowest `{entries[slowest][0]['orig_path']}` ({probed[slowest][1]:.0f} ms)"
+            )
         node_state.node_summary.info_for_user(f"[Node {self.meta.node_id}] Media indexing completed successfully: {c.get('video', 0)} video(s), {c.get('image', 0)} image(s)",)
 
-        return {"media": media}
\ No newline at end of file
+        return {"media": media}
@@ -2,13 +2,14 @@ from __future__ import annotations
 
 import random
 from dataclasses import dataclass
-from typing import Any, Dict, List, Mapping, MutableMapping, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Mapping, MutableMapping, Optional, Tuple
 
 from src.open_storyline.config import Settings
 from open_storyline.config import PlanTimelineConfig
 from open_storyline.nodes.node_state import NodeState
 from open_storyline.nodes.core_nodes.base_node import BaseNode, NodeMeta
 from open_storyline.nodes.node_schema import PlanTimelineInput
+from open_storyline.utils.beat_grid import BeatGrid
 from open_storyline.utils.register import NODE_REGISTRY
 
 # =========================
@@ -22,6 +23,8 @@ SECONDS_PER_MINUTE = 60.0
 MILLISECONDS_PER_SECOND = 1000.0
 
 SNAP_SAFETY_MAX_STEPS = 10_000
+# Snapping steps beat by beat for this many beats (a clip usually spans a handful) before bisecting the grid
+SNAP_WALK_MAX_STEPS = 32
 BINARY_SEARCH_ITERATIONS = 50
 
 RATIO_GROWTH_FACTOR = 2.0
@@ -30,6 +33,18 @@ RATIO_GROWTH_MAX = 10.0
 MIN_SUBTITLE_WEIGHT = 1
 CENTER_ALIGN_DIVISOR = 2.0
 
+# Bump when the per-group "plan_state" layout changes; older plans are then re-planned from scratch
+PLAN_STATE_VERSION = 1
+
+# Re-plan diffs: the fields that identify an item within each track, and fields not compared
+DIFF_TRACK_KEYS = {
+    "video": ("group_id", "clip_id"),
+    "subtitles": ("group_id", "unit_id"),
+    "voiceover": ("group_id",),
+    "bgm": ("loop_idx",),
+}
+DIFF_IGNORED_FIELDS = {"path", "orig_path", "source_path", "base64", "md5", "timeline_window"}
+
 
 @dataclass(frozen=True)
 class BeatTrack:
@@ -38,6 +53,7 @@ class BeatTrack:
     beat_timestamps_ms: List[Milliseconds]
     beat_durations_ms: List[Milliseconds]
     music_duration_ms: Milliseconds
+    beat_grid: BeatGrid
 
 
 class TimelinePlanner:
@@ -50,7 +66,7 @@ class TimelinePlanner:
 
     def __init__(self, config: PlanTimelineConfig, *, random_seed: int = DEFAULT_RANDOM_SEED) -> None:
         self._config = config
-        self._random_generator = random.Random(random_seed)
+        self._random_seed = random_seed
 
     def plan(
         self,
@@ -62,8 +78,17 @@ class TimelinePlanner:
         voiceovers: List[Dict[str, Any]],
         background_music: Optional[Dict[str, Any]],
         use_beats: bool,
+        previous_plan: Optional[Dict[str, Any]] = None,
+        changed_group_ids: Optional[Iterable[Any]] = None,
     ) -> Dict[str, Any]:
-        """Plan full timeline tracks: video/subtitles/voiceover/bgm."""
+        """
+        Plan full timeline tracks: video/subtitles/voiceover/bgm.
+
+        With `previous_plan` (an earlier result of this planner) and `changed_group_ids`, only the changed groups
+        are re-planned: every other group keeps its previous clip durations and source windows and is shifted to
+        its new start. In beat mode a group is also re-planned when it no longer starts on the same beat, since
+        its cuts were snapped to the beats that followed. The result then carries a "diff" against previous_plan.
+        """
         media_by_media_id = self._build_item_index(media, id_key="media_id")
         clips_by_clip_id = self._build_item_index(clips, id_key="clip_id")
         script_by_group_id = self._build_item_index(group_scripts, id_key="group_id")
@@ -77,6 +102,17 @@ class TimelinePlanner:
             use_beats=use_beats,
         )
 
+        replanning = previous_plan is not None and changed_group_ids is not None
+        reusable_groups: Dict[str, Dict[str, Any]] = {}
+        if replanning:
+            changed_group_ids = list(changed_group_ids)
+            reusable_groups = self._reusable_groups(
+                previous_plan,
+                changed_group_ids=changed_group_ids,
+                background_music=background_music,
+                use_beats=use_beats,
+            )
+
         video_segments, group_states, total_duration_ms, _end_beat_index = self._build_video_track(
             groups=groups,
             clips_by_clip_id=clips_by_clip_id,
@@ -84,9 +120,10 @@ class TimelinePlanner:
             script_by_group_id=script_by_group_id,
             voiceover_by_group_id=voiceover_by_group_id,
             background_music=background_music,
-            beat_durations_ms=beat_track.beat_durations_ms,
+            beat_grid=beat_track.beat_grid,
             start_beat_index=start_beat_index,
             use_beats=use_beats,
+            reusable_groups=reusable_groups,
         )
 
         voiceover_segments = self._build_voiceover_track(groups=groups, group_states=group_states)
@@ -97,15 +134,33 @@ class TimelinePlanner:
             music_offset_ms=music_offset_ms,
         )
 
-        return {
+        result: Dict[str, Any] = {
             "tracks": {
                 "video": video_segments,
                 "subtitles": subtitle_segments,
                 "voiceover": voiceover_segments,
                 "bgm": bgm_segments,
-            }
+            },
+            "plan_state": self._build_plan_state(
+                groups=groups, group_states=group_states, background_music=background_music, use_beats=use_beats
+            ),
         }
 
+        if replanning:
+            result["diff"] = {
+                "changed_groups": sorted({self._to_str_id(gid) for gid in changed_group_ids}),
+                "reused_groups": [
+                    gid for gid, state in group_states.items() if state.get("reused")
+                ],
+                "replanned_groups": [
+                    gid for gid, state in group_states.items() if not state.get("reused")
+                ],
+                "duration_delta_ms": total_duration_ms - self._plan_duration_ms(previous_plan),
+                "tracks": self._diff_tracks(previous_plan.get("tracks") or {}, result["tracks"]),
+            }
+
+        return result
+
     # -----------------------------
     # Track builders
     # -----------------------------
@@ -118,10 +173,12 @@ class TimelinePlanner:
         script_by_group_id: Mapping[str, Dict[str, Any]],
         voiceover_by_group_id: Mapping[str, Dict[str, Any]],
         background_music: Optional[Dict[str, Any]],
-        beat_durations_ms: List[Milliseconds],
+        beat_grid: BeatGrid,
         start_beat_index: int,
         use_beats: bool,
+        reusable_groups: Optional[Mapping[str, Dict[str, Any]]] = None,
     ) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]], Milliseconds, int]:
+        reusable_groups = reusable_groups or {}
         video_segments: List[Dict[str, Any]] = []
         group_states: Dict[str, Dict[str, Any]] = {}
 
@@ -149,6 +206,9 @@ class TimelinePlanner:
 
             group_script = script_by_group_id.get(group_id)
             group_voiceover = voiceover_by_group_id.get(group_id)
+            previous_group = reusable_groups.get(group_id)
+            if previous_group is not None and previous_group.get("clip_ids") != clip_ids:
+                previous_group = None
 
             # Case A: no script, no voiceover, and no beat snapping -> concatenate clips as-is.
             if not group_script and not group_voiceover and (not background_music or not use_beats):
@@ -194,6 +254,13 @@ class TimelinePlanner:
                     "end": group_end_ms,
                     "duration": group_end_ms - group_start_ms,
                     "first_clip_duration": first_clip_source_duration_ms,
+                    "mode": "concat",
+                    "clip_ids": clip_ids,
+                    "start_beat_index": beat_index,
+                    "end_beat_index": beat_index,
+                    "segments": video_segments[len(video_segments) - len(clip_items):],
+                    # concatenation has no choices to keep: it depends only on the clips themselves
+                    "reused": previous_group is not None and previous_group.get("mode") == "concat",
                 }
                 continue
 
@@ -208,11 +275,24 @@ class TimelinePlanner:
                 group_target_duration_ms, len(clip_items) * int(self._config.min_clip_duration)
             )
 
-            if use_beats and background_music:
+            group_start_beat_index = beat_index
+            if previous_group is not None and (
+                previous_group.get("mode") != "fit"
+                or (use_beats and background_music and previous_group.get("start_beat_index") != beat_index)
+            ):
+                previous_group = None
+
+            if previous_group is not None:
+                # Unchanged group: keep its previous cuts and windows, only its position on the timeline moves.
+                previous_clips = previous_group["clips"]
+                durations_ms = [int(c["duration"]) for c in previous_clips]
+                if use_beats and background_music:
+                    beat_index = int(previous_group.get("end_beat_index", beat_index))
+            elif use_beats and background_music:
                 durations_ms, beat_index = self._allocate_clip_durations_using_beats(
                     clip_items=clip_items,
                     group_target_ms=group_target_duration_ms,
-                    beat_durations_ms=beat_durations_ms,
+                    beat_grid=beat_grid,
                     start_beat_index=beat_index,
                     start_residual_ms=residual_ms,
                 )
@@ -224,7 +304,7 @@ class TimelinePlanner:
             group_start_ms = timeline_cursor_ms
             first_clip_planned_duration_ms: Milliseconds = durations_ms[0] if durations_ms else 0
 
-            for clip, planned_duration_ms in zip(clip_items, durations_ms):
+            for index_in_group, (clip, planned_duration_ms) in enumerate(zip(clip_items, durations_ms)):
                 clip_id = clip.get("clip_id")  # keep legacy behavior (may be int)
                 clip_kind = str(clip.get("kind", "video")).lower()
 
@@ -234,13 +314,18 @@ class TimelinePlanner:
                 source_start_ms, source_end_ms, source_available_ms = self._full_source_window_and_duration_ms(clip)
                 playback_rate = 1.0
 
-                if clip_kind == "video":
+                if previous_group is not None:
+                    previous_clip = previous_group["clips"][index_in_group]
+                    source_window_start_ms = int(previous_clip["source_window"]["start"])
+                    source_window_end_ms = int(previous_clip["source_window"]["end"])
+                    playback_rate = previous_clip.get("playback_rate", playback_rate)
+                elif clip_kind == "video":
                     if planned_duration_ms > source_available_ms:
                         playback_rate = (source_available_ms / planned_duration_ms) if planned_duration_ms > 0 else 1.0
                         source_window_start_ms, source_window_end_ms = source_start_ms, source_end_ms
                     else:
                         source_window_start_ms, source_window_end_ms = self._choose_source_window_for_timeline_duration_ms(
-                            clip=clip, used_timeline_duration_ms=int(planned_duration_ms)
+                            clip=clip, used_timeline_duration_ms=int(planned_duration_ms), group_id=group_id
                         )
                 else:
                     # image (and other non-video kinds): use from src_start for the planned duration
@@ -289,6 +374,12 @@ class TimelinePlanner:
                 "group_margin": int(self._config.group_margin_over_voiceover),
                 "voiceover": group_voiceover,
                 "script": group_script,
+                "mode": "fit",
+                "clip_ids": clip_ids,
+                "start_beat_index": group_start_beat_index,
+                "end_beat_index": beat_index,
+                "segments": video_segments[len(video_segments) - len(clip_items):],
+                "reused": previous_group is not None,
             }
 
         total_duration_ms = timeline_cursor_ms
@@ -466,12 +557,163 @@ class TimelinePlanner:
 
         return bgm_segments
 
+    # -----------------------------
+    # Incremental re-planning
+    # -----------------------------
+    def _build_plan_state(
+        self,
+        *,
+        groups: List[Dict[str, Any]],
+        group_states: Mapping[str, Dict[str, Any]],
+        background_music: Optional[Dict[str, Any]],
+        use_beats: bool,
+    ) -> Dict[str, Any]:
+        """Per-group planning decisions, kept in the result so a later re-plan can reuse untouched groups."""
+        planned_groups: List[Dict[str, Any]] = []
+        for group in groups:
+            state = group_states.get(self._to_str_id(group.get("group_id")))
+            if not state:
+                continue
+            planned_groups.append(
+                {
+                    "group_id": state["group_id"],
+                    "mode": state["mode"],
+                    "clip_ids": state["clip_ids"],
+                    "start": state["start"],
+                    "end": state["end"],
+                    "start_beat_index": state["start_beat_index"],
+                    "end_beat_index": state["end_beat_index"],
+                    "clips": [
+                        {
+                            "clip_id": self._to_str_id(segment.get("clip_id")),
+                            "duration": segment["timeline_window"]["end"] - segment["timeline_window"]["start"],
+                            "source_window": {
+                                "start": segment["source_window"]["start"],
+                                "end": segment["source_window"]["end"],
+                            },
+                            "playback_rate": segment.get("playback_rate", 1.0),
+                        }
+                        for segment in state["segments"]
+                    ],
+                }
+            )
+
+        return {
+            "version": PLAN_STATE_VERSION,
+            "random_seed": self._random_seed,
+            "use_beats": bool(use_beats and background_music),
+            "bgm_id": (background_music or {}).get("bgm_id"),
+            "groups": planned_groups,
+        }
+
+    def _reusable_groups(
+        self,
+        previous_plan: Dict[str, Any],
+        *,
+        changed_group_ids: Iterable[Any],
+        background_music: Optional[Dict[str, Any]],
+        use_beats: bool,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Groups of `previous_plan` that may be kept as they are; empty when the plan can't be reused at all."""
+        plan_state = previous_plan.get("plan_state") or {}
+        if (
+            plan_state.get("version") != PLAN_STATE_VERSION
+            or plan_state.get("random_seed") != self._random_seed
+            or bool(plan_state.get("use_beats")) != bool(use_beats and background_music)
+            or plan_state.get("bgm_id") != (background_music or {}).get("bgm_id")
+        ):
+            return {}
+
+        changed = {self._to_str_id(gid) for gid in changed_group_ids}
+        return {
+            self._to_str_id(g.get("group_id")): g
+            for g in plan_state.get("groups") or []
+            if self._to_str_id(g.get("group_id")) not in changed
+        }
+
+    @staticmethod
+    def _plan_duration_ms(plan: Dict[str, Any]) -> Milliseconds:
+        video_segments = (plan.get("tracks") or {}).get("video") or []
+        return max((int(seg["timeline_window"]["end"]) for seg in video_segments), default=0)
+
+    def _diff_tracks(
+        self, previous_tracks: Mapping[str, List[Dict[str, Any]]], tracks: Mapping[str, List[Dict[str, Any]]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Item-level diff per track. Items are matched by their ids (the n-th occurrence of a repeated id matches
+        the n-th occurrence) and reported as added / removed / changed (different content) / shifted (same
+        content and duration at a new timeline position, with `delta_ms`). File paths are ignored: they point
+        into per-run caches.
+        """
+        diff: Dict[str, Dict[str, Any]] = {}
+        for track_name, key_fields in DIFF_TRACK_KEYS.items():
+            previous_items = self._index_track_items(previous_tracks.get(track_name) or [], key_fields)
+            current_items = self._index_track_items(tracks.get(track_name) or [], key_fields)
+
+            track_diff: Dict[str, Any] = {"added": [], "removed": [], "changed": [], "shifted": [], "unchanged": 0}
+            for key, item in current_items.items():
+                label = self._diff_label(key_fields, key)
+                previous_item = previous_items.get(key)
+                if previous_item is None:
+                    track_diff["added"].append(label)
+                    continue
+
+                changed_fields = sorted(
+                    field
+                    for field in (set(item) | set(previous_item)) - DIFF_IGNORED_FIELDS
+                    if item.get(field) != previous_item.get(field)
+                )
+                window = item.get("timeline_window") or {}
+                previous_window = previous_item.get("timeline_window") or {}
+                if window != previous_window:
+                    duration = window.get("end", 0) - window.get("start", 0)
+                    previous_duration = previous_window.get("end", 0) - previous_window.get("start", 0)
+                    if changed_fields or duration != previous_duration:
+                        changed_fields.append("timeline_window")
+                    else:
+                        track_diff["shifted"].append(
+                            {**label, "delta_ms": window.get("start", 0) - previous_window.get("start", 0)}
+                        )
+                        continue
+
+                if changed_fields:
+                    track_diff["changed"].append({**label, "fields": changed_fields})
+                else:
+                    track_diff["unchanged"] += 1
+
+            track_diff["removed"] = [
+                self._diff_label(key_fields, key) for key in previous_items if key not in current_items
+            ]
+            diff[track_name] = track_diff
+
+        return diff
+
+    @classmethod
+    def _index_track_items(
+        cls, items: List[Dict[str, Any]], key_fields: Tuple[str, ...]
+    ) -> Dict[Tuple[str, ...], Dict[str, Any]]:
+        indexed: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        occurrences: Dict[Tuple[str, ...], int] = {}
+        for item in items:
+            base_key = tuple(cls._to_str_id(item.get(field)) for field in key_fields)
+            occurrence = occurrences.get(base_key, 0)
+            occurrences[base_key] = occurrence + 1
+            indexed[base_key + (str(occurrence),)] = item
+        return indexed
+
+    @staticmethod
+    def _diff_label(key_fields: Tuple[str, ...], key: Tuple[str, ...]) -> Dict[str, Any]:
+        label: Dict[str, Any] = dict(zip(key_fields, key))
+        if key[-1] != "0":
+            label["occurrence"] = int(key[-1])
+        return label
+
     # -----------------------------
     # Beats & title alignment
     # -----------------------------
     def _build_beat_track(self, background_music: Optional[Dict[str, Any]], *, use_beats: bool) -> BeatTrack:
         if not use_beats or not background_music:
-            return BeatTrack(beat_timestamps_ms=[], beat_durations_ms=[], music_duration_ms=0)
+            return BeatTrack(beat_timestamps_ms=[], beat_durations_ms=[], music_duration_ms=0, beat_grid=BeatGrid([]))
 
         music_duration_ms = int(background_music.get("duration", 0))
         beat_timestamps_ms = self._build_beat_timestamps_from_music_ms(background_music)
@@ -483,6 +725,7 @@ class TimelinePlanner:
             beat_timestamps_ms=beat_timestamps_ms,
             beat_durations_ms=beat_durations_ms,
             music_duration_ms=music_duration_ms,
+            beat_grid=BeatGrid.from_durations(beat_durations_ms),
         )
 
     def _compute_title_music_offset(
@@ -639,11 +882,14 @@ class TimelinePlanner:
         return int(start_ms), int(end_ms), int(duration_ms)
 
     def _choose_source_window_for_timeline_duration_ms(
-        self, *, clip: Dict[str, Any], used_timeline_duration_ms: Milliseconds
+        self, *, clip: Dict[str, Any], used_timeline_duration_ms: Milliseconds, group_id: str = ""
     ) -> Tuple[Milliseconds, Milliseconds]:
         source_start_ms, _, source_duration_ms = self._full_source_window_and_duration_ms(clip)
 
-        random_offset_ms = int(self._random_generator.random() * (source_duration_ms - used_timeline_duration_ms))
+        # Seeded per clip rather than drawn from one shared stream, so a clip's window does not depend on
+        # how many clips were planned before it (or on earlier calls to this planner).
+        clip_random = random.Random(f"{self._random_seed}:{group_id}:{self._to_str_id(clip.get('clip_id'))}")
+        random_offset_ms = int(clip_random.random() * (source_duration_ms - used_timeline_duration_ms))
         window_start_ms = source_start_ms + random_offset_ms
         window_end_ms = window_start_ms + int(used_timeline_duration_ms)
         return int(window_start_ms), int(window_end_ms)
@@ -656,7 +902,7 @@ class TimelinePlanner:
         *,
         clip_items: List[Dict[str, Any]],
         group_target_ms: Milliseconds,
-        beat_durations_ms: List[Milliseconds],
+        beat_grid: BeatGrid,
         start_beat_index: int,
         start_residual_ms: Milliseconds,
     ) -> Tuple[List[Milliseconds], int]:
@@ -670,7 +916,7 @@ class TimelinePlanner:
         if clip_count == 0:
             return [], int(start_beat_index)
 
-        if not beat_durations_ms:
+        if not beat_grid:
             raise ValueError("beat_durations is empty")
 
         weights_ms: List[Milliseconds] = []
@@ -704,60 +950,9 @@ class TimelinePlanner:
                 targets_ms[i] -= slack_ms
                 deficit_ms -= slack_ms
 
-        beat_count = len(beat_durations_ms)
-
-        def snap_to_nearest_beat(
-            desired_ms: Milliseconds, beat_index: int, phase_ms: Milliseconds
-        ) -> Tuple[Milliseconds, int]:
-            elapsed_ms = int(phase_ms)
-            idx = int(beat_index)
-
-            safety_steps = 0
-            while elapsed_ms < int(self._config.min_clip_duration):
-                elapsed_ms += int(beat_durations_ms[idx])
-                idx = (idx + 1) % beat_count
-                safety_steps += 1
-                if safety_steps > SNAP_SAFETY_MAX_STEPS:
-                    raise RuntimeError("snap_to_nearest_beat safety exceeded")
-
-            if elapsed_ms >= int(desired_ms):
-                return int(elapsed_ms), int(idx)
-
-            previous_elapsed_ms = elapsed_ms
-            previous_idx = idx
-
-            safety_steps = 0
-            while elapsed_ms < int(desired_ms):
-                previous_elapsed_ms = elapsed_ms
-                previous_idx = idx
-                elapsed_ms += int(beat_durations_ms[idx])
-                idx = (idx + 1) % beat_count
-                safety_steps += 1
-                if safety_steps > SNAP_SAFETY_MAX_STEPS:
-                    raise RuntimeError("snap_to_nearest_beat safety exceeded")
-
-            if int(desired_ms) - previous_elapsed_ms < elapsed_ms - int(desired_ms):
-                return int(previous_elapsed_ms), int(previous_idx)
-            return int(elapsed_ms), int(idx)
-
-        def snap_to_beat_ceil(
-            desired_ms: Milliseconds, beat_index: int, phase_ms: Milliseconds
-        ) -> Tuple[Milliseconds, int]:
-            elapsed_ms = int(phase_ms)
-            idx = int(beat_index)
-
-            desired_ms = max(int(self._config.min_clip_duration), int(desired_ms))
-            safety_steps = 0
-            while elapsed_ms < desired_ms:
-                elapsed_ms += int(beat_durations_ms[idx])
-                idx = (idx + 1) % beat_count
-                safety_steps += 1
-                if safety_steps > SNAP_SAFETY_MAX_STEPS:
-                    raise RuntimeError("snap_to_beat_ceil safety exceeded")
-            return int(elapsed_ms), int(idx)
-
         durations_ms: List[Milliseconds] = []
-        beat_index = int(start_beat_index) % beat_count
+        beat_index = int(start_beat_index) % len(beat_grid)
+        min_clip_ms = int(self._config.min_clip_duration)
         phase_ms = max(0, int(start_residual_ms))
 
         carry_ms: Milliseconds = 0
@@ -771,11 +966,11 @@ class TimelinePlanner:
                 desired_ms = int(self._config.min_clip_duration)
 
             if not is_last_clip:
-                actual_ms, beat_index = snap_to_nearest_beat(desired_ms, beat_index, phase_ms)
+                actual_ms, beat_index = self._snap_to_nearest_beat(beat_grid, desired_ms, beat_index, phase_ms, min_clip_ms)
             else:
                 remaining_ms = max(0, int(group_target_ms) - int(sum_actual_ms))
                 desired_ms = max(desired_ms, int(remaining_ms))
-                actual_ms, beat_index = snap_to_beat_ceil(desired_ms, beat_index, phase_ms)
+                actual_ms, beat_index = self._snap_to_beat_ceil(beat_grid, desired_ms, beat_index, phase_ms, min_clip_ms)
 
             durations_ms.append(int(actual_ms))
             sum_actual_ms += int(actual_ms)
@@ -785,6 +980,84 @@ class TimelinePlanner:
 
         return durations_ms, int(beat_index)
 
+    @staticmethod
+    def _snap_to_nearest_beat(
+        beat_grid: BeatGrid,
+        desired_ms: Milliseconds,
+        beat_index: int,
+        phase_ms: Milliseconds,
+        min_clip_ms: Milliseconds,
+    ) -> Tuple[Milliseconds, int]:
+        """
+        Walk whole beats from `beat_index` (already `phase_ms` into it) to at least `min_clip_ms`, then to the
+        beat boundary nearest `desired_ms` (ties go to the later one). Returns (elapsed_ms, next beat index).
+        """
+        beat_count = len(beat_grid)
+        origin_ms = beat_grid.position(beat_index) - int(phase_ms)  # where elapsed == 0
+
+        idx, position_ms = TimelinePlanner._beat_at_or_after(
+            beat_grid, int(beat_index), origin_ms + int(min_clip_ms), "snap_to_nearest_beat"
+        )
+        elapsed_ms = position_ms - origin_ms
+        if elapsed_ms >= int(desired_ms):
+            return int(elapsed_ms), int(idx % beat_count)
+
+        next_idx, position_ms = TimelinePlanner._beat_at_or_after(
+            beat_grid, idx, origin_ms + int(desired_ms), "snap_to_nearest_beat"
+        )
+        previous_elapsed_ms = beat_grid.position(next_idx - 1) - origin_ms
+        elapsed_ms = position_ms - origin_ms
+        if int(desired_ms) - previous_elapsed_ms < elapsed_ms - int(desired_ms):
+            return int(previous_elapsed_ms), int((next_idx - 1) % beat_count)
+        return int(elapsed_ms), int(next_idx % beat_count)
+
+    @staticmethod
+    def _snap_to_beat_ceil(
+        beat_grid: BeatGrid,
+        desired_ms: Milliseconds,
+        beat_index: int,
+        phase_ms: Milliseconds,
+        min_clip_ms: Milliseconds,
+    ) -> Tuple[Milliseconds, int]:
+        """Walk whole beats from `beat_index` until at least max(desired_ms, min_clip_ms) has elapsed."""
+        origin_ms = beat_grid.position(beat_index) - int(phase_ms)
+        desired_ms = max(int(min_clip_ms), int(desired_ms))
+
+        idx, position_ms = TimelinePlanner._beat_at_or_after(beat_grid, int(beat_index), origin_ms + desired_ms, "snap_to_beat_ceil")
+        return int(position_ms - origin_ms), int(idx % len(beat_grid))
+
+    @staticmethod
+    def _beat_at_or_after(beat_grid: BeatGrid, start_index: int, t_ms: int, caller: str) -> Tuple[int, Milliseconds]:
+        """
+        (index, position) of the first (unrolled) beat index >= `start_index` positioned at or after `t_ms`. Steps beat by beat for up to
+        SNAP_WALK_MAX_STEPS beats, which is cheaper than bisecting for the few beats a clip usually spans, then
+        bisects. Raises the caller's safety error past SNAP_SAFETY_MAX_STEPS or past the end of a non-looping grid.
+        """
+        positions = beat_grid.positions
+        beat_count = len(positions)
+        if beat_grid.loops:
+            cycle, i = divmod(start_index, beat_count)
+            offset_ms = cycle * beat_grid.cycle_ms
+        else:
+            i, offset_ms = start_index, 0
+
+        for step in range(SNAP_WALK_MAX_STEPS):
+            if i >= beat_count:
+                if not beat_grid.loops:
+                    raise RuntimeError(f"{caller} safety exceeded")
+                i = 0
+                offset_ms += beat_grid.cycle_ms
+            position_ms = offset_ms + positions[i]
+            if position_ms >= t_ms:
+                return start_index + step, position_ms
+            i += 1
+
+        idx = beat_grid.index_ceil(t_ms)
+        if idx is None or idx - start_index > SNAP_SAFETY_MAX_STEPS:
+            raise RuntimeError(f"{caller} safety exceeded")
+        idx = max(start_index, idx)
+        return idx, beat_grid.position(idx)
+
     def _allocate_clip_durations_without_beats(
         self, *, clip_items: List[Dict[str, Any]], group_target_ms: Milliseconds
     ) -> List[Milliseconds]:
@@ -798,15 +1071,10 @@ class TimelinePlanner:
             source_durations_ms.append(int(duration_ms))
 
         total_source_duration_ms = sum(source_durations_ms)
+        min_clip_ms = int(self._config.min_clip_duration)
 
         def total_for_ratio(ratio: float) -> Milliseconds:
-            total_ms: Milliseconds = 0
-            for duration_ms in source_durations_ms:
-                allocated_ms = int(duration_ms * ratio)
-                if allocated_ms < int(self._config.min_clip_duration):
-                    allocated_ms = int(self._config.min_clip_duration)
-                total_ms += int(allocated_ms)
-            return int(total_ms)
+            return sum(max(int(duration_ms * ratio), min_clip_ms) for duration_ms in source_durations_ms)
 
         ratio_high = max(1.0, int(group_target_ms) / total_source_duration_ms)
         while total_for_ratio(ratio_high) < int(group_target_ms):
@@ -892,6 +1160,9 @@ class PlanTimelineNode(BaseNode):
         voiceovers = (inputs.get("tts") or {}).get("voiceover", [])
         background_music = (inputs.get("music_rec") or {}).get("bgm")  # Optional dict
         use_beats = inputs.get("use_beats", False)
+        # Incremental re-plan: the interceptor injects the latest plan of this session as `previous_plan`
+        changed_group_ids = inputs.get("changed_group_ids")
+        previous_plan = inputs.get("previous_plan") if changed_group_ids is not None else None
 
         result = self.planner.plan(
             media=media,
@@ -901,7 +1172,23 @@ class PlanTimelineNode(BaseNode):
             voiceovers=voiceovers,
             background_music=background_music,
             use_beats=use_beats,
+            previous_plan=previous_plan,
+            changed_group_ids=changed_group_ids,
         )
 
-        node_state.node_summary.info_for_user("时间线组织成功")
+        if changed_group_ids is not None and previous_plan is None:
+            node_state.node_summary.add_warning("No previous timeline in this session, planned the whole timeline")
+
+        diff = result.get("diff")
+        if diff is not None:
+            video_diff = diff["tracks"]["video"]
+            node_state.node_summary.info_for_user(
+                f"增量重排时间线：重算 {len(diff['replanned_groups'])} 组，复用 {len(diff['reused_groups'])} 组；"
+                f"视频片段 变更 {len(video_diff['changed'])} / 平移 {len(video_diff['shifted'])} / "
+                f"新增 {len(video_diff['added'])} / 删除 {len(video_diff['removed'])}，"
+                f"总时长变化 {diff['duration_delta_ms']} ms"
+            )
+            node_state.node_summary.info_for_llm(f"[plan_timeline] re-plan diff: {diff}")
+        else:
+            node_state.node_summary.info_for_user("时间线组织成功")
         return result
@@ -1,5 +1,6 @@
 from typing import List, Dict, Tuple, Union, Any
 import json
+import math
 import random
 from src.open_storyline.config import Settings
 from itertools import accumulate, pairwise
@@ -7,9 +8,14 @@ from open_storyline.config import PlanTimelineProConfig
 from open_storyline.nodes.node_state import NodeState
 from open_storyline.nodes.core_nodes.base_node import BaseNode, NodeMeta
 from open_storyline.nodes.node_schema import PlanTimelineInput
+from open_storyline.utils.beat_grid import BeatGrid
 from open_storyline.utils.register import NODE_REGISTRY
 
 
+def _is_whole_ms(value) -> bool:
+    return isinstance(value, int) or float(value).is_integer()
+
+
 class TimeLine:
 
     def edit_meterial_timeline(
@@ -111,6 +117,56 @@ class TimeLine:
         duration_rates = [round(1 / num, 2) for _, num in tts_indices_map.items() for _ in range(num)]
         temp_tts_durations = [val for val, count in zip(tts_durations, list(tts_indices_map.values())) for _ in range(count)]
 
+        # Beats as a looping grid, so "take beats until the clip is covered" is a bisect instead of a walk; its
+        # indices run on past the last beat into the next loop of the music. Durations are whole milliseconds except
+        # right after a clip stretched to a fractional minimum: those walks still step beat by beat so float
+        # rounding is unchanged.
+        beat_grid = BeatGrid.from_durations(beats_durations)
+        num_beats = len(beat_grid)
+        if not beat_grid.loops:
+            raise ValueError("Music beats must cover a positive duration")
+        whole_beats = all(_is_whole_ms(d) for d in beats_durations)
+
+        def warn_music_cycling(times: int = 1):
+            for _ in range(times):
+                node_state.node_summary.add_warning("The music is not enough long. Set the music cycling.")
+
+        def next_beat(beat_index):
+            beat_index += 1
+            # assert the music is enough long
+            if beat_index >= num_beats:
+                warn_music_cycling()
+                return 0
+            return beat_index
+
+        def take_beats_within(durations, beat_index, limit):
+            """Take whole beats while `durations` stays within `limit`; stops at the beat that would overshoot."""
+            if not (whole_beats and _is_whole_ms(durations)):
+                while True:
+                    durations += beats_durations[beat_index]
+                    if durations - limit > 0:
+                        durations -= beats_durations[beat_index]
+                        return durations, beat_index
+                    beat_index = next_beat(beat_index)
+
+            start = beat_grid.position(beat_index)
+            end = max(beat_index, beat_grid.index_floor(start + math.floor(limit) - durations))
+            warn_music_cycling(end // num_beats)
+            return durations + beat_grid.position(end) - start, end % num_beats
+
+        def take_beats_until(durations, beat_index, minimum):
+            """Take whole beats, starting with the current one, until `durations` reaches `minimum`."""
+            if not (whole_beats and _is_whole_ms(durations)):
+                while durations < minimum:
+                    durations += beats_durations[beat_index]
+                    beat_index = next_beat(beat_index)
+                return durations, beat_index
+
+            start = beat_grid.position(beat_index)
+            end = beat_grid.index_ceil(start + math.ceil(minimum) - durations)
+            warn_music_cycling(end // num_beats)
+            return durations + beat_grid.position(end) - start, end % num_beats
+
         init_duration = 0
         wo_got_beats_clips = []
         min_clip_duration = cfg.min_clip_duration
@@ -120,42 +176,23 @@ class TimeLine:
 
             durations = init_duration
             # assert the music is enough long
-            if beat_index >= len(beats_durations):
+            if beat_index >= num_beats:
                 beat_index = 0
                 node_state.node_summary.add_warning("The music is not enough long. Set the music cycling.")
 
-            while True:
-
-                durations += beats_durations[beat_index]
-                sub_durations = durations - meterial_durations[i]  # diff
-
-                # cut video
-                if sub_durations > 0:
-                    durations -= beats_durations[beat_index]
-                    if durations < minimum_duration:
-                        while durations < minimum_duration:
-                            durations += beats_durations[beat_index]
-                            beat_index += 1
-                            # assert the music is enough long
-                            if beat_index >= len(beats_durations):
-                                beat_index = 0
-                                node_state.node_summary.add_warning("The music is not enough long. Set the music cycling.")
-                        if types[i] == 'video':
-                            wo_got_beats_clips.append(str(i))
-                            init_duration = durations - max(meterial_durations[i], minimum_duration)
-                            durations = max(meterial_durations[i], minimum_duration) # set new duration to max(meterial_durations[i], minimum_duration)
-                        else: # img type set to the next beats.
-                            init_duration = 0
-                    else:
-                        init_duration = 0
-                    break
-                else:
-                    beat_index += 1
-
-                # assert the music is enough long
-                if beat_index >= len(beats_durations):
-                    beat_index = 0
-                    node_state.node_summary.add_warning("The music is not enough long. Set the music cycling.")
+            durations, beat_index = take_beats_within(durations, beat_index, meterial_durations[i])
+
+            # cut video
+            if durations < minimum_duration:
+                durations, beat_index = take_beats_until(durations, beat_index, minimum_duration)
+                if types[i] == 'video':
+                    wo_got_beats_clips.append(str(i))
+                    init_duration = durations - max(meterial_durations[i], minimum_duration)
+                    durations = max(meterial_durations[i], minimum_duration) # set new duration to max(meterial_durations[i], minimum_duration)
+                else: # img type set to the next beats.
+                    init_duration = 0
+            else:
+                init_duration = 0
 
             new_meterial_durations.append(durations)
 
@@ -201,7 +238,8 @@ class TimeLine:
         paragraph = [0] + list(accumulate(tts_indices_map.values()))
         paragraph_durations = [[dura for dura in meterial_durations[paragraph[i]: paragraph[i+1]]] for i in range(len(paragraph[:-1]))]
         paragraph_durations_sum = [sum(durations) for durations in paragraph_durations]
-        start_timestamps = [sum(meterial_durations[:i]) for i in paragraph[:-1]]
+        meterial_offsets = [0] + list(accumulate(meterial_durations))
+        start_timestamps = [meterial_offsets[i] for i in paragraph[:-1]]
         assert len(paragraph_durations_sum) == len(start_timestamps)
 
         # adjust start timestamps
@@ -268,7 +306,8 @@ class TimeLine:
             paragraph = [0] + list(accumulate(tts_indices_map.values()))
             paragraph_durations = [[dura for dura in meterial_durations[paragraph[i]: paragraph[i+1]]] for i in range(len(paragraph[:-1]))]
             paragraph_durations_sum = [sum(durations) for durations in paragraph_durations]
-            text_start_timestamps = [sum(meterial_durations[:i]) for i in paragraph[:-1]]
+            meterial_offsets = [0] + list(accumulate(meterial_durations))
+            text_start_timestamps = [meterial_offsets[i] for i in paragraph[:-1]]
             text_durations = [b - a for a, b in pairwise(text_start_timestamps + [sum(meterial_durations)])]  # `text_duration_mode` default is `with_clip`
             assert len(paragraph_durations) == len(text_start_timestamps)
 
@@ -294,7 +333,7 @@ class TimeLine:
             
             # obtain final start-timestamps and durations
             sub_text_durations = [int(len(sub_text) / len(''.join(text)) * duration) for sub_text in text]
-            sub_start_timestamps = [start_timestamp + sum(sub_text_durations[:i]) for i in range(len(sub_text_durations))]
+            sub_start_timestamps = [start_timestamp + offset for offset in accumulate(sub_text_durations[:-1], initial=0)]
             final_text_durations.append(sub_text_durations)
             final_text_start_timestamps.append(sub_start_timestamps)
 
@@ -302,10 +341,18 @@ class TimeLine:
     
     @staticmethod
     def replace_with_closest_if_within_threshold(source_list, reference_list, threshold: int=500):
+        if any(a > b for a, b in pairwise(reference_list)):
+            # unsorted references: keep the scan so ties resolve to the first match as before
+            def closest_of(num):
+                return min(reference_list, key=lambda x: abs(x - num))
+        else:
+            # sorted references: bisect the grid; ties go to the earlier beat, as the scan did
+            closest_of = BeatGrid(reference_list).nearest
+
         result = []
         for num in source_list:
             
-            closest = min(reference_list, key=lambda x: abs(x - num))
+            closest = closest_of(num)
             
             if abs(closest - num) < threshold:
                 result.append(closest)
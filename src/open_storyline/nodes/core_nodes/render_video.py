@@ -42,6 +42,7 @@ except Exception:  # pragma: no cover
 
 from src.open_storyline.config import Settings
 from open_storyline.nodes.core_nodes.base_node import BaseNode, NodeMeta
+from open_storyline.nodes.node_runtime import NODE_RUNTIME
 from open_storyline.nodes.node_state import NodeState
 from open_storyline.nodes.node_schema import RenderVideoInput
 from open_storyline.utils.util import get_video_rotation
@@ -799,7 +800,8 @@ class RenderVideoPipeline:
             # (concurrent renders would corrupt each other's CRF otherwise)
             ffmpeg_params = ["-preset", "veryfast", "-crf", str(crf), "-threads", "0"]
 
-            await asyncio.to_thread(
+            await NODE_RUNTIME.run(
+                "heavy",
                 final_clip.write_videofile,
                 output_path,
                 codec=VIDEO_CODEC,
@@ -1004,6 +1006,7 @@ class RenderVideoNode(BaseNode):
         node_kind="render_video",
         require_prior_kind=["load_media", "plan_timeline", "transition_rec", "text_rec"],
         default_require_prior_kind=["load_media", "plan_timeline", "transition_rec", "text_rec"],
+        work_class="heavy",
     )
 
     input_schema = RenderVideoInput
@@ -27,7 +27,7 @@ class ScriptTemplateRecomendation(BaseNode):
     def __init__(self, server_cfg):
         super().__init__(server_cfg)
         self.element_filter = ElementFilter(json_path=self.server_cfg.script_template.script_template_info_path)
-        self.vectorstore = StorylineRecall.build_vectorstore(self.element_filter.library)
+        self.vectorstore = StorylineRecall.build_vectorstore(self.element_filter.library, cache_name="script_template")
         self._top_n = 3
 
     async def default_process(self, node_state: NodeState, inputs: Dict[str, Any]):
@@ -1,16 +1,21 @@
 import os
+import math
 import requests
+import threading
 import time
 
 from typing import Any, Dict, Optional, ClassVar, Type, Tuple, List
+from urllib.parse import urlencode
 from pydantic import BaseModel
 
 from pathlib import Path
 
+from open_storyline.config import Settings
 from open_storyline.nodes.core_nodes.base_node import NodeMeta, BaseNode
 from open_storyline.nodes.node_schema import SearchMediaInput
 from open_storyline.nodes.node_state import NodeState
 from open_storyline.utils.register import NODE_REGISTRY
+from open_storyline.utils.media_download import DownloadJob, DownloadResult, MediaDownloadCache
 
 SEARCH_RESULT_PER_PAGE = 40
 MAX_PHOTO_NUMBER = 10
@@ -21,9 +26,59 @@ DEFAULT_RESULT_NUMBER_PER_PAGE = 50
 DEFAULT_PAGE = 1
 
 TARGET_LONG_EDGE_PX = 1080
+# Same canvas render_video builds by default: 16:9 (or 9:16 for portrait) with a 1080 long edge
+DEFAULT_CANVAS_ASPECT_RATIO = 16.0 / 9.0
+# A rendition this much smaller than the canvas still counts as covering it
+RENDITION_COVER_TOLERANCE = 0.02
 
 VALID_ORIENTATIONS = {"landscape", "portrait"}
 VIDEO_QUALITY_RANK = {"sd": 0, "hd": 1, "uhd": 2}
+PEXELS_PROVIDER = "pexels"
+DEFAULT_PEXELS_API_BASE = "https://api.pexels.com"
+SEARCH_CACHE_MAX_ENTRIES = 256
+
+
+class SearchResponseCache:
+    """
+    In-process TTL cache of raw search API responses keyed by (endpoint, normalized query, per_page, page).
+    Orientation / duration filters are applied to the cached response, so they don't need to be part of the key.
+    """
+
+    def __init__(self, ttl_sec: float, max_entries: int = SEARCH_CACHE_MAX_ENTRIES):
+        self.ttl_sec = float(ttl_sec)
+        self.max_entries = int(max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._data: Dict[tuple, Tuple[float, dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(endpoint: str, query: str, per_page: int, page: int) -> tuple:
+        return (endpoint, " ".join((query or "").lower().split()), int(per_page), int(page))
+
+    def get(self, key: tuple) -> Optional[dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < now:
+                self._data.pop(key, None)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: tuple, value: dict[str, Any]) -> None:
+        if self.ttl_sec <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self._data) >= self.max_entries:
+                for k in [k for k, (exp, _) in self._data.items() if exp < now]:
+                    del self._data[k]
+                while len(self._data) >= self.max_entries:
+                    # dicts keep insertion order: drop the oldest entry
+                    del self._data[next(iter(self._data))]
+            self._data[key] = (now + self.ttl_sec, value)
 
 @NODE_REGISTRY.register()
 class SearchMediaNode(BaseNode):
@@ -38,6 +93,13 @@ class SearchMediaNode(BaseNode):
     )
     input_schema: ClassVar[Type[BaseModel]] = SearchMediaInput
 
+    def __init__(self, server_cfg: Settings) -> None:
+        super().__init__(server_cfg)
+        cfg = server_cfg.search_media
+        self.downloader = MediaDownloadCache(cfg.media_cache_dir, max_workers=cfg.download_concurrency)
+        self.search_cache = SearchResponseCache(cfg.search_cache_ttl_sec)
+        self.api_base = cfg.api_base_url.rstrip("/")
+
     async def default_process(self, node_state: NodeState, inputs: Dict[str, Any]) -> Dict[str, Any]:
         return {}
 
@@ -64,8 +126,15 @@ class SearchMediaNode(BaseNode):
         min_video_duration = min(max(inputs.get("min_video_duration", MIN_VIDEO_DURATION), MIN_VIDEO_DURATION), MAX_VIDEO_DURATION)
         max_video_duration = max(min(inputs.get("max_video_duration", MAX_VIDEO_DURATION), MAX_VIDEO_DURATION), MIN_VIDEO_DURATION)
 
+        downloads: list[DownloadResult] = []
+        full_size_bytes: list[float] = []
+        start = time.perf_counter()
+        hits_before, misses_before = self.search_cache.hits, self.search_cache.misses
+        search = {"api_base": self.api_base, "cache": self.search_cache}
+
         if video_number > 0:
-            video_preview_urls, video_saved_paths = get_video_media_from_pexels(
+            video_preview_urls, video_saved_paths, results = await self.run_blocking(
+                get_video_media_from_pexels,
                 pexels_api_key=pexels_api_key,
                 query=search_keyword,
                 media_dir=media_dir,
@@ -73,36 +142,100 @@ class SearchMediaNode(BaseNode):
                 orientation=orientation,
                 min_video_duration=min_video_duration,
                 max_video_duration=max_video_duration,
+                downloader=self.downloader,
+                **search,
             )
+            downloads.extend(self._collect_downloads(node_state, results, full_size_bytes))
             node_state.node_summary.info_for_user(f"search media successfully, found {len(video_preview_urls)} videos", preview_urls=video_preview_urls)
 
         if photo_number > 0:
-            image_preview_urls, image_saved_paths = get_photo_media_from_pexels(
+            image_preview_urls, image_saved_paths, results = await self.run_blocking(
+                get_photo_media_from_pexels,
                 pexels_api_key=pexels_api_key,
                 query=search_keyword,
                 media_dir=media_dir,
                 photo_number=photo_number,
                 orientation=orientation,
+                downloader=self.downloader,
+                **search,
             )
+            downloads.extend(self._collect_downloads(node_state, results, full_size_bytes))
             node_state.node_summary.info_for_user(f"search media successfully, found {len(image_preview_urls)} photos", preview_urls=image_preview_urls)
-        return {"search_media": video_saved_paths + image_saved_paths}
 
+        search_hits = self.search_cache.hits - hits_before
+        search_calls = search_hits + self.search_cache.misses - misses_before
+        if search_calls:
+            node_state.node_summary.info_for_user(f"Search API: {search_hits}/{search_calls} pages served from cache")
+
+        if downloads:
+            elapsed = time.perf_counter() - start
+            fetched = [d for d in downloads if not d.cached]
+            node_state.node_summary.info_for_user(
+                f"Media ready in {elapsed:.1f}s: {len(fetched)} downloaded "
+                f"({sum(d.size for d in fetched) / (1 << 20):.1f} MB, {sum(d.resumed for d in fetched)} resumed), "
+                f"{len(downloads) - len(fetched)} reused from cache"
+            )
 
-def download_video(url: str, out_path: Path) -> None:
-    with requests.get(url, stream=True, timeout=120) as r:
-        r.raise_for_status()
-        with open(out_path, "wb") as f:
-            for chunk in r.iter_content(chunk_size=1024 * 1024):
-                if chunk:
-                    f.write(chunk)
+            chosen = sum(d.size for d in downloads)
+            full = sum(full_size_bytes)
+            fetched_bytes = sum(d.size for d in fetched)
+            if full > chosen > 0:
+                # Time saved at the throughput this run actually saw
+                rate = fetched_bytes / elapsed if fetched_bytes and elapsed > 0 else 0.0
+                saved_s = f", ~{(full - chosen) / rate:.1f}s" if rate else ""
+                node_state.node_summary.info_for_user(
+                    f"Renditions sized for the output canvas: {chosen / (1 << 20):.1f} MB instead of "
+                    f"~{full / (1 << 20):.1f} MB at full size ({1 - chosen / full:.0%} fewer bytes{saved_s})"
+                )
+        return {"search_media": video_saved_paths + image_saved_paths}
 
-def search_videos(pexels_api_key: str, query: str, per_page, page) -> dict[str, Any]:
-    url = "https://api.pexels.com/videos/search"
+    @staticmethod
+    def _collect_downloads(node_state: NodeState, results: list, full_size_bytes: list[float]) -> list[DownloadResult]:
+        ok: list[DownloadResult] = []
+        for res in results:
+            if isinstance(res, Exception):
+                node_state.node_summary.add_warning(f"Skipped a media file that failed to download: {res}")
+            else:
+                ok.append(res)
+                full_size_bytes.append(res.size * res.job.full_size_ratio)
+        return ok
+
+
+def _download_media(
+    downloader: MediaDownloadCache,
+    jobs: list[DownloadJob],
+) -> Tuple[List[Dict[str, Any]], list]:
+    results = downloader.fetch_all(jobs)
+    saved_paths = [{"path": str(r.path)} for r in results if not isinstance(r, Exception)]
+    return saved_paths, results
+
+
+def _search(
+        endpoint: str,
+        pexels_api_key: str,
+        query: str,
+        per_page,
+        page,
+        api_base: str = DEFAULT_PEXELS_API_BASE,
+        cache: Optional[SearchResponseCache] = None,
+    ) -> dict[str, Any]:
+    key = SearchResponseCache.make_key(endpoint, query, per_page, page)
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+    url = f"{api_base}/{endpoint}"
     headers = {"Authorization": pexels_api_key}
     params = {"query": query, "per_page": per_page, "page": page}
     r = requests.get(url, headers=headers, params=params, timeout=30)
     r.raise_for_status()
-    return r.json()
+    data = r.json()
+    if cache is not None:
+        cache.put(key, data)
+    return data
+
+def search_videos(pexels_api_key: str, query: str, per_page, page, **kwargs) -> dict[str, Any]:
+    return _search("videos/search", pexels_api_key, query, per_page, page, **kwargs)
 
 def filter_videos(
         raw_videos: dict[str, Any],
@@ -110,14 +243,15 @@ def filter_videos(
         orientation: str,
         min_video_duration: int,
         max_video_duration: int,
-    ) -> list[str]:
+    ) -> list[dict[str, Any]]:
+    """Returns candidates {"url", "asset_id", "rendition", "ext"}."""
 
     if video_number <= 0:
         return []
 
     desired_orientation = _normalize_orientation(orientation)
 
-    results: list[str] = []
+    results: list[dict[str, Any]] = []
     seen: set[str] = set()
 
     videos = raw_videos.get("videos") or []
@@ -142,14 +276,21 @@ def filter_videos(
             if actual_orientation != desired_orientation:
                 continue
 
-        link = _pick_best_video_link(v.get("video_files") or [])
+        file_info, full_size_ratio = _pick_best_video_file(v.get("video_files") or [], _canvas_size(orientation))
+        link = (file_info or {}).get("link")
         if not link:
             continue
 
         if link in seen:
             continue
 
-        results.append(link)
+        results.append({
+            "url": link,
+            "asset_id": str(v.get("id") or link),
+            "rendition": _video_rendition(file_info),
+            "ext": ".mp4",
+            "full_size_ratio": full_size_ratio,
+        })
         seen.add(link)
 
         if len(results) >= video_number:
@@ -164,15 +305,18 @@ def get_video_media_from_pexels(
         video_number: int,
         orientation: str,
         min_video_duration: int,
-        max_video_duration: int
-    ) -> Tuple[list[str], List[Dict[str, Any]]]:
+        max_video_duration: int,
+        downloader: MediaDownloadCache,
+        api_base: str = DEFAULT_PEXELS_API_BASE,
+        cache: Optional[SearchResponseCache] = None,
+    ) -> Tuple[list[str], List[Dict[str, Any]], list]:
 
     if video_number <= 0:
-        return ([], [])
+        return ([], [], [])
 
     media_dir.mkdir(parents=True, exist_ok=True)
 
-    collected: list[str] = []
+    collected: list[dict[str, Any]] = []
     seen: set[str] = set()
 
     page = DEFAULT_PAGE
@@ -182,6 +326,8 @@ def get_video_media_from_pexels(
             query=query,
             per_page=DEFAULT_RESULT_NUMBER_PER_PAGE,
             page=page,
+            api_base=api_base,
+            cache=cache,
         )
 
         batch = filter_videos(
@@ -192,23 +338,31 @@ def get_video_media_from_pexels(
             max_video_duration=max_video_duration,
         )
 
-        for url in batch:
-            if url not in seen:
-                collected.append(url)
-                seen.add(url)
+        for cand in batch:
+            if cand["url"] not in seen:
+                collected.append(cand)
+                seen.add(cand["url"])
 
         if not raw_videos.get("next_page") or not (raw_videos.get("videos") or []):
             break
         page += 1
 
-    video_save_path = []
     ts = int(time.time() * 1000)
-    for idx, url in enumerate(collected):
-        out_path = media_dir / f"pexels_video_{ts}_{idx}.mp4"
-        download_video(url, out_path)
-        video_save_path.append({'path': str(out_path)})
+    jobs = [
+        DownloadJob(
+            url=cand["url"],
+            provider=PEXELS_PROVIDER,
+            asset_id=cand["asset_id"],
+            rendition=cand["rendition"],
+            ext=cand["ext"],
+            target=media_dir / f"pexels_video_{ts}_{idx}.mp4",
+            full_size_ratio=cand["full_size_ratio"],
+        )
+        for idx, cand in enumerate(collected)
+    ]
+    video_save_path, results = _download_media(downloader, jobs)
 
-    return collected, video_save_path
+    return [cand["url"] for cand in collected], video_save_path, results
 
 def _normalize_orientation(orientation: str) -> Optional[str]:
     normalize_orientation = (orientation or "").strip().lower()
@@ -217,9 +371,34 @@ def _normalize_orientation(orientation: str) -> Optional[str]:
 def _infer_orientation(width: int, height: int) -> str:
     return "landscape" if width > height else "portrait"
 
-def _pick_best_video_link(video_files: list[dict[str, Any]]) -> Optional[str]:
+def _canvas_size(orientation: str) -> Tuple[int, int]:
+    long_edge = TARGET_LONG_EDGE_PX
+    short_edge = int(round(long_edge / DEFAULT_CANVAS_ASPECT_RATIO / 2)) * 2
+    if _normalize_orientation(orientation) == "portrait":
+        return short_edge, long_edge
+    return long_edge, short_edge
+
+def _cover_scale(width: int, height: int, canvas: Tuple[int, int]) -> float:
+    """Scale at which a width x height frame covers the canvas; <= 1 means no upscaling is needed."""
+    if width <= 0 or height <= 0:
+        return math.inf
+    return max(canvas[0] / width, canvas[1] / height)
+
+def _video_rendition(file_info: dict[str, Any]) -> str:
+    if file_info.get("id") is not None:
+        return f"file{file_info['id']}"
+    return f"{file_info.get('quality') or 'na'}_{file_info.get('width', 0)}x{file_info.get('height', 0)}"
+
+def _pick_best_video_file(
+        video_files: list[dict[str, Any]],
+        canvas: Tuple[int, int],
+    ) -> Tuple[Optional[dict[str, Any]], float]:
     """
-    Pick a "moderate" MP4 download link.
+    Pick the smallest MP4 rendition that covers `canvas` without upscaling (whatever the compose mode, render
+    never needs more), falling back to the largest one when none does.
+
+    Returns (file_info, full_size_ratio) where full_size_ratio estimates how many times more bytes the largest
+    rendition would have cost (from `size` when the API reports it, otherwise from pixel area).
     """
     mp4_candidates: list[dict[str, Any]] = []
     for file_info in video_files or []:
@@ -229,7 +408,23 @@ def _pick_best_video_link(video_files: list[dict[str, Any]]) -> Optional[str]:
             mp4_candidates.append(file_info)
 
     if not mp4_candidates:
-        return None
+        return None, 1.0
+
+    def dims(file_info: dict[str, Any]) -> Tuple[int, int]:
+        try:
+            return int(file_info.get("width") or 0), int(file_info.get("height") or 0)
+        except (TypeError, ValueError):
+            return 0, 0
+
+    def cost(file_info: dict[str, Any]) -> float:
+        try:
+            size = int(file_info.get("size") or 0)
+        except (TypeError, ValueError):
+            size = 0
+        if size > 0:
+            return float(size)
+        w, h = dims(file_info)
+        return float(w * h)
 
     def quality_preference(quality: Any) -> int:
         # Higher is better.
@@ -242,51 +437,44 @@ def _pick_best_video_link(video_files: list[dict[str, Any]]) -> Optional[str]:
             return 0
         return -1
 
-    def candidate_score(file_info: dict[str, Any]) -> tuple[int, int, int]:
-        width_px = int(file_info.get("width", 0))
-        height_px = int(file_info.get("height", 0))
-        file_size_bytes = int(file_info.get("size", 0))
-
-        long_edge_px = max(width_px, height_px)
-        long_edge_distance = abs(long_edge_px - TARGET_LONG_EDGE_PX)
-
-        return (
-            -long_edge_distance,
-            quality_preference(file_info.get("quality")),  # hd > sd > uhd > unknown
-            -file_size_bytes,                 # smaller file is better
-        )
+    covering = [f for f in mp4_candidates if _cover_scale(*dims(f), canvas) <= 1.0 + RENDITION_COVER_TOLERANCE]
+    if covering:
+        best = min(covering, key=lambda f: (cost(f), -quality_preference(f.get("quality"))))
+    else:
+        best = max(mp4_candidates, key=lambda f: (dims(f)[0] * dims(f)[1], quality_preference(f.get("quality"))))
 
-    best_candidate = max(mp4_candidates, key=candidate_score)
-    return best_candidate.get("link")
+    largest = max(cost(f) for f in mp4_candidates)
+    return best, (largest / cost(best) if cost(best) > 0 else 1.0)
 
-def download_photo(url: str, out_path: Path) -> None:
-    with requests.get(url, stream=True, timeout=120) as r:
-        r.raise_for_status()
-        with open(out_path, "wb") as f:
-            for chunk in r.iter_content(chunk_size=1024 * 1024):
-                if chunk:
-                    f.write(chunk)
+def _photo_rendition_url(original_url: str, width: int, height: int, canvas: Tuple[int, int]) -> Tuple[str, str, float]:
+    """
+    Resize an original Pexels photo on the CDN to just cover the canvas.
+    Returns (url, rendition key, full_size_ratio).
+    """
+    scale = _cover_scale(width, height, canvas)
+    if scale >= 1.0:
+        return original_url, "original", 1.0
+    target_w = int(math.ceil(width * scale))
+    sep = "&" if "?" in original_url else "?"
+    url = f"{original_url}{sep}{urlencode({'auto': 'compress', 'cs': 'tinysrgb', 'w': target_w})}"
+    return url, f"w{target_w}", 1.0 / (scale * scale)
 
-def search_photos(pexels_api_key: str, query: str, per_page, page) -> dict[str, Any]:
-    url = "https://api.pexels.com/v1/search"
-    headers = {"Authorization": pexels_api_key}
-    params = {"query": query, "per_page": per_page, "page": page}
-    r = requests.get(url, headers=headers, params=params, timeout=30)
-    r.raise_for_status()
-    return r.json()
+def search_photos(pexels_api_key: str, query: str, per_page, page, **kwargs) -> dict[str, Any]:
+    return _search("v1/search", pexels_api_key, query, per_page, page, **kwargs)
 
 def filter_photos(
         raw_photos: dict[str, Any],
         photo_number: int,
         orientation: str,
-    ) -> list[str]:
+    ) -> list[dict[str, Any]]:
+    """Returns candidates {"url", "asset_id", "rendition", "ext"}."""
 
     if photo_number <= 0:
         return []
 
     desired_orientation = _normalize_orientation(orientation)
 
-    results: list[str] = []
+    results: list[dict[str, Any]] = []
     seen: set[str] = set()
 
     photos = raw_photos.get("photos") or []
@@ -307,10 +495,16 @@ def filter_photos(
                 continue
 
         src = p.get("src") or {}
+        full_size_ratio = 1.0
         if desired_orientation is not None:
-            url = src.get(desired_orientation) or src.get("original")
+            # Pexels' orientation crops (1200x627 / 800x1200) already cover the default canvas
+            rendition_keys = (desired_orientation, "original")
         else:
-            url = src.get("original") or src.get("large2x") or src.get("large") or src.get("medium")
+            rendition_keys = ("original", "large2x", "large", "medium")
+        rendition = next((k for k in rendition_keys if src.get(k)), None)
+        url = src.get(rendition) if rendition else None
+        if url and rendition == "original":
+            url, rendition, full_size_ratio = _photo_rendition_url(url, w_i, h_i, _canvas_size(orientation))
 
         if not url:
             continue
@@ -318,7 +512,13 @@ def filter_photos(
         if url in seen:
             continue
 
-        results.append(url)
+        results.append({
+            "url": url,
+            "asset_id": str(p.get("id") or url),
+            "rendition": rendition,
+            "ext": ".jpg",
+            "full_size_ratio": full_size_ratio,
+        })
         seen.add(url)
 
         if len(results) >= photo_number:
@@ -332,14 +532,17 @@ def get_photo_media_from_pexels(
         media_dir: Path,
         photo_number: int,
         orientation: str,
-    ) -> tuple[list[str], list[str]]:
+        downloader: MediaDownloadCache,
+        api_base: str = DEFAULT_PEXELS_API_BASE,
+        cache: Optional[SearchResponseCache] = None,
+    ) -> tuple[list[str], list[Dict[str, Any]], list]:
 
     if photo_number <= 0:
-        return ([], [])
+        return ([], [], [])
 
     media_dir.mkdir(parents=True, exist_ok=True)
 
-    collected: list[str] = []
+    collected: list[dict[str, Any]] = []
     seen: set[str] = set()
 
     page = DEFAULT_PAGE
@@ -349,6 +552,8 @@ def get_photo_media_from_pexels(
             query=query,
             per_page=DEFAULT_RESULT_NUMBER_PER_PAGE,
             page=page,
+            api_base=api_base,
+            cache=cache,
         )
 
         batch = filter_photos(
@@ -357,20 +562,28 @@ def get_photo_media_from_pexels(
             orientation=orientation,
         )
 
-        for url in batch:
-            if url not in seen:
-                collected.append(url)
-                seen.add(url)
+        for cand in batch:
+            if cand["url"] not in seen:
+                collected.append(cand)
+                seen.add(cand["url"])
 
         if not raw_photos.get("next_page") or not (raw_photos.get("photos") or []):
             break
         page += 1
 
-    image_save_paths = []
     ts = int(time.time() * 1000)
-    for idx, url in enumerate(collected):
-        out_path = media_dir / f"pexels_photo_{ts}_{idx}.jpg"
-        download_photo(url, out_path)
-        image_save_paths.append({"path": str(out_path)})
+    jobs = [
+        DownloadJob(
+            url=cand["url"],
+            provider=PEXELS_PROVIDER,
+            asset_id=cand["asset_id"],
+            rendition=cand["rendition"],
+            ext=cand["ext"],
+            target=media_dir / f"pexels_photo_{ts}_{idx}.jpg",
+            full_size_ratio=cand["full_size_ratio"],
+        )
+        for idx, cand in enumerate(collected)
+    ]
+    image_save_paths, results = _download_media(downloader, jobs)
 
-    return collected, image_save_paths
\ No newline at end of file
+    return [cand["url"] for cand in collected], image_save_paths, results
\ No newline at end of file
@@ -1,4 +1,5 @@
-from typing import Any, Dict
+import math
+from typing import Any, Dict, Optional
 from pathlib import Path
 
 import numpy as np
@@ -13,6 +14,15 @@ from open_storyline.utils.recall import StorylineRecall
 from src.open_storyline.utils.prompts import get_prompt
 from open_storyline.utils.parse_json import parse_json_dict
 from open_storyline.utils.register import NODE_REGISTRY
+from open_storyline.utils.music_index import MusicAnalysisIndex
+
+# ffmpeg PCM pipe read size (float32 mono), ~1.5 s at 22.05 kHz
+_PCM_PIPE_BLOCK_BYTES = 1 << 17
+# librosa's HPSS defaults: 31-bin median filters, on a hop-512 STFT
+_HPSS_KERNEL = 31
+_HPSS_REFERENCE_HOP = 512
+# Analysis bounds are rounded up to this step, so nearby timeline estimates share one index entry
+_ANALYSIS_BOUND_STEP_SEC = 60
 
 @NODE_REGISTRY.register()
 class SelectBGMNode(BaseNode):
@@ -24,6 +34,7 @@ class SelectBGMNode(BaseNode):
         require_prior_kind=[],
         default_require_prior_kind=[],
         next_available_node=["plan_timeline"],
+        work_class="cpu",
     )
 
     input_schema = SelectBGMInput
@@ -31,7 +42,63 @@ class SelectBGMNode(BaseNode):
     def __init__(self, server_cfg):
         super().__init__(server_cfg)
         self.element_filter = ElementFilter(json_path=f"{self.server_cfg.project.bgm_dir}/meta.json")
-        self.vectorstore = StorylineRecall.build_vectorstore(self.element_filter.library)
+        self.vectorstore = StorylineRecall.build_vectorstore(self.element_filter.library, cache_name="bgm")
+        self.music_index = MusicAnalysisIndex(self.server_cfg.project.bgm_dir, analyze=self._analyze_track)
+        if self.server_cfg.select_bgm.index_in_background:
+            bgm_cfg = self.server_cfg.select_bgm
+            self.music_index.start_background_refresh(
+                self.analysis_params(bgm_cfg.sample_rate, bgm_cfg.hop_length, bgm_cfg.frame_length, bgm_cfg)
+            )
+
+    @staticmethod
+    def analysis_params(
+        sr: int,
+        hop_length: int,
+        frame_length: int,
+        bgm_cfg: Any = None,
+        max_analysis_sec: Optional[float] = None,
+    ) -> dict[str, Any]:
+        """
+        Everything that changes the analysis output; part of the sidecar index key.
+        `max_analysis_sec` defaults to the configured cap.
+        """
+        if max_analysis_sec is None:
+            max_analysis_sec = getattr(bgm_cfg, "max_analysis_sec", 0.0)
+        return {
+            "sample_rate": int(sr),
+            "hop_length": int(hop_length),
+            "frame_length": int(frame_length),
+            "max_analysis_sec": float(max_analysis_sec or 0.0),
+            "percussive_method": str(getattr(bgm_cfg, "percussive_method", "hpss")),
+        }
+
+    @staticmethod
+    def analysis_bound_sec(bgm_cfg: Any, timeline_ms: int) -> float:
+        """
+        How much of a track to analyse: the expected timeline plus `analysis_margin_sec`, rounded up to whole
+        steps and capped at `max_analysis_sec`. With the timeline unknown (0), the cap itself; 0 = whole track.
+        """
+        cap = float(getattr(bgm_cfg, "max_analysis_sec", 0.0) or 0.0)
+        if timeline_ms <= 0:
+            return cap
+        needed = timeline_ms / 1000.0 + float(getattr(bgm_cfg, "analysis_margin_sec", 0.0))
+        bound = math.ceil(needed / _ANALYSIS_BOUND_STEP_SEC) * _ANALYSIS_BOUND_STEP_SEC
+        return float(min(bound, cap) if cap > 0 else bound)
+
+    def estimate_timeline_ms(self, timeline_hint: Optional[Dict[str, Any]]) -> int:
+        """
+        Expected timeline length, laid out the way plan_timeline does: narrated groups run for their voiceover
+        plus the group margin; without voiceover, the clips' full length bounds it. 0 when nothing is known yet.
+        """
+        plan_cfg = self.server_cfg.plan_timeline
+        hint = timeline_hint or {}
+        voiceover_ms = [int(d) for d in hint.get("voiceover_ms") or [] if d and d > 0]
+        if voiceover_ms:
+            body_ms = sum(voiceover_ms) + len(voiceover_ms) * int(plan_cfg.group_margin_over_voiceover)
+        else:
+            # Images carry no duration (0) and are shown for image_default_duration
+            body_ms = sum(int(d) if d and d > 0 else int(plan_cfg.image_default_duration) for d in hint.get("clips_ms") or [])
+        return body_ms + int(plan_cfg.title_duration) if body_ms > 0 else 0
 
     async def default_process(
         self,
@@ -51,7 +118,8 @@ class SelectBGMNode(BaseNode):
         if not bgm_info:
             return {"bgm": {}}
 
-        result = self.analyze_music_metrics(bgm_info=bgm_info, sr=cfg.select_bgm.sample_rate, hop_length=cfg.select_bgm.hop_length, frame_length=cfg.select_bgm.frame_length)
+        timeline_ms = self.estimate_timeline_ms(inputs.get("timeline_hint"))
+        result = await self.run_blocking(self.analyze_music_metrics, bgm_info=bgm_info, sr=cfg.select_bgm.sample_rate, hop_length=cfg.select_bgm.hop_length, frame_length=cfg.select_bgm.frame_length, timeline_ms=timeline_ms)
         if result.get("path"):
             node_state.node_summary.info_for_user(f"Successfully choose music", preview_urls = [result.get("path")])
         else:
@@ -75,7 +143,7 @@ class SelectBGMNode(BaseNode):
             raise NotADirectoryError(f"bgm_dir is not a directory: {bgm_dir}")
         
         # Step2: Full Recall
-        candidates = StorylineRecall.query_top_n(self.vectorstore, query=user_request)
+        candidates = await self.run_blocking(StorylineRecall.query_top_n, self.vectorstore, query=user_request)
 
         # Step3: Filter tags
         candidates = self.element_filter.filter(candidates, filter_include, filter_exclude)
@@ -113,14 +181,44 @@ class SelectBGMNode(BaseNode):
         sr: int = 22050,
         hop_length = 2048,
         frame_length = 2048,
-
+        timeline_ms: int = 0,
     ) -> dict[str, Any]:
         path = Path(bgm_info.get("path"))
         if not path.exists():
             raise FileNotFoundError(f"File not found: {path}")
-        
-        y, sample_rate = self._load_audio_mono(path, sr=sr)
-        duration = int(librosa.get_duration(y=y, sr=sample_rate) * 1000)
+
+        bgm_cfg = self.server_cfg.select_bgm
+        # The background index analyses up to the cap, which covers any shorter bound
+        metrics = self.music_index.get(path, self.analysis_params(sr, hop_length, frame_length, bgm_cfg))
+        if metrics is None:
+            bound_sec = self.analysis_bound_sec(bgm_cfg, timeline_ms)
+            params = self.analysis_params(sr, hop_length, frame_length, bgm_cfg, max_analysis_sec=bound_sec)
+            metrics = self.music_index.get_or_compute(path, params)
+        return {
+            "bgm_id": bgm_info.get("id"),
+            "path": str(path),
+            **metrics,
+        }
+
+
+    @classmethod
+    def _analyze_track(cls, path: Path, params: dict[str, Any]) -> dict[str, Any]:
+        """
+        Full analysis of one track. Cached in the sidecar index, so it only runs for new or changed files.
+        """
+        sr = params["sample_rate"]
+        hop_length = params["hop_length"]
+        frame_length = params["frame_length"]
+        max_analysis_sec = float(params.get("max_analysis_sec") or 0.0)
+
+        # Only the head of long tracks is analysed. `duration` stays the real playable length (the timeline
+        # loops music on it); beats past `analysed_duration` are extrapolated, see _extend_beats.
+        y, sample_rate = cls._load_audio_mono(path, sr=sr, max_duration_sec=max_analysis_sec or None)
+        analysed_duration = int(librosa.get_duration(y=y, sr=sample_rate) * 1000)
+        try:
+            duration = max(int(librosa.get_duration(path=str(path)) * 1000), analysed_duration)
+        except Exception:
+            duration = analysed_duration
 
         if y.size < frame_length:
             raise RuntimeError("The selected background music is too short.")
@@ -137,7 +235,13 @@ class SelectBGMNode(BaseNode):
 
         beat_frames = np.asarray(beat_frames, dtype=int)
 
-        beat_times = self._compute_accent_beats(y=y, sr=sample_rate, beat_frames=beat_frames, hop_length=hop_length)
+        beat_times = cls._compute_accent_beats(
+            y=y,
+            sr=sample_rate,
+            beat_frames=beat_frames,
+            hop_length=hop_length,
+            percussive_method=params.get("percussive_method", "hpss"),
+        )
 
         rms = librosa.feature.rms(
             y=y,
@@ -155,12 +259,11 @@ class SelectBGMNode(BaseNode):
         dynamic_range_db = float(hi - lo)
 
         return {
-            "bgm_id": bgm_info.get("id"),
-            "path": str(path),
             "duration": duration,
+            "analysed_duration": analysed_duration,
             "sample_rate": sample_rate,
             "bpm": bpm_val,
-            "beats": beat_times,
+            "beats": cls._extend_beats(beat_times, analysed_duration, duration),
             "energy_mean": energy_mean,
             "energy_mean_db": energy_mean_db,
             "dynamic_range_db": dynamic_range_db,
@@ -168,55 +271,72 @@ class SelectBGMNode(BaseNode):
 
 
     @staticmethod
-    def _load_audio_mono(path: Path, sr: int) -> tuple[np.ndarray, int]:
+    def _load_audio_mono(path: Path, sr: int, max_duration_sec: float | None = None) -> tuple[np.ndarray, int]:
+        """
+        Decode at most `max_duration_sec` seconds (None = whole file) as mono float32 at `sr`.
+        librosa/soundfile read block-wise and stop at the bound; the ffmpeg fallback streams raw PCM from a pipe.
+        """
 
         try:
-            y, sr_out = librosa.load(path, sr=sr, mono=True)
+            y, sr_out = librosa.load(path, sr=sr, mono=True, duration=max_duration_sec)
             return y.astype(np.float32, copy=False), int(sr_out)
         except Exception as e1:
 
             # Librosa failed to read. ffmpeg is used as a fallback
-            import os
             import subprocess
-            import tempfile
-
-            tmp_wav = None
-            try: 
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-                    tmp_wav = tmp.name
-                
-                cmd = [
-                    "ffmpeg",
-                    "-y",
-                    "-i", str(path),
-                    "-ac", "1",
-                    "-ar", str(sr),
-                    "-vn",
-                    tmp_wav,
-                ]
-                subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-                y, sr_out = librosa.load(tmp_wav, sr=sr, mono=True)
-                return y.astype(np.float32, copy=False), int(sr_out)
-            
+
+            cmd = ["ffmpeg", "-v", "error", "-i", str(path)]
+            if max_duration_sec:
+                cmd += ["-t", f"{max_duration_sec:.3f}"]
+            cmd += ["-vn", "-ac", "1", "-ar", str(sr), "-f", "f32le", "pipe:1"]
+
+            try:
+                proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
             except FileNotFoundError as e_ffmpeg:
                 raise RuntimeError(
                     f"The audio cannot be loaded and ffmpeg is not found."
                 ) from e_ffmpeg
 
+            try:
+                blocks = []
+                while True:
+                    chunk = proc.stdout.read(_PCM_PIPE_BLOCK_BYTES)
+                    if not chunk:
+                        break
+                    blocks.append(np.frombuffer(chunk, dtype=np.float32))
+                _, err = proc.communicate()
+                if proc.returncode != 0:
+                    raise RuntimeError(err.decode("utf-8", errors="ignore").strip())
+                y = np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.float32)
+                return y, int(sr)
             except Exception as e2:
                 raise RuntimeError(
                     f"The audio cannot be loaded: {type(e1).__name__}: {e1}"
                     f"Ffmpeg error: {type(e2).__name__}: {e2}"
                 ) from e2
             finally:
-                if tmp_wav is not None:
-                    try:
-                        os.remove(tmp_wav)
-                    except Exception:
-                        pass
+                if proc.poll() is None:
+                    proc.kill()
 
 
+    @staticmethod
+    def _extend_beats(beats_ms: list, analysed_ms: int, duration_ms: int) -> list:
+        """
+        Continue the accents of the analysed head over the rest of the track at their median spacing,
+        so beat snapping keeps working after `analysed_ms` (assumes a steady tempo, as `bpm` does).
+        """
+        if duration_ms <= analysed_ms or len(beats_ms) < 2:
+            return beats_ms
+        step = float(np.median(np.diff(beats_ms)))
+        if step <= 0:
+            return beats_ms
+        extended = list(beats_ms)
+        t = extended[-1] + step
+        while t <= duration_ms:
+            extended.append(round(t))
+            t += step
+        return extended
+
     @staticmethod
     def _compute_accent_beats(
         y: np.ndarray,
@@ -226,6 +346,7 @@ class SelectBGMNode(BaseNode):
         top_pct: float = 70.0,          
         min_sep_beats: int = 1,         # Min beat separation: 1 prevents selecting adjacent beats
         use_percussive: bool = True,    # Calculate onset strength from percussive component
+        percussive_method: str = "hpss",# "hpss": separate the waveform; "spectral_hpss": separate the analysis spectrogram
         local_norm_win: int = 8,        # Window size for local normalization (measured in beats)
         require_local_peak: bool = True # Only retain onsets that are local maxima
     ) -> list[float]:
@@ -237,8 +358,11 @@ class SelectBGMNode(BaseNode):
             return []
 
         # 1) Use percussive version for onset envelope
-        y_for_onset = librosa.effects.percussive(y) if use_percussive else y
-        onset_env = librosa.onset.onset_strength(y=y_for_onset, sr=sr, hop_length=hop_length)
+        if use_percussive and percussive_method == "spectral_hpss":
+            onset_env = _spectral_percussive_envelope(y, sr=sr, hop_length=hop_length)
+        else:
+            y_for_onset = librosa.effects.percussive(y) if use_percussive else y
+            onset_env = librosa.onset.onset_strength(y=y_for_onset, sr=sr, hop_length=hop_length)
 
         # 2) Use onset strength at each beat time as beat strength
         beat_frames_clip = np.clip(beat_frames.astype(int), 0, len(onset_env) - 1)
@@ -287,3 +411,18 @@ class SelectBGMNode(BaseNode):
         accent_times_ms = [round(x * 1000) for x in accent_times]
 
         return accent_times_ms
+
+
+def _spectral_percussive_envelope(y: np.ndarray, sr: int, hop_length: int) -> np.ndarray:
+    """
+    Onset strength of the percussive part, separated on the magnitude spectrogram at the analysis hop.
+
+    librosa.effects.percussive separates a hop-512 STFT, resynthesises audio and onset_strength transforms it
+    again; here the percussive magnitudes go straight into onset_strength, on the same frames as `beat_frames`.
+    The time median filter is scaled to span the same ~0.7 s as librosa's 31 frames at hop 512.
+    """
+    S = np.abs(librosa.stft(y, n_fft=2048, hop_length=hop_length))
+    harmonic_kernel = max(3, round(_HPSS_KERNEL * _HPSS_REFERENCE_HOP / hop_length) | 1)
+    _, percussive = librosa.decompose.hpss(S, kernel_size=(harmonic_kernel, _HPSS_KERNEL))
+    mel_db = librosa.power_to_db(librosa.feature.melspectrogram(S=percussive ** 2, sr=sr))
+    return librosa.onset.onset_strength(S=mel_db, sr=sr, hop_length=hop_length)
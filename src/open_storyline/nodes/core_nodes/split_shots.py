@@ -427,6 +427,7 @@ class SplitShotsNode(BaseNode):
         require_prior_kind=["load_media"],
         default_require_prior_kind=["load_media"],
         next_available_node=["understand_clips", "understand_clips_pro"],
+        work_class="heavy",
     )
     input_schema = SplitShotsInput
 
@@ -500,7 +501,9 @@ class SplitShotsNode(BaseNode):
             )
 
         for media_item in media:
-            new_clips, clip_index = self._process_single_media_item(
+            # ffmpeg decode + TransNetV2 inference + segmenting, in the heavy pool
+            new_clips, clip_index = await self.run_blocking(
+                self._process_single_media_item,
                 media_item=media_item,
                 output_directory=output_directory,
                 starting_clip_index=clip_index,
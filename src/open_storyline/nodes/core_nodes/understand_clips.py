@@ -1,5 +1,10 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 import asyncio
+import math
+import time
+
+import numpy as np
+from PIL import Image
 
 from open_storyline.nodes.core_nodes.base_node import BaseNode, NodeMeta
 from src.open_storyline.utils.prompts import get_prompt
@@ -7,6 +12,21 @@ from open_storyline.utils.parse_json import parse_json_dict
 from open_storyline.nodes.node_state import NodeState
 from open_storyline.nodes.node_schema import UnderstandClipsInput
 from open_storyline.utils.register import NODE_REGISTRY
+from open_storyline.utils.perceptual_hash import DHASH_HEIGHT, DHASH_WIDTH, cluster_by_hamming, dhash_from_gray, dhash_from_image
+from open_storyline.utils.video_frames import get_frame_extractor
+from open_storyline.utils.frame_budget import (
+    MOTION_PROBE_FRAMES,
+    MOTION_PROBE_HEIGHT,
+    MOTION_PROBE_WIDTH,
+    allocate_frame_budget,
+    estimate_motion,
+)
+from open_storyline.mcp.sampling_handler import (
+    DEFAULT_FRAMES_PER_SEC,
+    DEFAULT_MAX_FRAMES,
+    DEFAULT_MIN_FRAMES,
+    GLOBAL_MAX_IMAGE_BLOCKS,
+)
 
 @NODE_REGISTRY.register()
 class UnderstandClipsNode(BaseNode):
@@ -22,6 +42,7 @@ class UnderstandClipsNode(BaseNode):
         require_prior_kind=['load_media', 'split_shots'],
         default_require_prior_kind=['load_media', 'split_shots'],
         next_available_node=['filter_clips', 'filter_clips_pro'],
+        work_class="cpu",
     )
 
     input_schema = UnderstandClipsInput
@@ -54,6 +75,7 @@ class UnderstandClipsNode(BaseNode):
         """
         inputs: Previous node results read by BaseNode.load_inputs(ctx)
         """
+        started_at = time.perf_counter()
         load_media = inputs["media"]
         clips = inputs["split_shots"]["clips"]
         llm = node_state.llm
@@ -63,7 +85,40 @@ class UnderstandClipsNode(BaseNode):
 
         clip_captions: list[dict[str, Any]] = []
 
-        for clip in clips or []:
+        # 近重复片段只调用一次 VLM，其余复用代表片段的描述
+        cfg = self.server_cfg.understand_clips
+        dup_rep: dict[str, str] = {}
+        if cfg.dedup_enabled and len(clips or []) > 1:
+            try:
+                dup_rep = await self.run_blocking(
+                    _find_near_duplicate_clips,
+                    clips,
+                    load_media,
+                    cfg.dedup_max_hamming,
+                    cfg.dedup_frames_per_clip,
+                )
+            except Exception as e:
+                node_state.node_summary.add_warning(f"Near-duplicate clip detection skipped: {type(e).__name__}: {e}")
+        captioned: dict[str, dict[str, Any]] = {}
+        shared_count = 0
+
+        # 按运动量在单次运行预算内分配每个片段的帧数
+        frame_budget: dict[str, int] = {}
+        if cfg.adaptive_frames:
+            to_caption = [c for c in clips or [] if str(c.get("clip_id", "") or "").strip() not in dup_rep]
+            try:
+                frame_budget = await self.run_blocking(_allocate_clip_frames, to_caption, load_media, cfg)
+            except Exception as e:
+                node_state.node_summary.add_warning(f"Adaptive frame allocation skipped: {type(e).__name__}: {e}")
+        image_blocks_sent = 0
+        image_blocks_fixed = 0
+
+        # (clip_index, clip, out_item, media) of clips that need a VLM caption
+        pending: list[tuple[int, Dict[str, Any], dict[str, Any], list[Any]]] = []
+        duplicates: list[tuple[int, Dict[str, Any], dict[str, Any], list[Any]]] = []
+        results: dict[int, dict[str, Any]] = {}
+
+        for idx, clip in enumerate(clips or []):
             clip_id = str(clip.get("clip_id", "") or "").strip() or "(unknown_clip)"
             kind = str(clip.get("kind", "") or "").strip().lower()
             src = clip.get("source_ref") or {}
@@ -74,16 +129,15 @@ class UnderstandClipsNode(BaseNode):
             out_item: dict[str, Any] = {
                 "clip_id": clip_id,
             }
+            results[idx] = out_item
             
             if not media_item:
                 out_item["caption"] = f"Error: Media not found for media_id={media_id}"
-                clip_captions.append(out_item)
                 continue
 
             path = str(media_item.get("path", "") or "").strip()
             if not path:
                 out_item["caption"] = f"Error: No path specified for media_id={media_id}"
-                clip_captions.append(out_item)
                 continue
 
             # 组装 media
@@ -91,73 +145,61 @@ class UnderstandClipsNode(BaseNode):
 
             if kind == "image":
                 media = [{"path": path}]
+                image_blocks_fixed += 1
 
             elif kind == "video":
-                in_sec = _safe_float(src.get("start", 0) / 1000.0, 0.0)
-
-                if src.get("end") is not None:
-                    out_sec = _safe_float(src.get("end", 0) / 1000.0, in_sec)
-                else:
-                    dur = _safe_float(src.get("duration", 0.0), 0.0)
-                    out_sec = in_sec + max(0.0, dur)
-                
-                if out_sec <= in_sec:
-                    out_sec = in_sec + 0.1
-
+                in_sec, out_sec = _clip_window_sec(src)
                 media = [{
                     "path": path,
                     "in_sec": in_sec,
                     "out_sec": out_sec,
                 }]
+                image_blocks_fixed += _fixed_policy_frames(out_sec - in_sec)
+                if clip_id in frame_budget:
+                    media[0]["num_frames"] = frame_budget[clip_id]
             else:
                 out_item["caption"] = f"Error: Clip kind not supported: {kind}"
-                clip_captions.append(out_item)
-                continue
-    
-            max_retries = 2
-            raw = None
-            last_exc: Exception | None = None
-
-            for attempt in range(max_retries + 1):
-                try:
-                    raw = await llm.complete(
-                        system_prompt=system_prompt,
-                        user_prompt=user_prompt,
-                        media=media,
-                        temperature=0.3,
-                        top_p=0.9,
-                        max_tokens=2048,
-                        model_preferences=None,
-                    )
-                    if raw is not None:
-                        last_exc = None
-                        break
-                except Exception as e:
-                    last_exc = e
-
-                if attempt < max_retries:
-                    await asyncio.sleep(0.3 * (attempt + 1))
-
-            if raw is None:
-                out_item["caption"] = "Error: VLM request failed"
-                out_item["aes_score"] = -1.0
-                node_state.node_summary.add_error(repr(last_exc))
-                clip_captions.append(out_item)
                 continue
 
-            try:
-                obj = parse_json_dict(raw)
-            except Exception:
-                text = (raw or "").strip()
-                out_item["caption"] = text if text else "Error: Unable to parse model output"
-                clip_captions.append(out_item)
+            if clip_id in dup_rep:
+                duplicates.append((idx, clip, out_item, media))
+            else:
+                pending.append((idx, clip, out_item, media))
+
+        # 批量模式：多个短片段合并成一次 VLM 请求，解析失败的片段再单独重试
+        batches = _pack_caption_batches(pending, cfg) if cfg.batch_mode else [[job] for job in pending]
+        vlm_requests = 0
+        for batch in batches:
+            image_blocks_sent += sum(_media_image_blocks(media) for _, _, _, media in batch)
+            failed = batch
+            if len(batch) > 1:
+                vlm_requests += 1
+                failed = await self._caption_batch(node_state, batch)
+                failed_ids = {out_item["clip_id"] for _, _, out_item, _ in failed}
+                for _, _, out_item, _ in batch:
+                    if out_item["clip_id"] not in failed_ids:
+                        captioned[out_item["clip_id"]] = out_item
+                image_blocks_sent += sum(_media_image_blocks(media) for _, _, _, media in failed)
+            for _, clip, out_item, media in failed:
+                vlm_requests += 1
+                if await self._caption_one(node_state, system_prompt, user_prompt, clip, out_item, media):
+                    captioned[out_item["clip_id"]] = out_item
+
+        for _, clip, out_item, media in duplicates:
+            rep_item = captioned.get(dup_rep[out_item["clip_id"]])
+            if rep_item is not None:
+                out_item["caption"] = rep_item["caption"]
+                out_item["caption_shared_from"] = rep_item["clip_id"]
+                out_item["source_ref"] = {"media_id": (clip.get("source_ref") or {}).get("media_id", "")}
+                shared_count += 1
                 continue
+            # 代表片段理解失败时，重复片段自己走单独请求
+            image_blocks_sent += _media_image_blocks(media)
+            vlm_requests += 1
+            if await self._caption_one(node_state, system_prompt, user_prompt, clip, out_item, media):
+                captioned[out_item["clip_id"]] = out_item
 
-            out_item["caption"] = str(obj.get("caption", "") or "").strip()
-            out_item["source_ref"] = {
-                "media_id": clip.get("source_ref", {}).get("media_id", ""),
-            }
-            clip_captions.append(out_item)
+        clip_captions = [results[i] for i in sorted(results)]
 
         desc_lines: list[str] = []
         for desc in clip_captions:
@@ -182,11 +224,114 @@ class UnderstandClipsNode(BaseNode):
             
             except Exception as e:
                 overall_summary = f"Error: Summary generation failed: {type(e).__name__}: {e}"
-            node_state.node_summary.info_for_user(f"Clip understanding completed. Analyzed {len(clip_captions)} clips in total. Overall description: {overall_summary}")
+            dedup_note = (
+                f" {shared_count} near-duplicate clips reused a representative caption ({shared_count} VLM calls saved)."
+                if shared_count else ""
+            )
+            node_state.node_summary.info_for_user(f"Clip understanding completed. Analyzed {len(clip_captions)} clips in total.{dedup_note} Overall description: {overall_summary}")
+        node_state.node_summary.info_for_user(
+            f"Image blocks sent: {image_blocks_sent} (fixed per-clip policy: {image_blocks_fixed}); "
+            f"VLM requests: {vlm_requests}; understand_clips took {time.perf_counter() - started_at:.1f}s"
+        )
         return {
             "clip_captions": clip_captions,
             "overall": overall_summary
         }
+
+    async def _caption_one(
+        self,
+        node_state: NodeState,
+        system_prompt: str,
+        user_prompt: str,
+        clip: Dict[str, Any],
+        out_item: dict[str, Any],
+        media: list[Any],
+    ) -> bool:
+        """
+        Caption a single clip into `out_item`; returns True if the model produced a parseable caption.
+        """
+        max_retries = 2
+        raw = None
+        last_exc: Exception | None = None
+
+        for attempt in range(max_retries + 1):
+            try:
+                raw = await node_state.llm.complete(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    media=media,
+                    temperature=0.3,
+                    top_p=0.9,
+                    max_tokens=2048,
+                    model_preferences=None,
+                )
+                if raw is not None:
+                    last_exc = None
+                    break
+            except Exception as e:
+                last_exc = e
+
+            if attempt < max_retries:
+                await asyncio.sleep(0.3 * (attempt + 1))
+
+        if raw is None:
+            out_item["caption"] = "Error: VLM request failed"
+            out_item["aes_score"] = -1.0
+            node_state.node_summary.add_error(repr(last_exc))
+            return False
+
+        try:
+            obj = parse_json_dict(raw)
+        except Exception:
+            text = (raw or "").strip()
+            out_item["caption"] = text if text else "Error: Unable to parse model output"
+            return False
+
+        out_item["caption"] = str(obj.get("caption", "") or "").strip()
+        out_item["source_ref"] = {
+            "media_id": clip.get("source_ref", {}).get("media_id", ""),
+        }
+        return True
+
+    async def _caption_batch(
+        self,
+        node_state: NodeState,
+        batch: list[tuple[int, Dict[str, Any], dict[str, Any], list[Any]]],
+    ) -> list[tuple[int, Dict[str, Any], dict[str, Any], list[Any]]]:
+        """
+        Caption several clips with one VLM request. Returns the jobs whose caption is missing from the response.
+        """
+        clip_ids = [out_item["clip_id"] for _, _, out_item, _ in batch]
+        media: list[Any] = [m for _, _, _, job_media in batch for m in job_media]
+        clip_list = "\n".join(f"- Media {i + 1}: {cid}" for i, cid in enumerate(clip_ids))
+        try:
+            raw = await node_state.llm.complete(
+                system_prompt=get_prompt("understand_clips.system_batch", lang=node_state.lang),
+                user_prompt=get_prompt("understand_clips.user_batch", lang=node_state.lang, clip_list=clip_list),
+                media=media,
+                temperature=0.3,
+                top_p=0.9,
+                max_tokens=min(8192, 512 * len(batch) + 512),
+                model_preferences=None,
+            )
+            obj = parse_json_dict(raw or "")
+        except Exception as e:
+            node_state.node_summary.debug_for_dev(f"Batched caption request for {len(batch)} clips failed: {type(e).__name__}: {e}")
+            return batch
+
+        failed = []
+        for job in batch:
+            _, clip, out_item, _ = job
+            entry = obj.get(out_item["clip_id"])
+            caption = str(entry.get("caption", "") or "").strip() if isinstance(entry, dict) else ""
+            if not caption:
+                failed.append(job)
+                continue
+            out_item["caption"] = caption
+            out_item["source_ref"] = {
+                "media_id": clip.get("source_ref", {}).get("media_id", ""),
+            }
+        return failed
     
 
     def _parse_input(self, node_state: NodeState, inputs: Dict[str, Any]):
@@ -200,6 +345,170 @@ class UnderstandClipsNode(BaseNode):
         inputs.update({"media": load_media})
         return inputs
 
+def _clip_window_sec(src: Dict[str, Any]) -> tuple[float, float]:
+    in_sec = _safe_float(src.get("start", 0) / 1000.0, 0.0)
+
+    if src.get("end") is not None:
+        out_sec = _safe_float(src.get("end", 0) / 1000.0, in_sec)
+    else:
+        dur = _safe_float(src.get("duration", 0.0), 0.0)
+        out_sec = in_sec + max(0.0, dur)
+
+    if out_sec <= in_sec:
+        out_sec = in_sec + 0.1
+    return in_sec, out_sec
+
+
+def _media_image_blocks(media: list[Any]) -> int:
+    """Image blocks the sampling client will build for `media`."""
+    total = 0
+    for m in media:
+        if m.get("in_sec") is None:
+            total += 1
+        else:
+            total += m.get("num_frames") or _fixed_policy_frames(m["out_sec"] - m["in_sec"])
+    return total
+
+
+def _pack_caption_batches(
+    jobs: list[tuple[int, Dict[str, Any], dict[str, Any], list[Any]]],
+    cfg: Any,
+) -> list[list[tuple[int, Dict[str, Any], dict[str, Any], list[Any]]]]:
+    """
+    Greedily pack consecutive short clips into batches. K adapts to the clips' frame counts so a batch never
+    exceeds the client's GLOBAL_MAX_IMAGE_BLOCKS (frames beyond it would be dropped by _build_media_blocks).
+    Long clips always get their own request.
+    """
+    batches: list[list[tuple[int, Dict[str, Any], dict[str, Any], list[Any]]]] = []
+    current: list[tuple[int, Dict[str, Any], dict[str, Any], list[Any]]] = []
+    current_blocks = 0
+    for job in jobs:
+        media = job[3]
+        blocks = _media_image_blocks(media)
+        seg = media[0]
+        duration = (seg["out_sec"] - seg["in_sec"]) if seg.get("in_sec") is not None else 0.0
+        if duration > cfg.batch_max_clip_sec:
+            batches.append([job])
+            continue
+        if current and (len(current) >= cfg.batch_max_clips or current_blocks + blocks > GLOBAL_MAX_IMAGE_BLOCKS):
+            batches.append(current)
+            current, current_blocks = [], 0
+        current.append(job)
+        current_blocks += blocks
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _fixed_policy_frames(duration_sec: float) -> int:
+    """Frames the sampling client picks for a segment when no per-clip count is requested."""
+    n = int(math.ceil(max(0.0, duration_sec) * DEFAULT_FRAMES_PER_SEC))
+    return max(DEFAULT_MIN_FRAMES, min(DEFAULT_MAX_FRAMES, n))
+
+
+def _allocate_clip_frames(
+    clips: list[Dict[str, Any]],
+    load_media: Dict[str, Dict[str, Any]],
+    cfg: Any,
+) -> dict[str, int]:
+    """
+    {clip_id: frame count} for video clips, from a tiny gray decode of each clip.
+    Clips that cannot be probed are left out and fall back to the client's default sampling.
+    The run budget is `run_budget_ratio` times what the fixed policy would send for the same clips, so with the
+    default ratio of 1.0 frames are moved from static clips to busy ones rather than added.
+    """
+    extractor = get_frame_extractor()
+    clip_ids: list[str] = []
+    durations: list[float] = []
+    motions: list[float] = []
+    for clip in clips:
+        if str(clip.get("kind", "") or "").strip().lower() != "video":
+            continue
+        src = clip.get("source_ref") or {}
+        media_item = load_media.get(str(src.get("media_id", "") or ""))
+        path = str((media_item or {}).get("path", "") or "").strip()
+        if not path:
+            continue
+        in_sec, out_sec = _clip_window_sec(src)
+        times = [in_sec + ((i + 0.5) / MOTION_PROBE_FRAMES) * (out_sec - in_sec) for i in range(MOTION_PROBE_FRAMES)]
+        try:
+            grays = extractor.extract_arrays(path, times, MOTION_PROBE_WIDTH, MOTION_PROBE_HEIGHT, "gray")
+        except Exception:
+            continue
+        clip_ids.append(str(clip.get("clip_id", "") or "").strip())
+        durations.append(out_sec - in_sec)
+        motions.append(estimate_motion(grays))
+
+    run_budget = 0
+    if cfg.run_budget_ratio > 0:
+        fixed_total = sum(_fixed_policy_frames(d) for d in durations)
+        run_budget = max(len(durations) * cfg.min_frames, int(fixed_total * cfg.run_budget_ratio))
+    counts = allocate_frame_budget(
+        durations,
+        motions,
+        sample_fps=cfg.sample_fps,
+        min_frames=cfg.min_frames,
+        max_frames=min(cfg.max_frames, cfg.adaptive_max_frames, GLOBAL_MAX_IMAGE_BLOCKS),
+        run_budget=run_budget,
+    )
+    return dict(zip(clip_ids, counts))
+
+
+def _clip_signature(clip: Dict[str, Any], media_item: Optional[Dict[str, Any]], frames_per_clip: int) -> Optional[np.ndarray]:
+    """
+    Concatenated dHashes of `frames_per_clip` frames sampled at bucket centers; None if the clip cannot be hashed.
+    """
+    if not media_item:
+        return None
+    path = str(media_item.get("path", "") or "").strip()
+    kind = str(clip.get("kind", "") or "").strip().lower()
+    if not path:
+        return None
+
+    if kind == "image":
+        with Image.open(path) as img:
+            return np.tile(dhash_from_image(img), frames_per_clip)
+
+    if kind == "video":
+        in_sec, out_sec = _clip_window_sec(clip.get("source_ref") or {})
+        times = [in_sec + ((i + 0.5) / frames_per_clip) * (out_sec - in_sec) for i in range(frames_per_clip)]
+        grays = get_frame_extractor().extract_arrays(path, times, DHASH_WIDTH, DHASH_HEIGHT, "gray")
+        if any(g is None for g in grays):
+            return None
+        return np.concatenate([dhash_from_gray(g) for g in grays])
+
+    return None
+
+
+def _find_near_duplicate_clips(
+    clips: list[Dict[str, Any]],
+    load_media: Dict[str, Dict[str, Any]],
+    max_hamming: int,
+    frames_per_clip: int,
+) -> dict[str, str]:
+    """
+    Returns {clip_id: representative clip_id} for every clip that duplicates an earlier one.
+    """
+    clip_ids: list[str] = []
+    signatures: list[Optional[np.ndarray]] = []
+    kinds: list[str] = []
+    for clip in clips:
+        clip_ids.append(str(clip.get("clip_id", "") or "").strip())
+        kinds.append(str(clip.get("kind", "") or "").strip().lower())
+        media_id = str((clip.get("source_ref") or {}).get("media_id", "") or "")
+        try:
+            signatures.append(_clip_signature(clip, load_media.get(media_id), frames_per_clip))
+        except Exception:
+            signatures.append(None)
+
+    rep_of = cluster_by_hamming(signatures, max_hamming, groups=kinds)
+    return {
+        clip_ids[i]: clip_ids[r]
+        for i, r in enumerate(rep_of)
+        if r != i and clip_ids[i] and clip_ids[r]
+    }
+
+
 def _safe_float(x: Any, default: float = 0.0) -> float:
     try:
         if x is None:
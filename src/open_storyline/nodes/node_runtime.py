@@ -0,0 +1,172 @@
+"""
+Where node work runs inside the MCP server process.
+
+Every node coroutine runs on the one FastMCP event loop, so any synchronous work inside `process` (ffmpeg
+decode, TransNetV2 inference, librosa analysis, media probing, base64 packing of clips) stalls every other
+session's tool calls and sampling callbacks. Nodes hand such work to `BaseNode.run_blocking`, which dispatches
+it to a bounded thread pool chosen by the node's `NodeMeta.work_class`:
+
+- "io":    file / network / subprocess waits and light native work (probing, downloads, packing outputs)
+- "cpu":   numeric work in native code that releases the GIL (librosa, numpy, frame hashing)
+- "heavy": model inference and full video decode/encode, which take several cores or the GPU each;
+           kept to very few at a time so concurrent sessions queue instead of thrashing
+
+Threads rather than processes: node instances hold loaded models, vector stores and NodeSummary objects that
+cannot be pickled, and the heavy libraries release the GIL while they work.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional, TypeVar
+
+from open_storyline.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+WORK_CLASSES = ("io", "cpu", "heavy")
+DEFAULT_WORK_LIMITS: Dict[str, int] = {
+    "io": 16,
+    "cpu": max(1, min(4, os.cpu_count() or 1)),
+    "heavy": 2,
+}
+
+
+class NodeRuntime:
+    """One bounded thread pool per work class, created lazily and shared by all sessions."""
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        self.limits = dict(DEFAULT_WORK_LIMITS)
+        self._pools: Dict[str, ThreadPoolExecutor] = {}
+        self._lock = threading.Lock()
+        self._stats = {wc: {"calls": 0, "running": 0, "queued": 0, "wait_sec": 0.0, "max_wait_sec": 0.0, "busy_sec": 0.0} for wc in WORK_CLASSES}
+        if limits:
+            self.configure(limits)
+
+    def configure(self, limits: Dict[str, int]) -> None:
+        """Set per-class worker limits; classes whose pool already exists keep their pool until shutdown()."""
+        for work_class, limit in limits.items():
+            if work_class not in WORK_CLASSES:
+                raise ValueError(f"unknown work class `{work_class}`, expected one of {WORK_CLASSES}")
+            self.limits[work_class] = max(1, int(limit))
+
+    def _pool(self, work_class: str) -> ThreadPoolExecutor:
+        pool = self._pools.get(work_class)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(work_class)
+                if pool is None:
+                    pool = ThreadPoolExecutor(max_workers=self.limits[work_class], thread_name_prefix=f"node-{work_class}")
+                    self._pools[work_class] = pool
+        return pool
+
+    async def run(self, work_class: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run `fn(*args, **kwargs)` in the pool of `work_class`; contextvars are carried over like asyncio.to_thread."""
+        if work_class not in WORK_CLASSES:
+            raise ValueError(f"unknown work class `{work_class}`, expected one of {WORK_CLASSES}")
+        stats = self._stats[work_class]
+        ctx = contextvars.copy_context()
+        submitted_at = time.perf_counter()
+
+        def call() -> T:
+            started_at = time.perf_counter()
+            wait = started_at - submitted_at
+            with self._lock:
+                stats["queued"] -= 1
+                stats["running"] += 1
+                stats["wait_sec"] += wait
+                stats["max_wait_sec"] = max(stats["max_wait_sec"], wait)
+            try:
+                return ctx.run(functools.partial(fn, *args, **kwargs))
+            finally:
+                with self._lock:
+                    stats["running"] -= 1
+                    stats["busy_sec"] += time.perf_counter() - started_at
+
+        with self._lock:
+            stats["calls"] += 1
+            stats["queued"] += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool(work_class), call)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                wc: {
+                    "limit": self.limits[wc],
+                    **{k: round(v, 3) if isinstance(v, float) else v for k, v in s.items()},
+                }
+                for wc, s in self._stats.items()
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+NODE_RUNTIME = NodeRuntime()
+
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop wakes up from a short sleep. Lag near zero means coroutines are scheduled
+    promptly; lag of hundreds of ms means something is blocking the loop. Logs a summary every `report_every_sec`
+    when the worst lag in the window exceeds `warn_ms`.
+    """
+
+    def __init__(self, interval_sec: float = 0.05, window: int = 1200, warn_ms: float = 200.0, report_every_sec: float = 60.0):
+        self.interval_sec = interval_sec
+        self.warn_ms = warn_ms
+        self.report_every_sec = report_every_sec
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.max_lag_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> "LoopLagMonitor":
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="loop-lag-monitor")
+        return self
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        last_report = loop.time()
+        while True:
+            expected = loop.time() + self.interval_sec
+            await asyncio.sleep(self.interval_sec)
+            lag_ms = max(0.0, (loop.time() - expected) * 1000)
+            self.samples.append(lag_ms)
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+            if loop.time() - last_report >= self.report_every_sec:
+                last_report = loop.time()
+                summary = self.summary()
+                if summary["max_ms"] >= self.warn_ms:
+                    logger.warning(f"[NodeRuntime] event loop lag {summary}, pools {NODE_RUNTIME.stats()}")
+
+    def summary(self) -> Dict[str, float]:
+        samples = sorted(self.samples)
+        if not samples:
+            return {"samples": 0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+
+        def pct(q: float) -> float:
+            return round(samples[min(len(samples) - 1, int(q * len(samples)))], 1)
+
+        return {"samples": len(samples), "p50_ms": pct(0.5), "p99_ms": pct(0.99), "max_ms": round(samples[-1], 1)}
@@ -381,6 +381,10 @@ class RecommendTextOutput(BaseInput):
 
 class PlanTimelineInput(BaseInput):
     use_beats: Annotated[bool, Field(default=True, description="Whether clip transitions should sync with BGM beats")]
+    changed_group_ids: Annotated[List[str] | None, Field(
+        default=None,
+        description="When the user edited only some groups (script or voiceover), their group_ids. Only these groups are re-planned against the previous timeline; the others keep their clips and source windows. Leave unset to plan from scratch."
+    )]
 
 class PlanTimelineOutput(BaseModel):
     tracks: List[TimelineTracks] = Field(default_factory=list, description="Timeline track collection")
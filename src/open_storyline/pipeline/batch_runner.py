@@ -0,0 +1,334 @@
+"""
+BatchRunner — 无界面批量出片
+
+读取作业清单（JSON Lines，每行一个作业：素材目录 + 编辑模板 + 节点参数覆盖），
+由固定数量的 worker 并发执行 PipelineExecutor：
+- 每个作业用自己的会话 ID 构建 MCP 客户端（请求头 X-Storyline-Session-Id），服务端的会话状态互不干扰
+- 作业相互隔离：单个作业出错或超时只记入状态文件，不影响其余作业；超时的作业连同正在运行的节点一并取消
+- 状态文件只追加写入；崩溃后用同一清单重跑，已完成的作业直接跳过，
+  未完成的作业沿用同一会话，已跑完的节点由 NodeMemo 复用；resume=True 时按会话中的执行状态
+  （PipelineCheckpoint）从未完成的节点续跑
+- 结束时给出吞吐 / 延迟报告：jobs/hour、作业耗时与各节点耗时的 p50 / p95
+
+LLM / VLM / TTS 地址均来自配置文件或作业中的覆盖项，指向本地服务即可离线运行。
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from pydantic import BaseModel, Field
+
+from open_storyline.agent import ClientContext, build_agent
+from open_storyline.config import Settings
+from open_storyline.mcp.hooks.node_interceptors import ToolInterceptor
+from open_storyline.pipeline.edit_template import EditTemplate, NodeConfig
+from open_storyline.pipeline.node_memo import NodeMemo
+from open_storyline.pipeline.pipeline_executor import PipelineExecutor
+from open_storyline.pipeline.template_store import TemplateStore
+from open_storyline.storage.agent_memory import ArtifactStore
+from open_storyline.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_BATCH_WORKERS = 2
+
+
+class BatchJob(BaseModel):
+    """清单中的一个作业"""
+    job_id: str = Field(..., description="作业 ID，清单内唯一；同时决定会话 ID，重跑时据此续跑")
+    media_dir: str = Field(..., description="素材目录")
+    template_id: Optional[str] = Field(default=None, description="TemplateStore 中的模板 ID（含预设模板）")
+    template: Optional[EditTemplate] = Field(default=None, description="内联模板；清单中也可写模板 JSON 文件路径")
+    overrides: Dict[str, Dict[str, Any]] = Field(
+        default_factory=dict,
+        description="node_id -> NodeConfig 字段覆盖，如 {'generate_script': {'params': {'user_request': '...'}}}；params 按键合并",
+    )
+    lang: str = Field(default="zh")
+    tts_config: Optional[Dict[str, Any]] = Field(default=None, description="同 Web 端的 TTS 配置")
+    llm: Optional[Dict[str, Any]] = Field(default=None, description="LLM 覆盖项（model / base_url / api_key ...）")
+    vlm: Optional[Dict[str, Any]] = Field(default=None, description="VLM 覆盖项")
+    force: Union[bool, List[str]] = Field(default=False, description="见 PipelineExecutor.run 的 force")
+
+    @property
+    def session_id(self) -> str:
+        return f"batch_{self.job_id}"
+
+
+def load_manifest(path: Union[str, Path]) -> List[BatchJob]:
+    """读取作业清单：JSON Lines，空行与 # 开头的行忽略；template 为字符串时按模板 JSON 文件路径读取。"""
+    path = Path(path)
+    jobs: List[BatchJob] = []
+    seen = set()
+    with path.open("r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            raw = json.loads(line)
+            if isinstance(raw.get("template"), str):
+                template_path = Path(raw["template"])
+                if not template_path.is_absolute():
+                    template_path = path.parent / template_path
+                raw["template"] = json.loads(template_path.read_text(encoding="utf-8"))
+            job = BatchJob(**raw)
+            if job.job_id in seen:
+                raise ValueError(f"{path}:{line_no}: duplicate job_id '{job.job_id}'")
+            if job.template is None and not job.template_id:
+                raise ValueError(f"{path}:{line_no}: job '{job.job_id}' needs template_id or template")
+            seen.add(job.job_id)
+            jobs.append(job)
+    return jobs
+
+
+def resolve_template(job: BatchJob, template_store: TemplateStore) -> EditTemplate:
+    """作业实际执行的模板：基础模板 + 节点覆盖；无人值守，统一按全自动执行。"""
+    base = job.template if job.template is not None else template_store.get(job.template_id)
+    if base is None:
+        raise ValueError(f"template not found: {job.template_id}")
+
+    nodes: Dict[str, NodeConfig] = {nc.node_id: nc for nc in base.nodes}
+    for node_id, override in job.overrides.items():
+        current = nodes.get(node_id) or NodeConfig(node_id=node_id)
+        fields = {**current.model_dump(), **override, "node_id": node_id}
+        fields["params"] = {**current.params, **(override.get("params") or {})}
+        nodes[node_id] = NodeConfig(**fields)
+
+    return base.model_copy(update={"nodes": list(nodes.values()), "auto_mode": "full_auto"}, deep=True)
+
+
+class BatchState:
+    """作业状态文件（JSON Lines，只追加）；同一作业以最后一条记录为准"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.records: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            with self.path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # 崩溃时写了一半的行
+                    self.records[record["job_id"]] = record
+
+    def is_done(self, job_id: str) -> bool:
+        return self.records.get(job_id, {}).get("status") == "done"
+
+    def append(self, record: Dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.records[record["job_id"]] = record
+
+
+class BatchRunner:
+
+    def __init__(
+        self,
+        cfg: Settings,
+        state_path: Union[str, Path],
+        *,
+        workers: int = DEFAULT_BATCH_WORKERS,
+        template_store: Optional[TemplateStore] = None,
+        job_timeout_sec: Optional[float] = None,
+        resume: bool = False,
+    ):
+        self.cfg = cfg
+        self.state = BatchState(state_path)
+        self.workers = max(1, int(workers))
+        self.template_store = template_store or TemplateStore()
+        self.job_timeout_sec = job_timeout_sec
+        self.resume = resume
+        self.memo = NodeMemo(cfg.pipeline.memo_dir) if cfg.pipeline.memo_enabled else None
+
+    async def run(self, jobs: List[BatchJob]) -> Dict[str, Any]:
+        """执行清单中尚未完成的作业，返回本次运行的报告（见 build_report）。"""
+        todo = [job for job in jobs if not self.state.is_done(job.job_id)]
+        logger.info(
+            f"[Batch] {len(jobs)} jobs in manifest, {len(jobs) - len(todo)} already done, "
+            f"running {len(todo)} with {self.workers} workers"
+        )
+        queue: asyncio.Queue = asyncio.Queue()
+        for job in todo:
+            queue.put_nowait(job)
+
+        records: List[Dict[str, Any]] = []
+        started_at = time.perf_counter()
+
+        async def worker(idx: int) -> None:
+            while True:
+                try:
+                    job = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                record = await self._run_job(job)
+                record["worker"] = idx
+                self.state.append(record)
+                records.append(record)
+                logger.info(f"[Batch] {job.job_id}: {record['status']} in {record['elapsed_sec']:.1f}s")
+
+        await asyncio.gather(*(worker(i) for i in range(min(self.workers, len(todo)) or 1)))
+        report = build_report(records, time.perf_counter() - started_at)
+        report["skipped_done"] = len(jobs) - len(todo)
+        return report
+
+    async def _node_manager(self, job: BatchJob, store: ArtifactStore):
+        """
+        MCP 客户端的会话请求头在构建时固定，服务端按它区分会话（缓存目录、会话清理），
+        因此每个作业单独构建，不与其他作业共用。
+        """
+        _, node_manager = await build_agent(
+            cfg=self.cfg,
+            session_id=job.session_id,
+            store=store,
+            tool_interceptors=[
+                ToolInterceptor.inject_media_content_before,
+                ToolInterceptor.save_media_content_after,
+                ToolInterceptor.inject_tts_config,
+                ToolInterceptor.inject_pexels_api_key,
+            ],
+            llm_override=job.llm,
+            vlm_override=job.vlm,
+        )
+        return node_manager
+
+    async def _run_job(self, job: BatchJob) -> Dict[str, Any]:
+        record: Dict[str, Any] = {"job_id": job.job_id, "session_id": job.session_id, "started_at": time.time()}
+        started_at = time.perf_counter()
+        try:
+            template = resolve_template(job, self.template_store)
+            store = ArtifactStore(self.cfg.project.outputs_dir, session_id=job.session_id)
+            node_manager = await self._node_manager(job, store)
+            context = ClientContext(
+                cfg=self.cfg,
+                session_id=job.session_id,
+                media_dir=job.media_dir,
+                bgm_dir=self.cfg.project.bgm_dir,
+                outputs_dir=self.cfg.project.outputs_dir,
+                node_manager=node_manager,
+                chat_model_key=(job.llm or {}).get("model", self.cfg.llm.model),
+                vlm_model_key=(job.vlm or {}).get("model", self.cfg.vlm.model),
+                pexels_api_key=self.cfg.search_media.pexels_api_key or None,
+                tts_config=job.tts_config,
+                lang=job.lang,
+            )
+            executor = PipelineExecutor(
+                node_manager=node_manager,
+                store=store,
+                session_id=job.session_id,
+                runtime=context,
+                max_parallel=self.cfg.pipeline.max_parallel_nodes,
+                memo=self.memo,
+            )
+            if self.resume and executor.checkpoint.load() is not None:
+                # 模板取自上次执行时保存的状态，清单中之后的修改不生效
+                pipeline = executor.resume()
+            else:
+                pipeline = executor.run(template, force=job.force)
+            try:
+                # 超时即取消整条流水线（含正在运行的节点）；已完成的节点记在执行状态里，--resume 时沿用
+                result = await asyncio.wait_for(pipeline, self.job_timeout_sec or None)
+            except asyncio.TimeoutError:
+                record["status"] = "timeout"
+                nodes = (executor.checkpoint.state or {}).get("nodes", {})
+                record["completed_nodes"] = [node_id for node_id, n in nodes.items() if n.get("status") == "done"]
+                return record
+            if "resumed_nodes" in result:
+                record["resumed_nodes"] = result["resumed_nodes"]
+            record["status"] = result["status"]
+            if result.get("failed_node"):
+                record["failed_node"] = result["failed_node"]
+            record["node_errors"] = [
+                node_id for node_id, r in result["results"].items()
+                if r.get("status") == "error" or r.get("is_error")
+            ]
+            record["cached_nodes"] = result.get("cached_nodes", [])
+            record["timing"] = result["timing"]
+            record["summaries"] = {node_id: r.get("summary") for node_id, r in result["results"].items()}
+        except Exception as e:
+            logger.error(f"[Batch] {job.job_id} failed: {e}")
+            record["status"] = "error"
+            record["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            record["elapsed_sec"] = round(time.perf_counter() - started_at, 3)
+        return record
+
+
+# ---------------------------------------------------------------------------
+# 报告
+# ---------------------------------------------------------------------------
+def _percentile(values: List[float], pct: float) -> float:
+    """最近秩（nearest-rank）百分位"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def build_report(records: List[Dict[str, Any]], wall_sec: float) -> Dict[str, Any]:
+    """
+    jobs_per_hour 按本次运行的墙钟时间计算成功作业数；
+    节点耗时只统计实际执行的节点，复用缓存的节点单独计数。
+    """
+    done = [r for r in records if r.get("status") == "done"]
+    node_sec: Dict[str, List[float]] = defaultdict(list)
+    cache_hits: Dict[str, int] = defaultdict(int)
+    for r in records:
+        cached = set(r.get("cached_nodes") or [])
+        for node_id, sec in ((r.get("timing") or {}).get("node_sec") or {}).items():
+            if node_id in cached:
+                cache_hits[node_id] += 1
+            else:
+                node_sec[node_id].append(sec)
+
+    job_sec = [r["elapsed_sec"] for r in done]
+    status_counts: Dict[str, int] = defaultdict(int)
+    for r in records:
+        status_counts[r.get("status", "error")] += 1
+
+    return {
+        "jobs": len(records),
+        "status": dict(status_counts),
+        "failed_jobs": [r["job_id"] for r in records if r.get("status") != "done"],
+        "wall_sec": round(wall_sec, 3),
+        "jobs_per_hour": round(len(done) / wall_sec * 3600, 2) if wall_sec > 0 else 0.0,
+        "job_sec": {
+            "p50": round(_percentile(job_sec, 50), 3),
+            "p95": round(_percentile(job_sec, 95), 3),
+            "max": round(max(job_sec, default=0.0), 3),
+        },
+        "nodes": {
+            node_id: {
+                "runs": len(node_sec.get(node_id, [])),
+                "cache_hits": cache_hits.get(node_id, 0),
+                "p50_sec": round(_percentile(node_sec.get(node_id, []), 50), 3),
+                "p95_sec": round(_percentile(node_sec.get(node_id, []), 95), 3),
+            }
+            for node_id in sorted(set(node_sec) | set(cache_hits))
+        },
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"jobs: {report['jobs']} {report['status']}  (already done, skipped: {report.get('skipped_done', 0)})",
+        f"wall: {report['wall_sec']:.1f}s  throughput: {report['jobs_per_hour']:.1f} jobs/hour",
+        f"job latency: p50 {report['job_sec']['p50']:.1f}s  p95 {report['job_sec']['p95']:.1f}s  max {report['job_sec']['max']:.1f}s",
+        f"{'node':<24}{'runs':>6}{'cached':>8}{'p50_s':>10}{'p95_s':>10}",
+    ]
+    for node_id, stats in report["nodes"].items():
+        lines.append(
+            f"{node_id:<24}{stats['runs']:>6}{stats['cache_hits']:>8}{stats['p50_sec']:>10.2f}{stats['p95_sec']:>10.2f}"
+        )
+    if report["failed_jobs"]:
+        lines.append(f"not done: {', '.join(report['failed_jobs'])}")
+    return "\n".join(lines)
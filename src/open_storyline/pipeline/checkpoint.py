@@ -0,0 +1,117 @@
+"""
+PipelineCheckpoint — 流水线执行状态的持久化
+
+保存在会话产物目录下（{outputs_dir}/{session_id}/pipeline_state.json），记录：
+- 本次执行的模板与执行计划
+- 各节点状态：pending / running / done / failed / skipped，done 的节点附带产物 ID
+- 整体状态：running / done / error / cancelled
+
+节点状态每次变化都整体重写（临时文件 + os.replace），服务中途退出时文件仍完整；
+续跑时 running 的节点视为未完成，重新执行。
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from open_storyline.pipeline.edit_template import EditTemplate, NodeConfig
+from open_storyline.pipeline.node_memo import payload_paths
+from open_storyline.storage.agent_memory import ArtifactStore
+from open_storyline.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+PIPELINE_STATE_FILE = "pipeline_state.json"
+PIPELINE_STATE_VERSION = 1
+
+
+class PipelineCheckpoint:
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.state: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def for_store(cls, store: ArtifactStore) -> "PipelineCheckpoint":
+        return cls(store.blobs_dir / PIPELINE_STATE_FILE)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """读取上次保存的状态；不存在或版本不符时返回 None"""
+        try:
+            state = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if state.get("version") != PIPELINE_STATE_VERSION:
+            return None
+        return state
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+    def begin(
+        self,
+        template: EditTemplate,
+        plan: List[NodeConfig],
+        *,
+        force: Any = False,
+        completed: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> None:
+        """开始（或续跑）一次执行：completed 为续跑时沿用的已完成节点记录"""
+        completed = completed or {}
+        now = time.time()
+        self.state = {
+            "version": PIPELINE_STATE_VERSION,
+            "template": template.model_dump(mode="json"),
+            "plan": [nc.node_id for nc in plan],
+            "force": force,
+            "status": "running",
+            "started_at": now,
+            "updated_at": now,
+            "nodes": {
+                nc.node_id: completed.get(nc.node_id) or {"status": "skipped" if nc.mode == "skip" else "pending"}
+                for nc in plan
+            },
+        }
+        self._flush()
+
+    def mark(self, node_id: str, status: str, **fields: Any) -> None:
+        if self.state is None:
+            return
+        self.state["nodes"][node_id] = {"status": status, **fields, "updated_at": time.time()}
+        self._flush()
+
+    def finish(self, status: str) -> None:
+        if self.state is None:
+            return
+        self.state["status"] = status
+        self._flush()
+
+    def _flush(self) -> None:
+        self.state["updated_at"] = time.time()
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(self.state, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"[Pipeline] failed to write checkpoint {self.path}: {e}")
+
+
+def artifacts_available(store: ArtifactStore, artifact_ids: Iterable[str]) -> bool:
+    """产物仍可沿用：meta 记录、产物 JSON 以及其中引用的媒体文件都还在"""
+    artifact_ids = list(artifact_ids)
+    if not artifact_ids:
+        return False
+    for artifact_id in artifact_ids:
+        try:
+            meta, data = store.load_result(artifact_id)
+        except (OSError, ValueError):
+            return False
+        if meta is None:
+            return False
+        if any(not os.path.exists(p) for p in payload_paths(data.get("payload"))):
+            return False
+    return True
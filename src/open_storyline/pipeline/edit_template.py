@@ -69,6 +69,12 @@ DEFAULT_PIPELINE_ORDER: List[str] = [
     "render_video",
 ]
 
+# 模板节点 ID -> 实际执行的工具节点 ID（模板沿用的名字与注册的 node_id 不一致）
+PIPELINE_NODE_ALIASES: Dict[str, List[str]] = {
+    "select_BGM": ["select_bgm"],
+    "recommend_effects": ["elementrec_transition", "elementrec_text"],
+}
+
 
 # ---------------------------------------------------------------------------
 # 内置预设模板
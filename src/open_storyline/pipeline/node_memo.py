@@ -0,0 +1,208 @@
+"""
+NodeMemo — 节点执行结果的指纹缓存
+
+指纹 = 节点 ID + 执行模式 + 节点参数 + 输入产物摘要 + 相关配置段 + 提示词模板摘要（+ 素材目录内容）。
+索引存于 .storyline/cache/node_memo/{fp[:2]}/{fp}.json，记录产物文件位置，可在会话内或跨会话复用：
+命中时把原产物复制为当前会话的新产物，下游节点照常通过 ArtifactStore 读取。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from open_storyline.utils.logging import get_logger
+from open_storyline.utils.prompts import PROMPTS_DIR
+
+logger = get_logger(__name__)
+
+DEFAULT_NODE_MEMO_DIR = "./.storyline/cache/node_memo"
+# 指纹组成或产物格式变化时递增，旧索引自然失效
+NODE_MEMO_VERSION = 1
+
+# 影响节点输出的配置段（Settings 字段名）；llm / vlm 段同时带上运行时选择的模型
+NODE_CONFIG_SECTIONS: Dict[str, List[str]] = {
+    "search_media": ["search_media"],
+    "load_media": ["load_media"],
+    "split_shots": ["split_shots"],
+    "understand_clips": ["understand_clips", "vlm"],
+    "filter_clips": ["clip_map_reduce", "llm"],
+    "group_clips": ["clip_map_reduce", "llm"],
+    "script_template_rec": ["script_template", "llm"],
+    "generate_script": ["llm"],
+    "elementrec_text": ["recommend_text", "llm"],
+    "generate_voiceover": ["generate_voiceover"],
+    "select_bgm": ["select_bgm", "llm"],
+    "plan_timeline": ["plan_timeline"],
+    "plan_timeline_pro": ["plan_timeline_pro"],
+}
+# 节点读取的提示词任务目录（prompts/tasks/<task>/<lang>/），默认与 node_id 同名
+NODE_PROMPT_TASKS: Dict[str, List[str]] = {
+    "script_template_rec": [],
+    "plan_timeline": [],
+    "render_video": [],
+}
+# 输入不在产物里、而在运行时目录中的节点：node_id -> (ClientContext 字段, 是否按内容摘要)
+# 上传的素材每个会话各有一份，按内容摘要才能跨会话命中；BGM 库是共享目录，按 (大小, 修改时间) 即可
+NODE_DIR_INPUTS: Dict[str, List[tuple]] = {
+    "load_media": [("media_dir", True)],
+    "select_bgm": [("bgm_dir", False)],
+}
+
+# 不复用的节点：search_media 把下载写进当前会话的素材目录，render_video 的成片属于当前会话的输出
+NODE_MEMO_EXCLUDED = ("search_media", "render_video")
+
+_HASH_CHUNK_BYTES = 1 << 20
+
+
+def _json_digest(value: Any) -> str:
+    raw = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _dir_digest(directory: Union[str, Path], *, by_content: bool) -> str:
+    entries = []
+    root = Path(directory)
+    if root.is_dir():
+        for p in sorted(root.iterdir()):
+            if not p.is_file():
+                continue
+            st = p.stat()
+            entries.append([p.name, st.st_size, _file_digest(p) if by_content else st.st_mtime_ns])
+    return _json_digest(entries)
+
+
+def payload_paths(payload: Any) -> Iterable[str]:
+    """产物中引用的文件路径（媒体列表里的 path 字段）"""
+    if isinstance(payload, dict):
+        for value in payload.values():
+            if isinstance(value, list) and all(isinstance(i, dict) for i in value):
+                for item in value:
+                    if isinstance(item.get("path"), str):
+                        yield item["path"]
+            else:
+                yield from payload_paths(value)
+
+
+class NodeMemo:
+    """指纹 -> 产物 的磁盘索引；条目为小 JSON 文件，原子写入"""
+
+    def __init__(self, root: Union[str, Path] = DEFAULT_NODE_MEMO_DIR, prompts_dir: Union[str, Path] = PROMPTS_DIR):
+        self.root = Path(root)
+        self.prompts_dir = Path(prompts_dir)
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # 指纹
+    # ------------------------------------------------------------------
+    def fingerprint(
+        self,
+        *,
+        node_id: str,
+        mode: str,
+        params: Dict[str, Any],
+        input_payloads: Dict[str, Any],
+        runtime: Any,
+    ) -> str:
+        """
+        input_payloads: {kind: 上游产物 payload}，即节点执行时将被注入的输入。
+        runtime: ClientContext（cfg / lang / 模型选择 / 素材目录）
+        """
+        cfg = getattr(runtime, "cfg", None)
+        sections: Dict[str, Any] = {}
+        for name in NODE_CONFIG_SECTIONS.get(node_id, []):
+            section = getattr(cfg, name, None)
+            sections[name] = section.model_dump(mode="json") if hasattr(section, "model_dump") else section
+            if name == "llm":
+                sections["chat_model_key"] = getattr(runtime, "chat_model_key", None)
+            elif name == "vlm":
+                sections["vlm_model_key"] = getattr(runtime, "vlm_model_key", None)
+        if node_id == "generate_voiceover":
+            sections["tts_config"] = getattr(runtime, "tts_config", None)
+
+        lang = getattr(runtime, "lang", "zh")
+        prompts = {
+            task: self._prompt_digest(task, lang) for task in NODE_PROMPT_TASKS.get(node_id, [node_id])
+        }
+        dirs = {
+            field: _dir_digest(getattr(runtime, field), by_content=by_content)
+            for field, by_content in NODE_DIR_INPUTS.get(node_id, [])
+            if getattr(runtime, field, None)
+        }
+
+        return _json_digest(
+            {
+                "version": NODE_MEMO_VERSION,
+                "node_id": node_id,
+                "mode": mode,
+                "params": params,
+                "inputs": {kind: _json_digest(payload) for kind, payload in sorted(input_payloads.items())},
+                "config": sections,
+                "lang": lang,
+                "prompts": prompts,
+                "dirs": dirs,
+            }
+        )
+
+    def _prompt_digest(self, task: str, lang: str) -> Optional[str]:
+        task_dir = self.prompts_dir / task / lang
+        if not task_dir.is_dir():
+            return None
+        return _json_digest([[p.name, _file_digest(p)] for p in sorted(task_dir.glob("*.md"))])
+
+    # ------------------------------------------------------------------
+    # 索引读写
+    # ------------------------------------------------------------------
+    def _path_for(self, fingerprint: str) -> Path:
+        return self.root / fingerprint[:2] / f"{fingerprint}.json"
+
+    def lookup(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        返回 {"entry": 索引条目, "payload": 产物 payload}。
+        产物文件或其引用的媒体文件已不存在（会话被清理）时视为未命中。
+        """
+        try:
+            entry = json.loads(self._path_for(fingerprint).read_text(encoding="utf-8"))
+            with open(entry["path"], "r", encoding="utf-8") as f:
+                payload = json.load(f)["payload"]
+        except (OSError, ValueError, KeyError, TypeError):
+            self.misses += 1
+            return None
+
+        missing = [p for p in payload_paths(payload) if not os.path.exists(p)]
+        if missing:
+            logger.info(f"[NodeMemo] {entry.get('node_id')} memo skipped, {len(missing)} referenced file(s) are gone")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return {"entry": entry, "payload": payload}
+
+    def record(self, fingerprint: str, *, node_id: str, session_id: str, artifact_id: str, path: str, summary: Any) -> None:
+        target = self._path_for(fingerprint)
+        tmp = target.with_name(target.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+        entry = {
+            "node_id": node_id,
+            "session_id": session_id,
+            "artifact_id": artifact_id,
+            "path": str(Path(path).resolve()),
+            "summary": summary,
+        }
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, target)
+        except OSError as e:
+            logger.warning(f"[NodeMemo] failed to record {node_id}: {e}")
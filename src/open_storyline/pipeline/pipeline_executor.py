@@ -3,22 +3,40 @@ PipelineExecutor — 后端流水线执行器
 
 按 DAG 拓扑顺序执行节点，支持：
 - 全自动模式：所有节点连续执行
-- 半自动模式：关键节点等待用户确认，超时回退默认值
+- 并行执行：依赖关系由 NodeMeta.require_prior_kind 推导，互不依赖的节点并发执行（有并发上限）
+- 半自动模式：关键节点等待用户确认，超时回退默认值；等待期间以当前参数预执行该节点，
+  确认参数未改时直接采用预执行结果，修改或跳过时取消并丢弃
 - 进度回调：每个节点开始/完成/跳过时触发
+- 部分结果：节点通过 MCP 进度通知流式发布的中间结果（如逐段配音），可被下游提前消费
+- 前缀预览：配音前若干组完成后即对已完成的前缀排时间线并渲染预览视频，无需等待全部配音
+- 结果复用：按节点指纹（参数 + 输入产物 + 配置 + 提示词）查找已有产物，命中则跳过执行（force 可绕过）
+- 断点续跑：执行计划与各节点状态写入会话目录的 pipeline_state.json，失败或服务重启后可从未完成的节点继续
 """
 from __future__ import annotations
 
 import asyncio
+import json
+import time
 import traceback
 from collections import defaultdict
-from typing import Any, Callable, Coroutine, Dict, List, Literal, Optional
+from typing import Any, Callable, Coroutine, Dict, Iterable, List, Literal, Optional, Set, Tuple, Union
+
+from open_storyline.mcp.hooks.chat_middleware import (
+    get_mcp_log_sink,
+    reset_mcp_log_sink,
+    set_mcp_log_sink,
+)
+from open_storyline.mcp.hooks.node_interceptors import reset_input_overrides, set_input_overrides
 
 from open_storyline.nodes.node_manager import NodeManager
 from open_storyline.pipeline.edit_template import (
     DEFAULT_PIPELINE_ORDER,
+    PIPELINE_NODE_ALIASES,
     EditTemplate,
     NodeConfig,
 )
+from open_storyline.pipeline.checkpoint import PipelineCheckpoint, artifacts_available
+from open_storyline.pipeline.node_memo import NODE_MEMO_EXCLUDED, NodeMemo
 from open_storyline.storage.agent_memory import ArtifactStore
 from open_storyline.storage.file import FileCompressor
 from open_storyline.utils.logging import get_logger
@@ -34,10 +52,35 @@ ProgressCallback = Callable[
 ]
 ConfirmCallback = Callable[
     [str, Dict[str, Any], int],            # (node_id, params, timeout_sec)
-    Coroutine[Any, Any, Dict[str, Any]],   # returns confirmed params
+    Coroutine[Any, Any, Any],              # returns confirmed params, or CONFIRM_SKIP
+]
+PartialCallback = Callable[
+    [str, Dict[str, Any]],  # (node_id, partial payload, e.g. {"event": "voiceover.segment", ...})
+    Coroutine[Any, Any, None],
 ]
 
 
+# 返回错误即终止流水线的节点 / 抛出异常即终止流水线的节点
+FATAL_ON_ERROR_NODES = ("plan_timeline", "render_video")
+FATAL_ON_EXCEPTION_NODES = ("load_media", "plan_timeline", "render_video")
+
+# 不做预执行的节点：search_media 的下载直接写入素材目录，丢弃结果也无法撤销
+SPECULATION_EXCLUDED_NODES = ("search_media",)
+# 确认回调返回该值表示跳过节点
+CONFIRM_SKIP = "skip"
+
+# require_prior_kind 之外的顺序约束：节点 -> 须等待的之前节点（计划中存在且未跳过时）。
+# load_media 在调用时列出素材目录，search_media 结束后才把下载写入该目录
+ORDERING_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    "load_media": ("search_media",),
+}
+
+# 前缀预览：(逐组发布配音的节点, 排时间线节点, 渲染节点)
+PREFIX_PREVIEW_NODES = ("generate_voiceover", "plan_timeline", "render_video")
+
+DEFAULT_MAX_PARALLEL_NODES = 3
+
+
 class PipelineError(Exception):
     """流水线执行过程中的错误"""
 
@@ -59,11 +102,25 @@ class PipelineExecutor:
         store: ArtifactStore,
         session_id: str,
         runtime: Any,          # agent runtime context (ClientContext)
+        max_parallel: int = DEFAULT_MAX_PARALLEL_NODES,
+        memo: Optional[NodeMemo] = None,
+        speculative: bool = True,
+        prefix_preview_groups: int = 0,
     ):
         self.node_manager = node_manager
         self.store = store
         self.session_id = session_id
         self.runtime = runtime
+        self.max_parallel = max(1, int(max_parallel))
+        self.memo = memo
+        self.speculative = speculative
+        # 配音完成的前缀达到该组数时渲染前缀预览，0 为关闭
+        self.prefix_preview_groups = max(0, int(prefix_preview_groups))
+        self.checkpoint = PipelineCheckpoint.for_store(store)
+        self._force_all = False
+        self._force_tools: Set[str] = set()
+        # 前端同一时间只能展示一个确认框，并发节点的确认请求依次进行
+        self._confirm_lock = asyncio.Lock()
 
     # ------------------------------------------------------------------
     # Main entry
@@ -75,41 +132,267 @@ class PipelineExecutor:
         on_progress: Optional[ProgressCallback] = None,
         on_confirm: Optional[ConfirmCallback] = None,
         cancel_event: Optional[asyncio.Event] = None,
+        on_partial: Optional[PartialCallback] = None,
+        force: Union[bool, Iterable[str]] = False,
+        resume_state: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
-        按模板配置执行完整流水线。
+        按模板配置执行完整流水线。依赖已满足的节点并发执行，同时运行的节点数不超过 self.max_parallel。
+        on_partial: 节点流式发布部分结果时回调（如每段配音完成）；启用前缀预览时，预览视频写出后
+            以 ("render_video", {"event": "render.preview", ...}) 回调
+        force: True 时所有节点都重新执行；为节点 ID 列表时仅这些节点不复用已有结果。
+            被强制的节点产出变化后，下游节点的指纹随之变化，自然也会重新执行
+        resume_state: 由 resume() 传入的上次执行状态，其中仍可沿用的已完成节点不再执行
+
+        取消与致命错误发生后不再启动新节点，已在运行的节点执行完后返回；调用方取消本协程（如 asyncio.wait_for
+        超时）时，正在运行的节点一并取消，随后抛出 CancelledError。
 
         Returns:
-            {"status": "done", "results": {node_id: result_summary, ...}}
+            {"status": "done", "results": {node_id: result_summary, ...}, "timing": {...}, "cached_nodes": [...]}
+            timing 含总耗时、串行执行的耗时估计、节省的时间与关键路径；cached_nodes 为复用已有结果的节点；
+            续跑时另有 resumed_nodes：沿用上次结果的节点；渲染了前缀预览时 timing 另有 prefix_preview_sec：
+            预览视频写出时距流水线开始的秒数
         """
-        # 1) 构建执行计划
+        force = force if isinstance(force, bool) else list(force)
+        self._force_all = force is True
+        self._force_tools = set() if isinstance(force, bool) else {
+            tool_id for node_id in force for tool_id in PIPELINE_NODE_ALIASES.get(node_id, [node_id])
+        }
+
+        # 1) 构建执行计划与依赖图
         plan = self._build_execution_plan(template)
+        deps = self._build_dependency_graph(plan)
         results: Dict[str, Any] = {}
+        durations: Dict[str, float] = {}
         total = len(plan)
+        completed = self._resumable_nodes(plan, deps, resume_state) if resume_state else {}
+        self.checkpoint.begin(template, plan, force=force, completed=completed)
 
         logger.info(
             f"[Pipeline] Starting pipeline '{template.name}' "
-            f"({template.auto_mode}) with {total} nodes"
+            f"({template.auto_mode}) with {total} nodes, max_parallel={self.max_parallel}"
         )
 
-        for idx, node_cfg in enumerate(plan):
-            node_id = node_cfg.node_id
+        pending: List[NodeConfig] = [nc for nc in plan if nc.node_id not in completed]
+        running: Dict[asyncio.Task, str] = {}
+        finished: Set[str] = set(completed)
+        outcome: Dict[str, Any] = {"status": "done"}
+        started_at = time.perf_counter()
+
+        def progress() -> float:
+            return len(finished) / total
+
+        # 前缀预览：配音节点发布的完成前缀达到 prefix_preview_groups 组，且时间线与渲染的其余输入都已就绪时启动，
+        # 与正式节点并行执行；正式的配音节点结束后不再启动
+        preview_cfgs = self._preview_configs(plan) if self.prefix_preview_groups > 0 and on_partial else None
+        voiceover_segments: Dict[int, Dict[str, Any]] = {}
+        voiceover_prefix = {"prefix": 0, "total": 0}
+        preview_task: Optional[asyncio.Task] = None
+
+        def maybe_start_preview() -> None:
+            nonlocal preview_task
+            if preview_cfgs is None or preview_task is not None or outcome["status"] != "done":
+                return
+            source, planner, renderer = PREFIX_PREVIEW_NODES
+            prefix, total_groups = voiceover_prefix["prefix"], voiceover_prefix["total"]
+            if source in finished or not self.prefix_preview_groups <= prefix < total_groups:
+                return
+            # 配音与时间线由预览自己提供，其余上游（含按需补跑时的保守依赖）须已结束
+            if not (deps[planner] | deps[renderer]) - {source, planner} <= finished:
+                return
+            preview_task = asyncio.create_task(self._run_prefix_preview(
+                *preview_cfgs,
+                voiceover=[voiceover_segments[i] for i in range(prefix)],
+                total_groups=total_groups,
+                on_partial=on_partial,
+                started_at=started_at,
+            ))
+
+        async def feed_preview(node_id: str, payload: Dict[str, Any]) -> None:
+            if node_id == PREFIX_PREVIEW_NODES[0] and payload.get("event") == "voiceover.segment":
+                voiceover_segments[payload["index"]] = payload["segment"]
+                voiceover_prefix["prefix"] = max(voiceover_prefix["prefix"], int(payload.get("prefix") or 0))
+                voiceover_prefix["total"] = int(payload.get("total") or 0)
+                maybe_start_preview()
+            await on_partial(node_id, payload)
+
+        step_on_partial = on_partial if preview_cfgs is None else feed_preview
+
+        # 续跑：沿用上次已完成的节点
+        for node_id, entry in completed.items():
+            results[node_id] = {"status": "done", "summary": entry.get("summary", ""), "is_error": False, "resumed": True}
+            if on_progress:
+                await on_progress(node_id, "done", progress(), f"沿用上次结果：{entry.get('summary', '')}")
 
-            # 检查取消
-            if cancel_event and cancel_event.is_set():
-                logger.info(f"[Pipeline] Cancelled before {node_id}")
-                if on_progress:
-                    await on_progress(node_id, "cancelled", idx / total, "用户取消")
-                return {"status": "cancelled", "results": results}
+        try:
+            while True:
+                # 2) 启动所有依赖已完成的节点（按计划顺序，受并发上限约束）
+                while outcome["status"] == "done":
+                    ready = next((nc for nc in pending if deps[nc.node_id] <= finished), None)
+                    if ready is None:
+                        break
+                    node_id = ready.node_id
+
+                    # 检查取消
+                    if cancel_event and cancel_event.is_set():
+                        logger.info(f"[Pipeline] Cancelled before {node_id}")
+                        if on_progress:
+                            await on_progress(node_id, "cancelled", progress(), "用户取消")
+                        outcome = {"status": "cancelled"}
+                        break
+
+                    # 跳过
+                    if ready.mode == "skip":
+                        pending.remove(ready)
+                        logger.info(f"[Pipeline] Skipping {node_id}")
+                        finished.add(node_id)
+                        results[node_id] = {"status": "skipped"}
+                        if on_progress:
+                            await on_progress(node_id, "skipped", progress(), "已跳过")
+                        continue
+
+                    if len(running) >= self.max_parallel:
+                        break
+                    pending.remove(ready)
+                    task = asyncio.create_task(
+                        self._run_step(template, ready, on_progress, on_confirm, step_on_partial, progress)
+                    )
+                    running[task] = node_id
+
+                if not running:
+                    break
+
+                # 3) 等待任一节点结束并处理结果
+                done_tasks, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done_tasks:
+                    node_id = running.pop(task)
+                    result, exc, elapsed = task.result()
+                    durations[node_id] = elapsed
+                    finished.add(node_id)
+
+                    if exc is not None:
+                        logger.error(f"[Pipeline] {node_id} raised exception: {exc}")
+                        self.checkpoint.mark(node_id, "failed", error=str(exc))
+                        results[node_id] = {"status": "error", "error": str(exc)}
+                        if on_progress:
+                            await on_progress(node_id, "error", progress(), str(exc))
+                        if node_id in FATAL_ON_EXCEPTION_NODES and outcome["status"] == "done":
+                            outcome = {"status": "error", "failed_node": node_id}
+                        continue
+
+                    if result.get("skipped"):
+                        # 半自动确认时被跳过
+                        self.checkpoint.mark(node_id, "skipped")
+                        results[node_id] = {"status": "skipped"}
+                        if on_progress:
+                            await on_progress(node_id, "skipped", progress(), "已跳过")
+                        continue
+
+                    results[node_id] = {
+                        "status": "done",
+                        "summary": result.get("summary", ""),
+                        "is_error": result.get("isError", False),
+                        "cached": result.get("cached", False),
+                    }
+                    if result.get("speculative_saved_sec"):
+                        results[node_id]["speculative_saved_sec"] = result["speculative_saved_sec"]
+                    if result.get("isError"):
+                        self.checkpoint.mark(node_id, "failed", error=str(result.get("summary", "")))
+                    else:
+                        self.checkpoint.mark(
+                            node_id, "done",
+                            artifact_ids=result.get("artifact_ids", {}),
+                            summary=result.get("summary", ""),
+                        )
+                    if result.get("isError"):
+                        status, message = "error", str(result.get("summary", "执行出错"))
+                    elif result.get("cached"):
+                        status, message = "cached", f"复用已有结果：{result.get('summary', '')}"
+                    else:
+                        status, message = "done", result.get("summary", "完成")
+                    if result.get("speculative_saved_sec") and not result.get("isError"):
+                        message = f"{message}（确认期间预执行，节省 {result['speculative_saved_sec']:.1f}s）"
+                    if on_progress:
+                        await on_progress(node_id, status, progress(), message)
+                    if result.get("isError"):
+                        logger.error(f"[Pipeline] {node_id} returned error: {result.get('summary')}")
+                        # 非致命错误继续执行（除 plan_timeline / render_video）
+                        if node_id in FATAL_ON_ERROR_NODES and outcome["status"] == "done":
+                            outcome = {"status": "error", "failed_node": node_id}
+
+                # 时间线与渲染的其余输入可能在配音前缀之后才就绪
+                maybe_start_preview()
+        except asyncio.CancelledError:
+            # 调用方取消（如批量作业超时）：停止仍在运行的节点与预览，记下状态后照常抛出，续跑时从这些节点重新开始
+            tasks = [*running, *([preview_task] if preview_task is not None else [])]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.checkpoint.finish("cancelled")
+            raise
+
+        preview_sec: Optional[float] = None
+        if preview_task is not None:
+            # 正式渲染已结束（或流水线已中止），仍未完成的预览不再需要
+            preview_task.cancel()
+            await asyncio.wait({preview_task})
+            if not preview_task.cancelled():
+                preview_sec = preview_task.result()
+
+        wall_sec = time.perf_counter() - started_at
+        outcome["results"] = {nc.node_id: results[nc.node_id] for nc in plan if nc.node_id in results}
+        outcome["timing"] = self._timing_report(plan, deps, durations, wall_sec)
+        outcome["timing"]["speculative_saved_sec"] = round(
+            sum(r.get("speculative_saved_sec", 0.0) for r in results.values()), 3
+        )
+        if preview_sec is not None:
+            outcome["timing"]["prefix_preview_sec"] = round(preview_sec, 3)
+        outcome["cached_nodes"] = [node_id for node_id, r in outcome["results"].items() if r.get("cached")]
+        if completed:
+            outcome["resumed_nodes"] = [nc.node_id for nc in plan if nc.node_id in completed]
+        self.checkpoint.finish(outcome["status"])
+
+        if outcome["status"] == "done":
+            logger.info(
+                f"[Pipeline] Pipeline completed successfully in {wall_sec:.1f}s "
+                f"(saved {outcome['timing']['saved_sec']:.1f}s, critical path {outcome['timing']['critical_path']})"
+            )
+        return outcome
 
-            # 跳过
-            if node_cfg.mode == "skip":
-                logger.info(f"[Pipeline] Skipping {node_id}")
-                if on_progress:
-                    await on_progress(node_id, "skipped", (idx + 1) / total, "已跳过")
-                results[node_id] = {"status": "skipped"}
-                continue
+    async def resume(self, **kwargs: Any) -> Dict[str, Any]:
+        """
+        按会话中保存的执行状态续跑：沿用产物仍然存在的已完成节点，从未完成的节点继续。
+        模板与 force 取自保存的状态（可用 force= 覆盖），其余参数同 run()。
+        """
+        state = self.checkpoint.load()
+        if state is None:
+            raise PipelineError("pipeline", "没有可续跑的流水线记录")
+        template = EditTemplate(**state["template"])
+        kwargs.setdefault("force", state.get("force") or False)
+        logger.info(f"[Pipeline] Resuming pipeline '{template.name}' (last status: {state.get('status')})")
+        return await self.run(template, resume_state=state, **kwargs)
+
+    async def _run_step(
+        self,
+        template: EditTemplate,
+        node_cfg: NodeConfig,
+        on_progress: Optional[ProgressCallback],
+        on_confirm: Optional[ConfirmCallback],
+        on_partial: Optional[PartialCallback],
+        progress: Callable[[], float],
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Exception], float]:
+        """
+        执行一个计划节点（含半自动确认），返回 (result, exception, 耗时秒)，不向外抛出异常。
 
+        需要确认的节点在等待确认期间以当前参数预执行：确认参数未改（含超时）时采用预执行结果，
+        result["speculative_saved_sec"] 为确认等待中已完成的执行时间；参数被修改或节点被跳过时
+        取消预执行并删除其产物，再按确认后的参数执行。预执行的 NodeMemo 记录推迟到采用结果时写入。
+        """
+        node_id = node_cfg.node_id
+        started_at = time.perf_counter()
+        speculation: Optional[asyncio.Task] = None
+        speculation_ids: Dict[str, str] = {}
+        try:
             # 半自动确认
             params = dict(node_cfg.params)
             if (
@@ -117,52 +400,236 @@ class PipelineExecutor:
                 and node_cfg.confirm_required
                 and on_confirm is not None
             ):
-                if on_progress:
-                    await on_progress(
-                        node_id, "waiting_confirm",
-                        idx / total,
-                        f"等待确认 ({template.semi_auto_timeout_sec}s)"
+                if self.speculative and node_id not in SPECULATION_EXCLUDED_NODES:
+                    speculation_ids = self._new_artifact_ids(node_id)
+                    # 预执行不转发部分结果，避免前端展示可能被丢弃的内容
+                    speculation = asyncio.create_task(
+                        self._execute_step(node_id, node_cfg.mode, dict(params), None, speculation_ids, record_memo=False)
+                    )
+                speculation_started = time.perf_counter()
+                speculation_finished: Dict[str, float] = {}
+                if speculation is not None:
+                    speculation.add_done_callback(lambda _: speculation_finished.setdefault("at", time.perf_counter()))
+                async with self._confirm_lock:
+                    if on_progress:
+                        await on_progress(
+                            node_id, "waiting_confirm",
+                            progress(),
+                            f"等待确认 ({template.semi_auto_timeout_sec}s)"
+                            + ("，已按当前参数预执行" if speculation else "")
+                        )
+                    confirmed = await self._confirm_or_timeout(
+                        node_id, params,
+                        template.semi_auto_timeout_sec,
+                        on_confirm,
                     )
-                params = await self._confirm_or_timeout(
-                    node_id, params,
-                    template.semi_auto_timeout_sec,
-                    on_confirm,
-                )
+                confirmed_at = time.perf_counter()
+
+                if confirmed is None or confirmed != params:
+                    if speculation is not None:
+                        await self._discard_speculation(node_id, speculation, speculation_ids)
+                        speculation = None
+                    if confirmed is None:
+                        logger.info(f"[Pipeline] {node_id} skipped at confirmation")
+                        return {"skipped": True}, None, time.perf_counter() - started_at
+                    params = confirmed
+
+                if speculation is not None:
+                    # 参数未改：采用预执行结果（可能仍在运行）
+                    self.checkpoint.mark(node_id, "running")
+                    if on_progress and not speculation.done():
+                        await on_progress(node_id, "running", progress(), f"正在执行 {node_id}（确认期间已开始）")
+                    try:
+                        result = await speculation
+                    except Exception as exc:
+                        logger.warning(f"[Pipeline] {node_id} speculative run failed, running it again: {exc}")
+                        self._discard_artifacts(speculation_ids)
+                    else:
+                        self._record_memos(node_id, result.pop("pending_memo", {}), result["artifact_ids"])
+                        # 节省的时间 = 确认返回前预执行已经跑过的时长
+                        finished_at = speculation_finished.get("at", confirmed_at)
+                        result["speculative_saved_sec"] = round(
+                            max(0.0, min(confirmed_at, finished_at) - speculation_started), 3
+                        )
+                        return result, None, time.perf_counter() - started_at
 
             # 执行节点
+            self.checkpoint.mark(node_id, "running")
             if on_progress:
-                await on_progress(node_id, "running", idx / total, f"正在执行 {node_id}")
-
-            try:
-                result = await self._execute_node(node_id, node_cfg.mode, params)
-                results[node_id] = {
-                    "status": "done",
-                    "summary": result.get("summary", ""),
-                    "is_error": result.get("isError", False),
-                }
-                status = "error" if result.get("isError") else "done"
-                if on_progress:
-                    await on_progress(
-                        node_id, status,
-                        (idx + 1) / total,
-                        result.get("summary", "完成") if not result.get("isError") else str(result.get("summary", "执行出错")),
-                    )
-                if result.get("isError"):
-                    logger.error(f"[Pipeline] {node_id} returned error: {result.get('summary')}")
-                    # 非致命错误继续执行（除 plan_timeline / render_video）
-                    if node_id in ("plan_timeline", "render_video"):
-                        return {"status": "error", "failed_node": node_id, "results": results}
-            except Exception as exc:
-                logger.error(f"[Pipeline] {node_id} raised exception: {exc}")
-                logger.debug(traceback.format_exc())
-                results[node_id] = {"status": "error", "error": str(exc)}
-                if on_progress:
-                    await on_progress(node_id, "error", (idx + 1) / total, str(exc))
-                if node_id in ("load_media", "plan_timeline", "render_video"):
-                    return {"status": "error", "failed_node": node_id, "results": results}
+                await on_progress(node_id, "running", progress(), f"正在执行 {node_id}")
+            result = await self._execute_step(node_id, node_cfg.mode, params, on_partial, self._new_artifact_ids(node_id))
+            return result, None, time.perf_counter() - started_at
+        except asyncio.CancelledError:
+            # 本步骤被取消（如整条流水线被取消）：预执行一并取消，不等待其结束
+            if speculation is not None and not speculation.done():
+                speculation.cancel()
+                self._discard_artifacts(speculation_ids)
+            raise
+        except Exception as exc:
+            logger.debug(traceback.format_exc())
+            if speculation is not None and not speculation.done():
+                await self._discard_speculation(node_id, speculation, speculation_ids)
+            return None, exc, time.perf_counter() - started_at
+
+    async def _execute_step(
+        self,
+        node_id: str,
+        mode: str,
+        params: Dict[str, Any],
+        on_partial: Optional[PartialCallback],
+        artifact_ids: Dict[str, str],
+        record_memo: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        执行模板节点对应的工具；artifact_ids 为各工具预先分配的产物 ID（见 _new_artifact_ids）。
+        record_memo=False 时不写 NodeMemo，待记录的指纹放在 result["pending_memo"]（{tool_id: fingerprint}）。
+        """
+        tool_results = {}
+        for tool_id, artifact_id in artifact_ids.items():
+            # 一个模板节点对应多个工具（如 recommend_effects）：依次执行，合并摘要
+            tool_results[tool_id] = await self._execute_node(
+                tool_id, mode, params, on_partial=on_partial, artifact_id=artifact_id, record_memo=record_memo
+            )
+        if len(tool_results) == 1:
+            result = next(iter(tool_results.values()))
+        else:
+            result = {
+                "summary": {tool_id: r.get("summary", "") for tool_id, r in tool_results.items()},
+                "isError": any(r.get("isError") for r in tool_results.values()),
+                "cached": all(r.get("cached") for r in tool_results.values()),
+            }
+        result["artifact_ids"] = {
+            tool_id: r["artifact_id"] for tool_id, r in tool_results.items() if r.get("artifact_id")
+        }
+        pending_memo = {
+            tool_id: r.pop("memo_fingerprint") for tool_id, r in tool_results.items() if r.get("memo_fingerprint")
+        }
+        if pending_memo:
+            result["pending_memo"] = pending_memo
+        return result
+
+    def _record_memos(self, node_id: str, fingerprints: Dict[str, str], artifact_ids: Dict[str, str]) -> None:
+        """采用预执行结果时补写其 NodeMemo 记录"""
+        for tool_id, fingerprint in fingerprints.items():
+            if tool_id in artifact_ids:
+                self._record_memo(tool_id, fingerprint, artifact_ids[tool_id])
+        if fingerprints:
+            logger.debug(f"[Pipeline] {node_id} speculative run committed to memo")
+
+    def _new_artifact_ids(self, node_id: str) -> Dict[str, str]:
+        # 工具未注册时仍按模板节点 ID 调用，由 _call_tool 报错
+        tool_ids = self._step_tool_ids(node_id) or [node_id]
+        return {tool_id: self.store.generate_artifact_id(tool_id) for tool_id in tool_ids}
+
+    async def _discard_speculation(self, node_id: str, task: asyncio.Task, artifact_ids: Dict[str, str]) -> None:
+        """
+        取消预执行并删除其已保存的产物，使下游不会读到未经确认的结果。等待期间调用方自身被取消时照常抛出 CancelledError。
 
-        logger.info("[Pipeline] Pipeline completed successfully")
-        return {"status": "done", "results": results}
+        取消的是客户端对工具调用的等待：MCP 客户端不会向服务端发送 notifications/cancelled，
+        已开始的节点在服务端照常跑完（占用其节点线程池，写在服务端缓存目录下的中间文件保留），
+        但结果不再返回，ToolInterceptor 也不会将其保存为产物。
+        """
+        task.cancel()
+        try:
+            # 与 `await task` 不同，asyncio.wait 不把预执行自身的 CancelledError 当作调用方被取消
+            await asyncio.wait({task})
+        finally:
+            if task.done() and not task.cancelled():
+                task.exception()  # 预执行的结果与异常都不再需要，仅标记为已读取
+            self._discard_artifacts(artifact_ids)
+            logger.info(f"[Pipeline] {node_id} speculative run discarded")
+
+    def _discard_artifacts(self, artifact_ids: Dict[str, str]) -> None:
+        for artifact_id in artifact_ids.values():
+            self.store.discard(artifact_id)
+
+    @staticmethod
+    def _preview_configs(plan: List[NodeConfig]) -> Optional[Tuple[NodeConfig, NodeConfig]]:
+        """前缀预览所用的 (排时间线, 渲染) 节点配置；配音、排时间线、渲染任一被跳过时不做预览"""
+        node_cfgs = {nc.node_id: nc for nc in plan}
+        if any(node_id not in node_cfgs or node_cfgs[node_id].mode == "skip" for node_id in PREFIX_PREVIEW_NODES):
+            return None
+        _, planner, renderer = PREFIX_PREVIEW_NODES
+        return node_cfgs[planner], node_cfgs[renderer]
+
+    async def _run_prefix_preview(
+        self,
+        plan_cfg: NodeConfig,
+        render_cfg: NodeConfig,
+        *,
+        voiceover: List[Dict[str, Any]],
+        total_groups: int,
+        on_partial: PartialCallback,
+        started_at: float,
+    ) -> Optional[float]:
+        """
+        对已完成的配音前缀排时间线并渲染预览：plan_timeline 的配音与分组输入替换为前缀部分，render_video
+        使用该预览时间线，写出后经 on_partial 发布 {"event": "render.preview", "output_path", ...}。
+
+        预览不查也不写 NodeMemo、不计入进度与断点；其产物由 ToolInterceptor 存在单独的预览会话下
+        （正式节点按会话查找输入，不会读到），发布后即删除。预览失败只记录日志。
+        返回预览视频写出时距流水线开始的秒数，未完成预览时为 None。
+        """
+        source, planner, renderer = PREFIX_PREVIEW_NODES
+        artifact_ids = {planner: self.store.generate_artifact_id(planner), renderer: self.store.generate_artifact_id(renderer)}
+        group_ids = {item.get("group_id") for item in voiceover}
+        # 预览节点的进度消息不转发，避免与正式节点的进度混在一起
+        token = set_mcp_log_sink(None)
+        try:
+            collected = self.node_manager.check_excutable(self.session_id, self.store, ["group_clips"])["collected_node"]
+            if "group_clips" not in collected:
+                return None
+            _, group_output = self.store.load_result(collected["group_clips"].artifact_id)
+            group_payload = dict(group_output["payload"])
+            group_payload["groups"] = [g for g in group_payload.get("groups") or [] if g.get("group_id") in group_ids]
+
+            plan_payload = await self._call_with_inputs(
+                plan_cfg, artifact_ids[planner],
+                {self.node_manager.id_to_kind.get(source, source): {"voiceover": voiceover}, "group_clips": group_payload},
+            )
+            if plan_payload is None:
+                return None
+            rendered = await self._call_with_inputs(render_cfg, artifact_ids[renderer], {"plan_timeline": plan_payload})
+            if rendered is None:
+                return None
+
+            elapsed = time.perf_counter() - started_at
+            logger.info(f"[Pipeline] prefix preview of {len(voiceover)}/{total_groups} groups rendered at {elapsed:.1f}s")
+            await on_partial(renderer, {
+                "event": "render.preview",
+                "output_path": rendered.get("output_path"),
+                "duration_s": rendered.get("duration_s"),
+                "prefix": len(voiceover),
+                "total": total_groups,
+                "elapsed_sec": round(elapsed, 3),
+            })
+            return elapsed
+        except Exception as e:
+            logger.warning(f"[Pipeline] prefix preview failed: {e}")
+            logger.debug(traceback.format_exc())
+            return None
+        finally:
+            reset_mcp_log_sink(token)
+            self._discard_artifacts(artifact_ids)
+
+    async def _call_with_inputs(
+        self,
+        node_cfg: NodeConfig,
+        artifact_id: str,
+        input_overrides: Dict[str, Any],
+    ) -> Optional[Dict[str, Any]]:
+        """以替换后的输入（kind -> payload）执行节点，返回其产物 payload；节点返回错误时为 None"""
+        node_id = (self._step_tool_ids(node_cfg.node_id) or [node_cfg.node_id])[0]
+        token = set_input_overrides(input_overrides)
+        try:
+            result = await self._call_tool(node_id, node_cfg.mode, dict(node_cfg.params), artifact_id=artifact_id)
+        finally:
+            reset_input_overrides(token)
+        if result.get("isError"):
+            logger.warning(f"[Pipeline] prefix preview: {node_id} returned error: {result.get('summary')}")
+            return None
+        _, output = self.store.load_result(artifact_id)
+        return output.get("payload") if isinstance(output, dict) else None
 
     # ------------------------------------------------------------------
     # 内部方法
@@ -191,11 +658,132 @@ class PipelineExecutor:
 
         return plan
 
+    def _resumable_nodes(
+        self,
+        plan: List[NodeConfig],
+        deps: Dict[str, Set[str]],
+        state: Dict[str, Any],
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        上次执行中可沿用的节点：状态为 done、产物仍然存在，且所依赖的节点也都沿用
+        （上游需要重跑时，下游的输入会变，也要重跑）。返回 {node_id: 上次的节点记录}。
+        """
+        saved_nodes = state.get("nodes") or {}
+        available: Set[str] = {nc.node_id for nc in plan if nc.mode == "skip"}
+        completed: Dict[str, Dict[str, Any]] = {}
+        for node_cfg in plan:  # 计划顺序即拓扑顺序
+            node_id = node_cfg.node_id
+            entry = saved_nodes.get(node_id) or {}
+            if node_cfg.mode == "skip" or entry.get("status") != "done":
+                continue
+            if not deps[node_id] <= available:
+                continue
+            if not artifacts_available(self.store, (entry.get("artifact_ids") or {}).values()):
+                logger.info(f"[Pipeline] {node_id} artifacts are gone, re-running it")
+                continue
+            completed[node_id] = entry
+            available.add(node_id)
+        return completed
+
+    def _step_tool_ids(self, node_id: str) -> List[str]:
+        """模板节点实际对应的已注册工具节点 ID（可能为空：工具未注册）"""
+        return [
+            tool_id for tool_id in PIPELINE_NODE_ALIASES.get(node_id, [node_id])
+            if tool_id in self.node_manager.id_to_tool
+        ]
+
+    def _build_dependency_graph(self, plan: List[NodeConfig]) -> Dict[str, Set[str]]:
+        """
+        由 NodeMeta 的 require_prior_kind（default 模式用 default_require_prior_kind）推导依赖：
+        节点依赖计划中在它之前、产出其所需 kind 的最近一个节点。跳过的节点不产出任何 kind。
+
+        所需 kind 在之前无节点产出时，ToolInterceptor 会在执行时按需以 default 模式（递归地）补跑上游节点；
+        这类节点等待之前的所有节点，与串行执行时看到的产物一致，也不会与正在运行的节点重复执行同一上游。
+        不经过产物传递的先后关系（如共享素材目录）见 ORDERING_DEPENDENCIES。
+        """
+        deps: Dict[str, Set[str]] = {}
+        producer_of_kind: Dict[str, str] = {}
+        active: Set[str] = set()
+
+        for node_cfg in plan:
+            node_id = node_cfg.node_id
+            if node_cfg.mode == "skip":
+                deps[node_id] = set()
+                continue
+            active.add(node_id)
+
+            tool_ids = self._step_tool_ids(node_id)
+            if not tool_ids:
+                # 未注册的工具：依赖关系未知，等待之前的所有节点
+                deps[node_id] = set(deps)
+                continue
+
+            require_map = (
+                self.node_manager.id_to_require_prior_kind
+                if node_cfg.mode == "auto"
+                else self.node_manager.id_to_default_require_prior_kind
+            )
+            node_deps: Set[str] = set()
+            needs_on_demand = False
+            for tool_id in tool_ids:
+                for kind in require_map.get(tool_id, []):
+                    if kind in producer_of_kind:
+                        node_deps.add(producer_of_kind[kind])
+                    else:
+                        needs_on_demand = True
+            if needs_on_demand:
+                node_deps = set(deps)
+            node_deps.update(prior for prior in ORDERING_DEPENDENCIES.get(node_id, ()) if prior in active)
+            deps[node_id] = node_deps
+
+            for tool_id in tool_ids:
+                producer_of_kind[self.node_manager.id_to_kind.get(tool_id, tool_id)] = node_id
+
+        return deps
+
+    @staticmethod
+    def _timing_report(
+        plan: List[NodeConfig],
+        deps: Dict[str, Set[str]],
+        durations: Dict[str, float],
+        wall_sec: float,
+    ) -> Dict[str, Any]:
+        """关键路径：按实际耗时在依赖图上最长的一条链；串行耗时为各节点耗时之和。"""
+        finish: Dict[str, float] = {}
+        previous_on_path: Dict[str, Optional[str]] = {}
+        for node_cfg in plan:  # 计划顺序即拓扑顺序
+            node_id = node_cfg.node_id
+            prior = max(deps.get(node_id, ()), key=lambda d: finish.get(d, 0.0), default=None)
+            finish[node_id] = durations.get(node_id, 0.0) + (finish.get(prior, 0.0) if prior else 0.0)
+            previous_on_path[node_id] = prior
+
+        path: List[str] = []
+        node_id = max(finish, key=finish.get, default=None)
+        critical_path_sec = finish.get(node_id, 0.0) if node_id else 0.0
+        while node_id is not None:
+            if node_id in durations:
+                path.append(node_id)
+            node_id = previous_on_path[node_id]
+        path.reverse()
+
+        serial_sec = sum(durations.values())
+        return {
+            "wall_sec": round(wall_sec, 3),
+            "serial_sec": round(serial_sec, 3),
+            "saved_sec": round(max(0.0, serial_sec - wall_sec), 3),
+            "critical_path": path,
+            "critical_path_sec": round(critical_path_sec, 3),
+            "node_sec": {node_id: round(sec, 3) for node_id, sec in durations.items()},
+        }
+
     async def _execute_node(
         self,
         node_id: str,
         mode: str,
         params: Dict[str, Any],
+        on_partial: Optional[PartialCallback] = None,
+        artifact_id: Optional[str] = None,
+        record_memo: bool = True,
     ) -> Dict[str, Any]:
         """
         执行单个节点，复用现有 ToolInterceptor 的依赖解析逻辑。
@@ -203,14 +791,145 @@ class PipelineExecutor:
         通过直接调用 NodeManager 的 tool.arun() 来执行，
         因为 ToolInterceptor 的 inject_media_content_before 会
         自动处理依赖注入。
+
+        执行期间节点流式发布的部分结果经 on_partial 转发给调用方。
+        启用 NodeMemo 时先按指纹查找已有产物，命中则复制为本会话的新产物并直接返回（不产生部分结果）；
+        执行成功后记录指纹，record_memo=False 时改为放入 result["memo_fingerprint"] 由调用方决定是否记录。
         """
+        artifact_id = artifact_id or self.store.generate_artifact_id(node_id)
+
+        fingerprint = await self._node_fingerprint(node_id, mode, params)
+        if fingerprint and not (self._force_all or node_id in self._force_tools):
+            hit = await asyncio.to_thread(self.memo.lookup, fingerprint)
+            if hit is not None:
+                return self._reuse_memo(node_id, hit, artifact_id)
+
+        forward_tasks: List[asyncio.Task] = []
+
+        def _on_partial(payload: Dict[str, Any]) -> None:
+            if on_partial is not None:
+                forward_tasks.append(asyncio.create_task(on_partial(node_id, payload)))
+
+        token = set_mcp_log_sink(self._partial_sink(get_mcp_log_sink(), _on_partial))
+        try:
+            result = await self._call_tool(node_id, mode, params, artifact_id=artifact_id)
+            if not result.get("isError"):
+                # ToolInterceptor 在节点成功后以该 ID 保存产物
+                result["artifact_id"] = artifact_id
+            if fingerprint and not result.get("isError"):
+                if record_memo:
+                    self._record_memo(node_id, fingerprint, artifact_id)
+                else:
+                    result["memo_fingerprint"] = fingerprint
+            return result
+        finally:
+            reset_mcp_log_sink(token)
+            for res in await asyncio.gather(*forward_tasks, return_exceptions=True):
+                if isinstance(res, Exception):
+                    logger.warning(f"[Pipeline] {node_id} partial callback failed: {res}")
+
+    def _record_memo(self, node_id: str, fingerprint: str, artifact_id: str) -> None:
+        meta, _ = self.store.load_result(artifact_id)
+        if meta is not None:
+            self.memo.record(
+                fingerprint,
+                node_id=node_id,
+                session_id=self.session_id,
+                artifact_id=artifact_id,
+                path=meta.path,
+                summary=meta.summary,
+            )
+
+    async def _node_fingerprint(self, node_id: str, mode: str, params: Dict[str, Any]) -> Optional[str]:
+        """
+        节点本次执行的指纹；未启用缓存、节点不可复用，或所需输入产物尚不存在
+        （执行时 ToolInterceptor 会按需补跑上游，输入无法事先确定）时返回 None。
+        """
+        if self.memo is None or node_id in NODE_MEMO_EXCLUDED:
+            return None
+        require_map = (
+            self.node_manager.id_to_require_prior_kind
+            if mode == "auto"
+            else self.node_manager.id_to_default_require_prior_kind
+        )
+        collected = self.node_manager.check_excutable(self.session_id, self.store, require_map.get(node_id, []))
+        if not collected["excutable"]:
+            return None
+
+        def _fingerprint() -> str:
+            input_payloads = {}
+            for kind, meta in collected["collected_node"].items():
+                with open(meta.path, "r", encoding="utf-8") as f:
+                    input_payloads[kind] = json.load(f).get("payload")
+            return self.memo.fingerprint(
+                node_id=node_id, mode=mode, params=params, input_payloads=input_payloads, runtime=self.runtime
+            )
+
+        try:
+            # 素材目录按内容摘要，放到线程中计算，避免阻塞事件循环
+            return await asyncio.to_thread(_fingerprint)
+        except (OSError, ValueError) as e:
+            logger.warning(f"[Pipeline] {node_id} fingerprint unavailable, executing without memo: {e}")
+            return None
+
+    def _reuse_memo(self, node_id: str, hit: Dict[str, Any], artifact_id: str) -> Dict[str, Any]:
+        """
+        把命中的产物另存为本会话的新产物，供下游节点按常规方式读取。
+        与 ToolInterceptor 一样在事件循环中写入 ArtifactStore（meta.json 的读写不加锁）。
+        """
+        entry = hit["entry"]
+        self.store.save_result(
+            self.session_id,
+            node_id,
+            {
+                "artifact_id": artifact_id,
+                "summary": entry.get("summary"),
+                "tool_excute_result": hit["payload"],
+            },
+        )
+        logger.info(
+            f"[Pipeline] {node_id} reused artifact {entry.get('artifact_id')} "
+            f"from session {entry.get('session_id')}"
+        )
+        return {"summary": entry.get("summary") or "", "isError": False, "cached": True, "artifact_id": artifact_id}
+
+    @staticmethod
+    def _partial_sink(
+        parent: Optional[Callable[[dict], None]],
+        on_partial: Callable[[Dict[str, Any]], None],
+    ) -> Callable[[dict], None]:
+        """包装 MCP 日志通道：进度消息中带 "event" 字段的 JSON 视为部分结果，其余照常转发。"""
+
+        def sink(raw: Any) -> None:
+            if isinstance(raw, dict) and raw.get("type") == "tool_progress":
+                message = raw.get("message") or ""
+                if message.startswith("{"):
+                    try:
+                        payload = json.loads(message)
+                    except ValueError:
+                        payload = None
+                    if isinstance(payload, dict) and payload.get("event"):
+                        on_partial(payload)
+                        return
+            if parent is not None:
+                parent(raw)
+
+        return sink
+
+    async def _call_tool(
+        self,
+        node_id: str,
+        mode: str,
+        params: Dict[str, Any],
+        artifact_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
         tool = self.node_manager.get_tool(node_id)
         if not tool:
             raise PipelineError(node_id, f"Tool '{node_id}' not found in NodeManager")
 
         # 构造工具调用参数
         tool_args = {
-            "artifact_id": self.store.generate_artifact_id(node_id),
+            "artifact_id": artifact_id or self.store.generate_artifact_id(node_id),
             "mode": mode,
         }
         tool_args.update(params)
@@ -247,14 +966,16 @@ class PipelineExecutor:
         params: Dict[str, Any],
         timeout_sec: int,
         on_confirm: ConfirmCallback,
-    ) -> Dict[str, Any]:
-        """半自动：请求确认，超时走默认值"""
+    ) -> Optional[Dict[str, Any]]:
+        """半自动：请求确认，超时走默认值；用户选择跳过时返回 None"""
         try:
             confirmed = await asyncio.wait_for(
                 on_confirm(node_id, params, timeout_sec),
                 timeout=timeout_sec,
             )
             logger.info(f"[Pipeline] {node_id} confirmed by user")
+            if confirmed == CONFIRM_SKIP:
+                return None
             return confirmed if isinstance(confirmed, dict) else params
         except asyncio.TimeoutError:
             logger.info(
@@ -131,6 +131,16 @@ class ArtifactStore:
             data = json.load(f)
         return meta, data
     
+    def discard(self, artifact_id: str) -> bool:
+        """Remove an artifact from meta.json and delete its JSON file; returns False if it was never saved."""
+        metas = self._load_meta_list()
+        meta = next((m for m in metas if m.artifact_id == artifact_id), None)
+        if meta is None:
+            return False
+        self._save_meta_list([m for m in metas if m.artifact_id != artifact_id])
+        Path(meta.path).unlink(missing_ok=True)
+        return True
+
     def generate_artifact_id(self, node_id):
         unique_id = uuid.uuid4().hex[:8]
         artifact_id = f"{node_id}_{unique_id}"
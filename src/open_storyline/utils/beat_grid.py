@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import List, Optional, Sequence
+
+
+class BeatGrid:
+    """
+    Sorted beat positions in integer milliseconds with O(log n) lookups.
+
+    With `cycle_ms > 0` the grid repeats every `cycle_ms` (looping BGM): positions past the end continue into the
+    next cycle, and indices are "unrolled" (index `n` is beat 0 of the second cycle), so callers can walk any number
+    of beats ahead without wrapping by hand. `index % len(grid)` gives the beat within the track.
+
+    `levels` optionally holds one strength per beat (1 = strongest, as in `beat_type_max`) for `accents()`.
+    """
+
+    def __init__(
+        self,
+        positions_ms: Sequence[int],
+        *,
+        cycle_ms: int = 0,
+        levels: Optional[Sequence[int]] = None,
+    ) -> None:
+        self.positions: List[int] = list(positions_ms)
+        if any(a > b for a, b in zip(self.positions, self.positions[1:])):
+            raise ValueError("beat positions must be sorted")
+        if levels is not None and len(levels) != len(self.positions):
+            raise ValueError("levels must have one entry per beat")
+        if cycle_ms and self.positions and (self.positions[0] < 0 or self.positions[-1] > cycle_ms):
+            raise ValueError("beat positions must lie within [0, cycle_ms]")
+        self.cycle_ms = cycle_ms
+        self.levels: Optional[List[int]] = None if levels is None else list(levels)
+
+    @classmethod
+    def from_durations(cls, durations_ms: Sequence[int], *, levels: Optional[Sequence[int]] = None) -> "BeatGrid":
+        """Looping grid whose beats start at 0 and last `durations_ms` each; the cycle is their sum."""
+        if any(d < 0 for d in durations_ms):
+            raise ValueError("beat durations must be non-negative")
+        starts = [0] + list(accumulate(durations_ms))
+        return cls(starts[:-1], cycle_ms=starts[-1], levels=levels)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __bool__(self) -> bool:
+        return bool(self.positions)
+
+    @property
+    def loops(self) -> bool:
+        return self.cycle_ms > 0 and bool(self.positions)
+
+    # -----------------------------
+    # Index lookups (unrolled when looping)
+    # -----------------------------
+    def position(self, index: int) -> int:
+        n = len(self.positions)
+        if not self.loops:
+            return self.positions[index]
+        cycle, i = divmod(index, n)
+        return cycle * self.cycle_ms + self.positions[i]
+
+    def index_ceil(self, t_ms: float) -> Optional[int]:
+        """Index of the first beat at or after `t_ms` (None past the end of a non-looping grid)."""
+        if not self.loops:
+            i = bisect_left(self.positions, t_ms)
+            return i if i < len(self.positions) else None
+        cycle, rem = divmod(t_ms, self.cycle_ms)
+        i = bisect_left(self.positions, rem)
+        return int(cycle) * len(self.positions) + i
+
+    def index_floor(self, t_ms: float) -> Optional[int]:
+        """Index of the last beat at or before `t_ms` (None before the first beat of a non-looping grid)."""
+        if not self.loops:
+            i = bisect_right(self.positions, t_ms) - 1
+            return i if i >= 0 else None
+        cycle, rem = divmod(t_ms, self.cycle_ms)
+        i = bisect_right(self.positions, rem) - 1
+        return int(cycle) * len(self.positions) + i
+
+    # -----------------------------
+    # Position lookups
+    # -----------------------------
+    def ceil(self, t_ms: float) -> Optional[int]:
+        i = self.index_ceil(t_ms) if self.positions else None
+        return None if i is None else self.position(i)
+
+    def floor(self, t_ms: float) -> Optional[int]:
+        i = self.index_floor(t_ms) if self.positions else None
+        return None if i is None else self.position(i)
+
+    def nearest(self, t_ms: float, *, prefer_later: bool = False) -> Optional[int]:
+        """Closest beat to `t_ms`; on a tie the earlier one unless `prefer_later`."""
+        before, after = self.floor(t_ms), self.ceil(t_ms)
+        if before is None or after is None:
+            return after if before is None else before
+        if prefer_later:
+            return before if t_ms - before < after - t_ms else after
+        return after if after - t_ms < t_ms - before else before
+
+    def between(self, start_ms: float, end_ms: float) -> List[int]:
+        """Beat positions in [start_ms, end_ms)."""
+        if not self.positions or end_ms <= start_ms:
+            return []
+        first = self.index_ceil(start_ms)
+        if first is None:
+            return []
+        out: List[int] = []
+        i = first
+        while True:
+            if not self.loops and i >= len(self.positions):
+                break
+            p = self.position(i)
+            if p >= end_ms:
+                break
+            out.append(p)
+            i += 1
+        return out
+
+    # -----------------------------
+    # Filters
+    # -----------------------------
+    def downbeats(self, beats_per_bar: int = 4, phase: int = 0) -> "BeatGrid":
+        """Every `beats_per_bar`-th beat starting at `phase` (bar starts)."""
+        if beats_per_bar <= 0:
+            raise ValueError("beats_per_bar must be positive")
+        keep = range(phase % beats_per_bar, len(self.positions), beats_per_bar)
+        return self._subset(keep)
+
+    def accents(self, max_level: int = 1) -> "BeatGrid":
+        """Beats whose level is at most `max_level` (all beats when no levels are known)."""
+        if self.levels is None:
+            return self._subset(range(len(self.positions)))
+        return self._subset([i for i, level in enumerate(self.levels) if level <= max_level])
+
+    def _subset(self, indices) -> "BeatGrid":
+        indices = list(indices)
+        return BeatGrid(
+            [self.positions[i] for i in indices],
+            cycle_ms=self.cycle_ms,
+            levels=None if self.levels is None else [self.levels[i] for i in indices],
+        )
@@ -0,0 +1,130 @@
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+
+
+class BoundedDiskCache:
+    """
+    Size-bounded LRU directory of cache entries, laid out as `<root>/<key[:2]>/<key><suffix>`.
+
+    An entry is one main file (`suffix`, the only one counted towards `max_bytes`) plus optional companion files
+    such as metadata sidecars (`companion_suffixes`), which are evicted together with it. Writes go through a
+    temporary file and `os.replace`, so readers never see a torn file; reads refresh the main file's mtime via
+    `touch`, and once the directory grows past `max_bytes` the least recently used entries are evicted.
+
+    The byte count is kept in memory per instance. Several processes sharing one directory each keep their own
+    count, so the bound is approximate across processes.
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        max_bytes: int,
+        suffix: str,
+        companion_suffixes: Sequence[str] = (),
+    ):
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+        self.suffix = suffix
+        self.companion_suffixes = tuple(companion_suffixes)
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+    def path_for(self, key: str, suffix: Optional[str] = None) -> Path:
+        return self.root / key[:2] / f"{key}{suffix or self.suffix}"
+
+    @staticmethod
+    def touch(path: Path) -> None:
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    def put(self, key: str, files: Sequence[Tuple[str, bytes]]) -> None:
+        """
+        Write the files of one entry, given as (suffix, data) and replaced in this order; put the file whose
+        presence marks the entry complete last. Replacing an existing entry counts only the size difference,
+        so concurrent writers of the same key do not inflate the total.
+        """
+        tag = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        staged: List[Tuple[Path, Path]] = []
+        try:
+            for suffix, data in files:
+                path = self.path_for(key, suffix)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(path.name + tag)
+                tmp.write_bytes(data)
+                staged.append((tmp, path))
+        except OSError:
+            for tmp, _ in staged:
+                tmp.unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_total_bytes()
+            try:
+                for tmp, path in staged:
+                    if path.suffix == self.suffix:
+                        replaced = self._size_of(path)
+                        os.replace(tmp, path)
+                        self._total_bytes += self._size_of(path) - replaced
+                    else:
+                        os.replace(tmp, path)
+            except OSError:
+                for tmp, _ in staged:
+                    tmp.unlink(missing_ok=True)
+                return
+            if self._total_bytes > self.max_bytes:
+                self._evict_locked()
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_total_bytes()
+            return self._total_bytes
+
+    @staticmethod
+    def _size_of(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
+
+    def _iter_entries(self) -> List[Tuple[float, int, Path]]:
+        entries: List[Tuple[float, int, Path]] = []
+        if not self.root.exists():
+            return entries
+        for sub in self.root.iterdir():
+            if not sub.is_dir():
+                continue
+            for f in sub.iterdir():
+                if f.suffix != self.suffix:
+                    continue
+                try:
+                    st = f.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, f))
+        return entries
+
+    def _scan_total_bytes(self) -> int:
+        return sum(size for _, size, _ in self._iter_entries())
+
+    def _evict_locked(self) -> None:
+        entries = sorted(self._iter_entries(), key=lambda e: e[0])
+        total = sum(size for _, size, _ in entries)
+        # Evict down to 90% so that a full cache does not rescan the directory on every put
+        target = int(self.max_bytes * 0.9)
+        for _, size, f in entries:
+            if total <= target:
+                break
+            try:
+                for companion in self.companion_suffixes:
+                    f.with_suffix(companion).unlink(missing_ok=True)
+                f.unlink()
+                total -= size
+            except OSError:
+                continue
+        self._total_bytes = total
@@ -7,6 +7,66 @@ FilterValue = Union[str, List[str]]
 FilterDict = Dict[str, FilterValue]
 
 
+def _bitset(positions: List[int], size: int) -> int:
+    buf = bytearray((size >> 3) + 1)
+    for p in positions:
+        buf[p >> 3] |= 1 << (p & 7)
+    return int.from_bytes(buf, "little")
+
+
+def _iter_bits(mask: int) -> List[int]:
+    """Set bit positions in ascending order."""
+    bits = bin(mask)[:1:-1]
+    out: List[int] = []
+    i = bits.find("1")
+    while i != -1:
+        out.append(i)
+        i = bits.find("1", i + 1)
+    return out
+
+
+class _InvertedIndex:
+    """
+    field -> normalized value -> library positions. Items lacking a field appear in none of its postings, which
+    gives the same include / exclude semantics as matching item by item. Postings are turned into int bitsets the
+    first time a query touches them, so high-cardinality fields (ids, names) cost nothing until filtered on.
+    """
+
+    def __init__(self, library: List[Dict[str, Any]]):
+        self.size = len(library)
+        self.all = (1 << self.size) - 1
+        self.postings: Dict[str, Dict[str, List[int]]] = {}
+        self._bitsets: Dict[tuple, int] = {}
+        for pos, item in enumerate(library):
+            for key, value in item.items():
+                by_value = self.postings.setdefault(key, {})
+                for v in set(ElementFilter._normalize(value)):
+                    by_value.setdefault(v, []).append(pos)
+
+    def _any_of(self, key: str, values: FilterValue) -> int:
+        by_value = self.postings.get(key, {})
+        mask = 0
+        for v in set(ElementFilter._normalize(values)):
+            if v not in by_value:
+                continue
+            bits = self._bitsets.get((key, v))
+            if bits is None:
+                bits = _bitset(by_value[v], self.size)
+                self._bitsets[(key, v)] = bits
+            mask |= bits
+        return mask
+
+    def match(self, include: FilterDict, exclude: FilterDict) -> int:
+        mask = self.all
+        for key, expected in include.items():
+            mask &= self._any_of(key, expected)
+            if not mask:
+                return 0
+        for key, forbidden in exclude.items():
+            mask &= ~self._any_of(key, forbidden)
+        return mask
+
+
 class ElementFilter:
     """
     Generic filter for structured element libraries (music, effects, stickers, etc.)
@@ -18,6 +78,8 @@ class ElementFilter:
         json_path: Optional[str] = None,
     ):
         self.library: List[Dict[str, Any]] = []
+        self._index: Optional[_InvertedIndex] = None
+        self._index_key: Optional[tuple] = None
 
         if library is not None:
             self.library = library
@@ -32,6 +94,7 @@ class ElementFilter:
         library: Optional[List[Dict[str, Any]]] = None,
     ) -> None:
         """Reload or replace the element library."""
+        self._index = None
         if library is not None:
             self.library = library
             return
@@ -66,16 +129,21 @@ class ElementFilter:
         include = filter_include or {}
         exclude = filter_exclude or {}
 
-        results = []
+        if candidates is self.library:
+            mask = self._get_index().match(include, exclude)
+            results = [self.library[pos] for pos in _iter_bits(mask)]
+        else:
+            # Caller-supplied candidate lists (e.g. recall results) are short, match them item by item
+            results = []
 
-        for item in candidates:
-            if not self._match_include(item, include):
-                continue
+            for item in candidates:
+                if not self._match_include(item, include):
+                    continue
 
-            if self._match_exclude(item, exclude):
-                continue
+                if self._match_exclude(item, exclude):
+                    continue
 
-            results.append(item)
+                results.append(item)
 
         if not results and fallback_n > 0:
             return random.sample(
@@ -84,6 +152,14 @@ class ElementFilter:
 
         return results
 
+    def _get_index(self) -> _InvertedIndex:
+        """Build the inverted index on first use and again whenever the library list is replaced."""
+        key = (id(self.library), len(self.library))
+        if self._index is None or self._index_key != key:
+            self._index = _InvertedIndex(self.library)
+            self._index_key = key
+        return self._index
+
     @staticmethod
     def _normalize(value: Any) -> List[str]:
         """Normalize scalar or list values into a list of strings."""
@@ -0,0 +1,68 @@
+import math
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+
+MOTION_PROBE_WIDTH = 32
+MOTION_PROBE_HEIGHT = 18
+MOTION_PROBE_FRAMES = 6
+# Mean absolute gray-level difference (0..1) at which a clip counts as "half way" to full motion
+MOTION_HALF_SATURATION = 0.04
+# Frame demand multiplier goes from MIN (static) to MAX (fast action)
+MOTION_FACTOR_MIN = 0.35
+MOTION_FACTOR_MAX = 2.0
+
+
+def estimate_motion(frames: Sequence[Optional[np.ndarray]]) -> float:
+    """
+    Cheap motion/complexity score of a clip from a handful of tiny grayscale frames:
+    mean absolute difference between consecutive frames, scaled to [0, 1].
+    """
+    valid = [np.asarray(f, dtype=np.float32) for f in frames if f is not None]
+    if len(valid) < 2:
+        return 0.0
+    diffs = [float(np.mean(np.abs(b - a))) for a, b in zip(valid, valid[1:])]
+    return float(np.mean(diffs)) / 255.0
+
+
+def motion_factor(motion: float) -> float:
+    saturation = motion / (motion + MOTION_HALF_SATURATION) if motion > 0 else 0.0
+    return MOTION_FACTOR_MIN + (MOTION_FACTOR_MAX - MOTION_FACTOR_MIN) * saturation
+
+
+def allocate_frame_budget(
+    durations_sec: Sequence[float],
+    motions: Sequence[float],
+    *,
+    sample_fps: float,
+    min_frames: int,
+    max_frames: int,
+    run_budget: int,
+) -> List[int]:
+    """
+    Frames per clip: demand is duration * sample_fps scaled by how much the clip moves, clamped to
+    [min_frames, max_frames]. If the total exceeds `run_budget`, every clip keeps min_frames and the rest of the
+    budget is shared in proportion to the remaining demand (largest remainder rounding).
+    """
+    demands = [
+        max(min_frames, min(max_frames, int(math.ceil(max(0.0, d) * sample_fps * motion_factor(m)))))
+        for d, m in zip(durations_sec, motions)
+    ]
+    if run_budget <= 0 or sum(demands) <= run_budget:
+        return demands
+
+    floor_total = min_frames * len(demands)
+    if floor_total >= run_budget:
+        return [min_frames] * len(demands)
+
+    extra = [d - min_frames for d in demands]
+    extra_total = sum(extra)
+    spare = run_budget - floor_total
+    shares = [e * spare / extra_total for e in extra]
+    alloc = [min_frames + int(s) for s in shares]
+    leftover = run_budget - sum(alloc)
+    by_remainder = sorted(range(len(shares)), key=lambda i: shares[i] - int(shares[i]), reverse=True)
+    for i in by_remainder[:leftover]:
+        alloc[i] += 1
+    return alloc
@@ -0,0 +1,63 @@
+import asyncio
+import json
+import re
+from typing import Any, Awaitable, Callable, List, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# CJK ideographs / kana / hangul are roughly one token each, other text about four characters per token
+_CJK_RE = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯豈-﫿]")
+_CHARS_PER_TOKEN = 4.0
+
+
+def estimate_tokens(text: Any) -> int:
+    """
+    Rough, tokenizer-free token estimate, good enough for sizing prompt chunks.
+    Non-string values are measured by their JSON form.
+    """
+    if not isinstance(text, str):
+        text = json.dumps(text, ensure_ascii=False)
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + int((len(text) - cjk) / _CHARS_PER_TOKEN) + 1
+
+
+def chunk_by_tokens(
+    items: Sequence[T],
+    render: Callable[[T], Any],
+    max_tokens: int,
+) -> List[List[T]]:
+    """
+    Split `items` into consecutive chunks whose rendered size stays within `max_tokens`.
+    An item larger than the budget gets a chunk of its own.
+    """
+    chunks: List[List[T]] = []
+    current: List[T] = []
+    current_tokens = 0
+    for item in items:
+        tokens = estimate_tokens(render(item))
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(item)
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def gather_bounded(
+    tasks: Sequence[Callable[[], Awaitable[R]]],
+    max_concurrency: int,
+) -> List[Any]:
+    """
+    Run coroutine factories with at most `max_concurrency` in flight.
+    Results keep the input order; a failed task yields its exception instead of cancelling the others.
+    """
+    semaphore = asyncio.Semaphore(max(1, int(max_concurrency)))
+
+    async def _run(task: Callable[[], Awaitable[R]]) -> Any:
+        async with semaphore:
+            return await task()
+
+    return await asyncio.gather(*(_run(t) for t in tasks), return_exceptions=True)
@@ -0,0 +1,242 @@
+import os
+import re
+import time
+import random
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from open_storyline.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+# -----------------------------
+# Defaults
+# -----------------------------
+DEFAULT_MEDIA_CACHE_DIR = "./.storyline/cache/media"
+DEFAULT_DOWNLOAD_CONCURRENCY = 4
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+DOWNLOAD_MAX_ATTEMPTS = 4
+CONNECT_TIMEOUT_SEC = 10
+READ_TIMEOUT_SEC = 60
+PARTIAL_SUFFIX = ".part"
+
+# Timeouts, rate limits and 5xx are retried; other HTTP errors fail the download at once
+RETRY_STATUS_CODES = {408, 429}
+MAX_RETRY_AFTER_SEC = 30.0
+
+_CONTENT_RANGE_RE = re.compile(r"bytes (?:(\d+)-\d+|\*)/(\d+|\*)")
+_UNSAFE_KEY_CHARS_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+@dataclass
+class DownloadJob:
+    """One asset to fetch: where it comes from, its cache identity and where the session wants it."""
+    url: str
+    provider: str
+    asset_id: str
+    rendition: str
+    ext: str
+    target: Path
+    full_size_ratio: float = 1.0    # bytes of the largest rendition / bytes of this one (estimate), for reporting
+
+
+@dataclass
+class DownloadResult:
+    job: DownloadJob
+    path: Path
+    size: int
+    cached: bool      # served from the cross-session cache, nothing downloaded
+    resumed: bool     # at least one Range request continued a partial file
+    elapsed_s: float
+
+
+class MediaDownloadCache:
+    """
+    Cross-session cache of downloaded stock media, keyed by (provider, asset id, rendition).
+
+    Downloads go to `<key>.part` and are renamed into place once complete, so a file under its final name is always
+    whole; an interrupted download leaves the `.part` behind and the next attempt resumes it with an HTTP Range
+    request. Session media dirs get hard links to cached files (a copy when linking is not possible).
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path] = DEFAULT_MEDIA_CACHE_DIR,
+        max_workers: int = DEFAULT_DOWNLOAD_CONCURRENCY,
+    ):
+        self.root = Path(root)
+        self.max_workers = max(1, int(max_workers))
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    # ---------- paths ----------
+    def path_for(self, provider: str, asset_id: str, rendition: str, ext: str) -> Path:
+        name = _UNSAFE_KEY_CHARS_RE.sub("_", f"{asset_id}_{rendition}")
+        return self.root / _UNSAFE_KEY_CHARS_RE.sub("_", provider) / f"{name}{ext}"
+
+    # ---------- download ----------
+    def fetch(self, job: DownloadJob) -> DownloadResult:
+        start = time.perf_counter()
+        cached_path = self.path_for(job.provider, job.asset_id, job.rendition, job.ext)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(str(cached_path), threading.Lock())
+
+        # Two jobs for the same asset download it once
+        with key_lock:
+            cached = cached_path.exists()
+            resumed = False
+            if not cached:
+                resumed = self._download(job.url, cached_path)
+
+        _link_or_copy(cached_path, job.target)
+        return DownloadResult(
+            job=job,
+            path=job.target,
+            size=cached_path.stat().st_size,
+            cached=cached,
+            resumed=resumed,
+            elapsed_s=time.perf_counter() - start,
+        )
+
+    def fetch_all(
+        self,
+        jobs: Sequence[DownloadJob],
+        on_done: Optional[Callable[[DownloadResult], None]] = None,
+    ) -> List[Union[DownloadResult, Exception]]:
+        """Fetch with at most `max_workers` downloads in flight; results keep job order, failures are returned."""
+
+        def _run(job: DownloadJob) -> Union[DownloadResult, Exception]:
+            try:
+                res = self.fetch(job)
+            except Exception as e:
+                logger.warning(f"Download failed for {job.url}: {type(e).__name__}: {e}")
+                return e
+            if on_done is not None:
+                on_done(res)
+            return res
+
+        if not jobs:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs)), thread_name_prefix="media-dl") as pool:
+            return list(pool.map(_run, jobs))
+
+    def _download(self, url: str, dest: Path) -> bool:
+        """Download `url` into `dest` via `dest.part`, resuming the partial file across attempts. Returns whether a resume happened."""
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        part = dest.with_name(dest.name + PARTIAL_SUFFIX)
+        resumed = False
+        last_error: Optional[Exception] = None
+
+        attempt = 0
+        while attempt < DOWNLOAD_MAX_ATTEMPTS:
+            offset = part.stat().st_size if part.exists() else 0
+            headers = {"Range": f"bytes={offset}-"} if offset else {}
+            retry_after: Optional[float] = None
+            try:
+                with self._session.get(
+                    url,
+                    headers=headers,
+                    stream=True,
+                    timeout=(CONNECT_TIMEOUT_SEC, READ_TIMEOUT_SEC),
+                ) as r:
+                    if r.status_code == 416 and offset:
+                        _, total = _parse_content_range(r)
+                        if total == offset:
+                            # The partial file is already whole (the rename was interrupted)
+                            os.replace(part, dest)
+                            return True
+                        # Longer than the file, or the size is unknown: start over, which is not a failed attempt
+                        part.unlink(missing_ok=True)
+                        continue
+                    r.raise_for_status()
+
+                    expected_total = self._expected_total(r, offset)
+                    if offset and r.status_code == 206:
+                        start, _ = _parse_content_range(r)
+                        if start != offset:
+                            # Appending would splice the wrong bytes in: drop the partial file and retry from zero
+                            part.unlink(missing_ok=True)
+                            raise requests.ConnectionError(f"Content-Range starts at {start}, expected {offset}")
+                        resumed = True
+                        mode = "ab"
+                    else:
+                        # Server ignored the Range header: start over
+                        offset, mode = 0, "wb"
+
+                    with open(part, mode) as f:
+                        for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+                            if chunk:
+                                f.write(chunk)
+
+                size = part.stat().st_size
+                if expected_total is not None and size != expected_total:
+                    raise requests.ConnectionError(f"incomplete download: {size}/{expected_total} bytes")
+                os.replace(part, dest)
+                return resumed
+
+            except requests.HTTPError as e:
+                status = e.response.status_code if e.response is not None else 0
+                if status not in RETRY_STATUS_CODES and status < 500:
+                    raise
+                last_error = e
+                retry_after = _retry_after_sec(e.response)
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                last_error = e
+
+            attempt += 1
+            if attempt < DOWNLOAD_MAX_ATTEMPTS:
+                backoff = min(8.0, 2 ** (attempt - 1)) * 0.5 + random.uniform(0, 0.5)
+                time.sleep(max(backoff, min(retry_after or 0.0, MAX_RETRY_AFTER_SEC)))
+
+        raise RuntimeError(f"Download failed after {DOWNLOAD_MAX_ATTEMPTS} attempts: {url}: {last_error}")
+
+    @staticmethod
+    def _expected_total(r: requests.Response, offset: int) -> Optional[int]:
+        if r.status_code == 206:
+            _, total = _parse_content_range(r)
+            if total is not None:
+                return total
+            length = r.headers.get("Content-Length")
+            return offset + int(length) if length and length.isdigit() else None
+        length = r.headers.get("Content-Length")
+        # requests transparently decodes gzip, so a compressed length says nothing about the file size
+        if length and length.isdigit() and not r.headers.get("Content-Encoding"):
+            return int(length)
+        return None
+
+
+def _parse_content_range(r: requests.Response) -> Tuple[Optional[int], Optional[int]]:
+    """(first byte, full size) from `bytes a-b/N` or, on 416, `bytes */N`; None where absent or unknown."""
+    m = _CONTENT_RANGE_RE.match(r.headers.get("Content-Range", ""))
+    if not m:
+        return None, None
+    start = int(m.group(1)) if m.group(1) is not None else None
+    total = int(m.group(2)) if m.group(2) != "*" else None
+    return start, total
+
+
+def _retry_after_sec(r: Optional[requests.Response]) -> Optional[float]:
+    value = r.headers.get("Retry-After", "") if r is not None else ""
+    return float(value) if value.strip().isdigit() else None
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(dst.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
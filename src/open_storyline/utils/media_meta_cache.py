@@ -0,0 +1,55 @@
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+
+# -----------------------------
+# Defaults
+# -----------------------------
+DEFAULT_MEDIA_META_CACHE_DIR = "./.storyline/cache/media_meta"
+# Bump when the probed fields change so stale entries are ignored
+MEDIA_META_VERSION = 1
+
+
+class MediaMetadataCache:
+    """
+    On-disk cache of probed media metadata keyed by (resolved path, size, mtime).
+
+    A file that is replaced or edited changes size or mtime and simply misses; entries are tiny JSON files
+    written atomically, so concurrent probes never see a torn entry.
+    """
+
+    def __init__(self, root: Union[str, Path] = DEFAULT_MEDIA_META_CACHE_DIR):
+        self.root = Path(root)
+
+    @staticmethod
+    def make_key(path: Union[str, Path]) -> Optional[str]:
+        p = Path(path)
+        try:
+            st = p.stat()
+        except OSError:
+            return None
+        raw = json.dumps([str(p.resolve()), st.st_size, st.st_mtime_ns, MEDIA_META_VERSION])
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self._path_for(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, metadata: Dict[str, Any]) -> None:
+        path = self._path_for(key)
+        tmp = path.with_name(path.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(metadata), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            return
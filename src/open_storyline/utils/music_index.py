@@ -0,0 +1,167 @@
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from open_storyline.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_FILENAME = ".analysis_index.json"
+INDEX_VERSION = 2  # 2: `duration` is the full track length, beats extrapolated past `analysed_duration`
+AUDIO_EXTS = {".mp3", ".wav", ".m4a", ".aac", ".flac", ".ogg"}
+
+
+def file_md5(path: Union[str, Path]) -> str:
+    """MD5 of file content, the same id scripts/omni_bgm_label.py writes into meta.json."""
+    hash_md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            hash_md5.update(chunk)
+    return hash_md5.hexdigest()
+
+
+def params_key(params: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+class MusicAnalysisIndex:
+    """
+    Sidecar index of per-track music analysis (beats, tempo, loudness profile) stored in `<bgm_dir>/.analysis_index.json`.
+
+    Entries are keyed by content digest + analysis parameters, so renaming a track keeps its analysis and changing
+    `sample_rate` / `hop_length` / ... simply creates new entries. (size, mtime) per path is kept to avoid
+    re-hashing unchanged files on lookup.
+    """
+
+    def __init__(
+        self,
+        bgm_dir: Union[str, Path],
+        analyze: Callable[[Path, Dict[str, Any]], Dict[str, Any]],
+        index_path: Optional[Union[str, Path]] = None,
+    ):
+        self.bgm_dir = Path(bgm_dir)
+        self.analyze = analyze
+        self.index_path = Path(index_path) if index_path else self.bgm_dir / INDEX_FILENAME
+        self._lock = threading.RLock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._background: Optional[threading.Thread] = None
+        self._data = self._load()
+
+    # ---------- persistence ----------
+    def _load(self) -> Dict[str, Any]:
+        empty = {"version": INDEX_VERSION, "files": {}, "entries": {}}
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return empty
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return empty
+        data.setdefault("files", {})
+        data.setdefault("entries", {})
+        return data
+
+    def _save_locked(self) -> None:
+        tmp = self.index_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            tmp.write_text(json.dumps(self._data, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.index_path)
+        except OSError as e:
+            logger.warning(f"Failed to write music analysis index {self.index_path}: {e}")
+
+    # ---------- lookup ----------
+    def _rel(self, path: Path) -> str:
+        try:
+            return path.resolve().relative_to(self.bgm_dir.resolve()).as_posix()
+        except ValueError:
+            return str(path.resolve())
+
+    def digest(self, path: Path) -> str:
+        st = path.stat()
+        rel = self._rel(path)
+        with self._lock:
+            known = self._data["files"].get(rel)
+            if known and known.get("size") == st.st_size and known.get("mtime_ns") == st.st_mtime_ns:
+                return known["digest"]
+        digest = file_md5(path)
+        with self._lock:
+            self._data["files"][rel] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "digest": digest}
+        return digest
+
+    def get(self, path: Union[str, Path], params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key = f"{self.digest(Path(path))}:{params_key(params)}"
+        with self._lock:
+            entry = self._data["entries"].get(key)
+        return dict(entry) if entry is not None else None
+
+    def get_or_compute(self, path: Union[str, Path], params: Dict[str, Any]) -> Dict[str, Any]:
+        path = Path(path)
+        key = f"{self.digest(path)}:{params_key(params)}"
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # One analysis per (track, params) even if the background indexer is on the same file
+        with key_lock:
+            with self._lock:
+                entry = self._data["entries"].get(key)
+            if entry is not None:
+                return dict(entry)
+            metrics = self.analyze(path, params)
+            with self._lock:
+                self._data["entries"][key] = metrics
+                self._save_locked()
+            return dict(metrics)
+
+    # ---------- indexing ----------
+    def iter_tracks(self) -> List[Path]:
+        if not self.bgm_dir.is_dir():
+            return []
+        return sorted(
+            p for p in self.bgm_dir.rglob("*")
+            if p.is_file() and p.suffix.lower() in AUDIO_EXTS and not p.name.startswith(".")
+        )
+
+    def missing(self, params: Dict[str, Any], paths: Optional[Iterable[Path]] = None) -> List[Path]:
+        out: List[Path] = []
+        for p in (paths if paths is not None else self.iter_tracks()):
+            try:
+                if self.get(p, params) is None:
+                    out.append(p)
+            except OSError:
+                continue
+        return out
+
+    def build(
+        self,
+        params: Dict[str, Any],
+        paths: Optional[Iterable[Path]] = None,
+        on_progress: Optional[Callable[[Path, Optional[Exception]], None]] = None,
+    ) -> int:
+        """Analyse every new or changed track; returns how many were indexed."""
+        done = 0
+        for p in self.missing(params, paths):
+            err: Optional[Exception] = None
+            try:
+                self.get_or_compute(p, params)
+                done += 1
+            except Exception as e:
+                err = e
+                logger.warning(f"Music analysis failed for {p}: {type(e).__name__}: {e}")
+            if on_progress is not None:
+                on_progress(p, err)
+        return done
+
+    def start_background_refresh(self, params: Dict[str, Any]) -> Optional[threading.Thread]:
+        """Index new or changed tracks on a daemon thread; lookups keep working (and wait per track) meanwhile."""
+        with self._lock:
+            if self._background is not None and self._background.is_alive():
+                return self._background
+            self._background = threading.Thread(
+                target=self.build,
+                args=(params,),
+                name="bgm-analysis-index",
+                daemon=True,
+            )
+            self._background.start()
+            return self._background
@@ -0,0 +1,71 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+from PIL import Image
+
+
+DHASH_WIDTH = 9
+DHASH_HEIGHT = 8
+DHASH_BYTES = (DHASH_WIDTH - 1) * DHASH_HEIGHT // 8
+
+# popcount for every byte value, used to compute Hamming distances on packed hashes
+_POPCOUNT_U8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def dhash_from_gray(gray: np.ndarray) -> np.ndarray:
+    """
+    64-bit difference hash of a (DHASH_HEIGHT, DHASH_WIDTH) grayscale frame, packed into 8 uint8.
+    """
+    gray = np.asarray(gray, dtype=np.int16)
+    if gray.shape != (DHASH_HEIGHT, DHASH_WIDTH):
+        img = Image.fromarray(gray.astype(np.uint8)).resize((DHASH_WIDTH, DHASH_HEIGHT), Image.BILINEAR)
+        gray = np.asarray(img, dtype=np.int16)
+    bits = gray[:, 1:] > gray[:, :-1]
+    return np.packbits(bits.reshape(-1))
+
+
+def dhash_from_image(img: Image.Image) -> np.ndarray:
+    gray = img.convert("L").resize((DHASH_WIDTH, DHASH_HEIGHT), Image.BILINEAR)
+    return dhash_from_gray(np.asarray(gray))
+
+
+def cluster_by_hamming(
+    signatures: Sequence[Optional[np.ndarray]],
+    max_distance: int,
+    groups: Optional[Sequence[str]] = None,
+) -> List[int]:
+    """
+    Leader clustering of clip signatures (each a concatenation of per-frame dHashes of equal length).
+
+    Two clips match when every aligned frame pair is within `max_distance` bits. Clips are visited in order and
+    join the first earlier representative they match, so representatives never chain into each other.
+    Clips without a signature, or in different `groups`, are never merged.
+
+    Returns, for every clip, the index of its representative (itself for representatives).
+    """
+    n = len(signatures)
+    rep_of = list(range(n))
+    if n < 2 or max_distance < 0:
+        return rep_of
+
+    # Representatives are bucketed by (group, signature length) and kept as one stacked array per bucket
+    buckets: dict = {}
+    for i, sig in enumerate(signatures):
+        if sig is None or sig.size == 0 or sig.size % DHASH_BYTES:
+            continue
+        frames = sig.reshape(-1, DHASH_BYTES)
+        key = ((groups[i] if groups is not None else ""), frames.shape[0])
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = ([i], frames[None, :, :])
+            continue
+
+        rep_indices, stacked = bucket  # stacked: (r, k, 8)
+        dist = _POPCOUNT_U8[np.bitwise_xor(stacked, frames[None, :, :])].sum(axis=2, dtype=np.int32)  # (r, k)
+        hits = np.flatnonzero((dist <= max_distance).all(axis=1))
+        if hits.size:
+            rep_of[i] = rep_indices[int(hits[0])]
+        else:
+            rep_indices.append(i)
+            buckets[key] = (rep_indices, np.concatenate([stacked, frames[None, :, :]], axis=0))
+    return rep_of
@@ -1,15 +1,95 @@
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_community.vectorstores.faiss import FAISS
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+import hashlib
+import json
 import os
+import threading
+
+DEFAULT_MODEL_NAME = "./.storyline/models/all-MiniLM-L6-v2"
+FALLBACK_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_RECALL_CACHE_DIR = "./.storyline/cache/recall"
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+MANIFEST_FILENAME = "manifest.json"
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """
+    Wraps an embedding model with an LRU cache for query embeddings; document embedding is passed through.
+    """
+
+    def __init__(self, inner: Embeddings, max_size: int = QUERY_EMBEDDING_CACHE_SIZE):
+        self.inner = inner
+        self.max_size = max_size
+        self._cache: "OrderedDict[str, list[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.inner.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        with self._lock:
+            vec = self._cache.get(text)
+            if vec is not None:
+                self._cache.move_to_end(text)
+                return vec
+        vec = self.inner.embed_query(text)
+        with self._lock:
+            self._cache[text] = vec
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return vec
+
+
+_embeddings: dict[tuple[str, str], CachedQueryEmbeddings] = {}
+_embeddings_lock = threading.Lock()
+
+
+def get_embeddings(model_name: str = DEFAULT_MODEL_NAME, device: str = "cpu") -> CachedQueryEmbeddings:
+    """
+    One embedding model per (model, device) for the whole process, shared by every recall user.
+    """
+    if not os.path.exists(model_name):
+        model_name = FALLBACK_MODEL_NAME
+    key = (model_name, device)
+    with _embeddings_lock:
+        emb = _embeddings.get(key)
+        if emb is None:
+            emb = CachedQueryEmbeddings(
+                HuggingFaceEmbeddings(
+                    model_name=model_name,
+                    model_kwargs={"device": device}
+                )
+            )
+            _embeddings[key] = emb
+        return emb
+
+
+def _doc_keys(items: list[dict]) -> list[str]:
+    """Content-derived ids; identical items get a #n suffix so ids stay unique."""
+    keys: list[str] = []
+    seen: dict[str, int] = {}
+    for item in items:
+        base = hashlib.sha1(json.dumps(item, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+        n = seen.get(base, 0)
+        seen[base] = n + 1
+        keys.append(base if n == 0 else f"{base}#{n}")
+    return keys
+
 
 class StorylineRecall:
     @staticmethod
     def build_vectorstore(
-        data: list[dict], 
-        field: str = "description", 
-        model_name: str = "./.storyline/models/all-MiniLM-L6-v2", 
-        device: str = "cpu"
+        data: list[dict],
+        field: str = "description",
+        model_name: str = DEFAULT_MODEL_NAME,
+        device: str = "cpu",
+        cache_name: Optional[str] = None,
+        cache_dir: str = DEFAULT_RECALL_CACHE_DIR,
     ):
         """
         Build a FAISS vectorstore using a local HuggingFace embedding model.
@@ -19,31 +99,82 @@ class StorylineRecall:
             field: which text field to embed
             model_name: HuggingFace model identifier
             device: "cpu" or "cuda" if available
+            cache_name: if set, the index is persisted under `cache_dir/cache_name`; it is reloaded when the data
+                is unchanged and updated incrementally (only added / changed docs are embedded) otherwise
+            cache_dir: root directory of persisted indexes
 
         Returns:
             FAISS vectorstore
         """
-        if not os.path.exists(model_name):
-            model_name = "sentence-transformers/all-MiniLM-L6-v2"
-
-        # Create embeddings using HF model
-        embeddings = HuggingFaceEmbeddings(
-            model_name=model_name,
-            model_kwargs={"device": device}
-        )
+        embeddings = get_embeddings(model_name, device)
 
         # Construct LangChain Documents
-        docs = []
-        for item in data:
-            text = item.get(field, "")
-            if text:
-                docs.append(Document(page_content=text, metadata=item))
-
-        if not docs:
+        items = [item for item in data if item.get(field, "")]
+        if not items:
             print(f"[RECALL - Build vectorstore] Cannot find field: {field}, return None.")
             return None
-        # Build FAISS
-        vectorstore = FAISS.from_documents(docs, embeddings)
+        keys = _doc_keys(items)
+
+        if not cache_name:
+            docs = [Document(page_content=item[field], metadata=item) for item in items]
+            return FAISS.from_documents(docs, embeddings, ids=keys)
+
+        return StorylineRecall._load_or_update(items, keys, field, model_name, embeddings, Path(cache_dir) / cache_name)
+
+    @staticmethod
+    def _load_or_update(
+        items: list[dict],
+        keys: list[str],
+        field: str,
+        model_name: str,
+        embeddings: Embeddings,
+        folder: Path,
+    ):
+        manifest_hash = hashlib.sha1(json.dumps([model_name, field, keys]).encode("utf-8")).hexdigest()
+        manifest_path = folder / MANIFEST_FILENAME
+
+        manifest: dict = {}
+        vectorstore = None
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            if manifest.get("model_name") == model_name and manifest.get("field") == field:
+                # Written by this class only, so loading the pickled docstore is safe
+                vectorstore = FAISS.load_local(str(folder), embeddings, allow_dangerous_deserialization=True)
+        except Exception:
+            vectorstore = None
+
+        if vectorstore is not None and manifest.get("manifest_hash") == manifest_hash:
+            return vectorstore
+
+        if vectorstore is None:
+            docs = [Document(page_content=item[field], metadata=item) for item in items]
+            vectorstore = FAISS.from_documents(docs, embeddings, ids=keys)
+            added, removed = len(keys), 0
+        else:
+            old_keys = set(manifest.get("keys") or [])
+            new_keys = set(keys)
+            stale = [k for k in old_keys if k not in new_keys]
+            fresh = [(k, item) for k, item in zip(keys, items) if k not in old_keys]
+            if stale:
+                vectorstore.delete(stale)
+            if fresh:
+                vectorstore.add_texts(
+                    [item[field] for _, item in fresh],
+                    metadatas=[item for _, item in fresh],
+                    ids=[k for k, _ in fresh],
+                )
+            added, removed = len(fresh), len(stale)
+
+        try:
+            folder.mkdir(parents=True, exist_ok=True)
+            vectorstore.save_local(str(folder))
+            manifest_path.write_text(
+                json.dumps({"manifest_hash": manifest_hash, "model_name": model_name, "field": field, "keys": keys}),
+                encoding="utf-8",
+            )
+        except OSError as e:
+            print(f"[RECALL - Build vectorstore] Failed to persist index to {folder}: {e}")
+        print(f"[RECALL - Build vectorstore] {folder.name}: {added} docs embedded, {removed} removed")
         return vectorstore
 
     @staticmethod
@@ -60,4 +191,4 @@ class StorylineRecall:
             list of original dict entries
         """
         results = vectorstore.similarity_search(query, k=n)
-        return [doc.metadata for doc in results]
\ No newline at end of file
+        return [doc.metadata for doc in results]
@@ -0,0 +1,69 @@
+import json
+import hashlib
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from open_storyline.utils.disk_cache import BoundedDiskCache
+
+
+# -----------------------------
+# Defaults
+# -----------------------------
+DEFAULT_TTS_CACHE_DIR = "./.storyline/cache/tts"
+DEFAULT_TTS_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+
+
+def normalize_tts_text(text: str) -> str:
+    """Whitespace and Unicode form don't change what a TTS engine says, so they don't split cache entries."""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+class TTSChunkCache:
+    """
+    Bounded on-disk cache of synthesized TTS chunks, content-addressed by
+    (normalized text, provider, voice, request params, model version, service endpoint). The endpoint keeps
+    entries from different TTS deployments apart when they share a provider name and no model version is set.
+
+    Each entry is `<key>.wav` plus a `<key>.json` sidecar holding the frame count / sample rate, so durations
+    are known without opening the audio. Hits refresh the WAV mtime; once the directory grows past `max_bytes`
+    the least recently used entries are evicted.
+    """
+
+    def __init__(self, root: Union[str, Path] = DEFAULT_TTS_CACHE_DIR, max_bytes: int = DEFAULT_TTS_CACHE_MAX_BYTES):
+        self._disk = BoundedDiskCache(root, max_bytes, suffix=".wav", companion_suffixes=(".json",))
+        self.root = self._disk.root
+        self.max_bytes = self._disk.max_bytes
+
+    @staticmethod
+    def make_key(
+        text: str,
+        provider: str,
+        voice: str,
+        params: Dict[str, Any],
+        model_version: str = "",
+        endpoint: str = "",
+    ) -> str:
+        raw = json.dumps(
+            [normalize_tts_text(text), provider, voice, params, model_version, endpoint.rstrip("/")],
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        wav_path, meta_path = self._disk.path_for(key), self._disk.path_for(key, ".json")
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            data = wav_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        self._disk.touch(wav_path)
+        return data, meta
+
+    def put(self, key: str, data: bytes, meta: Dict[str, Any]) -> None:
+        # Audio first, sidecar last: an entry only counts once its sidecar exists
+        self._disk.put(key, [(".wav", data), (".json", json.dumps(meta).encode("utf-8"))])
+
+    def total_bytes(self) -> int:
+        return self._disk.total_bytes()
@@ -0,0 +1,371 @@
+import os
+import atexit
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import av
+import numpy as np
+from PIL import Image
+
+from open_storyline.utils.disk_cache import BoundedDiskCache
+
+
+# -----------------------------
+# Defaults
+# -----------------------------
+DEFAULT_FRAME_CACHE_DIR = "./.storyline/cache/frames"
+DEFAULT_FRAME_CACHE_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_OPEN_SOURCES = 4
+DEFAULT_ENCODE_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+# Decoding forward is cheaper than seeking as long as the gap is shorter than a typical GOP
+SEEK_FORWARD_THRESHOLD_SEC = 5.0
+# Timestamps are quantized to milliseconds for cache keys and frame matching
+TIME_EPSILON_SEC = 1e-3
+RESIZE_INTERPOLATION = "LANCZOS"
+
+
+def source_digest(path: Union[str, Path]) -> str:
+    """
+    Cheap identity of a media file: resolved path + size + mtime.
+    Rewriting the file in place changes mtime, which invalidates every cached frame of it.
+    """
+    st = os.stat(path)
+    raw = f"{os.path.realpath(path)}|{st.st_size}|{st.st_mtime_ns}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _target_size(width: int, height: int, long_edge: int) -> Tuple[int, int]:
+    le = max(width, height)
+    if long_edge <= 0 or le <= long_edge:
+        return width, height
+    scale = long_edge / float(le)
+    return max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+
+
+def _encode_jpeg(frame_rgb: np.ndarray, rot90_k: int, jpeg_quality: int) -> bytes:
+    """Runs inside the encode pool, so it must stay a picklable top-level function."""
+    if rot90_k:
+        frame_rgb = np.ascontiguousarray(np.rot90(frame_rgb, rot90_k))
+    buf = BytesIO()
+    Image.fromarray(frame_rgb).save(buf, format="JPEG", quality=jpeg_quality, optimize=True)
+    return buf.getvalue()
+
+
+class JpegFrameCache:
+    """
+    Bounded on-disk JPEG cache keyed by (source digest, t, edge, quality).
+    Hits refresh the file mtime; once the directory grows past `max_bytes` the least recently used files are evicted.
+    """
+
+    def __init__(self, root: Union[str, Path] = DEFAULT_FRAME_CACHE_DIR, max_bytes: int = DEFAULT_FRAME_CACHE_MAX_BYTES):
+        self._disk = BoundedDiskCache(root, max_bytes, suffix=".jpg")
+        self.root = self._disk.root
+        self.max_bytes = self._disk.max_bytes
+
+    @staticmethod
+    def make_key(digest: str, t: float, edge: int, quality: int) -> str:
+        raw = f"{digest}|{round(float(t), 3):.3f}|{int(edge)}|{int(quality)}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._disk.path_for(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        self._disk.touch(path)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        self._disk.put(key, [(".jpg", data)])
+
+
+class _SourceDecoder:
+    """
+    A long-lived PyAV decoder for one source file.
+    Requests for increasing timestamps keep decoding forward instead of reopening and seeking,
+    which is the common case when the clips of one source are understood in order.
+
+    The file is opened by the first user (under `self.lock`), not on construction, so the extractor never
+    opens files while holding its global lock. `users` and `evicted` are guarded by the extractor's lock:
+    an evicted decoder is closed by whoever releases it last.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.users = 0
+        self.evicted = False
+        self.container = None
+        self.stream = None
+        self._frames = None
+        self._current = None
+        self._current_t = float("-inf")
+        self._ahead = None
+
+    def open(self) -> None:
+        """Caller must hold `self.lock`."""
+        if self.container is None:
+            self.container = av.open(self.path)
+            self.stream = self.container.streams.video[0]
+            self.stream.thread_type = "AUTO"
+
+    @property
+    def duration(self) -> float:
+        if self.stream.duration is not None and self.stream.time_base is not None:
+            return float(self.stream.duration * self.stream.time_base)
+        if self.container.duration is not None:
+            return float(self.container.duration) / av.time_base
+        return 0.0
+
+    def close(self) -> None:
+        if self.container is None:
+            return
+        try:
+            self.container.close()
+        except Exception:
+            pass
+        self.container = None
+        self._frames = None
+
+    def _frame_time(self, frame) -> Optional[float]:
+        if frame.pts is None:
+            return None
+        return float(frame.pts * self.stream.time_base)
+
+    def _seek(self, t: float) -> None:
+        offset = int(max(0.0, t) / self.stream.time_base)
+        self.container.seek(offset, stream=self.stream, backward=True, any_frame=False)
+        self._frames = self.container.decode(self.stream)
+        self._current = None
+        self._current_t = float("-inf")
+        self._ahead = None
+
+    def frames_at(self, times: Sequence[float]) -> List[Any]:
+        """
+        Returns the frame displayed at each (ascending) timestamp, i.e. the last frame whose pts <= t,
+        matching what MoviePy's get_frame(t) used to return. Caller must hold `self.lock`.
+        """
+        if not times:
+            return []
+
+        first = times[0]
+        if (
+            self._frames is None
+            or first + TIME_EPSILON_SEC < self._current_t
+            or first - self._current_t > SEEK_FORWARD_THRESHOLD_SEC
+        ):
+            self._seek(first)
+
+        out: List[Any] = []
+        for t in times:
+            if t + TIME_EPSILON_SEC < self._current_t:
+                self._seek(t)
+            while True:
+                if self._ahead is None:
+                    self._ahead = next(self._frames, None)
+                if self._ahead is None:
+                    break
+                at = self._frame_time(self._ahead)
+                if at is None or at <= t + TIME_EPSILON_SEC:
+                    self._current = self._ahead
+                    self._current_t = at if at is not None else self._current_t
+                    self._ahead = None
+                    continue
+                break
+            out.append(self._current if self._current is not None else self._ahead)
+        return out
+
+
+class VideoFrameExtractor:
+    """
+    Extracts JPEG frames from local videos:
+    - each source is decoded once, in a single forward pass over all requested timestamps
+    - frames are scaled to the target long edge by libswscale during conversion
+    - JPEG encoding runs in a process pool and results land in a bounded on-disk cache
+    """
+
+    def __init__(
+        self,
+        cache: Optional[JpegFrameCache] = None,
+        *,
+        max_open_sources: int = DEFAULT_MAX_OPEN_SOURCES,
+        encode_workers: int = DEFAULT_ENCODE_WORKERS,
+    ):
+        self.cache = cache or JpegFrameCache()
+        self.max_open_sources = max(1, int(max_open_sources))
+        self.encode_workers = max(0, int(encode_workers))
+        self._decoders: "OrderedDict[str, _SourceDecoder]" = OrderedDict()
+        self._decoders_lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    # ---------- decoders ----------
+    @contextmanager
+    def _use_decoder(self, path: str) -> Iterator[_SourceDecoder]:
+        """
+        Yields the open decoder of `path` with its lock held. The global lock only covers the LRU bookkeeping;
+        opening, decoding and closing evicted decoders happen outside it.
+        """
+        key = os.path.realpath(path)
+        idle: List[_SourceDecoder] = []
+        with self._decoders_lock:
+            dec = self._decoders.get(key)
+            if dec is None:
+                dec = _SourceDecoder(path)
+                self._decoders[key] = dec
+            else:
+                self._decoders.move_to_end(key)
+            dec.users += 1
+            while len(self._decoders) > self.max_open_sources:
+                _, old = self._decoders.popitem(last=False)
+                old.evicted = True
+                if old.users == 0:
+                    idle.append(old)
+        for old in idle:
+            with old.lock:
+                old.close()
+
+        try:
+            with dec.lock:
+                dec.open()
+                yield dec
+        finally:
+            with self._decoders_lock:
+                dec.users -= 1
+                close_now = dec.evicted and dec.users == 0
+            if close_now:
+                with dec.lock:
+                    dec.close()
+
+    def duration(self, path: str) -> float:
+        with self._use_decoder(path) as dec:
+            return dec.duration
+
+    # ---------- encoding ----------
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.encode_workers <= 0:
+            return None
+        with self._pool_lock:
+            if self._pool is None:
+                try:
+                    self._pool = ProcessPoolExecutor(max_workers=self.encode_workers)
+                except (OSError, NotImplementedError):
+                    self.encode_workers = 0
+                    return None
+            return self._pool
+
+    def _encode_many(self, jobs: List[Tuple[np.ndarray, int]], jpeg_quality: int) -> List[bytes]:
+        pool = self._get_pool()
+        if pool is not None and len(jobs) > 1:
+            try:
+                futures = [pool.submit(_encode_jpeg, arr, k, jpeg_quality) for arr, k in jobs]
+                return [f.result() for f in futures]
+            except BrokenProcessPool:
+                with self._pool_lock:
+                    self._pool = None
+        return [_encode_jpeg(arr, k, jpeg_quality) for arr, k in jobs]
+
+    def close(self) -> None:
+        with self._decoders_lock:
+            idle = []
+            for dec in self._decoders.values():
+                dec.evicted = True
+                if dec.users == 0:
+                    idle.append(dec)
+            self._decoders.clear()
+        for dec in idle:
+            with dec.lock:
+                dec.close()
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    # ---------- public ----------
+    def extract_arrays(
+        self,
+        path: str,
+        times: Sequence[float],
+        width: int,
+        height: int,
+        pix_fmt: str = "gray",
+    ) -> List[Optional[np.ndarray]]:
+        """
+        Raw frames scaled to exactly (width, height) for every absolute timestamp in `times`. Not cached:
+        meant for tiny analysis frames (hashes, motion estimates) where decoding dominates anyway.
+        """
+        todo = sorted({round(max(0.0, float(t)), 3) for t in times})
+        by_time: Dict[float, np.ndarray] = {}
+        with self._use_decoder(path) as dec:
+            for t, frame in zip(todo, dec.frames_at(todo)):
+                if frame is not None:
+                    by_time[t] = frame.to_ndarray(width=width, height=height, format=pix_fmt)
+        return [by_time.get(round(max(0.0, float(t)), 3)) for t in times]
+
+    def extract(
+        self,
+        path: str,
+        times: Sequence[float],
+        resize_edge: int,
+        jpeg_quality: int,
+    ) -> List[Optional[bytes]]:
+        """
+        Return JPEG bytes for every absolute timestamp in `times` (same order, None if no frame could be decoded).
+        """
+        digest = source_digest(path)
+        keys = [JpegFrameCache.make_key(digest, t, resize_edge, jpeg_quality) for t in times]
+        results: List[Optional[bytes]] = [self.cache.get(k) for k in keys]
+
+        # Distinct missing timestamps, ascending, so the decoder never has to go backwards
+        missing: Dict[str, float] = {}
+        for k, t, data in zip(keys, times, results):
+            if data is None and k not in missing:
+                missing[k] = round(max(0.0, float(t)), 3)
+        if not missing:
+            return results
+
+        todo = sorted(missing.items(), key=lambda kv: kv[1])
+        jobs: List[Tuple[np.ndarray, int]] = []
+        job_keys: List[str] = []
+        with self._use_decoder(path) as dec:
+            frames = dec.frames_at([t for _, t in todo])
+            converted: Dict[int, Tuple[np.ndarray, int]] = {}
+            for (k, _), frame in zip(todo, frames):
+                if frame is None:
+                    continue
+                if id(frame) not in converted:
+                    w, h = _target_size(frame.width, frame.height, resize_edge)
+                    arr = frame.to_ndarray(width=w, height=h, format="rgb24", interpolation=RESIZE_INTERPOLATION)
+                    rotation = int(getattr(frame, "rotation", 0) or 0)
+                    converted[id(frame)] = (arr, (rotation // 90) % 4)
+                jobs.append(converted[id(frame)])
+                job_keys.append(k)
+
+        encoded = dict(zip(job_keys, self._encode_many(jobs, jpeg_quality)))
+        for k, data in encoded.items():
+            self.cache.put(k, data)
+
+        return [data if data is not None else encoded.get(k) for k, data in zip(keys, results)]
+
+
+_default_extractor: Optional[VideoFrameExtractor] = None
+_default_extractor_lock = threading.Lock()
+
+
+def get_frame_extractor() -> VideoFrameExtractor:
+    """Process-wide extractor, so decoders, the encode pool and the cache index are shared across requests."""
+    global _default_extractor
+    with _default_extractor_lock:
+        if _default_extractor is None:
+            _default_extractor = VideoFrameExtractor()
+            atexit.register(_default_extractor.close)
+        return _default_extractor
@@ -2371,6 +2371,7 @@ class App {
     this.pipelineConfirmNodeId = $("#pipelineConfirmNodeId");
     this.pipelineConfirmParams = $("#pipelineConfirmParams");
     this.pipelineConfirmBtn = $("#pipelineConfirmBtn");
+    this.pipelineSkipBtn = $("#pipelineSkipBtn");
     this.pipelineCountdown = $("#pipelineCountdown");
     this.pipelineRunning = false;
     this._pipelineSteps = {};
@@ -3134,6 +3135,9 @@ class App {
     if (this.pipelineConfirmBtn) {
       this.pipelineConfirmBtn.addEventListener("click", () => this._confirmPipelineNode());
     }
+    if (this.pipelineSkipBtn) {
+      this.pipelineSkipBtn.addEventListener("click", () => this._skipPipelineNode());
+    }
   }
 
   setPending(list) {
@@ -3330,6 +3334,11 @@ class App {
       return;
     }
 
+    if (type === "pipeline.partial") {
+      this._updatePipelinePartial(data);
+      return;
+    }
+
     if (type === "pipeline.confirm") {
       this._showPipelineConfirm(data);
       return;
@@ -3486,6 +3495,40 @@ class App {
     chat.scrollTop = chat.scrollHeight;
   }
 
+  _updatePipelinePartial(data) {
+    const { node_id, event, prefix, total } = data || {};
+    if (event === "render.preview") {
+      this._showPipelinePreview(data);
+      return;
+    }
+    if (!node_id || event !== "voiceover.segment") return;
+    const stepEl = document.querySelector(`[data-step-id="${node_id}"] .pipeline-step-msg`);
+    if (stepEl) stepEl.textContent = `${prefix || 0}/${total || 0}`;
+  }
+
+  // 配音前缀的预览视频：正式渲染完成前先展示已完成的前几组
+  _showPipelinePreview(data) {
+    const { output_path, prefix, total } = data || {};
+    const url = this._normalizePreviewUrl(output_path);
+    if (!url || !this._pipelineProgressEl) return;
+
+    let box = this._pipelineProgressEl.querySelector(".pipeline-preview");
+    if (!box) {
+      box = document.createElement("div");
+      box.className = "pipeline-preview";
+      this._pipelineProgressEl.appendChild(box);
+    }
+    box.innerHTML = "";
+    const label = document.createElement("div");
+    label.className = "pipeline-preview-label";
+    label.textContent = `预览：前 ${prefix || 0}/${total || 0} 组`;
+    const video = document.createElement("video");
+    video.src = url;
+    video.controls = true;
+    video.preload = "metadata";
+    box.append(label, video);
+  }
+
   _updatePipelineStep(data) {
     const { node_id, status, progress, message } = data || {};
     if (!node_id) return;
@@ -3526,6 +3569,9 @@ class App {
     } else if (status === "done") {
       stepEl.classList.add("is-done");
       if (iconEl) iconEl.textContent = "\u2713";
+    } else if (status === "cached") {
+      stepEl.classList.add("is-done");
+      if (iconEl) iconEl.textContent = "\u21bb";
     } else if (status === "error") {
       stepEl.classList.add("is-error");
       if (iconEl) iconEl.textContent = "\u2717";
@@ -3558,11 +3604,27 @@ class App {
     if (finalStatus === "done") {
       const barEl = document.getElementById("pipelineBarFill");
       if (barEl) barEl.style.width = "100%";
+    } else {
+      this._addPipelineResumeButton();
     }
     // Close confirm modal if open
     this._closePipelineConfirm();
   }
 
+  _addPipelineResumeButton() {
+    // 失败或取消后可从未完成的节点续跑（服务端沿用已完成节点的产物）
+    const header = document.querySelector("#pipelineProgressPanel .pipeline-progress-header");
+    if (!header || header.querySelector(".pipeline-resume-btn")) return;
+    const btn = document.createElement("button");
+    btn.type = "button";
+    btn.className = "pipeline-resume-btn";
+    btn.textContent = (this.lang || "zh") === "zh" ? "续跑" : "Resume";
+    btn.addEventListener("click", () => {
+      if (this.ws && !this.pipelineRunning) this.ws.send("pipeline.resume", {});
+    });
+    header.appendChild(btn);
+  }
+
   _showPipelineConfirm(data) {
     const { node_id, params, timeout_sec } = data || {};
     if (!this.pipelineConfirmModal) return;
@@ -3616,6 +3678,13 @@ class App {
     this._closePipelineConfirm();
   }
 
+  _skipPipelineNode() {
+    if (this.ws) {
+      this.ws.send("pipeline.confirm_response", { node_id: this._pipelineConfirmNodeId, skip: true });
+    }
+    this._closePipelineConfirm();
+  }
+
   _closePipelineConfirm() {
     if (this._pipelineConfirmTimer) {
       clearInterval(this._pipelineConfirmTimer);